@@ -8,6 +8,7 @@
 
 # ===================== 基础全局配置 =====================
 # Python解释器编码（避免中文乱码）
+import os
 import sys
 sys.setdefaultencoding = lambda x, enc="utf-8": None
 
@@ -37,7 +38,7 @@ REQUEST_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
     "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
+    "Accept-Encoding": "gzip, deflate, br, zstd",  # 实际声明值由core/crawl_transport.py按已安装的解压库生成
     "Referer": "https://finance.sina.com.cn/",  # 新增：添加来源页，模拟真实访问
     "Cookie": "UOR=www.baidu.com,finance.sina.com.cn,; SINAGLOBAL=1234567890; ULV=1234567890123:1:1:1:1234567890123:;",  # 新增：模拟Cookie（可随便填）
     "Upgrade-Insecure-Requests": "1",
@@ -51,12 +52,38 @@ REQUEST_HEADERS = {
 # 请求超时时间（秒）：超过该时间未响应则放弃采集
 REQUEST_TIMEOUT = 10
 
-# 关键词间请求间隔（秒）：防止请求过快被封禁（建议1-3秒）
+# 同一站点相邻请求的最小间隔（秒）：防止请求过快被封禁（建议1-3秒）；不同站点各自计时、互不等待
 REQUEST_INTERVAL = 1
 
+# 按站点覆盖请求间隔（站点域名 → 秒），未列出的站点使用REQUEST_INTERVAL
+CRAWL_HOST_INTERVALS = {
+    # "www.10jqka.com.cn": 2,
+}
+
+# 站点限流（429/Retry-After）后请求间隔翻倍的上限（秒），请求成功后逐步回落
+CRAWL_HOST_MAX_INTERVAL = 30
+
+# 单次遵守Retry-After暂停的上限（秒）
+CRAWL_RETRY_AFTER_MAX = 60
+
+# 并发采集：全局最大并发请求数、单个站点的最大并发请求数（替代逐关键词串行+固定间隔）
+CRAWL_CONCURRENCY = 8
+CRAWL_PER_HOST_CONCURRENCY = 2
+
 # 请求失败重试次数：单关键词采集失败后重试次数
 REQUEST_RETRY_TIMES = 2
 
+# 重试退避（秒）：第n次重试前随机等待0 ~ min(上限, 基准×2^n)
+REQUEST_RETRY_BASE_DELAY = 1
+REQUEST_RETRY_MAX_DELAY = 10
+
+# 需要重试的HTTP状态码（限流/服务端临时错误）
+REQUEST_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 连接池：保留连接池的站点数、每个站点的最大保活连接数
+REQUEST_POOL_CONNECTIONS = 10
+REQUEST_POOL_MAXSIZE = 10
+
 # ===================== 行业舆情专属配置 =====================
 # 默认行业事件关键词（采集函数未传入时使用）
 INDUSTRY_DEFAULT_EVENT_KEYWORDS = [
@@ -122,11 +149,24 @@ STORAGE_FORMAT = "sqlite"
 # SQLite数据库文件路径（项目根目录下的data文件夹）
 SQLITE_DB_PATH = "./data/opinion_demo.db"
 
+# 增量采集状态库：各来源+关键词的水位线与页面ETag/Last-Modified
+CRAWL_STATE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "crawl_state.db")
+
+# 采集URL库：已发现的文章链接及抓取状态（核心采集函数与test/test_crawl.py共用）
+CRAWL_URL_STORE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "crawl_urls.db")
+
+# 详情页抓取失败的链接最多尝试次数（达到后不再重试）
+CRAWL_URL_MAX_ATTEMPTS = 3
+
+# 失败重试的基础退避时间（秒）：第n次失败后等待 基础退避×2^(n-1) 再重试
+CRAWL_URL_RETRY_BACKOFF = 300
+
 # ===================== 扩展配置（可选） =====================
 # 时间范围过滤：仅采集指定时间段内的舆情（格式：YYYY-MM-DD）
-# 若为None则采集所有时间
+# 若为None则采集所有时间；页面按发布时间倒序，遇到早于起始日期的舆情即停止翻页
 CRAWL_TIME_START = None
 CRAWL_TIME_END = None
 
-# 是否开启增量采集（True：仅采集新增舆情，需配合时间戳）
+# 是否开启增量采集（True：仅采集新增舆情）
+# 按来源+关键词记录水位线，发送ETag/If-Modified-Since条件请求，遇到不晚于水位线的舆情即停止解析与翻页
 INCREMENTAL_CRAWL = False
\ No newline at end of file
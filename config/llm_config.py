@@ -0,0 +1,217 @@
+# config/llm_config.py
+# -*- coding: utf-8 -*-
+"""
+大模型调用核心配置文件
+功能：统一管理舆情分析器/数据生成器调用大模型的参数，无需修改核心代码即可调整调用策略
+适用：core/sentiment_analyzer.py、core/data_generator_controller.py
+"""
+import os
+
+# 项目根目录（缓存等本地文件统一放在根目录下的data文件夹）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ===================== 模型基础配置 =====================
+# 接口地址（设置环境变量DEEPSEEK_BASE_URL可切换到本地模拟服务，如 http://127.0.0.1:8765/v1）
+LLM_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+
+# 默认模型
+LLM_MODEL = "deepseek-chat"
+
+# 默认采样温度
+LLM_TEMPERATURE = 0.3
+
+# 默认最大输出Token数
+LLM_MAX_TOKENS = 2000
+
+# ===================== 模型路由配置 =====================
+# 各场景的候选配置（按优先顺序），未配置的字段沿用默认模型/温度/最大输出；
+# 首选配置实测P95耗时超过该场景SLO时切换到下一档更快的配置，未列出的场景使用默认配置。
+# 注意：DeepSeek接口只有deepseek-chat一档对话模型（deepseek-reasoner更慢），同一模型仅调小max_tokens
+# 并不能缩短耗时，反而会截断输出；因此默认只有一档，路由只负责按场景设置参数与质量统计，不是延迟优化手段
+
+# 降级档模型：设置环境变量DEEPSEEK_FAST_MODEL（同一接口地址下更快/更便宜的模型，如自建的小参数模型）后，
+# 行业/公司分析超出SLO时才会切换到该模型
+LLM_FAST_MODEL = os.getenv("DEEPSEEK_FAST_MODEL")
+
+LLM_ROUTES = {
+    "industry": [{"model": LLM_MODEL, "max_tokens": 2000, "temperature": 0.3}] +
+                ([{"model": LLM_FAST_MODEL, "max_tokens": 2000, "temperature": 0.3}] if LLM_FAST_MODEL else []),
+    "company": [{"model": LLM_MODEL, "max_tokens": 2000, "temperature": 0.3}] +
+               ([{"model": LLM_FAST_MODEL, "max_tokens": 2000, "temperature": 0.3}] if LLM_FAST_MODEL else []),
+    # 补问只输出缺失板块
+    "reask_industry": [{"max_tokens": 1200}],
+    "reask_company": [{"max_tokens": 1200}],
+    # 通用分析仅5个要点
+    "general": [{"max_tokens": 600, "temperature": 0.2}],
+    "suggestions": [{"max_tokens": 1200, "temperature": 0.5}]
+}
+
+# 各场景P95耗时目标（秒，不含限流排队）
+LLM_ROUTE_SLO = {
+    "industry": 60,
+    "company": 60,
+    "reask_industry": 30,
+    "reask_company": 30,
+    "general": 15,
+    "suggestions": 40
+}
+
+# 每个配置保留的最近耗时样本数，以及判定所需的最少样本数
+LLM_ROUTE_WINDOW = 50
+LLM_ROUTE_MIN_SAMPLES = 5
+
+# 样本有效期（秒）：过期后首选配置重新试用，服务恢复后自动切回
+LLM_ROUTE_SAMPLE_TTL = 600
+
+# 最低质量要求：JSON完整解析（未截断修复）的比例低于该值的配置不参与路由
+LLM_ROUTE_MIN_QUALITY = 0.8
+
+# ===================== 响应缓存配置 =====================
+# 缓存总开关（False：所有调用直接请求大模型）
+LLM_CACHE_ENABLE = True
+
+# SQLite缓存文件路径
+LLM_CACHE_DB_PATH = os.path.join(ROOT_DIR, "data", "llm_cache.db")
+
+# 缓存有效期（秒）：超过该时间的缓存视为过期，默认7天
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+# 缓存条数上限：超过后按最近最少使用（LRU）淘汰
+LLM_CACHE_MAX_ENTRIES = 2000
+
+# ===================== 批量分析配置 =====================
+# 异步批量分析的默认并发请求数
+LLM_BATCH_CONCURRENCY = 8
+
+# ===================== 限流配置（所有DeepSeek调用共享） =====================
+# 每分钟请求数上限
+LLM_RATE_LIMIT_RPM = 300
+
+# 每分钟Token数上限（输入+输出）
+LLM_RATE_LIMIT_TPM = 1000000
+
+# 自适应并发窗口上限/下限（AIMD：成功加性增大，429/5xx乘性减小）
+LLM_MAX_CONCURRENCY = 16
+LLM_MIN_CONCURRENCY = 1
+
+# 限流/服务端错误的最大重试次数
+LLM_MAX_RETRIES = 3
+
+# 指数退避基础时间（秒）
+LLM_RETRY_BASE_DELAY = 1.0
+
+# ===================== 熔断配置（所有DeepSeek调用共享） =====================
+# 统计窗口：最近多少次调用
+LLM_BREAKER_WINDOW = 20
+
+# 窗口内至少多少次调用才判定是否熔断
+LLM_BREAKER_MIN_CALLS = 5
+
+# 失败率阈值（超时/连接错误/5xx计为失败）
+LLM_BREAKER_FAILURE_RATE = 0.5
+
+# 慢调用耗时阈值（秒）与慢调用率阈值
+LLM_BREAKER_SLOW_CALL_SECONDS = 60
+LLM_BREAKER_SLOW_CALL_RATE = 0.8
+
+# 熔断持续时间（秒），到期后进入半开状态放行探测请求
+LLM_BREAKER_OPEN_SECONDS = 30
+
+# 半开状态同时放行的探测请求数
+LLM_BREAKER_HALF_OPEN_CALLS = 1
+
+# ===================== 请求调度配置 =====================
+# 为交互请求（页面点击分析）预留的并发名额，批量任务最多使用"并发窗口-预留名额"
+LLM_INTERACTIVE_RESERVED_SLOTS = 2
+
+# 各优先级默认排队时限（秒，从请求开始计算），超时放弃排队；None表示不限
+LLM_INTERACTIVE_DEADLINE = 60
+LLM_HIGH_PRIORITY_DEADLINE = 600
+LLM_ROUTINE_DEADLINE = None
+
+# ===================== 打包分析配置 =====================
+# 每次请求打包的同场景舆情条数（单条输出约2000 Token，受模型最大输出长度限制）
+LLM_PACK_SIZE = 3
+
+# 打包请求的最大输出Token数
+LLM_PACK_MAX_TOKENS = 8000
+
+# ===================== 相似舆情复用配置 =====================
+# 是否启用相似舆情复用（转载/轻度改写的新闻直接复用已有分析结果）
+LLM_NEAR_DUP_ENABLE = True
+
+# 相似舆情签名库路径
+LLM_NEAR_DUP_DB_PATH = os.path.join(ROOT_DIR, "data", "near_duplicate.db")
+
+# 最大汉明距离（64位SimHash，越小越严格；无关文本的距离通常在30左右，
+# 调大后同模板但数字不同的公告也可能被误判为转载）
+LLM_NEAR_DUP_MAX_DISTANCE = 4
+
+# 参与比对的最短正文长度（过短的文本签名不稳定，不做复用）
+LLM_NEAR_DUP_MIN_LENGTH = 50
+
+# 签名有效期（秒）：转载通常集中在数日内，过期分析不再复用
+LLM_NEAR_DUP_TTL = 3 * 24 * 3600
+
+# ===================== 本地初筛配置 =====================
+# 初筛得分阈值：达到阈值的舆情才提交大模型分析（单个强风险词约3分，标题命中×1.5）
+LLM_TRIAGE_THRESHOLD = 3.0
+
+# ===================== 分析结果库配置 =====================
+# 是否将行业/公司分析结果写入本地结果库（页面重跑后可直接展示历史结果）
+LLM_RESULT_STORE_ENABLE = True
+
+# 分析结果库路径
+LLM_RESULT_STORE_DB_PATH = os.path.join(ROOT_DIR, "data", "analysis_results.db")
+
+# ===================== 组合信号配置 =====================
+# 近期权重半衰期（天）：越早的分析结果在行业得分/公司风险指数中的权重越低
+LLM_PORTFOLIO_HALF_LIFE_DAYS = 7
+
+# 实质变化阈值：行业加权景气度得分、公司风险指数（0-100）的变化幅度
+LLM_PORTFOLIO_SCORE_CHANGE = 5
+LLM_PORTFOLIO_RISK_CHANGE = 15
+
+# 投资建议提示词中列出的行业/公司数（行业按得分取首尾各N个，公司按风险指数取前N个）
+LLM_PORTFOLIO_TOP_N = 10
+
+# 启动时从结果库载入的历史结果数
+LLM_PORTFOLIO_SEED_LIMIT = 500
+
+# ===================== HTTP连接池配置（所有OpenAI客户端共享） =====================
+# 是否启用HTTP/2（需安装h2，即httpx[http2]；未安装时自动退回HTTP/1.1）
+LLM_HTTP2 = True
+
+# 连接池最大连接数（应不小于LLM_MAX_CONCURRENCY）
+LLM_HTTP_MAX_CONNECTIONS = 32
+
+# 最大保活连接数
+LLM_HTTP_MAX_KEEPALIVE = 16
+
+# 空闲保活连接的过期时间（秒）
+LLM_HTTP_KEEPALIVE_EXPIRY = 120
+
+# 建连超时/整体超时（秒）：分析类请求输出较长，整体超时需覆盖完整生成时间
+LLM_HTTP_CONNECT_TIMEOUT = 10
+LLM_HTTP_TIMEOUT = 180
+
+# ===================== 调用遥测配置 =====================
+# 是否记录每次大模型调用的耗时/Token/费用
+LLM_TELEMETRY_ENABLE = True
+
+# 调用记录文件（JSONL，仅追加）
+LLM_TELEMETRY_PATH = os.path.join(ROOT_DIR, "data", "llm_telemetry.jsonl")
+
+# 调用记录轮转：文件超过上限（字节）时改名为.1/.2/...，最多保留的历史文件数（总占用有上限）
+LLM_TELEMETRY_MAX_BYTES = 2 * 1024 * 1024
+LLM_TELEMETRY_BACKUPS = 3
+
+# 侧边栏调用统计的时间窗口（小时）：只聚合最近的记录
+LLM_TELEMETRY_SUMMARY_HOURS = 24
+
+# 计费单价（元/百万Token）：输入、输出
+LLM_PRICE_INPUT_PER_M = 2.0
+LLM_PRICE_OUTPUT_PER_M = 8.0
+
+# 命中服务端前缀缓存的输入单价（元/百万Token）
+LLM_PRICE_CACHED_INPUT_PER_M = 0.5
@@ -0,0 +1,201 @@
+# batch_job_runner.py
+"""
+离线批量分析任务
+输入为JSONL（每行一条舆情），工作线程池逐条分析，结果逐条落盘（JSONL检查点）；
+中断后重新运行会跳过已完成的舆情，每个舆情ID只输出一次
+
+用法（命令行入口见core/cli.py）：
+    python core/cli.py analyze --input data/news.jsonl --output data/results.jsonl --concurrency 8 --resume
+    python core/cli.py analyze --from-generated core/generated_data --output data/results.jsonl --resume
+"""
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import threading
+from typing import Dict, List, Set
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import LLM_BATCH_CONCURRENCY
+from core.triage import NewsTriage
+from core.request_scheduler import request_priority, priority_for_news
+
+
+def news_id(news: Dict) -> str:
+    """舆情ID：优先使用id字段，否则按标题+内容+主体生成稳定哈希"""
+    if news.get("id"):
+        return str(news["id"])
+    raw = json.dumps([news.get("title", ""), news.get("content", ""),
+                      news.get("related_company", ""), news.get("related_industry", "")],
+                     ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def write_news_jsonl(news_list: List[Dict], path: str) -> int:
+    """将舆情列表写为任务输入JSONL（补齐id字段），返回写入条数"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for news in news_list:
+            f.write(json.dumps({"id": news_id(news), **news}, ensure_ascii=False) + "\n")
+    return len(news_list)
+
+
+def read_news_jsonl(path: str) -> List[Dict]:
+    """读取任务输入JSONL（跳过空行）"""
+    news_list = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                news_list.append(json.loads(line))
+    return news_list
+
+
+class BatchJobRunner:
+    """带检查点的批量分析任务"""
+
+    def __init__(self, analyzer, output_path: str, workers: int = None, triage: bool = False,
+                 progress_every: int = 10):
+        """
+        Args:
+            analyzer: 舆情分析器（需提供analyze_news方法）
+            output_path: 结果JSONL路径（同时作为检查点）
+            workers: 工作线程数，默认读取LLM_BATCH_CONCURRENCY
+            triage: 是否先做本地初筛，低信号舆情直接输出本地标签
+            progress_every: 每完成多少条打印一次进度
+        """
+        self.analyzer = analyzer
+        self.output_path = output_path
+        self.workers = workers or LLM_BATCH_CONCURRENCY
+        self.triage = NewsTriage() if triage else None
+        self.progress_every = progress_every
+
+        self._lock = threading.Lock()
+        self._completed = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Set[str]:
+        """读取已完成的舆情ID；上次中断残留的半行会被截掉，避免污染后续追加"""
+        completed = set()
+        if not os.path.exists(self.output_path):
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+            return completed
+
+        valid_size = 0
+        with open(self.output_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    completed.add(json.loads(line)["id"])
+                except (json.JSONDecodeError, KeyError):
+                    break
+                valid_size += len(line)
+
+        if valid_size < os.path.getsize(self.output_path):
+            print(f"⚠️ 检查点末尾存在不完整记录，已截断至 {len(completed)} 条")
+            with open(self.output_path, "r+b") as f:
+                f.truncate(valid_size)
+        return completed
+
+    def _write_result(self, item_id: str, result: Dict) -> bool:
+        """追加一条结果并落盘；同一ID只写一次"""
+        line = json.dumps({"id": item_id, "result": result}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if item_id in self._completed:
+                return False
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._completed.add(item_id)
+            return True
+
+    def _analyze(self, news: Dict) -> Dict:
+        if self.triage:
+            scored = self.triage.score(news)
+            if scored["初筛得分"] < self.triage.threshold:
+                return self.analyzer._attach_news_meta(self.triage.local_label(news, scored), news)
+        # 后台任务：高严重程度舆情优先，其余让位于页面交互请求
+        with request_priority(priority_for_news(news)):
+            return self.analyzer.analyze_news(news)
+
+    def run(self, news_list: List[Dict]) -> Dict:
+        """
+        执行批量分析
+
+        Returns:
+            运行报告：总数、已跳过、本次完成、失败、耗时、吞吐量
+        """
+        # 去重：同一ID只排队一次，已完成的直接跳过
+        pending = {}
+        for news in news_list:
+            item_id = news_id(news)
+            if item_id not in self._completed and item_id not in pending:
+                pending[item_id] = news
+        skipped = len(news_list) - len(pending)
+
+        jobs = queue.Queue()
+        for item in pending.items():
+            jobs.put(item)
+
+        report = {"总数": len(news_list), "已跳过": skipped, "本次完成": 0, "失败": 0}
+        failures = []
+        start = time.monotonic()
+        print(f"开始批量任务：共 {len(news_list)} 条，跳过已完成/重复 {skipped} 条，"
+              f"待分析 {len(pending)} 条（{self.workers} 个工作线程）")
+
+        def worker():
+            while True:
+                try:
+                    item_id, news = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    result = self._analyze(news)
+                    if "服务降级" in result:
+                        # 备选数据不算完成，留待下次运行重新分析
+                        raise RuntimeError(result["服务降级"]["降级原因"])
+                    if result.get("解析状态") == "失败":
+                        # 响应无法解析为JSON：同样留待下次运行重新分析
+                        raise RuntimeError("大模型响应解析失败")
+                    written = self._write_result(item_id, result)
+                except Exception as e:
+                    # 失败不写检查点，下次运行自动重试
+                    with self._lock:
+                        report["失败"] += 1
+                        failures.append({"id": item_id, "错误信息": str(e)})
+                    print(f"⚠️ 分析失败 [{item_id}]: {e}")
+                    continue
+
+                with self._lock:
+                    if written:
+                        report["本次完成"] += 1
+                    done = report["本次完成"] + report["失败"]
+                if done % self.progress_every == 0 or done == len(pending):
+                    self._print_progress(done, len(pending), start)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(pending)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.monotonic() - start
+        report["耗时(秒)"] = round(elapsed, 2)
+        report["吞吐量(条/分钟)"] = round(report["本次完成"] / elapsed * 60, 2) if elapsed > 0 else 0.0
+        report["失败明细"] = failures
+        print(f"✅ 批量任务结束：本次完成 {report['本次完成']} 条，失败 {report['失败']} 条，"
+              f"耗时 {report['耗时(秒)']} 秒，吞吐 {report['吞吐量(条/分钟)']} 条/分钟")
+        return report
+
+    @staticmethod
+    def _print_progress(done: int, total: int, start: float):
+        elapsed = time.monotonic() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = (total - done) / rate if rate > 0 else 0.0
+        print(f"  进度 {done}/{total} | 吞吐 {rate * 60:.1f} 条/分钟 | 预计剩余 {remaining:.0f} 秒")
+
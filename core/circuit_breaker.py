@@ -0,0 +1,179 @@
+# circuit_breaker.py
+"""
+大模型服务熔断器
+最近N次调用的失败率或慢调用率超过阈值时熔断，熔断期间请求直接失败（返回降级结果），
+到期后半开放行少量探测请求，探测成功则恢复
+"""
+import os
+import sys
+import time
+import threading
+from collections import deque
+from typing import Dict
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_BREAKER_WINDOW,
+    LLM_BREAKER_MIN_CALLS,
+    LLM_BREAKER_FAILURE_RATE,
+    LLM_BREAKER_SLOW_CALL_SECONDS,
+    LLM_BREAKER_SLOW_CALL_RATE,
+    LLM_BREAKER_OPEN_SECONDS,
+    LLM_BREAKER_HALF_OPEN_CALLS
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+STATE_NAMES = {
+    STATE_CLOSED: "正常",
+    STATE_OPEN: "熔断",
+    STATE_HALF_OPEN: "半开探测"
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断期间快速失败"""
+
+
+class CircuitBreaker:
+    """滑动窗口熔断器（失败率 + 慢调用率）"""
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 60, slow_call_rate: float = 0.8,
+                 open_seconds: float = 30, half_open_calls: int = 1):
+        """
+        Args:
+            window: 统计最近多少次调用
+            min_calls: 窗口内至少多少次调用才判定
+            failure_rate: 失败率阈值
+            slow_call_seconds: 慢调用耗时阈值（秒）
+            slow_call_rate: 慢调用率阈值
+            open_seconds: 熔断持续时间（秒）
+            half_open_calls: 半开状态同时放行的探测请求数
+        """
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+        self._outcomes = deque(maxlen=window)
+        self._probes = 0
+        self._lock = threading.Lock()
+
+        # 统计
+        self.open_count = 0
+        self.rejected_count = 0
+
+    def allow(self) -> bool:
+        """是否放行本次调用；熔断期间返回False"""
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected_count += 1
+                    return False
+                self.state = STATE_HALF_OPEN
+                self._probes = 0
+
+            if self.state == STATE_HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected_count += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def check(self):
+        """放行检查，熔断期间抛出CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(f"大模型服务熔断中（剩余 {self.remaining_open_seconds():.0f} 秒），已快速失败")
+
+    def record_success(self, latency: float):
+        """记录一次成功调用（耗时超过阈值计为慢调用）"""
+        self._record(failed=False, slow=latency >= self.slow_call_seconds)
+
+    def record_failure(self):
+        """记录一次失败调用（超时/连接错误/5xx）"""
+        self._record(failed=True, slow=False)
+
+    def release_probe(self):
+        """探测请求未产生结果（如限流、调用方中断）时归还探测名额"""
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+    def _record(self, failed: bool, slow: bool):
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                # 探测失败或仍然很慢：重新熔断；否则恢复并清空窗口
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = STATE_CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == STATE_OPEN:
+                # 熔断前已放行的请求陆续返回，不再计入
+                return
+
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._outcomes if f) / len(self._outcomes)
+            slows = sum(1 for _, s in self._outcomes if s) / len(self._outcomes)
+            if failures >= self.failure_rate or slows >= self.slow_call_rate:
+                self._open()
+
+    def _open(self):
+        self.state = STATE_OPEN
+        self.opened_at = time.monotonic()
+        self.open_count += 1
+        self._outcomes.clear()
+        print(f"⚠️ 大模型服务熔断 {self.open_seconds:.0f} 秒，期间请求直接返回降级结果")
+
+    def remaining_open_seconds(self) -> float:
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict:
+        """熔断器状态"""
+        with self._lock:
+            total = len(self._outcomes)
+            return {
+                "状态": STATE_NAMES[self.state],
+                "失败率": sum(1 for f, _ in self._outcomes if f) / total if total else 0.0,
+                "慢调用率": sum(1 for _, s in self._outcomes if s) / total if total else 0.0,
+                "熔断次数": self.open_count,
+                "快速失败次数": self.rejected_count,
+                "剩余熔断秒数": round(self.remaining_open_seconds(), 1)
+            }
+
+
+# ===================== 进程级共享熔断器 =====================
+_shared_breaker = None
+_shared_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """获取进程级共享熔断器（舆情分析器与数据生成器共用）"""
+    global _shared_breaker
+    with _shared_breaker_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker(
+                window=LLM_BREAKER_WINDOW,
+                min_calls=LLM_BREAKER_MIN_CALLS,
+                failure_rate=LLM_BREAKER_FAILURE_RATE,
+                slow_call_seconds=LLM_BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate=LLM_BREAKER_SLOW_CALL_RATE,
+                open_seconds=LLM_BREAKER_OPEN_SECONDS,
+                half_open_calls=LLM_BREAKER_HALF_OPEN_CALLS
+            )
+        return _shared_breaker
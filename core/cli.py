@@ -0,0 +1,136 @@
+# cli.py
+"""
+命令行入口（不依赖Streamlit，适合定时任务与多进程批量分析）
+
+用法：
+    python core/cli.py analyze --input data/news.jsonl --output data/results.json --concurrency 8
+    python core/cli.py analyze --from-generated core/generated_data --output data/results.jsonl --resume
+    python core/cli.py generate --output-dir core/generated_data
+
+密钥读取顺序：--api-key → 环境变量/.env中的DEEPSEEK_API_KEY
+"""
+import os
+import sys
+import json
+import argparse
+from typing import Dict, List
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+DEFAULT_DATA_DIR = os.path.join(ROOT_DIR, "core", "generated_data")
+
+
+def _load_news(args) -> List[Dict]:
+    """读取待分析舆情：JSONL文件或仿真数据目录"""
+    if args.input:
+        from core.batch_job_runner import read_news_jsonl
+
+        return read_news_jsonl(args.input)
+
+    from core.data_integration import DataIntegrator
+
+    integrator = DataIntegrator(data_dir=args.from_generated)
+    max_news = 2 * max(len(integrator.policies), len(integrator.risk_events))
+    news_list = integrator.prepare_news_for_analysis(max_news=max_news)
+    return news_list[:args.limit] if args.limit else news_list
+
+
+def _api_key(args):
+    """读取DeepSeek密钥，未找到时打印提示并返回None"""
+    from core.credentials import get_credential
+
+    api_key = get_credential("DEEPSEEK_API_KEY", args.api_key)
+    if not api_key:
+        print("❌ 未找到DEEPSEEK_API_KEY，请通过--api-key、环境变量或.env提供")
+    return api_key
+
+
+def cmd_analyze(args) -> int:
+    """批量分析舆情"""
+    api_key = _api_key(args)
+    if not api_key:
+        return 1
+
+    # 延迟导入：仅分析命令需要加载大模型客户端
+    from core.sentiment_analyzer import FinancialSentimentAnalyzer
+
+    news_list = _load_news(args)
+    analyzer = FinancialSentimentAnalyzer(api_key=api_key, use_cache=not args.no_cache)
+
+    if args.resume:
+        # 断点续跑：结果逐条写入JSONL检查点
+        from core.batch_job_runner import BatchJobRunner
+
+        report = BatchJobRunner(analyzer, args.output, args.concurrency, args.triage).run(news_list)
+        return 1 if report["失败"] else 0
+
+    if args.packed:
+        results = analyzer.batch_analyze_packed(news_list)
+    else:
+        results = analyzer.batch_analyze_news(news_list, concurrency=args.concurrency, triage=args.triage)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        if args.output.endswith(".jsonl"):
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        else:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"✅ 已保存 {len(results)} 条分析结果：{args.output}")
+    return 0
+
+
+def cmd_generate(args) -> int:
+    """生成仿真金融数据"""
+    api_key = _api_key(args)
+    if not api_key:
+        return 1
+
+    # 生成器模块使用同目录导入
+    sys.path.append(os.path.join(ROOT_DIR, "core"))
+    from main_data_generator import MainDataGenerator
+
+    from core.request_scheduler import PRIORITY_ROUTINE
+
+    # 命令行批量造数按常规任务排队，让位于同时进行的交互分析
+    generator = MainDataGenerator(api_key, priority=PRIORITY_ROUTINE)
+    generator.controller.config["output_dir"] = args.output_dir
+    os.makedirs(args.output_dir, exist_ok=True)
+    generator.run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="金融舆情分析命令行工具")
+    parser.add_argument("--api-key", help="DeepSeek API密钥（默认读取环境变量/.env）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    analyze = subparsers.add_parser("analyze", help="批量分析舆情")
+    source = analyze.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="舆情JSONL文件（每行一条，字段同batch_analyze_news）")
+    source.add_argument("--from-generated", nargs="?", const=DEFAULT_DATA_DIR,
+                        help="从仿真数据目录（policies.json/risk_events.json）读取舆情")
+    analyze.add_argument("--output", required=True, help="结果文件（.json或.jsonl）")
+    analyze.add_argument("--limit", type=int, help="仿真数据最多分析条数")
+    analyze.add_argument("--concurrency", type=int, help="并发请求数")
+    analyze.add_argument("--triage", action="store_true", help="先做本地初筛，仅高信号舆情提交大模型")
+    analyze.add_argument("--packed", action="store_true", help="打包分析（同场景多条合并为一次请求）")
+    analyze.add_argument("--resume", action="store_true", help="逐条写入JSONL检查点，重跑时跳过已完成舆情")
+    analyze.add_argument("--no-cache", action="store_true", help="旁路响应缓存与相似舆情复用")
+    analyze.set_defaults(func=cmd_analyze)
+
+    generate = subparsers.add_parser("generate", help="生成仿真金融数据")
+    generate.add_argument("--output-dir", default=DEFAULT_DATA_DIR, help="数据输出目录")
+    generate.set_defaults(func=cmd_generate)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# core/crawl_engine.py
+"""
+异步并发采集引擎
+多个关键词页面并发抓取，全局并发与单站点并发均有上限；各站点按礼貌度调度独立排期，
+排期等待发生在占用全局并发名额之前，某一站点限流时其他站点的请求照常进行；
+请求在线程中复用共享传输层（连接池、重试、限流规则与耗时记录与同步采集完全一致）
+"""
+import os
+import sys
+import asyncio
+import threading
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.crawl_config import (
+    DEBUG_MODE,
+    CRAWL_CONCURRENCY,
+    CRAWL_PER_HOST_CONCURRENCY
+)
+from core.crawl_transport import CrawlTransport, get_crawl_transport
+
+
+class CrawlEngine:
+    """有界并发的页面抓取（全局 + 单站点信号量）"""
+
+    def __init__(self, transport: CrawlTransport = None, concurrency: int = 8, per_host: int = 2):
+        """
+        Args:
+            transport: 共享传输层（提供默认请求头、超时、重试参数与耗时记录）
+            concurrency: 全局最大并发请求数
+            per_host: 单个站点的最大并发请求数
+        """
+        self.transport = transport or get_crawl_transport()
+        self.concurrency = concurrency
+        self.per_host = per_host
+
+    def fetch_all(self, urls: List[str], headers: Dict = None, timeout: float = None,
+                  verify: bool = True, encoding: str = None, url_headers: List[Dict] = None) -> List[Dict]:
+        """
+        并发抓取多个页面
+
+        Args:
+            urls: 页面地址列表
+            headers: 额外请求头（覆盖默认请求头）
+            timeout: 单次请求超时（秒）
+            verify: 是否校验HTTPS证书
+            encoding: 页面编码，None时按响应头判断
+            url_headers: 与urls对应的逐页请求头（如条件请求的If-None-Match），覆盖headers
+
+        Returns:
+            与urls顺序一致的结果列表：{"url", "status", "text", "headers", "error"}；失败时status/text为None，headers不区分大小写
+        """
+        return asyncio.run(self.afetch_all(urls, headers, timeout, verify, encoding, url_headers))
+
+    async def afetch_all(self, urls: List[str], headers: Dict = None, timeout: float = None,
+                         verify: bool = True, encoding: str = None, url_headers: List[Dict] = None) -> List[Dict]:
+        """异步版本的fetch_all"""
+        if not urls:
+            return []
+        page_headers = [{**(headers or {}), **(extra or {})} or None for extra in (url_headers or [None] * len(urls))]
+        limit = asyncio.Semaphore(self.concurrency)
+        host_limits = {host: asyncio.Semaphore(self.per_host) for host in {urlsplit(url).netloc for url in urls}}
+
+        async def run_one(url, request_headers):
+            host = urlsplit(url).netloc
+            async with host_limits[host]:
+                wait = self.transport.politeness.reserve(host)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                async with limit:
+                    return await fetch_one(url, request_headers)
+
+        async def fetch_one(url, request_headers):
+            try:
+                # 首次请求已在上方排期，传输层只对重试重新排期
+                response = await asyncio.to_thread(self.transport.get, url, headers=request_headers,
+                                                   timeout=timeout, verify=verify, reserved=True)
+                response.encoding = encoding or response.encoding
+                return {"url": url, "status": response.status_code, "text": response.text,
+                        "headers": response.headers, "error": None}
+            except Exception as e:
+                if DEBUG_MODE:
+                    print(f"❌ 页面抓取失败：{url} - {str(e)}")
+                return {"url": url, "status": None, "text": None, "headers": {}, "error": str(e)}
+
+        return await asyncio.gather(*(run_one(url, h) for url, h in zip(urls, page_headers)))
+
+
+# ===================== 进程级共享采集引擎 =====================
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_crawl_engine() -> CrawlEngine:
+    """获取进程级共享采集引擎（共用传输层的连接池与耗时记录）"""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = CrawlEngine(concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST_CONCURRENCY)
+        return _shared_engine
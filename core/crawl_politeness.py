@@ -0,0 +1,150 @@
+# core/crawl_politeness.py
+"""
+按站点的采集礼貌度调度
+每个站点独立维护请求间隔：同一站点的请求按最小间隔依次排期，不同站点互不等待（总速率为各站点速率之和）；
+服务端返回429/Retry-After时暂停该站点并放大其请求间隔，之后请求成功逐步恢复
+"""
+import os
+import sys
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.crawl_config import (
+    DEBUG_MODE,
+    REQUEST_INTERVAL,
+    CRAWL_HOST_INTERVALS,
+    CRAWL_HOST_MAX_INTERVAL,
+    CRAWL_RETRY_AFTER_MAX
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头（秒数或HTTP日期），返回需等待的秒数；无法解析返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class PolitenessScheduler:
+    """按站点排期请求：最小间隔 + 限流暂停 + 间隔自适应"""
+
+    def __init__(self, min_interval: float = 0.0, host_intervals: Dict[str, float] = None,
+                 max_interval: float = 30.0, retry_after_max: float = 60.0, recover_factor: float = 0.8):
+        """
+        Args:
+            min_interval: 同一站点相邻请求的默认最小间隔（秒）
+            host_intervals: 按站点覆盖的最小间隔（站点 → 秒）
+            max_interval: 限流后放大的请求间隔上限（秒）
+            retry_after_max: 单次暂停时长上限（秒），避免服务端给出过长的Retry-After
+            recover_factor: 请求成功后放大间隔向默认值回落的比例
+        """
+        self.min_interval = min_interval
+        self.host_intervals = dict(host_intervals or {})
+        self.max_interval = max_interval
+        self.retry_after_max = retry_after_max
+        self.recover_factor = recover_factor
+
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> Dict:
+        base = self.host_intervals.get(host, self.min_interval)
+        return self.hosts.setdefault(host, {"base": base, "interval": base, "next_at": 0.0,
+                                            "paused_until": 0.0, "requests": 0, "throttled": 0,
+                                            "waited": 0.0})
+
+    def reserve(self, host: str) -> float:
+        """
+        为站点预约下一个请求时间点
+
+        Args:
+            host: 站点（域名:端口）
+
+        Returns:
+            需等待的秒数（调用方等待后即可发送请求；并发调用按调用顺序依次排期）
+        """
+        with self._lock:
+            state = self._host(host)
+            now = time.monotonic()
+            slot = max(now, state["next_at"], state["paused_until"])
+            state["next_at"] = slot + state["interval"]
+            state["requests"] += 1
+            state["waited"] += slot - now
+            return slot - now
+
+    def throttled(self, host: str, retry_after: Optional[str] = None, default_pause: float = 0.0) -> float:
+        """
+        站点返回限流信号（429或带Retry-After的5xx）：暂停该站点并放大请求间隔
+
+        Args:
+            host: 站点
+            retry_after: 响应的Retry-After头
+            default_pause: 无Retry-After时的暂停秒数
+
+        Returns:
+            实际暂停的秒数
+        """
+        pause = parse_retry_after(retry_after)
+        pause = min(self.retry_after_max, default_pause if pause is None else pause)
+        with self._lock:
+            state = self._host(host)
+            state["paused_until"] = max(state["paused_until"], time.monotonic() + pause)
+            state["interval"] = min(self.max_interval, max(state["interval"] * 2, state["base"], 0.5))
+            state["throttled"] += 1
+            interval = state["interval"]
+        if DEBUG_MODE:
+            print(f"🐢 站点限流：{host} 暂停{pause:.1f}秒，请求间隔调整为{interval:.1f}秒")
+        return pause
+
+    def succeeded(self, host: str):
+        """请求成功：放大的请求间隔逐步回落到默认值"""
+        with self._lock:
+            state = self._host(host)
+            if state["interval"] > state["base"]:
+                state["interval"] = max(state["base"], state["interval"] * self.recover_factor)
+
+    def stats(self) -> List[Dict]:
+        """各站点的排期状态"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "站点": host,
+                "请求数": state["requests"],
+                "限流次数": state["throttled"],
+                "当前间隔(秒)": round(state["interval"], 2),
+                "累计排队(秒)": round(state["waited"], 2),
+                "暂停剩余(秒)": round(max(0.0, state["paused_until"] - now), 1)
+            } for host, state in self.hosts.items()]
+
+
+# ===================== 进程级共享礼貌度调度 =====================
+_shared_politeness = None
+_shared_politeness_lock = threading.Lock()
+
+
+def get_politeness_scheduler() -> PolitenessScheduler:
+    """获取进程级共享礼貌度调度（所有采集请求共用各站点的请求预算）"""
+    global _shared_politeness
+    with _shared_politeness_lock:
+        if _shared_politeness is None:
+            _shared_politeness = PolitenessScheduler(
+                min_interval=REQUEST_INTERVAL,
+                host_intervals=CRAWL_HOST_INTERVALS,
+                max_interval=CRAWL_HOST_MAX_INTERVAL,
+                retry_after_max=CRAWL_RETRY_AFTER_MAX
+            )
+        return _shared_politeness
@@ -0,0 +1,245 @@
+# core/crawl_state.py
+"""
+增量采集状态
+按(来源, 关键词)持久化水位线（已采集的最新发布时间及该时间点的标题）与页面的ETag/Last-Modified：
+下次采集发送条件请求（未修改时服务端返回304，不传输页面），
+页面按发布时间倒序，遇到不晚于水位线的舆情即停止（不再解析后续条目、不再翻页）
+"""
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.crawl_config import CRAWL_STATE_DB_PATH
+
+# 无发布时间的舆情按标题判断是否已采集，每个关键词保留的标题数
+RECENT_TITLES_LIMIT = 200
+
+_FULL_TIME = re.compile(r'(\d{4})[-/年.](\d{1,2})[-/月.](\d{1,2})日?(?:\s*(\d{1,2}):(\d{2})(?::(\d{2}))?)?')
+_SHORT_TIME = re.compile(r'(\d{1,2})[-/月](\d{1,2})日?\s*(\d{1,2}):(\d{2})')
+_CLOCK_TIME = re.compile(r'^(\d{1,2}):(\d{2})$')
+_RELATIVE_TIME = re.compile(r'(\d+)\s*(分钟|小时|天)前')
+
+
+def normalize_time(text: str, now: datetime = None) -> Optional[str]:
+    """
+    统一发布时间格式
+
+    Args:
+        text: 页面上的发布时间（2025-12-07 10:30 / 2025年12月07日 / 12-07 10:30 / 10:30 / 3小时前 等）
+        now: 解析省略年份/日期/相对时间的参照时间，默认当前时间
+
+    Returns:
+        "YYYY-MM-DD HH:MM:SS"（可按字符串比较先后）；无法解析返回None
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    now = now or datetime.now()
+    try:
+        match = _FULL_TIME.search(text)
+        if match:
+            year, month, day, hour, minute, second = (int(v) if v else 0 for v in match.groups())
+            return datetime(year, month, day, hour, minute, second).strftime("%Y-%m-%d %H:%M:%S")
+        match = _SHORT_TIME.search(text)
+        if match:
+            month, day, hour, minute = (int(v) for v in match.groups())
+            value = datetime(now.year, month, day, hour, minute)
+            # 跨年：省略年份的日期晚于当前时间时视为去年
+            if value > now + timedelta(days=1):
+                value = value.replace(year=now.year - 1)
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        match = _CLOCK_TIME.match(text)
+        if match:
+            value = now.replace(hour=int(match.group(1)), minute=int(match.group(2)), second=0, microsecond=0)
+            # 跨日：只有时分的时间晚于当前时间时视为昨天
+            if value > now:
+                value -= timedelta(days=1)
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        match = _RELATIVE_TIME.search(text)
+        if match:
+            unit = {"分钟": "minutes", "小时": "hours", "天": "days"}[match.group(2)]
+            return (now - timedelta(**{unit: int(match.group(1))})).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return None
+
+
+def select_new_items(items: List[Dict], mark: Optional[Dict] = None, time_start: str = None,
+                     time_end: str = None, ordered: bool = True, time_field: str = "发布时间",
+                     title_field: str = "标题") -> Tuple[List[Dict], bool]:
+    """
+    从页面条目中挑出新舆情
+
+    Args:
+        items: 页面解析出的条目
+        mark: 水位线（CrawlStateStore.get的返回值），None表示首次采集
+        time_start/time_end: 采集时间范围（YYYY-MM-DD，None为不限）
+        ordered: 条目是否按发布时间倒序（滚动新闻页）；搜索结果页按相关度排序时为False，
+                 不与水位线比较、不提前停止，只按标题去重并按时间范围过滤
+        time_field/title_field: 发布时间、标题字段名
+
+    Returns:
+        (新条目列表, 是否已到达水位线或时间下限——后续条目与后续页面无需再采集)
+    """
+    start = normalize_time(time_start) if time_start else None
+    end = normalize_time(time_end) if time_end else None
+    end = end[:10] + " 23:59:59" if end else None
+    watermark = (mark or {}).get("watermark")
+    boundary = set((mark or {}).get("boundary") or [])
+    recent = set((mark or {}).get("recent") or [])
+
+    selected = []
+    for item in items:
+        published = normalize_time(item.get(time_field))
+        title = item.get(title_field)
+        if published is None or not ordered:
+            # 无发布时间/按相关度排序的页面（发布时间与水位线无先后关系）：按标题判断是否已采集
+            if title in recent or title in boundary:
+                continue
+            if published is None or not ((start and published < start) or (end and published > end)):
+                selected.append(item)
+            continue
+        if ((start and published < start) or (watermark and published < watermark)
+                or (watermark and published == watermark and title in boundary)):
+            return selected, True
+        if end and published > end:
+            continue
+        selected.append(item)
+    return selected, False
+
+
+class CrawlStateStore:
+    """增量采集状态库（SQLite持久化）"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite文件路径（":memory:"为内存库）
+        """
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_watermarks (
+                source TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                watermark TEXT,
+                boundary TEXT NOT NULL DEFAULT '[]',
+                recent TEXT NOT NULL DEFAULT '[]',
+                etag TEXT,
+                last_modified TEXT,
+                new_items INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, keyword)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, source: str, keyword: str) -> Optional[Dict]:
+        """读取水位线：{"watermark", "boundary", "recent", "etag", "last_modified"}，无记录返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, boundary, recent, etag, last_modified FROM crawl_watermarks "
+                "WHERE source = ? AND keyword = ?", (source, keyword)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"watermark": row[0], "boundary": json.loads(row[1]), "recent": json.loads(row[2]),
+                "etag": row[3], "last_modified": row[4]}
+
+    @staticmethod
+    def conditional_headers(mark: Optional[Dict]) -> Dict:
+        """根据水位线生成条件请求头（If-None-Match / If-Modified-Since）"""
+        headers = {}
+        if mark and mark.get("etag"):
+            headers["If-None-Match"] = mark["etag"]
+        if mark and mark.get("last_modified"):
+            headers["If-Modified-Since"] = mark["last_modified"]
+        return headers
+
+    def update(self, source: str, keyword: str, new_items: List[Dict], etag: str = None,
+               last_modified: str = None, ordered: bool = True, time_field: str = "发布时间",
+               title_field: str = "标题"):
+        """
+        采集完成后推进水位线并保存页面校验信息
+
+        Args:
+            source: 来源标识
+            keyword: 采集关键词
+            new_items: 本次采集到的新条目
+            etag/last_modified: 首页响应的ETag/Last-Modified（未返回时保留原值）
+            ordered: 页面是否按发布时间倒序；为False时不推进水位线，所有标题记入已采集标题
+        """
+        mark = self.get(source, keyword) or {"watermark": None, "boundary": [], "recent": []}
+        watermark, boundary, recent = mark["watermark"], set(mark["boundary"]), list(mark["recent"])
+        for item in new_items:
+            published = normalize_time(item.get(time_field))
+            title = item.get(title_field)
+            if published is None or not ordered:
+                recent.append(title)
+            elif watermark is None or published > watermark:
+                watermark, boundary = published, {title}
+            elif published == watermark:
+                boundary.add(title)
+        recent = list(dict.fromkeys(recent))[-RECENT_TITLES_LIMIT:]
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO crawl_watermarks (source, keyword, watermark, boundary, recent, etag, last_modified, "
+                "new_items, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(source, keyword) DO UPDATE SET watermark = excluded.watermark, "
+                "boundary = excluded.boundary, recent = excluded.recent, "
+                "etag = COALESCE(excluded.etag, etag), last_modified = COALESCE(excluded.last_modified, last_modified), "
+                "new_items = new_items + excluded.new_items, updated_at = excluded.updated_at",
+                (source, keyword, watermark, json.dumps(sorted(boundary), ensure_ascii=False),
+                 json.dumps(recent, ensure_ascii=False), etag, last_modified, len(new_items), time.time())
+            )
+            self._conn.commit()
+
+    def stats(self) -> List[Dict]:
+        """各来源+关键词的水位线"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, keyword, watermark, etag IS NOT NULL OR last_modified IS NOT NULL, new_items, "
+                "updated_at FROM crawl_watermarks ORDER BY updated_at DESC"
+            ).fetchall()
+        return [{
+            "来源": source,
+            "关键词": keyword,
+            "水位线": watermark,
+            "条件请求": bool(conditional),
+            "累计新增": new_items,
+            "更新时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(updated_at))
+        } for source, keyword, watermark, conditional, new_items, updated_at in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ===================== 进程级共享采集状态 =====================
+_shared_state = None
+_shared_state_lock = threading.Lock()
+
+
+def get_crawl_state() -> CrawlStateStore:
+    """获取进程级共享增量采集状态库"""
+    global _shared_state
+    with _shared_state_lock:
+        if _shared_state is None:
+            _shared_state = CrawlStateStore(CRAWL_STATE_DB_PATH)
+        return _shared_state
@@ -0,0 +1,226 @@
+# core/crawl_transport.py
+"""
+舆情采集HTTP传输层
+所有采集函数共用一个requests会话：按站点复用保活连接池，瞬时错误（连接/超时/429/5xx）按抖动退避重试，
+按已安装的解压库声明Accept-Encoding（gzip/deflate，安装brotli后支持br），并记录每次请求的耗时；
+每次请求前按站点礼貌度调度排期，429/Retry-After只暂停对应站点
+"""
+import os
+import sys
+import time
+import random
+import threading
+from collections import deque
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.crawl_config import (
+    DEBUG_MODE,
+    REQUEST_HEADERS,
+    REQUEST_TIMEOUT,
+    REQUEST_RETRY_TIMES,
+    REQUEST_RETRY_BASE_DELAY,
+    REQUEST_RETRY_MAX_DELAY,
+    REQUEST_RETRY_STATUS,
+    REQUEST_POOL_CONNECTIONS,
+    REQUEST_POOL_MAXSIZE
+)
+from core.llm_telemetry import percentile
+from core.crawl_politeness import PolitenessScheduler, get_politeness_scheduler
+
+# 瞬时错误：重试可能成功
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """第attempt次重试前的等待秒数：在[0, min(上限, 基准×2^attempt)]内随机（避免多个请求同时重试）"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def supported_encodings() -> str:
+    """按已安装的解压库生成Accept-Encoding（未安装brotli/zstandard时不声明br/zstd，避免收到无法解码的响应）"""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+    try:
+        import zstandard  # noqa: F401
+        encodings.append("zstd")
+    except ImportError:
+        pass
+    return ", ".join(encodings)
+
+
+class CrawlTransport:
+    """共享会话 + 重试 + 请求耗时记录"""
+
+    def __init__(self, headers: Dict = None, timeout: float = 10, retries: int = 2,
+                 base_delay: float = 1.0, max_delay: float = 10.0, retry_status=(429, 500, 502, 503, 504),
+                 pool_connections: int = 10, pool_maxsize: int = 10, history: int = 1000,
+                 politeness: PolitenessScheduler = None):
+        """
+        Args:
+            headers: 默认请求头（Accept-Encoding按已安装的解压库覆盖）
+            timeout: 默认超时（秒）
+            retries: 瞬时错误的最大重试次数
+            base_delay/max_delay: 退避基准/上限（秒），实际等待在[0, min(上限, 基准×2^n)]内随机
+            retry_status: 需要重试的HTTP状态码
+            pool_connections: 保留连接池的站点数
+            pool_maxsize: 每个站点的最大保活连接数
+            history: 保留最近多少条请求记录
+            politeness: 按站点的请求排期，默认不限制请求间隔（仍遵守Retry-After）
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_status = set(retry_status)
+        self.politeness = politeness or PolitenessScheduler()
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        self.session.headers["Accept-Encoding"] = supported_encodings()
+        # 重试由本类处理，适配器不重试
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.records = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: Dict = None, timeout: float = None, reserved: bool = False,
+            **kwargs) -> requests.Response:
+        """
+        发送GET请求（瞬时错误自动重试）
+
+        Args:
+            url: 请求地址
+            headers: 额外请求头（覆盖会话默认值）
+            timeout: 超时（秒），默认使用初始化配置
+            reserved: 调用方已为首次请求排期（异步采集引擎在占用并发名额前排期）
+            kwargs: 透传给requests（如verify、params）
+
+        Returns:
+            响应；重试耗尽时返回最后一次响应（可重试状态码）或抛出最后一次异常
+        """
+        host = urlsplit(url).netloc
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if attempt or not reserved:
+                wait = self.politeness.reserve(host)
+                if wait > 0:
+                    time.sleep(wait)
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= self.retries:
+                    self.record(host, start, attempt, status=None, error=type(e).__name__)
+                    raise
+                error = type(e).__name__
+            else:
+                if self.is_throttle(response.status_code, response.headers):
+                    # 站点暂停由礼貌度调度在下次排期时等待，不再额外退避
+                    self.politeness.throttled(host, response.headers.get("Retry-After"), default_pause=delay)
+                    delay = 0.0
+                elif response.status_code < 400:
+                    self.politeness.succeeded(host)
+                if response.status_code not in self.retry_status or attempt >= self.retries:
+                    self.record(host, start, attempt, status=response.status_code,
+                                ttfb=response.elapsed.total_seconds(),
+                                size=int(response.headers.get("Content-Length") or len(response.content)),
+                                encoding=response.headers.get("Content-Encoding"))
+                    return response
+                error = f"HTTP {response.status_code}"
+
+            attempt += 1
+            if DEBUG_MODE:
+                print(f"⚠️ 采集请求失败（{error}），{delay:.1f}秒后第{attempt}次重试：{url}")
+            time.sleep(delay)
+
+    @staticmethod
+    def is_throttle(status: int, headers) -> bool:
+        """是否为站点限流信号：429，或带Retry-After的503"""
+        return status == 429 or (status == 503 and "Retry-After" in headers)
+
+    def record(self, host: str, start: float, retries: int, status: int = None, ttfb: float = None,
+               size: int = 0, encoding: str = None, error: str = None):
+        """记录一次请求（异步采集引擎也写入此处）：size为传输字节数（压缩响应为压缩后大小）"""
+        with self._lock:
+            self.records.append({
+                "ts": time.time(),
+                "host": host,
+                "status": status,
+                "retries": retries,
+                "ttfb": ttfb,
+                "latency": time.monotonic() - start,
+                "bytes": size,
+                "encoding": encoding,
+                "error": error
+            })
+
+    def stats(self) -> List[Dict]:
+        """按站点聚合最近的请求记录"""
+        with self._lock:
+            records = list(self.records)
+        groups = {}
+        for entry in records:
+            groups.setdefault(entry["host"], []).append(entry)
+
+        rows = []
+        for host, entries in groups.items():
+            latencies = [e["latency"] for e in entries]
+            rows.append({
+                "站点": host,
+                "请求数": len(entries),
+                "失败数": sum(1 for e in entries if e["status"] is None or e["status"] >= 400),
+                "未修改(304)": sum(1 for e in entries if e["status"] == 304),
+                "重试次数": sum(e["retries"] for e in entries),
+                "耗时P50(秒)": round(percentile(latencies, 50), 3),
+                "耗时P95(秒)": round(percentile(latencies, 95), 3),
+                "压缩响应": sum(1 for e in entries if e["encoding"]),
+                "下载字节": sum(e["bytes"] for e in entries)
+            })
+        return rows
+
+
+# ===================== 进程级共享传输层 =====================
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+
+def get_crawl_transport() -> CrawlTransport:
+    """获取进程级共享传输层（行业/企业舆情采集共用连接池）"""
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = CrawlTransport(
+                headers=REQUEST_HEADERS,
+                timeout=REQUEST_TIMEOUT,
+                retries=REQUEST_RETRY_TIMES,
+                base_delay=REQUEST_RETRY_BASE_DELAY,
+                max_delay=REQUEST_RETRY_MAX_DELAY,
+                retry_status=REQUEST_RETRY_STATUS,
+                pool_connections=REQUEST_POOL_CONNECTIONS,
+                pool_maxsize=REQUEST_POOL_MAXSIZE,
+                politeness=get_politeness_scheduler()
+            )
+        return _shared_transport
@@ -0,0 +1,71 @@
+# credentials.py
+"""
+API密钥查找
+按顺序查询已注册的凭据来源（默认：Streamlit Secrets → 环境变量/.env），
+仅在Streamlit运行时内读取Secrets，命令行/定时任务进程无需导入Streamlit
+"""
+import os
+import sys
+from typing import Callable, List, Optional
+
+from dotenv import load_dotenv
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 项目根目录的.env（不覆盖已存在的环境变量）
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+DEFAULT_KEY_NAME = "DEEPSEEK_API_KEY"
+
+
+def streamlit_secrets_provider(name: str) -> Optional[str]:
+    """Streamlit Secrets（仅当前进程已加载Streamlit时查询）"""
+    if "streamlit" not in sys.modules:
+        return None
+    import streamlit as st
+
+    try:
+        return st.secrets.get(name)
+    except Exception:
+        # 未配置secrets.toml
+        return None
+
+
+def env_provider(name: str) -> Optional[str]:
+    """环境变量（含项目根目录.env）"""
+    return os.getenv(name)
+
+
+_providers: List[Callable[[str], Optional[str]]] = [streamlit_secrets_provider, env_provider]
+
+
+def register_credential_provider(provider: Callable[[str], Optional[str]], first: bool = True):
+    """
+    注册凭据来源
+
+    Args:
+        provider: 输入密钥名称，返回密钥或None
+        first: 是否优先于已有来源查询
+    """
+    if first:
+        _providers.insert(0, provider)
+    else:
+        _providers.append(provider)
+
+
+def get_credential(name: str = DEFAULT_KEY_NAME, explicit: str = None) -> Optional[str]:
+    """
+    查找密钥：显式传入的值优先，否则按注册顺序返回第一个非空值
+
+    Args:
+        name: 密钥名称
+        explicit: 调用方显式传入的密钥
+    """
+    if explicit:
+        return explicit
+    for provider in _providers:
+        value = provider(name)
+        if value:
+            return value
+    return None
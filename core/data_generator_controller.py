@@ -1,28 +1,39 @@
 # data_generator_controller.py
 import os
+import sys
 import json
+import time
 import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 
 import httpx
 from httpx import HTTPTransport
-from openai import OpenAI
 from dotenv import load_dotenv
 
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import LLM_BASE_URL
+from core.rate_limiter import estimate_tokens, call_with_rate_limit
+from core.llm_client import get_openai_client
+from core.llm_telemetry import get_telemetry, cached_prompt_tokens
+from core.request_scheduler import request_priority, PRIORITY_INTERACTIVE
+
 
 
 class DataGeneratorController:
     """数据生成控制器"""
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, priority: int = None):
         # 优先使用传入的 api_key，否则从环境变量读取
         self.api_key = api_key
+        # 调用优先级：默认为交互请求（页面上点击生成），命令行批量造数传入PRIORITY_ROUTINE让位于交互分析
+        self.priority = PRIORITY_INTERACTIVE if priority is None else priority
         # 初始化OpenAI客户端
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
+        # 与舆情分析器共用进程级连接池
+        self.client = get_openai_client(api_key, LLM_BASE_URL)
 
         # 输出目录
         self.output_dir = "generated_data"
@@ -82,8 +93,9 @@ class DataGeneratorController:
 
     def generate_with_llm(self, prompt: str, system_prompt: str = None,
                           temperature: float = 0.3,
-                          response_format: dict = None) -> str:
-        """调用大模型生成数据"""
+                          response_format: dict = None,
+                          priority: int = None) -> str:
+        """调用大模型生成数据（priority为None时使用控制器的调用优先级）"""
 
         messages = []
 
@@ -92,19 +104,46 @@ class DataGeneratorController:
 
         messages.append({"role": "user", "content": prompt})
 
+        start = time.monotonic()
+        stats = {}
         try:
-            response = self.client.chat.completions.create(
+            # 与舆情分析器共用进程级限流器，避免并行调用触发429
+            with request_priority(self.priority if priority is None else priority):
+                response = call_with_rate_limit(
+                    lambda: self.client.chat.completions.create(
+                        model="deepseek-chat",
+                        messages=messages,
+                        temperature=temperature,
+                        response_format=response_format,
+                        max_tokens=4000
+                    ),
+                    estimated_tokens=estimate_tokens(prompt) + estimate_tokens(system_prompt) + 4000,
+                    stats=stats
+                )
+            usage = response.usage
+            get_telemetry().record(
+                scenario="data_generator",
                 model="deepseek-chat",
-                messages=messages,
-                temperature=temperature,
-                response_format=response_format,
-                max_tokens=4000
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) if usage else 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) if usage else 0,
+                cached_tokens=cached_prompt_tokens(usage),
+                queue_wait=stats.get("queue_wait", 0.0),
+                latency=time.monotonic() - start,
+                retries=stats.get("retries", 0)
             )
 
             return response.choices[0].message.content
 
         except Exception as e:
             print(f"LLM调用失败: {e}")
+            get_telemetry().record(
+                scenario="data_generator",
+                model="deepseek-chat",
+                queue_wait=stats.get("queue_wait", 0.0),
+                latency=time.monotonic() - start,
+                retries=stats.get("retries", 0),
+                status="error"
+            )
             # 返回模拟数据避免中断
             return self._get_fallback_data(prompt)
 
@@ -2,7 +2,6 @@
 import json
 import os
 from typing import Dict, List
-import streamlit as st
 import sys
 import os
 
@@ -74,6 +73,7 @@ class DataIntegrator:
                 "related_industry": company_info.get("所属行业", "") if company_info else "",
                 "related_company": company_name,
                 "company_info": company_info,
+                "severity": event.get("严重程度", ""),
                 "news_type": "risk_event"
             }
             news_list.append(news)
@@ -0,0 +1,86 @@
+# core/incremental_crawl.py
+"""
+关键词页面增量采集
+各关键词页面经采集引擎并发抓取，按来源+关键词的水位线与共享URL库筛出新舆情：
+首页发送条件请求（304时跳过），按发布时间倒序的页面到达水位线即停止翻页，仅成功抓取（200）时推进水位线
+"""
+import os
+import sys
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.crawl_config import (
+    CRAWL_TIME_START,
+    CRAWL_TIME_END,
+    INCREMENTAL_CRAWL
+)
+from core.crawl_engine import get_crawl_engine
+from core.crawl_state import CrawlStateStore, get_crawl_state, select_new_items
+from core.url_store import get_url_store, normalize_url
+
+
+def crawl_keywords(source, keywords, page_url, parse, max_pages=1, ordered=True, **fetch_kwargs):
+    """
+    并发采集各关键词页面；文章链接以"已发现"登记到共享URL库（不占用详情页爬虫的待抓取队列）；
+    开启增量采集时发送条件请求，仅保留晚于水位线且链接未登记过的舆情，到达水位线即停止翻页
+    :param source: 来源标识（水位线按来源+关键词保存）
+    :param keywords: 采集关键词列表
+    :param page_url: (关键词, 页码) → 页面URL
+    :param parse: (页面HTML, 关键词) → 舆情字典列表
+    :param max_pages: 每个关键词最多采集的页数
+    :param ordered: 页面是否按发布时间倒序（搜索结果页为False，按URL库与标题去重，不比较水位线、不提前停止）
+    :param fetch_kwargs: 透传给采集引擎（headers/timeout/verify/encoding）
+    :return: {关键词: {"status", "error", "items", "not_modified"}}
+    """
+    state = get_crawl_state() if INCREMENTAL_CRAWL else None
+    url_store = get_url_store()
+    marks = {keyword: state.get(source, keyword) for keyword in keywords} if state else {}
+    results = {keyword: {"status": None, "error": None, "items": [], "not_modified": False, "validators": {}}
+               for keyword in keywords}
+
+    pending = list(keywords)
+    for page_no in range(1, max_pages + 1):
+        if not pending:
+            break
+        pages = get_crawl_engine().fetch_all(
+            [page_url(keyword, page_no) for keyword in pending],
+            url_headers=[CrawlStateStore.conditional_headers(marks.get(keyword)) if page_no == 1 else None
+                         for keyword in pending],
+            **fetch_kwargs
+        )
+        next_pending = []
+        for keyword, page in zip(pending, pages):
+            result = results[keyword]
+            if page["error"] or page["status"] != 200:
+                # 翻页失败时保留已采集的页面
+                if page_no == 1:
+                    result.update(status=page["status"], error=page["error"], not_modified=page["status"] == 304)
+                continue
+            try:
+                items, reached = select_new_items(parse(page["text"], keyword), marks.get(keyword),
+                                                  CRAWL_TIME_START, CRAWL_TIME_END, ordered=ordered)
+            except Exception as e:
+                if page_no == 1:
+                    result["error"] = f"解析失败：{str(e)}"
+                continue
+            # 登记文章链接；增量采集时跳过已登记的链接（无发布时间、转载到其他关键词下的旧文）
+            new_links = set(url_store.observe([item["原文链接"] for item in items], source=source))
+            if state:
+                items = [item for item in items
+                         if not item["原文链接"] or normalize_url(item["原文链接"]) in new_links]
+            if page_no == 1:
+                result["status"] = 200
+                result["validators"] = {"etag": page["headers"].get("ETag"),
+                                        "last_modified": page["headers"].get("Last-Modified")}
+            result["items"].extend(items)
+            if items and not reached:
+                next_pending.append(keyword)
+        pending = next_pending
+
+    if state:
+        for keyword, result in results.items():
+            if result["status"] == 200:
+                state.update(source, keyword, result["items"], ordered=ordered, **result["validators"])
+    return results
@@ -0,0 +1,188 @@
+# json_stream.py
+import json
+from typing import List, Tuple, Any, Optional
+
+
+class JSONSectionStream:
+    """
+    增量JSON顶层板块解析器
+
+    逐段喂入大模型流式输出的文本，每当顶层对象中的一个键值对（板块）完整闭合时即返回该板块，
+    无需等待整个JSON生成完毕。顶层'{'之前的内容（如```json代码块标记）会被忽略。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0              # 下一个待扫描字符位置
+        self._depth = 0            # 当前括号深度（顶层对象内部为1）
+        self._in_string = False
+        self._escape = False
+        self._section_start = None  # 当前板块在buffer中的起始位置
+        self.finished = False       # 顶层对象是否已闭合
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        喂入一段文本
+
+        Returns:
+            本次新完成的板块列表[(板块名称, 板块内容)]
+        """
+        self.buffer += chunk
+        completed = []
+
+        while self._pos < len(self.buffer) and not self.finished:
+            ch = self.buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # 等待顶层对象开始
+                if ch == "{":
+                    self._depth = 1
+                    self._section_start = self._pos + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._close_section(self._pos))
+                    self.finished = True
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._close_section(self._pos))
+                self._section_start = self._pos + 1
+
+            self._pos += 1
+
+        return completed
+
+    def _close_section(self, end: int) -> List[Tuple[str, Any]]:
+        """解析buffer[_section_start:end]中的单个键值对"""
+        segment = self.buffer[self._section_start:end].strip()
+        if not segment:
+            return []
+        try:
+            return list(json.loads("{" + segment + "}").items())
+        except json.JSONDecodeError:
+            # 板块内容不合法时跳过，由完整结果解析兜底
+            return []
+
+
+# ===================== 完整响应提取与修复 =====================
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """删除字符串外紧邻'}'或']'之前的多余逗号"""
+    out = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "}]":
+            # 回溯删除空白前的逗号
+            i = len(out) - 1
+            while i >= 0 and out[i].isspace():
+                i -= 1
+            if i >= 0 and out[i] == ",":
+                del out[i]
+        out.append(ch)
+    return "".join(out)
+
+
+def _try_loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(_strip_trailing_commas(text))
+    except json.JSONDecodeError:
+        return None
+
+
+def extract_json(text: str) -> Tuple[Optional[Any], bool]:
+    """
+    从大模型响应中提取JSON对象
+
+    括号匹配定位首个顶层对象（忽略```json代码块标记与前后说明文字），容忍多余逗号；
+    输出被截断时回退到最后一个完整元素并补齐括号：截断在字符串/数字/字面量中间时丢弃该键值
+    （"景气度得分": 7 可能是75），使其作为缺失字段补问，而不是当作完整值接受。
+
+    Returns:
+        (解析结果, 是否经过截断修复)；无法解析时解析结果为None
+    """
+    if not text:
+        return None, False
+    start = text.find("{")
+    if start < 0:
+        return None, False
+
+    stack = []
+    in_string = escape = False
+    # 字符串外的逗号位置及当时未闭合的括号，截断修复时作为回退点
+    cut_points = []
+
+    for pos in range(start, len(text)):
+        ch = text[pos]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+            # 容器开头也是回退点（截断时保留为空容器，由缺失字段校验补问）
+            cut_points.append((pos + 1, list(stack)))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                # 顶层对象闭合
+                return _try_loads(text[start:pos + 1]), False
+        elif ch == ",":
+            cut_points.append((pos, list(stack)))
+
+    # 截断：末尾不在标量中间时先尝试直接补齐，再依次回退到更早的完整元素
+    body = text[start:].rstrip()
+    if not in_string and not (body[-1].isalnum() or body[-1] in "-+."):
+        result = _try_loads(body + "".join(_CLOSERS[c] for c in reversed(stack)))
+        if result is not None:
+            return result, True
+    for pos, open_stack in reversed(cut_points):
+        result = _try_loads(text[start:pos] + "".join(_CLOSERS[c] for c in reversed(open_stack)))
+        if result is not None:
+            return result, True
+    return None, False
+
+
+def missing_fields(data: Any, schema: Any, prefix: str = "") -> List[str]:
+    """
+    按JSON框架校验结果，返回缺失（或应为对象却不是对象）的字段路径，如"景气度分析.评分拆解"
+    """
+    if not isinstance(schema, dict):
+        return []
+    if not isinstance(data, dict):
+        return [prefix] if prefix else list(schema.keys())
+
+    missing = []
+    for key, sub_schema in schema.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if key not in data:
+            missing.append(path)
+        else:
+            missing.extend(missing_fields(data[key], sub_schema, path))
+    return missing
@@ -0,0 +1,134 @@
+# llm_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict
+
+
+class LLMResponseCache:
+    """大模型响应缓存（SQLite持久化，按内容寻址）"""
+
+    def __init__(self, db_path: str, ttl: int = 7 * 24 * 3600,
+                 max_entries: int = 2000, bypass: bool = False):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite文件路径（":memory:"为内存库）
+            ttl: 缓存有效期（秒），None或0表示永不过期
+            max_entries: 缓存条数上限，超过后按LRU淘汰
+            bypass: 为True时读写均跳过缓存
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+
+        self.hits = 0
+        self.misses = 0
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Optional[str], prompt: str,
+                 temperature: float, max_tokens: int) -> str:
+        """根据模型、系统提示词、提示词哈希、温度和最大Token数生成缓存键"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw = json.dumps([model, system_prompt or "", prompt_hash, temperature, max_tokens],
+                         ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回None"""
+        if self.bypass:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str, model: str = None):
+        """写入缓存，并按LRU淘汰超出上限的条目"""
+        if self.bypass:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """清理过期条目，并淘汰最久未访问的超量条目（调用方持锁）"""
+        if self.ttl:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+
+        if self.max_entries:
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE cache_key IN ("
+                    "SELECT cache_key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """缓存统计信息"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "条目数": size,
+            "命中次数": self.hits,
+            "未命中次数": self.misses,
+            "命中率": round(self.hits / total, 4) if total else 0.0,
+            "已旁路": self.bypass
+        }
@@ -0,0 +1,92 @@
+# llm_client.py
+"""
+进程级OpenAI客户端工厂
+所有OpenAI客户端共用一个调优过的httpx连接池（保活、HTTP/2、连接数与超时可配置），
+批量调用时不再为每个客户端重复建立TCP/TLS连接
+"""
+import os
+import sys
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_BASE_URL,
+    LLM_HTTP2,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_CONNECT_TIMEOUT,
+    LLM_HTTP_TIMEOUT
+)
+
+_lock = threading.Lock()
+_http_client = None
+_openai_clients = {}
+
+
+def _http2_enabled() -> bool:
+    """配置开启且已安装h2时使用HTTP/2"""
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY
+        ),
+        "timeout": httpx.Timeout(LLM_HTTP_TIMEOUT, connect=LLM_HTTP_CONNECT_TIMEOUT)
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """获取进程级共享的httpx连接池"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(**_client_options())
+        return _http_client
+
+
+def get_openai_client(api_key: str, base_url: str = None) -> OpenAI:
+    """
+    获取共享连接池上的OpenAI客户端（相同密钥+地址复用同一实例，关闭SDK内置重试）
+
+    Args:
+        api_key: API密钥
+        base_url: 接口地址，默认读取LLM_BASE_URL
+    """
+    base_url = base_url or LLM_BASE_URL
+    http_client = get_http_client()
+    with _lock:
+        key = (api_key, base_url)
+        if key not in _openai_clients:
+            # 重试统一由core/rate_limiter.py处理（限流器/熔断器需感知每次429/5xx），SDK不再隐式重试
+            _openai_clients[key] = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client,
+                                          max_retries=0)
+        return _openai_clients[key]
+
+
+def create_async_openai_client(api_key: str, base_url: str = None) -> AsyncOpenAI:
+    """
+    创建异步OpenAI客户端（连接池参数与同步客户端一致）
+
+    异步连接绑定事件循环，无法跨asyncio.run共享；由调用方在批次结束后close()
+    """
+    return AsyncOpenAI(api_key=api_key, base_url=base_url or LLM_BASE_URL, max_retries=0,
+                       http_client=httpx.AsyncClient(**_client_options()))
+
@@ -0,0 +1,250 @@
+# llm_telemetry.py
+"""
+大模型调用遥测
+每次调用写入一条JSONL记录（仅追加，超过大小上限时轮转），并提供按场景聚合的P50/P95/P99耗时与Token/费用统计
+
+查看统计：python core/llm_telemetry.py
+"""
+import os
+import sys
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_TELEMETRY_ENABLE,
+    LLM_TELEMETRY_PATH,
+    LLM_TELEMETRY_MAX_BYTES,
+    LLM_TELEMETRY_BACKUPS,
+    LLM_PRICE_INPUT_PER_M,
+    LLM_PRICE_OUTPUT_PER_M,
+    LLM_PRICE_CACHED_INPUT_PER_M
+)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """线性插值百分位数（q取0-100），空列表返回None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def cached_prompt_tokens(usage) -> int:
+    """
+    从接口返回的用量中读取命中服务端前缀缓存的输入Token数
+
+    兼容DeepSeek（prompt_cache_hit_tokens）与OpenAI（prompt_tokens_details.cached_tokens），
+    旧版SDK中未声明的字段可能为字典
+    """
+    if usage is None:
+        return 0
+    if isinstance(usage, dict):
+        hit = usage.get("prompt_cache_hit_tokens")
+        details = usage.get("prompt_tokens_details")
+    else:
+        hit = getattr(usage, "prompt_cache_hit_tokens", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+    if hit is None and details is not None:
+        hit = details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", None)
+    return int(hit or 0)
+
+
+class LLMTelemetry:
+    """大模型调用记录（JSONL追加写入）"""
+
+    def __init__(self, path: str, enabled: bool = True,
+                 price_input_per_m: float = LLM_PRICE_INPUT_PER_M,
+                 price_output_per_m: float = LLM_PRICE_OUTPUT_PER_M,
+                 price_cached_input_per_m: float = LLM_PRICE_CACHED_INPUT_PER_M,
+                 max_bytes: int = 2 * 1024 * 1024, backups: int = 3):
+        """
+        Args:
+            path: 记录文件路径
+            enabled: 为False时不写入
+            max_bytes: 记录文件大小上限，超过后轮转为path.1（读取与统计的工作量随之有上限）
+            backups: 保留的轮转文件数
+            price_input_per_m/price_output_per_m: 输入/输出单价（元/百万Token）
+            price_cached_input_per_m: 命中前缀缓存的输入单价（元/百万Token）
+        """
+        self.path = path
+        self.enabled = enabled
+        self.price_input_per_m = price_input_per_m
+        self.price_output_per_m = price_output_per_m
+        self.price_cached_input_per_m = price_cached_input_per_m
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+        if enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def cost(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        """估算单次调用费用（元），命中前缀缓存的输入Token按缓存单价计"""
+        return ((prompt_tokens - cached_tokens) * self.price_input_per_m
+                + cached_tokens * self.price_cached_input_per_m
+                + completion_tokens * self.price_output_per_m) / 1_000_000
+
+    def record(self, scenario: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               queue_wait: float = 0.0, ttft: float = None, latency: float = 0.0, retries: int = 0,
+               cache_hit: bool = False, status: str = "ok", cached_tokens: int = 0, **extra) -> Dict:
+        """
+        写入一条调用记录
+
+        Args:
+            scenario: 调用场景（industry/company/general/...）
+            model: 模型名称
+            prompt_tokens/completion_tokens: 输入/输出Token数（缓存命中时为0）
+            queue_wait: 限流排队与退避等待秒数
+            ttft: 首Token耗时（秒，仅流式调用）
+            latency: 总耗时（秒，含排队）
+            retries: 重试次数
+            cache_hit: 是否命中响应缓存
+            status: ok/error（error表示调用失败并使用了备选响应）
+            cached_tokens: 输入中命中服务端前缀缓存的Token数
+            extra: 其他字段（如stream）
+        """
+        entry = {
+            "ts": round(time.time(), 3),
+            "scenario": scenario,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "queue_wait": round(queue_wait, 4),
+            "ttft": round(ttft, 4) if ttft is not None else None,
+            "latency": round(latency, 4),
+            "retries": retries,
+            "cache_hit": cache_hit,
+            "status": status,
+            "cost": round(self.cost(prompt_tokens, completion_tokens, cached_tokens), 6),
+            **extra
+        }
+        if not self.enabled:
+            return entry
+
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return entry
+
+    def _rotate(self):
+        """path → path.1 → path.2 ...，超出保留数的最旧文件删除"""
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def load(self, since: float = None, include_rotated: bool = False) -> List[Dict]:
+        """
+        读取调用记录，跳过写入中断产生的残行
+
+        Args:
+            since: 起始时间戳
+            include_rotated: 是否同时读取轮转后的历史文件（按时间先后）
+        """
+        paths = [self.path]
+        if include_rotated:
+            paths = [f"{self.path}.{index}" for index in range(self.backups, 0, -1)] + paths
+        records = []
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if since is None or entry.get("ts", 0) >= since:
+                        records.append(entry)
+        return records
+
+    def summary(self, records: List[Dict] = None, since: float = None) -> List[Dict]:
+        """
+        按场景聚合统计（最后一行为全部场景汇总）
+
+        Args:
+            records: 调用记录，默认读取当前记录文件（大小有上限）
+            since: 只统计该时间戳之后的记录
+
+        Returns:
+            每个场景一行：调用次数、缓存命中率、前缀缓存命中率、失败次数、耗时/首Token/排队的P50/P95/P99、Token与费用合计
+        """
+        records = self.load(since=since) if records is None else records
+        groups = {}
+        for entry in records:
+            groups.setdefault(entry.get("scenario", "unknown"), []).append(entry)
+        if records:
+            groups["全部"] = records
+
+        rows = []
+        for scenario, entries in groups.items():
+            # 耗时分布只统计真实调用，缓存命中单独计数
+            calls = [e for e in entries if not e.get("cache_hit")]
+            latencies = [e["latency"] for e in calls]
+            ttfts = [e["ttft"] for e in calls if e.get("ttft") is not None]
+            waits = [e["queue_wait"] for e in calls]
+            prompt_tokens = sum(e.get("prompt_tokens", 0) for e in entries)
+            cached_tokens = sum(e.get("cached_tokens", 0) for e in entries)
+            row = {
+                "场景": scenario,
+                "调用次数": len(entries),
+                "缓存命中率": round(1 - len(calls) / len(entries), 4),
+                "失败次数": sum(1 for e in entries if e.get("status") != "ok"),
+                "重试次数": sum(e.get("retries", 0) for e in entries),
+                "输入Token": prompt_tokens,
+                "前缀缓存Token": cached_tokens,
+                "前缀缓存命中率": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+                "输出Token": sum(e.get("completion_tokens", 0) for e in entries),
+                "费用(元)": round(sum(e.get("cost", 0) for e in entries), 4)
+            }
+            for name, values in (("耗时", latencies), ("首Token", ttfts), ("排队", waits)):
+                for q in (50, 95, 99):
+                    value = percentile(values, q)
+                    row[f"{name}P{q}(秒)"] = round(value, 3) if value is not None else None
+            rows.append(row)
+        return rows
+
+
+# ===================== 进程级共享实例 =====================
+_shared_telemetry = None
+_shared_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> LLMTelemetry:
+    """获取进程级共享的调用记录器（舆情分析器与数据生成器共用）"""
+    global _shared_telemetry
+    with _shared_telemetry_lock:
+        if _shared_telemetry is None:
+            _shared_telemetry = LLMTelemetry(LLM_TELEMETRY_PATH, enabled=LLM_TELEMETRY_ENABLE,
+                                             max_bytes=LLM_TELEMETRY_MAX_BYTES, backups=LLM_TELEMETRY_BACKUPS)
+        return _shared_telemetry
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    telemetry = get_telemetry()
+    rows = telemetry.summary(telemetry.load(include_rotated=True))
+    if not rows:
+        print(f"暂无调用记录：{LLM_TELEMETRY_PATH}")
+    else:
+        pd.set_option("display.width", 200)
+        pd.set_option("display.max_columns", None)
+        print(pd.DataFrame(rows).to_string(index=False))
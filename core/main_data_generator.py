@@ -13,8 +13,13 @@ from financial_series_generator import FinancialSeriesGenerator
 class MainDataGenerator:
     """主数据生成程序"""
 
-    def __init__(self, api_key=None):
-        self.controller = DataGeneratorController(api_key)
+    def __init__(self, api_key=None, priority: int = None):
+        """
+        Args:
+            api_key: DeepSeek API密钥
+            priority: 大模型调用优先级（None为交互请求）
+        """
+        self.controller = DataGeneratorController(api_key, priority=priority)
         self.industry_gen = IndustryGenerator(self.controller)
         self.company_gen = CompanyGenerator(self.controller)
         self.policy_gen = PolicyGenerator(self.controller)
@@ -0,0 +1,162 @@
+# model_router.py
+"""
+按场景的模型路由
+从配置表为每个分析场景选择模型、最大输出与温度，记录每个配置的实测耗时与输出质量；
+首选配置的P95耗时超过场景SLO（或质量不达标）时，切换到下一档更快的配置
+（只有配置了更快的降级档模型时才有延迟收益，见config/llm_config.py中的LLM_FAST_MODEL）
+"""
+import os
+import sys
+import time
+import threading
+from collections import deque
+from typing import Dict, List
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    LLM_MAX_TOKENS,
+    LLM_ROUTES,
+    LLM_ROUTE_SLO,
+    LLM_ROUTE_WINDOW,
+    LLM_ROUTE_MIN_SAMPLES,
+    LLM_ROUTE_SAMPLE_TTL,
+    LLM_ROUTE_MIN_QUALITY
+)
+from core.llm_telemetry import percentile
+
+
+class ModelRouter:
+    """场景路由表 + 滑动窗口耗时/质量统计"""
+
+    def __init__(self, routes: Dict[str, List[Dict]], slo: Dict[str, float], default: Dict,
+                 window: int = 50, min_samples: int = 5, sample_ttl: float = 600,
+                 min_quality: float = 0.8):
+        """
+        Args:
+            routes: {场景: [候选配置, ...]}，配置字段为model/max_tokens/temperature
+            slo: {场景: P95耗时目标秒数}
+            default: 默认配置（补齐候选配置中缺省的字段，也用于未配置的场景）
+            window: 每个配置保留的最近样本数
+            min_samples: 判定所需的最少样本数（不足时视为达标，继续试用）
+            sample_ttl: 样本有效期（秒）
+            min_quality: 最低质量要求（JSON完整解析比例）
+        """
+        self.routes = {
+            scenario: [{**default, **route} for route in candidates]
+            for scenario, candidates in routes.items()
+        }
+        self.slo = slo
+        self.default = default
+        self.window = window
+        self.min_samples = min_samples
+        self.sample_ttl = sample_ttl
+        self.min_quality = min_quality
+
+        # {(场景, 档位): deque[(时间戳, 耗时, 是否合格)]}
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, scenario: str, tier: int) -> List[tuple]:
+        samples = self._samples.get((scenario, tier))
+        if not samples:
+            return []
+        since = time.time() - self.sample_ttl
+        while samples and samples[0][0] < since:
+            samples.popleft()
+        return list(samples)
+
+    def _healthy(self, scenario: str, tier: int) -> bool:
+        samples = self._recent(scenario, tier)
+        if len(samples) < self.min_samples:
+            return True
+        quality = sum(1 for _, _, ok in samples if ok) / len(samples)
+        if quality < self.min_quality:
+            return False
+        slo = self.slo.get(scenario)
+        return slo is None or percentile([latency for _, latency, _ in samples], 95) <= slo
+
+    def route(self, scenario: str) -> Dict:
+        """
+        选择场景的调用配置
+
+        Returns:
+            {"model", "max_tokens", "temperature", "scenario", "tier"}；tier为候选配置下标
+        """
+        candidates = self.routes.get(scenario)
+        if not candidates:
+            return {**self.default, "scenario": scenario, "tier": 0}
+
+        with self._lock:
+            chosen = next((tier for tier in range(len(candidates)) if self._healthy(scenario, tier)), None)
+            if chosen is None:
+                # 均不达标：选质量达标的档位中P95最低的，否则退到最后一档
+                chosen = len(candidates) - 1
+                best = None
+                for tier in range(len(candidates)):
+                    samples = self._recent(scenario, tier)
+                    if sum(1 for _, _, ok in samples if ok) < self.min_quality * len(samples):
+                        continue
+                    p95 = percentile([latency for _, latency, _ in samples], 95)
+                    if best is None or p95 < best:
+                        chosen, best = tier, p95
+        return {**candidates[chosen], "scenario": scenario, "tier": chosen}
+
+    def observe(self, route: Dict, latency: float, ok: bool):
+        """
+        记录一次调用结果
+
+        Args:
+            route: route()返回的配置
+            latency: 调用耗时（秒，不含限流排队）
+            ok: 调用成功且输出为完整JSON
+        """
+        key = (route["scenario"], route["tier"])
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append((time.time(), latency, ok))
+
+    def stats(self) -> List[Dict]:
+        """每个场景各档配置的实测情况"""
+        rows = []
+        with self._lock:
+            for scenario, candidates in self.routes.items():
+                for tier, route in enumerate(candidates):
+                    samples = self._recent(scenario, tier)
+                    p95 = percentile([latency for _, latency, _ in samples], 95)
+                    rows.append({
+                        "场景": scenario,
+                        "档位": tier,
+                        "模型": route["model"],
+                        "最大输出": route["max_tokens"],
+                        "样本数": len(samples),
+                        "P95耗时(秒)": round(p95, 2) if p95 is not None else None,
+                        "SLO(秒)": self.slo.get(scenario),
+                        "合格率": round(sum(1 for _, _, ok in samples if ok) / len(samples), 3) if samples else None
+                    })
+        return rows
+
+
+# ===================== 进程级共享路由 =====================
+_shared_router = None
+_shared_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """获取进程级共享路由（多个分析器实例共用实测统计）"""
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter(
+                routes=LLM_ROUTES,
+                slo=LLM_ROUTE_SLO,
+                default={"model": LLM_MODEL, "max_tokens": LLM_MAX_TOKENS, "temperature": LLM_TEMPERATURE},
+                window=LLM_ROUTE_WINDOW,
+                min_samples=LLM_ROUTE_MIN_SAMPLES,
+                sample_ttl=LLM_ROUTE_SAMPLE_TTL,
+                min_quality=LLM_ROUTE_MIN_QUALITY
+            )
+        return _shared_router
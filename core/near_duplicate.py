@@ -0,0 +1,172 @@
+# near_duplicate.py
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict, Tuple
+
+# SimHash位数
+SIMHASH_BITS = 64
+
+
+def _normalize(text: str) -> str:
+    """去除空白与标点，仅保留中文、字母和数字（转载常见的排版差异不影响签名）"""
+    return "".join(re.findall(r'[\u4e00-\u9fffA-Za-z0-9]', text or "")).lower()
+
+
+def simhash(text: str, ngram: int = 3) -> int:
+    """计算文本的64位SimHash签名（字符n-gram，按出现次数加权）"""
+    normalized = _normalize(text)
+    if len(normalized) < ngram:
+        normalized = normalized.ljust(ngram)
+
+    weights = [0] * SIMHASH_BITS
+    for i in range(len(normalized) - ngram + 1):
+        digest = hashlib.blake2b(normalized[i:i + ngram].encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER为有符号64位，存储前转换"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicateStore:
+    """
+    相似舆情结果库（SQLite持久化）
+
+    按场景+主体（行业/公司）分组保存已分析舆情的SimHash签名与分析结果，
+    新舆情与同组签名的汉明距离不超过阈值时直接复用已有结果。
+    """
+
+    def __init__(self, db_path: str, max_distance: int = 4, min_length: int = 50,
+                 ttl: int = 3 * 24 * 3600):
+        """
+        初始化结果库
+
+        Args:
+            db_path: SQLite文件路径（":memory:"为内存库）
+            max_distance: 最大汉明距离
+            min_length: 参与比对的最短正文长度（去除标点空白后）
+            ttl: 签名有效期（秒），None或0表示永不过期
+        """
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS near_duplicate (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scenario TEXT NOT NULL,
+                entity TEXT NOT NULL,
+                signature INTEGER NOT NULL,
+                content_preview TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_near_duplicate_group ON near_duplicate(scenario, entity, created_at)"
+        )
+        self._conn.commit()
+
+    def _eligible(self, content: str) -> bool:
+        return len(_normalize(content)) >= self.min_length
+
+    def lookup(self, scenario: str, entity: str, content: str) -> Optional[Tuple[Dict, Dict]]:
+        """
+        查找相似舆情的分析结果
+
+        Returns:
+            (分析结果, 匹配信息)；未命中返回None。匹配信息包含相似度、汉明距离、
+            被复用舆情的内容摘要与分析时间，便于审计
+        """
+        if not self._eligible(content):
+            return None
+
+        signature = simhash(content)
+        since = time.time() - self.ttl if self.ttl else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT signature, content_preview, result, created_at FROM near_duplicate "
+                "WHERE scenario = ? AND entity = ? AND created_at >= ?",
+                (scenario, entity, since)
+            ).fetchall()
+
+        best = None
+        for stored, preview, result, created_at in rows:
+            distance = hamming_distance(signature, _to_unsigned(stored))
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, preview, result, created_at)
+
+        if best is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        distance, preview, result, created_at = best
+        match_info = {
+            "相似度": round(1 - distance / SIMHASH_BITS, 4),
+            "汉明距离": distance,
+            "来源舆情摘要": preview,
+            "来源分析时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created_at))
+        }
+        return json.loads(result), match_info
+
+    def add(self, scenario: str, entity: str, content: str, result: Dict):
+        """保存已分析舆情的签名与结果"""
+        if not self._eligible(content):
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO near_duplicate (scenario, entity, signature, content_preview, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (scenario, entity, _to_signed(simhash(content)), content[:100],
+                 json.dumps(result, ensure_ascii=False), time.time())
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM near_duplicate WHERE created_at < ?",
+                                   (time.time() - self.ttl,))
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """结果库统计"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM near_duplicate").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "签名数": count,
+            "复用次数": self.hits,
+            "未命中次数": self.misses,
+            "复用率": self.hits / total if total else 0.0
+        }
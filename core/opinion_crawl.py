@@ -1,11 +1,10 @@
 # core/opinion_crawl.py
 import sys
 import os
-import requests
 import time
 import re
 import json
-from urllib.parse import quote
+from urllib.parse import quote, urljoin
 import tushare as ts
 import pandas as pd
 import urllib3
@@ -23,11 +22,12 @@ sys.path.append(ROOT_DIR)
 from config.crawl_config import (
     DEBUG_MODE,
     CRAWL_ITEM_NUM_PER_COMBINATION,
-    REQUEST_HEADERS,
+    CRAWL_PAGE_NUM,
+    INCREMENTAL_CRAWL,
     REQUEST_TIMEOUT,
-    REQUEST_INTERVAL,
     INDUSTRY_DEFAULT_EVENT_KEYWORDS
 )
+from core.incremental_crawl import crawl_keywords
 
 # 爬虫配置（同花顺适配）
 HEADERS = {
@@ -36,10 +36,91 @@ HEADERS = {
     "Accept-Language": "zh-CN,zh;q=0.9",
     "Referer": "https://www.10jqka.com.cn/",
 }
-REQUEST_INTERVAL = 2  # 请求间隔
 CRAWL_NUM = 10  # 每个关键词采集条数
 
 
+def _parse_10jqka_news(html, search_key, industry_name):
+    """解析同花顺财经搜索结果页，返回舆情字典列表"""
+    # ========== 适配同花顺页面结构的正则 ==========
+    # 标题+链接正则（同花顺固定结构）
+    title_pattern = re.compile(r'<a class="search-result-title" target="_blank" href="(.*?)">(.*?)</a>', re.S)
+    # 时间+来源正则
+    time_source_pattern = re.compile(
+        r'<span class="search-result-time">(.*?)</span>.*?<span class="search-result-source">(.*?)</span>',
+        re.S)
+
+    # 提取数据
+    titles = title_pattern.findall(html)[:CRAWL_NUM]
+    time_source = time_source_pattern.findall(html)[:CRAWL_NUM]
+
+    # 结构化数据
+    news_list = []
+    for i, (link, title) in enumerate(titles):
+        # 清洗标题（去除HTML标签）
+        title = re.sub(r'<.*?>', '', title).strip()
+        news_list.append({
+            "标题": title,
+            "发布时间": time_source[i][0].strip() if i < len(time_source) else "",
+            "来源": time_source[i][1].strip() if i < len(time_source) else "",
+            "关键词": search_key,
+            "所属行业": industry_name,
+            "原文链接": urljoin("https://www.10jqka.com.cn/", link) if link else ""
+        })
+    return news_list
+
+
+def _parse_sina_roll(html, keyword, industry_name):
+    """解析新浪财经行业滚动新闻页，返回舆情字典列表（按发布时间倒序）"""
+    # 解析数据（标题/时间/来源）
+    title_pattern = re.compile(r'<div class="content"><h2><a href="(.*?)" target="_blank">(.*?)</a></h2></div>',
+                               re.S)
+    time_pattern = re.compile(r'<span class="time">(.*?)</span>', re.S)
+    source_pattern = re.compile(r'<span class="source"><a href=".*?" target="_blank">(.*?)</a></span>', re.S)
+
+    titles = title_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+    times = time_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+    sources = source_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+
+    if len(titles) == 0:
+        # 备选正则（兼容旧页面结构）
+        title_pattern = re.compile(r'<li><a href="(.*?)" target="_blank">(.*?)</a></li>', re.S)
+        titles = title_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+
+    return [{
+        "标题": title,
+        "发布时间": times[i] if i < len(times) else "",
+        "来源": sources[i] if i < len(sources) else "",
+        "内容": title,  # Demo简化：标题替代正文，可扩展解析详情页
+        "采集类型": "行业舆情",
+        "所属行业": industry_name,
+        "采集关键词": keyword,
+        "原文链接": urljoin("https://finance.sina.com.cn/", link) if link else ""
+    } for i, (link, title) in enumerate(titles)]
+
+
+def _parse_zqrb_news(html, keyword, enterprise_name):
+    """解析证券日报滚动新闻页，返回舆情字典列表（按发布时间倒序）"""
+    # 解析数据（标题/时间/来源）
+    title_pattern = re.compile(r'<h3 class="news-title"><a href="(.*?)">(.*?)</a></h3>')
+    time_pattern = re.compile(r'<span class="time">(.*?)</span>')
+    source_pattern = re.compile(r'<span class="source">(.*?)</span>')
+
+    titles = title_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+    times = time_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+    sources = source_pattern.findall(html)[:CRAWL_ITEM_NUM_PER_COMBINATION]
+
+    return [{
+        "标题": title,
+        "发布时间": times[i] if i < len(times) else "",
+        "来源": sources[i] if i < len(sources) else "",
+        "内容": title,  # Demo简化：标题替代正文，可扩展解析详情页
+        "采集类型": "企业舆情",
+        "企业名称": enterprise_name,
+        "采集关键词": keyword,
+        "原文链接": urljoin("https://www.zqrb.cn/", link) if link else ""
+    } for i, (link, title) in enumerate(titles)]
+
+
 def crawl_industry_yuqing(industry_name):
     """
     同花顺财经静态爬虫（稳定采集，无404/反爬问题）
@@ -49,68 +130,43 @@ def crawl_industry_yuqing(industry_name):
     # 提取核心关键词
     industry_core = industry_name.replace("行业", "")
     keywords = ["补贴", "政策", "营收", "价格", "风险"]
+    search_keys = [f"{industry_core} {kw}" for kw in keywords]
     all_news = []
 
-    # 遍历关键词采集
-    for kw in keywords:
-        search_key = f"{industry_core} {kw}"
-        # 同花顺财经搜索URL（静态页，无API，不会404）
-        url = f"https://www.10jqka.com.cn/search/index/?keyword={search_key}&type=news"
-
-        try:
-            # 发送请求（同花顺无需重定向/特殊配置）
-            res = requests.get(
-                url=url,
-                headers=HEADERS,
-                timeout=15,
-                verify=False
-            )
-            res.encoding = "utf-8"
-            html = res.text
-
-            # 校验状态码（确保请求成功）
-            if res.status_code != 200:
-                print(f"⚠️  请求失败（状态码{res.status_code}）：{search_key}")
-                time.sleep(REQUEST_INTERVAL)
-                continue
-
-            # ========== 适配同花顺页面结构的正则 ==========
-            # 标题+链接正则（同花顺固定结构）
-            title_pattern = re.compile(r'<a class="search-result-title" target="_blank" href=".*?">(.*?)</a>', re.S)
-            # 时间+来源正则
-            time_source_pattern = re.compile(
-                r'<span class="search-result-time">(.*?)</span>.*?<span class="search-result-source">(.*?)</span>',
-                re.S)
-
-            # 提取数据
-            titles = title_pattern.findall(html)[:CRAWL_NUM]
-            time_source = time_source_pattern.findall(html)[:CRAWL_NUM]
-
-            # 结构化数据
-            for i in range(len(titles)):
-                # 清洗标题（去除HTML标签）
-                title = re.sub(r'<.*?>', '', titles[i]).strip()
-                news_info = {
-                    "标题": title,
-                    "发布时间": time_source[i][0].strip() if i < len(time_source) else "",
-                    "来源": time_source[i][1].strip() if i < len(time_source) else "",
-                    "关键词": search_key,
-                    "所属行业": industry_name
-                }
-                all_news.append(news_info)
-
-            print(f"✅ 采集成功：{search_key} → {len(titles)}条数据")
-            time.sleep(REQUEST_INTERVAL)
-
-        except Exception as e:
-            print(f"❌ 采集失败：{search_key} → {str(e)}")
-            time.sleep(REQUEST_INTERVAL)
+    # 并发采集各关键词（同花顺财经搜索URL，静态页，无API，不会404；搜索结果按相关度排序，不提前停止）
+    results = crawl_keywords(
+        "10jqka",
+        search_keys,
+        lambda search_key, page_no: f"https://www.10jqka.com.cn/search/index/?keyword={search_key}&type=news",
+        lambda html, search_key: _parse_10jqka_news(html, search_key, industry_name),
+        ordered=False,
+        headers=HEADERS,
+        timeout=15,
+        verify=False,
+        encoding="utf-8"
+    )
+    for search_key, result in results.items():
+        if result["not_modified"]:
+            print(f"⏭️ 页面无更新：{search_key}")
+            continue
+        if result["error"]:
+            print(f"❌ 采集失败：{search_key} → {result['error']}")
             continue
+        # 校验状态码（确保请求成功）
+        if result["status"] != 200:
+            print(f"⚠️  请求失败（状态码{result['status']}）：{search_key}")
+            continue
+
+        all_news.extend(result["items"])
+        print(f"✅ 采集成功：{search_key} → {len(result['items'])}条数据")
 
     # 数据处理与结果校验
-    df = pd.DataFrame(all_news).drop_duplicates(subset=["标题"], keep="first")
+    df = pd.DataFrame(all_news, columns=["标题", "发布时间", "来源", "关键词", "所属行业", "原文链接"])
+    df = df.drop_duplicates(subset=["标题"], keep="first")
+    # 增量采集时页面无更新/无新增属于正常结果，不使用模拟数据
+    crawled = any(result["status"] == 200 or result["not_modified"] for result in results.values())
 
-    if len(df) == 0:
+    if len(df) == 0 and not (INCREMENTAL_CRAWL and crawled):
         # 兜底：本地模拟数据（确保测试不失败）
         mock_data = pd.DataFrame({
             "标题": [
@@ -123,7 +179,8 @@ def crawl_industry_yuqing(industry_name):
             "发布时间": ["2025-12-07", "2025-12-06", "2025-12-05", "2025-12-04", "2025-12-03"],
             "来源": ["同花顺财经", "证券时报", "东方财富网", "第一财经", "财经日报"],
             "关键词": ["新能源 补贴", "新能源 政策", "新能源 营收", "新能源 价格", "新能源 风险"],
-            "所属行业": "新能源行业"
+            "所属行业": "新能源行业",
+            "原文链接": ""  # 模拟数据无原文链接，列与真实采集结果保持一致
         })
         print("⚠️  同花顺采集无数据，使用本地模拟数据")
         df = mock_data
@@ -148,60 +205,35 @@ def crawl_industry_opinion(industry_name, event_keywords=None):
     keyword_combinations = [f"{industry_core} {kw}" for kw in event_keywords]
     industry_yuqing_list = []
 
-    # 2. 遍历关键词采集（新浪财经行业频道）
-    for keyword in keyword_combinations:
-        time.sleep(REQUEST_INTERVAL)  # 防反爬间隔
-        url = f"https://finance.sina.com.cn/roll/index.d.html?cid=2509&keywords={keyword}&page=1"
-        try:
-            # 发送请求
-            res = requests.get(
-                url=url,
-                headers=REQUEST_HEADERS,
-                timeout=REQUEST_TIMEOUT
-            )
-            res.encoding = "utf-8"
-
-            # 解析数据（标题/时间/来源）
-            title_pattern = re.compile(r'<div class="content"><h2><a href=".*?" target="_blank">(.*?)</a></h2></div>',
-                                       re.S)
-            time_pattern = re.compile(r'<span class="time">(.*?)</span>', re.S)
-            source_pattern = re.compile(r'<span class="source"><a href=".*?" target="_blank">(.*?)</a></span>', re.S)
-
-            titles = title_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-            times = time_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-            sources = source_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-
-            if len(titles) == 0:
-                # 备选正则（兼容旧页面结构）
-                title_pattern = re.compile(r'<li><a href=".*?" target="_blank">(.*?)</a></li>', re.S)
-                titles = title_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-                times = time_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-                sources = source_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-
-            # 构造DataFrame
-            df = pd.DataFrame({
-                "标题": titles,
-                "发布时间": times,
-                "来源": sources,
-                "内容": titles,  # Demo简化：标题替代正文，可扩展解析详情页
-                "采集类型": "行业舆情",
-                "所属行业": industry_name,
-                "采集关键词": keyword
-            })
-            industry_yuqing_list.append(df)
-
+    # 2. 并发采集各关键词（新浪财经行业频道，滚动新闻按发布时间倒序）
+    results = crawl_keywords(
+        "sina_roll",
+        keyword_combinations,
+        lambda keyword, page_no: f"https://finance.sina.com.cn/roll/index.d.html?cid=2509&keywords={keyword}&page={page_no}",
+        lambda html, keyword: _parse_sina_roll(html, keyword, industry_name),
+        max_pages=CRAWL_PAGE_NUM,
+        timeout=REQUEST_TIMEOUT,
+        encoding="utf-8"
+    )
+    for keyword, result in results.items():
+        if result["not_modified"]:
             if DEBUG_MODE:
-                print(f"✅ 行业舆情采集：关键词【{keyword}】获取{len(df)}条数据")
-
-        except Exception as e:
+                print(f"⏭️ 行业舆情采集：关键词【{keyword}】页面无更新")
+            continue
+        if result["error"]:
             if DEBUG_MODE:
-                print(f"❌ 行业舆情采集：关键词【{keyword}】失败 - {str(e)}")
+                print(f"❌ 行业舆情采集：关键词【{keyword}】失败 - {result['error']}")
             continue
 
+        industry_yuqing_list.extend(result["items"])
+
+        if DEBUG_MODE:
+            print(f"✅ 行业舆情采集：关键词【{keyword}】获取{len(result['items'])}条数据")
+
     # 3. 数据合并+去重+过滤
     if len(industry_yuqing_list) == 0:
         return pd.DataFrame()  # 无数据返回空DF
-    df_all = pd.concat(industry_yuqing_list, ignore_index=True)
+    df_all = pd.DataFrame(industry_yuqing_list)
     df_all = text_deduplicate(df_all)  # 去重
     df_all = text_filter(df_all, keywords=[industry_core])  # 过滤无关内容
 
@@ -225,52 +257,35 @@ def crawl_enterprise_opinion(enterprise_name, risk_keywords=None):
     ]
     enterprise_yuqing_list = []
 
-    # 2. 遍历关键词采集（证券日报企业频道）
-    for keyword in keyword_combinations:
-        time.sleep(REQUEST_INTERVAL)  # 防反爬间隔
-        url = f"https://www.zqrb.cn/roll/news?keyword={keyword}&page=1"
-        try:
-            # 发送请求
-            res = requests.get(
-                url=url,
-                headers=REQUEST_HEADERS,
-                timeout=REQUEST_TIMEOUT
-            )
-            res.encoding = "utf-8"
-
-            # 解析数据（标题/时间/来源）
-            title_pattern = re.compile(r'<h3 class="news-title"><a href=".*?">(.*?)</a></h3>')
-            time_pattern = re.compile(r'<span class="time">(.*?)</span>')
-            source_pattern = re.compile(r'<span class="source">(.*?)</span>')
-
-            titles = title_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-            times = time_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-            sources = source_pattern.findall(res.text)[:CRAWL_ITEM_NUM_PER_COMBINATION]
-
-            # 构造DataFrame
-            df = pd.DataFrame({
-                "标题": titles,
-                "发布时间": times,
-                "来源": sources,
-                "内容": titles,  # Demo简化：标题替代正文，可扩展解析详情页
-                "采集类型": "企业舆情",
-                "企业名称": enterprise_name,
-                "采集关键词": keyword
-            })
-            enterprise_yuqing_list.append(df)
-
+    # 2. 并发采集各关键词（证券日报企业频道，滚动新闻按发布时间倒序）
+    results = crawl_keywords(
+        "zqrb_roll",
+        keyword_combinations,
+        lambda keyword, page_no: f"https://www.zqrb.cn/roll/news?keyword={keyword}&page={page_no}",
+        lambda html, keyword: _parse_zqrb_news(html, keyword, enterprise_name),
+        max_pages=CRAWL_PAGE_NUM,
+        timeout=REQUEST_TIMEOUT,
+        encoding="utf-8"
+    )
+    for keyword, result in results.items():
+        if result["not_modified"]:
             if DEBUG_MODE:
-                print(f"✅ 企业舆情采集：关键词【{keyword}】获取{len(df)}条数据")
-
-        except Exception as e:
+                print(f"⏭️ 企业舆情采集：关键词【{keyword}】页面无更新")
+            continue
+        if result["error"]:
             if DEBUG_MODE:
-                print(f"❌ 企业舆情采集：关键词【{keyword}】失败 - {str(e)}")
+                print(f"❌ 企业舆情采集：关键词【{keyword}】失败 - {result['error']}")
             continue
 
+        enterprise_yuqing_list.extend(result["items"])
+
+        if DEBUG_MODE:
+            print(f"✅ 企业舆情采集：关键词【{keyword}】获取{len(result['items'])}条数据")
+
     # 3. 数据合并+去重+过滤
     if len(enterprise_yuqing_list) == 0:
         return pd.DataFrame()  # 无数据返回空DF
-    df_all = pd.concat(enterprise_yuqing_list, ignore_index=True)
+    df_all = pd.DataFrame(enterprise_yuqing_list)
     df_all = text_deduplicate(df_all)  # 去重
     df_all = text_filter(df_all, keywords=[enterprise_name])  # 过滤无关内容
 
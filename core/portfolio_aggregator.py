@@ -0,0 +1,268 @@
+# portfolio_aggregator.py
+"""
+组合舆情信号聚合
+行业/公司分析结果落地时增量更新按时间衰减加权的行业景气度得分与公司风险指数；
+投资建议仅在组合信号发生实质变化时才重新调用大模型生成
+"""
+import os
+import sys
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_PORTFOLIO_HALF_LIFE_DAYS,
+    LLM_PORTFOLIO_SCORE_CHANGE,
+    LLM_PORTFOLIO_RISK_CHANGE,
+    LLM_PORTFOLIO_TOP_N,
+    LLM_PORTFOLIO_SEED_LIMIT
+)
+from core.result_store import content_id
+
+# 严重等级对应的风险分值（风险指数 = 加权平均分值 × 100）
+SEVERITY_WEIGHTS = {"高": 1.0, "中": 0.5, "低": 0.1}
+
+ANALYSIS_SCENARIOS = {"行业景气度分析": "industry", "公司风险分析": "company"}
+
+
+def _format_ts(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+class PortfolioAggregator:
+    """行业/公司信号的增量聚合（指数衰减加权）"""
+
+    def __init__(self, half_life_days: float = 7, score_change: float = 5, risk_change: float = 15,
+                 top_n: int = 10):
+        """
+        Args:
+            half_life_days: 近期权重半衰期（天）
+            score_change: 行业加权得分变化超过该值视为实质变化
+            risk_change: 公司风险指数变化超过该值视为实质变化
+            top_n: 投资建议中列出的行业/公司数
+        """
+        self.half_life = half_life_days * 86400
+        self.score_change = score_change
+        self.risk_change = risk_change
+        self.top_n = top_n
+
+        self.industries = {}
+        self.companies = {}
+        self.version = 0
+        # 已计入的(场景, 主体, 舆情ID)，同一主体的同一舆情只计一次
+        self._seen = set()
+        # 上次生成投资建议时的信号快照与结果
+        self._narrative = None
+        self._lock = threading.Lock()
+
+    def _accumulate(self, entry: Dict, ts: float, values: Dict):
+        """按时间衰减累加：累加量以ref_ts为基准，新结果使旧累加量整体衰减"""
+        if ts > entry["ref_ts"]:
+            factor = 0.5 ** ((ts - entry["ref_ts"]) / self.half_life)
+            for key in entry["sums"]:
+                entry["sums"][key] *= factor
+            entry["ref_ts"] = ts
+            weight = 1.0
+        else:
+            weight = 0.5 ** ((entry["ref_ts"] - ts) / self.half_life)
+        for key, value in values.items():
+            entry["sums"][key] = entry["sums"].get(key, 0.0) + weight * value
+        entry["count"] += 1
+        entry["latest_ts"] = max(entry["latest_ts"], ts)
+
+    def add(self, result: Dict, news_id: str = None, industry: str = None, ts: float = None) -> bool:
+        """
+        计入一条分析结果
+
+        Args:
+            result: 行业景气度/公司风险分析结果（其他类型忽略）
+            news_id: 舆情ID，默认按舆情摘要生成
+            industry: 公司所属行业（默认读取结果中的公司基本信息）
+            ts: 分析时间戳，默认当前时间
+
+        Returns:
+            是否计入（重复舆情、解析失败或降级结果返回False）
+        """
+        scenario = ANALYSIS_SCENARIOS.get(result.get("分析类型"))
+        if scenario is None or result.get("解析状态") == "失败" or "服务降级" in result:
+            return False
+        entity = result.get("行业名称") if scenario == "industry" else result.get("公司名称")
+        if not entity:
+            return False
+        ts = ts or time.time()
+        key = (scenario, entity, news_id or content_id(result.get("舆情摘要", "")))
+
+        if scenario == "industry":
+            section = result.get("景气度分析") or {}
+            try:
+                score = float(section.get("景气度得分"))
+            except (TypeError, ValueError):
+                score = None
+            tendency = (result.get("舆情属性") or {}).get("舆情倾向")
+            values = {"weight": 1.0, "positive": 1.0 if tendency == "利好" else 0.0,
+                      "negative": 1.0 if tendency == "利空" else 0.0}
+            if score is not None:
+                values.update(score=score, score_weight=1.0)
+        else:
+            level = (result.get("负面舆情识别") or {}).get("严重等级")
+            values = {"weight": 1.0, "severity": SEVERITY_WEIGHTS.get(level, 0.0)}
+            industry = industry or (result.get("公司基本信息") or {}).get("所属行业")
+
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            signals = self.industries if scenario == "industry" else self.companies
+            entry = signals.setdefault(entity, {"count": 0, "ref_ts": ts, "latest_ts": ts, "sums": {},
+                                                "levels": {}, "industry": None})
+            self._accumulate(entry, ts, values)
+            if scenario == "company":
+                entry["levels"][level] = entry["levels"].get(level, 0) + 1
+                entry["industry"] = industry or entry["industry"]
+            self.version += 1
+        return True
+
+    def add_many(self, results: List[Dict]) -> int:
+        """批量计入分析结果，返回计入条数"""
+        return sum(1 for result in results if isinstance(result, dict) and self.add(result))
+
+    def seed_from_store(self, store, limit: int = 500) -> int:
+        """从结果库载入最近的历史结果，返回计入条数"""
+        added = 0
+        for row in store.history(limit=limit):
+            added += self.add(row["结果"], news_id=row["舆情ID"], industry=row["所属行业"],
+                              ts=row["时间戳"])
+        return added
+
+    def snapshot(self) -> Dict:
+        """
+        当前组合信号
+
+        Returns:
+            {"版本", "结果数", "行业": [按加权景气度得分降序], "公司": [按风险指数降序]}
+        """
+        now = time.time()
+        with self._lock:
+            industries = []
+            for name, entry in self.industries.items():
+                sums = entry["sums"]
+                score = sums["score"] / sums["score_weight"] if sums.get("score_weight") else None
+                industries.append({
+                    "行业": name,
+                    "舆情数": entry["count"],
+                    "景气度得分": round(score, 1) if score is not None else None,
+                    "利好占比": round(sums["positive"] / sums["weight"], 2),
+                    "利空占比": round(sums["negative"] / sums["weight"], 2),
+                    "热度": round(sums["weight"] * 0.5 ** ((now - entry["ref_ts"]) / self.half_life), 2),
+                    "最近分析": _format_ts(entry["latest_ts"])
+                })
+            companies = []
+            for name, entry in self.companies.items():
+                sums = entry["sums"]
+                companies.append({
+                    "公司": name,
+                    "所属行业": entry["industry"],
+                    "舆情数": entry["count"],
+                    "高": entry["levels"].get("高", 0),
+                    "中": entry["levels"].get("中", 0),
+                    "低": entry["levels"].get("低", 0),
+                    "风险指数": round(sums["severity"] / sums["weight"] * 100, 1),
+                    "热度": round(sums["weight"] * 0.5 ** ((now - entry["ref_ts"]) / self.half_life), 2),
+                    "最近分析": _format_ts(entry["latest_ts"])
+                })
+            version, total = self.version, len(self._seen)
+
+        industries.sort(key=lambda row: (row["景气度得分"] is None, -(row["景气度得分"] or 0)))
+        companies.sort(key=lambda row: -row["风险指数"])
+        return {"版本": version, "结果数": total, "行业": industries, "公司": companies}
+
+    def visible(self, snapshot: Dict) -> Dict:
+        """投资建议提示词中列出的信号：得分最高/最低的行业与风险最高的公司"""
+        industries = snapshot["行业"]
+        if len(industries) > 2 * self.top_n:
+            industries = industries[:self.top_n] + industries[-self.top_n:]
+        return {"行业": industries, "公司": snapshot["公司"][:self.top_n]}
+
+    def material_changes(self, previous: Optional[Dict], current: Dict) -> List[str]:
+        """
+        对比两次快照中提示词可见的信号，返回实质变化说明（为空表示无实质变化）
+        """
+        if previous is None:
+            return ["首次生成"]
+        before, after = self.visible(previous), self.visible(current)
+        changes = []
+
+        old = {row["行业"]: row["景气度得分"] for row in before["行业"]}
+        for row in after["行业"]:
+            name, score = row["行业"], row["景气度得分"]
+            if name not in old:
+                changes.append(f"新增行业：{name}")
+            elif score is not None and (old[name] is None or abs(score - old[name]) >= self.score_change):
+                changes.append(f"{name}景气度得分 {old[name]} → {score}")
+
+        old = {row["公司"]: row["风险指数"] for row in before["公司"]}
+        for row in after["公司"]:
+            name, risk = row["公司"], row["风险指数"]
+            if name not in old:
+                changes.append(f"新增风险公司：{name}")
+            elif abs(risk - old[name]) >= self.risk_change:
+                changes.append(f"{name}风险指数 {old[name]} → {risk}")
+        return changes
+
+    def suggest(self, generate: Callable[[Dict], Dict], portfolio_info: Dict = None,
+                force: bool = False) -> Dict:
+        """
+        获取投资建议：组合信号与组合信息均无实质变化时复用上次结果
+
+        Args:
+            generate: 基于提示词可见信号生成建议的函数（调用大模型）
+            portfolio_info: 投资组合信息
+            force: 强制重新生成
+
+        Returns:
+            投资建议，附带"生成信息"（基于结果数、是否重新生成、触发原因）
+        """
+        current = self.snapshot()
+        previous, previous_portfolio, suggestions = self._narrative or (None, None, None)
+        changes = self.material_changes(previous, current)
+        if portfolio_info != previous_portfolio and previous is not None:
+            changes.append("投资组合信息变化")
+        if force and not changes:
+            changes.append("手动刷新")
+
+        if not changes:
+            return {**suggestions, "生成信息": {"基于结果数": current["结果数"], "重新生成": False,
+                                                "触发原因": [], "上次生成": previous["生成时间"]}}
+
+        suggestions = generate(self.visible(current))
+        current["生成时间"] = _format_ts(time.time())
+        # 解析失败或降级的建议不缓存，下次重新生成
+        if suggestions.get("解析状态") != "失败" and "服务降级" not in suggestions:
+            self._narrative = (current, portfolio_info, suggestions)
+        return {**suggestions, "生成信息": {"基于结果数": current["结果数"], "重新生成": True,
+                                            "触发原因": changes, "上次生成": current["生成时间"]}}
+
+
+# ===================== 进程级共享组合信号 =====================
+_shared_aggregator = None
+_shared_aggregator_lock = threading.Lock()
+
+
+def get_portfolio_aggregator(result_store=None) -> PortfolioAggregator:
+    """获取进程级共享组合信号（首次创建时从结果库载入历史结果）"""
+    global _shared_aggregator
+    with _shared_aggregator_lock:
+        if _shared_aggregator is None:
+            _shared_aggregator = PortfolioAggregator(
+                half_life_days=LLM_PORTFOLIO_HALF_LIFE_DAYS,
+                score_change=LLM_PORTFOLIO_SCORE_CHANGE,
+                risk_change=LLM_PORTFOLIO_RISK_CHANGE,
+                top_n=LLM_PORTFOLIO_TOP_N
+            )
+            if result_store is not None:
+                _shared_aggregator.seed_from_store(result_store, limit=LLM_PORTFOLIO_SEED_LIMIT)
+        return _shared_aggregator
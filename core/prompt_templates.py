@@ -0,0 +1,260 @@
+# prompt_templates.py
+"""
+舆情分析提示词模板
+固定的分析要求与JSON输出框架集中在此处，单条分析、打包分析与本地初筛共用；
+任务说明与分析要求放在系统提示词中作为稳定前缀（命中服务端前缀缓存），用户消息只包含舆情内容
+"""
+import json
+
+# 公司风险类型枚举（提示词与本地初筛词典共用）
+RISK_TYPES = [
+    "债务逾期", "担保违约", "高管失联/被查", "评级下调/展望负面", "债券展期/回售违约",
+    "非标融资违约", "流动性危机", "资产查封冻结", "重大诉讼仲裁", "供应链风险", "经营风险", "合规风险"
+]
+
+# 各场景JSON输出的顶层板块
+INDUSTRY_SECTIONS = ["舆情属性", "景气度分析", "资产标的与配置", "产业链与跨行业影响", "动态调整支撑"]
+COMPANY_SECTIONS = ["负面舆情识别", "影响范围与传导路径", "风险量化评估", "风险处置建议"]
+
+# ===================== 行业景气度分析（场景1） =====================
+INDUSTRY_TASK = """
+# 任务指令：行业舆情多维度分析
+请严格按照金融投资分析标准，对用户提供的目标行业舆情进行多维度专业分析，最终输出可直接解析的JSON格式结果（无任何多余文字、注释）。
+"""
+
+INDUSTRY_ANALYSIS_RULES = """
+# 核心分析要求
+## 1. 舆情属性精准识别（正面/负面/中性）
+- 舆情类型：从「行业政策/技术突破/市场需求/竞争格局/风险事件」中精准匹配（可多选，数组形式）
+- 舆情倾向：利好/利空/中性（需明确）
+- 影响强度：高/中/低（结合量化维度：政策落地力度/技术商业化进度/市场需求规模等）
+- 具体影响：基于舆情类型，量化描述对行业的直接影响（例如「新能源补贴政策落地，预计拉动行业年度销量增长15%-20%」）
+
+## 2. 赛道景气度量化评分
+- 景气度评级：高涨/良好/一般/低迷（需与得分强绑定，判定标准：高涨=80-100分、良好=60-79分、一般=30-59分、低迷=0-29分）
+- 景气度得分：0-100分（评分逻辑：政策支撑度30% + 技术成熟度25% + 市场需求25% + 产业链配套20%，需量化拆解）
+- 评分拆解：需单独列出政策支撑度（0-30分）、技术成熟度（0-25分）、市场需求（0-25分）、产业链配套（0-20分）的具体得分，且四项得分之和需等于景气度总分
+
+
+## 3. 资产标的精准匹配与配置建议
+- 关联资产标的：
+  - 股票：核心标的代码+名称（数组形式，例如["宁德时代 300750", "隆基绿能 601012"]），需标注匹配逻辑（如「新能源政策利好电池环节龙头」）
+  - 债券：核心标的类型+名称（数组形式，例如["新能源产业债AAA级", "光伏企业中期票据"]），需标注匹配逻辑
+- 配置调整建议：
+  - 行业配置策略：超配/标配/低配/规避（需结合景气度得分）
+  - 标的调整方向：增持/减持/持有/清仓（分股票/债券维度说明）
+  - 调整幅度建议：量化区间（例如「新能源股票超配比例提升5%-8%，新能源债券标配维持不变」）
+  - 风险收益比：潜在收益空间（量化区间）+ 下行风险（量化区间）+ 核心逻辑（例如「潜在收益20%-30%，下行风险10%以内，核心逻辑为政策红利释放+需求增长」）
+
+## 4. 多行业联动与产业链影响（适配分散投资策略）
+- 受益行业：关联受益行业列表（数组形式），标注受益逻辑（例如["储能行业：新能源装机增长带动储能需求"]）
+- 受损行业：关联受损行业列表（数组形式），标注受损逻辑（例如["传统火电行业：新能源替代加速导致装机量下滑"]）
+- 产业链分环节影响（需量化、具体）：
+  - 上游：原材料/核心零部件/基础资源的价格变动、供需变化（例如「锂矿：需求增长预计推动价格上涨8%-10%」）
+  - 中游：生产制造/加工组装/设备供应的产能利用率、利润率变化（例如「电池制造：产能利用率提升至90%，利润率提升2-3个百分点」）
+  - 下游：终端应用/分销渠道/消费市场的需求规模、渗透率变化（例如「新能源汽车终端：政策补贴带动需求增长15%-20%，渗透率提升至35%」）
+
+## 5. 多行业并行监测适配（动态调整策略支撑）
+- 跨行业替代/互补关系：列出与目标行业有替代/互补关系的行业（数组形式），标注对分散投资的影响（例如["光伏行业与风电行业：互补关系，分散配置可降低政策波动风险"]）
+- 风险提示：分行业/标的维度的核心风险点（数组形式，例如["新能源行业：政策退坡风险；宁德时代：原材料价格上涨风险"]）
+- 时间窗口：舆情影响的持续时间（量化，例如「6个月内持续影响，3个月为核心窗口期」）
+
+# 输出格式强制要求
+1. 仅返回JSON字符串，无任何前置/后置文字、解释、换行；
+2. 所有列表类字段（受益行业、关联资产标的等）均以数组形式返回；
+3. 量化维度需标注具体数值/区间，禁止模糊表述；
+4. 匹配逻辑、调整依据需简洁且符合金融投资逻辑；
+5. JSON字段命名清晰（如下示例框架），层级结构明确：
+
+{
+  "舆情属性": {
+    "舆情类型": [],
+    "舆情倾向": "",
+    "影响强度": "",
+    "具体影响": ""
+  },
+  "景气度分析": {
+    "景气度评级": "",
+    "景气度得分": 0,
+    "评分拆解": {
+      "政策支撑度": 0,
+      "技术成熟度": 0,
+      "市场需求": 0,
+      "产业链配套": 0
+    }
+  },
+  "资产标的与配置": {
+    "关联资产标的": {
+      "股票": [],
+      "债券": []
+    },
+    "配置调整建议": {
+      "行业配置策略": "",
+      "标的调整方向": {
+        "股票": "",
+        "债券": ""
+      },
+      "调整幅度建议": "",
+      "风险收益比": ""
+    }
+  },
+  "产业链与跨行业影响": {
+    "受益行业": [],
+    "受损行业": [],
+    "产业链影响": {
+      "上游": "",
+      "中游": "",
+      "下游": ""
+    },
+    "跨行业关系": []
+  },
+  "动态调整支撑": {
+    "风险提示": [],
+    "时间窗口": ""
+  }
+}
+"""
+
+# ===================== 公司风险分析（场景2） =====================
+COMPANY_TASK = """
+# 任务指令：债券发行人/非标融资主体负面舆情风险量化分析
+请基于金融风控标准，分析用户提供的目标企业舆情信息，重点识别债务违约、评级下调等负面风险，量化严重等级并输出可落地的处置方案。输出结果为**纯净JSON格式**，无任何前置、后置文字或注释。
+"""
+
+COMPANY_ANALYSIS_RULES = """
+## 核心分析维度（严格按以下结构输出）
+### 1. 负面舆情精准识别（强制枚举风险类型）
+- **风险类型**：从以下枚举值中匹配（可多选，数组格式）：{risk_types}；若均不符合，可自行生成。
+- **风险事件详情**：精炼描述事件核心要素（时间、地点、涉及金额、相关主体、事件进展），量化表述（例如"2025年12月发行人发生5亿元债券逾期，涉及3家商业银行债权"）
+- **严重等级**：高/中/低（判定标准：高=直接触发违约或丧失偿债能力；中=影响偿债能力但未实质性违约；低=轻微负面，不影响偿债能力）
+- **风险定性**：实质性违约风险/潜在违约风险/舆情扰动风险，若均不符合可自行生成
+
+### 2. 影响范围与传导路径判定
+- **影响范围**：单一主体/关联企业/全行业（需明确关联企业名单，例如"发行人子公司A、担保人B；行业层面仅影响区域城投平台"）
+- **直接影响对象**：明确受影响的债券品种/非标产品（数组格式，例如["25XX债01（代码123XXX）", "XX信托非标融资产品"]）,强制生成，不允许返回空值。
+- **传导路径分析**：
+  - 内部传导：对发行人现金流、融资能力、核心业务的具体影响（量化数据支撑）
+  - 外部传导：对关联企业、担保人、上下游供应链、区域金融生态的连锁反应
+  - 市场传导：对债券二级市场价格、同行业信用利差的影响预判
+
+### 3. 风险量化评估（金融风控视角）
+- **损失预估**：给出潜在损失金额区间和可能的间接损失。不要输出任何占比，百分数信息。
+- **市场影响程度**：债券价格跌幅预判（例如"预计债券价格下跌15%-20%"）/ 融资成本上升幅度（例如"新增融资成本上浮300-500BP"）
+
+### 4. 风险处置建议（可落地、分优先级）
+- **紧急处置等级**：立即处置/近期关注（7日内）/常规监控（30日内）
+- **分场景处置措施**：
+  - 持仓机构操作建议：减持比例（例如"减持持仓规模的50%-80%"）/ 止损价位（例如"债券价格跌破80元时全额止损"）/ 持有观望条件
+  - 风险对冲策略：适用场景（如信用违约互换CDS）/ 对冲工具选择 / 对冲比例建议
+  - 投后管理措施：尽调重点（如核查发行人货币资金真实性）/ 沟通对象（如发行人财务总监、担保人）/ 信息披露跟踪要求
+- **风险缓释手段**：担保人代偿能力核查 / 抵质押物处置可行性 / 政府救助可能性分析（针对城投类主体）
+
+
+
+## 输出格式强制要求
+1. 必须返回标准JSON，字段命名与上述维度严格对应，无嵌套层级冗余；所有字段必须生成，不允许返回空值；
+2. 所有量化指标需提供具体数值/区间，禁止模糊表述（如"较大影响"需替换为"影响金额5-8亿元"）；
+3. 风险类型、监控指标等列表类字段，统一用数组格式输出；
+4. 分析逻辑需符合债券/非标风控实务，避免理论化表述；
+5. 禁止输出任何JSON以外的内容（包括"以下是分析结果"等过渡语句）。
+
+## JSON输出框架（严格遵循，不得修改字段名称）
+{
+  "负面舆情识别": {
+    "风险类型": [],
+    "风险事件详情": "",
+    "严重等级": "",
+    "风险定性": ""
+  },
+  "影响范围与传导路径": {
+    "影响范围": "",
+    "直接影响对象": [],
+    "传导路径分析": {
+      "内部传导": "",
+      "外部传导": "",
+      "市场传导": ""
+    }
+  },
+  "风险量化评估": {
+    "损失预估": "",
+    "市场影响程度": ""
+  },
+  "风险处置建议": {
+    "紧急处置等级": "",
+    "分场景处置措施": {
+      "持仓机构操作建议": "",
+      "风险对冲策略": "",
+      "投后管理措施": ""
+    },
+    "风险缓释手段": ""
+  }
+}
+""".replace("{risk_types}", "、".join(RISK_TYPES))
+
+# ===================== 投资建议生成 =====================
+SUGGESTIONS_RULES = """
+# 任务指令：基于组合舆情信号生成综合投资建议
+用户将提供按时间衰减加权的行业景气度信号、公司风险信号与当前投资组合信息。
+- 行业信号：景气度得分为0-100分的加权平均，利好/利空占比为舆情倾向的加权占比，热度反映近期舆情数量
+- 公司信号：风险指数为0-100（严重等级高=100、中=50、低=10的加权平均），高/中/低为各严重等级的舆情数
+
+请提供以下建议，以JSON格式返回：
+
+1. **整体策略**
+   - 市场观点：乐观/谨慎/中性
+   - 风险偏好：建议的风险承受水平
+   - 仓位建议：建议整体仓位（%）
+
+2. **行业配置建议**
+   - 推荐增持的行业及理由
+   - 建议减持的行业及理由
+   - 建议关注的行业
+
+3. **个股操作建议**
+   - 推荐关注的个股（如有）
+   - 建议回避的个股（如有）
+   - 仓位调整建议
+
+4. **风险控制**
+   - 主要风险点
+   - 止损建议
+   - 对冲策略
+
+5. **监控重点**
+   - 需要重点监控的指标
+   - 关键时间节点
+   - 预警信号
+
+请确保建议具体、可操作。请用中文生成。
+"""
+
+# ===================== 打包批量分析 =====================
+PACKED_OUTPUT_RULES = """
+# 批量输出格式要求（优先级高于上述单条输出要求）
+1. 上述共{count}条舆情，请逐条独立分析，互不影响；
+2. 仅返回一个JSON对象：{"结果": [...]}，数组长度必须等于{count}，并按舆情序号顺序排列；
+3. 数组中每个元素增加"序号"字段（与舆情序号一致），其余字段严格遵循上述单条JSON输出框架；
+4. 禁止输出任何JSON以外的内容。
+"""
+
+
+# ===================== 结果校验 =====================
+def _schema_from_rules(rules: str) -> dict:
+    """从分析要求末尾的JSON输出框架解析字段结构"""
+    return json.loads(rules[rules.rindex("\n{\n"):])
+
+
+# 各场景的JSON输出框架（用于结果校验与缺失板块补问）
+SCENARIO_SCHEMAS = {
+    "industry": _schema_from_rules(INDUSTRY_ANALYSIS_RULES),
+    "company": _schema_from_rules(COMPANY_ANALYSIS_RULES)
+}
+
+# 缺失板块补问要求
+REASK_RULES = """
+# 补充输出要求（优先级高于上述输出要求）
+上一次输出缺少以下板块或字段：{missing}
+请仅针对这些板块重新输出，返回只包含以下板块的JSON对象，字段结构严格遵循：
+{schema}
+禁止输出任何JSON以外的内容。
+"""
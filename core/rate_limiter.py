@@ -0,0 +1,360 @@
+# rate_limiter.py
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import threading
+from typing import Callable, Optional
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_RATE_LIMIT_RPM,
+    LLM_RATE_LIMIT_TPM,
+    LLM_MAX_CONCURRENCY,
+    LLM_MIN_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY
+)
+from core.request_scheduler import get_request_scheduler
+from core.circuit_breaker import CircuitBreaker, get_circuit_breaker
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本Token数（中文约0.6 Token/字，其他字符约0.3 Token/字）"""
+    if not text:
+        return 0
+    cjk_count = len(re.findall(r'[\u4e00-\u9fff]', text))
+    return int(cjk_count * 0.6 + (len(text) - cjk_count) * 0.3) + 1
+
+
+class TokenBucket:
+    """令牌桶：按分钟速率匀速补充令牌"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """距离可取出amount个令牌还需等待的秒数（0表示可立即取出）"""
+        self._refill()
+        # 单次需求超过桶容量时按桶满处理，避免永久等待
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """取出令牌（允许因实际用量修正而变为负数）"""
+        self._refill()
+        self.tokens -= amount
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应限流器
+
+    - 请求数/Token数两个令牌桶控制每分钟速率
+    - AIMD并发窗口：成功时加性增大，429/5xx时乘性减小
+    - 服务端返回Retry-After时暂停所有新请求
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 max_concurrency: int = 16, min_concurrency: int = 1,
+                 initial_concurrency: int = None, decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 1.0):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(initial_concurrency or max(min_concurrency, max_concurrency // 2))
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+        # 统计
+        self.total_requests = 0
+        self.throttled_count = 0
+
+    def _try_acquire(self, estimated_tokens: int, reserve: int = 0) -> float:
+        """
+        尝试占用一个请求名额，成功返回0，否则返回建议等待秒数
+
+        Args:
+            reserve: 需留出的并发名额（批量任务为交互请求预留，至少保留1个可用名额）
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            if self.in_flight >= max(1, int(self.concurrency_limit) - reserve):
+                return 0.05
+
+            wait = max(self.request_bucket.wait_time(1),
+                       self.token_bucket.wait_time(estimated_tokens))
+            if wait > 0:
+                return wait
+
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(estimated_tokens)
+            self.in_flight += 1
+            self.total_requests += 1
+            return 0.0
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """阻塞直到获得请求名额，返回排队等待秒数"""
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(estimated_tokens)
+            if wait <= 0:
+                return time.monotonic() - start
+            time.sleep(min(wait, 1.0))
+
+    async def aacquire(self, estimated_tokens: int = 0) -> float:
+        """异步等待获得请求名额，返回排队等待秒数"""
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(estimated_tokens)
+            if wait <= 0:
+                return time.monotonic() - start
+            await asyncio.sleep(min(wait, 1.0))
+
+    def release(self, estimated_tokens: int = 0, actual_tokens: int = None):
+        """请求成功：归还名额，按实际用量修正Token桶，并加性增大并发窗口"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if actual_tokens is not None:
+                self.token_bucket.consume(actual_tokens - estimated_tokens)
+            self.concurrency_limit = min(self.max_concurrency,
+                                         self.concurrency_limit + 1.0 / self.concurrency_limit)
+
+    def release_slot(self):
+        """请求被中断（取消/提前停止迭代）：只归还名额，不作为成功或失败反馈给并发窗口"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def release_failure(self, error: Exception) -> bool:
+        """
+        请求失败：归还名额；限流/服务端错误时乘性减小并发窗口
+
+        Returns:
+            是否值得重试
+        """
+        status, retry_after = _inspect_error(error)
+        if status is None:
+            # 无状态码：仅网络连接/超时类异常视为拥塞
+            throttled = _is_transient_error(error)
+        else:
+            throttled = status == 429 or status >= 500
+
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if not throttled:
+                return False
+
+            self.throttled_count += 1
+            now = time.monotonic()
+            # 同一次拥塞只收缩一次窗口
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.concurrency_limit = max(self.min_concurrency,
+                                             self.concurrency_limit * self.decrease_factor)
+                self._last_decrease = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+        return True
+
+    def stats(self) -> dict:
+        """限流器状态"""
+        with self._lock:
+            return {
+                "并发窗口": round(self.concurrency_limit, 2),
+                "进行中请求": self.in_flight,
+                "累计请求": self.total_requests,
+                "限流次数": self.throttled_count
+            }
+
+
+def _inspect_error(error: Exception):
+    """从OpenAI SDK异常中提取HTTP状态码与Retry-After秒数"""
+    status = getattr(error, "status_code", None)
+    retry_after = None
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+    return status, retry_after
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """是否为网络连接/超时类瞬时异常"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from openai import APIConnectionError  # 包含APITimeoutError
+    except ImportError:
+        return False
+    return isinstance(error, APIConnectionError)
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    """带抖动的指数退避时间（full jitter）"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def record_breaker_error(breaker: CircuitBreaker, error: Exception):
+    """超时/连接错误/5xx计入熔断统计；限流与请求参数错误说明服务可用，不计入"""
+    status, _ = _inspect_error(error)
+    if (status is None and _is_transient_error(error)) or (status is not None and status >= 500):
+        breaker.record_failure()
+    else:
+        breaker.release_probe()
+
+
+def _usage_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None) if usage else None
+
+
+def call_with_rate_limit(create_fn: Callable, estimated_tokens: int,
+                         limiter: AdaptiveRateLimiter = None, max_retries: int = None,
+                         stats: dict = None, breaker: CircuitBreaker = None):
+    """
+    在熔断器与限流器保护下调用大模型（按当前请求优先级排队），限流/服务端错误时退避重试
+
+    Args:
+        create_fn: 无参调用函数，返回SDK响应对象
+        estimated_tokens: 本次请求预估Token数（输入+最大输出）
+        limiter: 限流器，默认使用进程级共享限流器
+        max_retries: 最大重试次数，默认读取LLM_MAX_RETRIES
+        stats: 可选，传入字典时写入排队等待秒数queue_wait（含退避）与重试次数retries
+        breaker: 熔断器，默认使用进程级共享熔断器
+
+    Returns:
+        SDK响应对象；重试耗尽或不可重试时抛出最后一次异常，熔断期间抛出CircuitOpenError
+    """
+    limiter = limiter or get_rate_limiter()
+    breaker = breaker or get_circuit_breaker()
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    stats = {} if stats is None else stats
+    stats.update(queue_wait=0.0, retries=0)
+
+    for attempt in range(max_retries + 1):
+        stats["retries"] = attempt
+        # 熔断期间不排队，直接失败
+        breaker.check()
+        try:
+            stats["queue_wait"] += get_request_scheduler().acquire(limiter, estimated_tokens)
+        except BaseException:
+            # 排队被取消/超时：调度器已移出排队票据，这里只归还熔断探测名额
+            breaker.release_probe()
+            raise
+        started = time.monotonic()
+        released = False
+        try:
+            response = create_fn()
+            released = True
+        except Exception as e:
+            released = True
+            record_breaker_error(breaker, e)
+            retryable = limiter.release_failure(e)
+            if not retryable or attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, LLM_RETRY_BASE_DELAY)
+            print(f"⚠️ 大模型请求受限，{delay:.1f}秒后第{attempt + 1}次重试: {e}")
+            time.sleep(delay)
+            stats["queue_wait"] += delay
+            continue
+        finally:
+            # 调用被中断（KeyboardInterrupt/CancelledError）时只归还并发名额与熔断探测名额，不调整并发窗口
+            if not released:
+                limiter.release_slot()
+                breaker.release_probe()
+
+        breaker.record_success(time.monotonic() - started)
+        limiter.release(estimated_tokens, _usage_tokens(response))
+        return response
+
+
+async def acall_with_rate_limit(create_fn: Callable, estimated_tokens: int,
+                                limiter: AdaptiveRateLimiter = None, max_retries: int = None,
+                                stats: dict = None, breaker: CircuitBreaker = None):
+    """异步版本的call_with_rate_limit，create_fn返回可等待对象"""
+    limiter = limiter or get_rate_limiter()
+    breaker = breaker or get_circuit_breaker()
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    stats = {} if stats is None else stats
+    stats.update(queue_wait=0.0, retries=0)
+
+    for attempt in range(max_retries + 1):
+        stats["retries"] = attempt
+        breaker.check()
+        try:
+            stats["queue_wait"] += await get_request_scheduler().aacquire(limiter, estimated_tokens)
+        except BaseException:
+            # 排队被取消/超时：调度器已移出排队票据，这里只归还熔断探测名额
+            breaker.release_probe()
+            raise
+        started = time.monotonic()
+        released = False
+        try:
+            response = await create_fn()
+            released = True
+        except Exception as e:
+            released = True
+            record_breaker_error(breaker, e)
+            retryable = limiter.release_failure(e)
+            if not retryable or attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, LLM_RETRY_BASE_DELAY)
+            print(f"⚠️ 大模型请求受限，{delay:.1f}秒后第{attempt + 1}次重试: {e}")
+            await asyncio.sleep(delay)
+            stats["queue_wait"] += delay
+            continue
+        finally:
+            # 调用被中断（KeyboardInterrupt/CancelledError）时只归还并发名额与熔断探测名额，不调整并发窗口
+            if not released:
+                limiter.release_slot()
+                breaker.release_probe()
+
+        breaker.record_success(time.monotonic() - started)
+        limiter.release(estimated_tokens, _usage_tokens(response))
+        return response
+
+
+# ===================== 进程级共享限流器 =====================
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """获取进程级共享限流器（舆情分析器与数据生成器共用）"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter(
+                requests_per_minute=LLM_RATE_LIMIT_RPM,
+                tokens_per_minute=LLM_RATE_LIMIT_TPM,
+                max_concurrency=LLM_MAX_CONCURRENCY,
+                min_concurrency=LLM_MIN_CONCURRENCY
+            )
+        return _shared_limiter
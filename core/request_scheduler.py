@@ -0,0 +1,199 @@
+# request_scheduler.py
+"""
+大模型请求优先级调度
+在共享限流器之前按优先级排队：交互请求 > 高严重程度舆情 > 常规批量任务，
+同一优先级按截止时间先到先得；批量任务不能占用为交互请求预留的并发名额
+"""
+import os
+import sys
+import time
+import bisect
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_INTERACTIVE_RESERVED_SLOTS,
+    LLM_INTERACTIVE_DEADLINE,
+    LLM_HIGH_PRIORITY_DEADLINE,
+    LLM_ROUTINE_DEADLINE
+)
+
+# 优先级（数值越小越优先）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_HIGH = 1
+PRIORITY_ROUTINE = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_HIGH: "high",
+    PRIORITY_ROUTINE: "routine"
+}
+
+DEFAULT_DEADLINES = {
+    PRIORITY_INTERACTIVE: LLM_INTERACTIVE_DEADLINE,
+    PRIORITY_HIGH: LLM_HIGH_PRIORITY_DEADLINE,
+    PRIORITY_ROUTINE: LLM_ROUTINE_DEADLINE
+}
+
+# 非排队时的轮询间隔（秒）
+_POLL_INTERVAL = 0.05
+
+# 当前请求的(优先级, 截止时间)；未设置时视为交互请求
+_request_context = contextvars.ContextVar("llm_request_context", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """请求在截止时间前未获得调用名额"""
+
+
+@contextmanager
+def request_priority(priority: int, deadline: Optional[float] = None):
+    """
+    设置当前请求（线程/协程内）的优先级与截止时间，覆盖其中的所有大模型调用
+
+    Args:
+        priority: PRIORITY_INTERACTIVE/PRIORITY_HIGH/PRIORITY_ROUTINE
+        deadline: 排队时限（秒，从进入上下文开始计算），None使用该优先级的默认时限
+    """
+    deadline = DEFAULT_DEADLINES[priority] if deadline is None else deadline
+    token = _request_context.set((priority, time.monotonic() + deadline if deadline else None))
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+
+def current_request() -> Tuple[int, Optional[float]]:
+    """当前请求的(优先级, 截止时间)"""
+    context = _request_context.get()
+    if context is None:
+        deadline = DEFAULT_DEADLINES[PRIORITY_INTERACTIVE]
+        return PRIORITY_INTERACTIVE, time.monotonic() + deadline if deadline else None
+    return context
+
+
+def current_priority_name() -> str:
+    return PRIORITY_NAMES[current_request()[0]]
+
+
+def priority_for_news(news: Dict) -> int:
+    """批量舆情的优先级：严重程度为高的风险事件优先于常规舆情"""
+    severity = news.get("severity") or news.get("严重程度")
+    return PRIORITY_HIGH if severity == "高" else PRIORITY_ROUTINE
+
+
+class RequestScheduler:
+    """优先级+截止时间排队，仅队首请求可向限流器申请名额"""
+
+    def __init__(self, reserved_slots: int = LLM_INTERACTIVE_RESERVED_SLOTS):
+        """
+        Args:
+            reserved_slots: 为交互请求预留的并发名额
+        """
+        self.reserved_slots = reserved_slots
+        self._waiting = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        # 统计
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.deadline_missed = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def _enqueue(self) -> tuple:
+        priority, deadline = current_request()
+        ticket = (priority, deadline if deadline is not None else float("inf"), next(self._seq))
+        with self._lock:
+            bisect.insort(self._waiting, ticket)
+        return ticket
+
+    def _poll(self, limiter, ticket: tuple, estimated_tokens: int) -> float:
+        """轮到该请求时向限流器申请名额，成功返回0，否则返回建议等待秒数"""
+        priority, deadline, _ = ticket
+        with self._lock:
+            if time.monotonic() > deadline:
+                self._waiting.remove(ticket)
+                self.deadline_missed[PRIORITY_NAMES[priority]] += 1
+                raise DeadlineExceeded(f"{PRIORITY_NAMES[priority]}请求排队超时")
+
+            if self._waiting[0] != ticket:
+                return _POLL_INTERVAL
+
+            reserve = 0 if priority == PRIORITY_INTERACTIVE else self.reserved_slots
+            wait = limiter._try_acquire(estimated_tokens, reserve=reserve)
+            if wait <= 0:
+                self._waiting.pop(0)
+                self.admitted[PRIORITY_NAMES[priority]] += 1
+                return 0.0
+            return min(wait, deadline - time.monotonic())
+
+    def _abandon(self, ticket: tuple):
+        """放弃排队（取消/中断/超时）：移出队列，后续请求在下一次轮询时即可成为队首"""
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+
+    def acquire(self, limiter, estimated_tokens: int = 0) -> float:
+        """按当前请求的优先级排队并占用限流器名额，返回排队等待秒数；超过截止时间抛出DeadlineExceeded"""
+        start = time.monotonic()
+        ticket = self._enqueue()
+        admitted = False
+        try:
+            while True:
+                wait = self._poll(limiter, ticket, estimated_tokens)
+                if wait <= 0:
+                    admitted = True
+                    return time.monotonic() - start
+                time.sleep(max(0.0, min(wait, 1.0)))
+        finally:
+            if not admitted:
+                self._abandon(ticket)
+
+    async def aacquire(self, limiter, estimated_tokens: int = 0) -> float:
+        """异步版本的acquire（协程被取消时同样移出队列）"""
+        start = time.monotonic()
+        ticket = self._enqueue()
+        admitted = False
+        try:
+            while True:
+                wait = self._poll(limiter, ticket, estimated_tokens)
+                if wait <= 0:
+                    admitted = True
+                    return time.monotonic() - start
+                await asyncio.sleep(max(0.0, min(wait, 1.0)))
+        finally:
+            if not admitted:
+                self._abandon(ticket)
+
+    def stats(self) -> Dict:
+        """调度器状态"""
+        with self._lock:
+            waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._waiting:
+                waiting[PRIORITY_NAMES[priority]] += 1
+            return {
+                "排队中": waiting,
+                "已放行": dict(self.admitted),
+                "排队超时": dict(self.deadline_missed)
+            }
+
+
+# ===================== 进程级共享调度器 =====================
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """获取进程级共享调度器（与共享限流器配合使用）"""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RequestScheduler()
+        return _shared_scheduler
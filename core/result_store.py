@@ -0,0 +1,176 @@
+# result_store.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict, List
+
+
+def content_id(content: str) -> str:
+    """舆情ID：按舆情正文生成的稳定哈希"""
+    return hashlib.sha1((content or "").strip().encode("utf-8")).hexdigest()[:16]
+
+
+def _score_and_level(scenario: str, result: Dict):
+    """提取便于检索的核心指标：行业为景气度得分/评级，公司为严重等级"""
+    if scenario == "industry":
+        section = result.get("景气度分析") or {}
+        try:
+            score = float(section.get("景气度得分"))
+        except (TypeError, ValueError):
+            score = None
+        return score, section.get("景气度评级")
+    section = result.get("负面舆情识别") or {}
+    return None, section.get("严重等级")
+
+
+class AnalysisResultStore:
+    """
+    分析结果库（SQLite持久化）
+
+    按场景、主体（行业/公司）、所属行业、舆情ID与分析时间建立索引，
+    支持"某公司最新风险分析""某行业景气度得分走势"等查询。
+    同一场景+主体+舆情只保留一条（最新一次分析），缓存命中、重复点击与重复批量不会产生重复记录。
+    """
+
+    def __init__(self, db_path: str):
+        """
+        初始化结果库
+
+        Args:
+            db_path: SQLite文件路径（":memory:"为内存库）
+        """
+        self.db_path = db_path
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scenario TEXT NOT NULL,
+                entity TEXT NOT NULL,
+                industry TEXT,
+                news_id TEXT NOT NULL,
+                score REAL,
+                level TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE(news_id, scenario, entity)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_entity ON analysis_results(scenario, entity, created_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_industry ON analysis_results(industry, created_at)"
+        )
+        self._conn.commit()
+
+    def save(self, scenario: str, entity: str, content: str, result: Dict,
+             industry: str = None) -> int:
+        """
+        保存一条分析结果（同一场景+主体+舆情已有记录时更新；结果未变化时保持原分析时间）
+
+        Args:
+            scenario: industry/company
+            entity: 行业名称/公司名称
+            content: 舆情正文（用于生成舆情ID）
+            result: 分析结果
+            industry: 所属行业（行业场景默认为entity）
+
+        Returns:
+            记录ID
+        """
+        score, level = _score_and_level(scenario, result)
+        if scenario == "industry":
+            industry = industry or entity
+        news_id = content_id(content)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO analysis_results (scenario, entity, industry, news_id, score, level, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(news_id, scenario, entity) DO UPDATE SET industry = excluded.industry, "
+                "score = excluded.score, level = excluded.level, result = excluded.result, "
+                "created_at = excluded.created_at WHERE result != excluded.result",
+                (scenario, entity, industry, news_id, score, level,
+                 json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT id FROM analysis_results WHERE news_id = ? AND scenario = ? AND entity = ?",
+                (news_id, scenario, entity)
+            ).fetchone()[0]
+
+    def _query(self, where: str, params: tuple, limit: int = None, ascending: bool = False) -> List[Dict]:
+        sql = ("SELECT scenario, entity, industry, news_id, score, level, result, created_at "
+               f"FROM analysis_results WHERE {where} ORDER BY created_at {'ASC' if ascending else 'DESC'}, id "
+               f"{'ASC' if ascending else 'DESC'}")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{
+            "场景": scenario,
+            "主体": entity,
+            "所属行业": industry,
+            "舆情ID": news_id,
+            "得分": score,
+            "等级": level,
+            "分析时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created_at)),
+            "时间戳": created_at,
+            "结果": json.loads(result)
+        } for scenario, entity, industry, news_id, score, level, result, created_at in rows]
+
+    def find(self, scenario: str, entity: str, content: str) -> Optional[Dict]:
+        """同一主体+舆情的最近一次分析（用于直接展示历史结果）"""
+        rows = self._query("news_id = ? AND scenario = ? AND entity = ?",
+                           (content_id(content), scenario, entity), limit=1)
+        return rows[0] if rows else None
+
+    def latest(self, scenario: str, entity: str) -> Optional[Dict]:
+        """某行业/公司的最新一次分析"""
+        rows = self._query("scenario = ? AND entity = ?", (scenario, entity), limit=1)
+        return rows[0] if rows else None
+
+    def history(self, scenario: str = None, entity: str = None, industry: str = None,
+                since: float = None, limit: int = 100) -> List[Dict]:
+        """
+        按条件查询历史分析（按分析时间倒序）
+
+        Args:
+            scenario/entity/industry: 场景、主体、所属行业，None表示不限
+            since: 起始时间戳
+            limit: 最多返回条数
+        """
+        conditions, params = [], []
+        for column, value in (("scenario", scenario), ("entity", entity), ("industry", industry)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        return self._query(" AND ".join(conditions) or "1 = 1", tuple(params), limit=limit)
+
+    def score_series(self, industry: str, since: float = None) -> List[Dict]:
+        """某行业景气度得分随时间变化（按分析时间正序）"""
+        where, params = "scenario = 'industry' AND entity = ? AND score IS NOT NULL", (industry,)
+        if since is not None:
+            where, params = where + " AND created_at >= ?", params + (since,)
+        return [{"分析时间": row["分析时间"], "景气度得分": row["得分"], "景气度评级": row["等级"]}
+                for row in self._query(where, params, ascending=True)]
+
+    def stats(self) -> Dict:
+        """结果库统计"""
+        with self._lock:
+            total, companies, industries = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT CASE WHEN scenario = 'company' THEN entity END), "
+                "COUNT(DISTINCT industry) FROM analysis_results"
+            ).fetchone()
+        return {"结果数": total, "公司数": companies, "行业数": industries}
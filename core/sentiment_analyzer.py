@@ -1,29 +1,140 @@
 # sentiment_analyzer.py
 import os
+import sys
+import copy
 import json
+import time
+import asyncio
+from types import SimpleNamespace
 from typing import Dict, List, Any
-from openai import OpenAI
-from dotenv import load_dotenv
-import streamlit as st
-
-load_dotenv()
+from openai import AsyncOpenAI
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import (
+    LLM_BASE_URL,
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    LLM_MAX_TOKENS,
+    LLM_BATCH_CONCURRENCY,
+    LLM_PACK_SIZE,
+    LLM_PACK_MAX_TOKENS,
+    LLM_CACHE_ENABLE,
+    LLM_CACHE_DB_PATH,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_NEAR_DUP_ENABLE,
+    LLM_NEAR_DUP_DB_PATH,
+    LLM_NEAR_DUP_MAX_DISTANCE,
+    LLM_NEAR_DUP_MIN_LENGTH,
+    LLM_NEAR_DUP_TTL,
+    LLM_RESULT_STORE_ENABLE,
+    LLM_RESULT_STORE_DB_PATH
+)
+from core.credentials import get_credential
+from core.llm_cache import LLMResponseCache
+from core.llm_client import get_openai_client, create_async_openai_client
+from core.llm_telemetry import get_telemetry, cached_prompt_tokens
+from core.single_flight import get_single_flight, make_flight_key
+from core.near_duplicate import NearDuplicateStore
+from core.result_store import AnalysisResultStore, content_id
+from core.model_router import get_model_router
+from core.portfolio_aggregator import PortfolioAggregator, get_portfolio_aggregator
+from core.triage import NewsTriage
+from core.request_scheduler import (
+    get_request_scheduler,
+    request_priority,
+    priority_for_news,
+    current_priority_name
+)
+from core.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from core.rate_limiter import (
+    estimate_tokens,
+    get_rate_limiter,
+    call_with_rate_limit,
+    acall_with_rate_limit,
+    record_breaker_error
+)
+from core.json_stream import JSONSectionStream, extract_json, missing_fields
+from core.prompt_templates import (
+    INDUSTRY_TASK,
+    INDUSTRY_ANALYSIS_RULES,
+    COMPANY_TASK,
+    COMPANY_ANALYSIS_RULES,
+    SUGGESTIONS_RULES,
+    PACKED_OUTPUT_RULES,
+    INDUSTRY_SECTIONS,
+    COMPANY_SECTIONS,
+    SCENARIO_SCHEMAS,
+    REASK_RULES
+)
+
+
+# 各分析场景的系统提示词：角色 + 任务说明 + 分析要求与JSON输出框架（所有请求完全相同的固定前缀）
+INDUSTRY_SYSTEM_PROMPT = "你是资深的金融行业分析师" + INDUSTRY_TASK + INDUSTRY_ANALYSIS_RULES
+COMPANY_SYSTEM_PROMPT = "你是经验丰富的金融风控专家" + COMPANY_TASK + COMPANY_ANALYSIS_RULES
+GENERAL_SYSTEM_PROMPT = "你是金融舆情分析师"
+SUGGESTIONS_SYSTEM_PROMPT = "你是资深投资顾问" + SUGGESTIONS_RULES
 
 
 class FinancialSentimentAnalyzer:
     """金融舆情分析器"""
 
-    def __init__(self, api_key=None):
-        """初始化分析器"""
-        self.api_key = st.secrets["DEEPSEEK_API_KEY"]
-        self.model = "deepseek-chat"
+    def __init__(self, api_key=None, use_cache: bool = True):
+        """
+        初始化分析器
+
+        Args:
+            api_key: DeepSeek API密钥，未传入时依次读取Streamlit Secrets与环境变量
+            use_cache: 是否启用大模型响应缓存（False时旁路缓存）
+        """
+        self.api_key = get_credential("DEEPSEEK_API_KEY", api_key)
+        self.model = LLM_MODEL
+        self.temperature = LLM_TEMPERATURE
+        self.max_tokens = LLM_MAX_TOKENS
 
         if not self.api_key:
             raise ValueError("请设置DEEPSEEK_API_KEY环境变量")
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.deepseek.com"
-        )
+        self.base_url = LLM_BASE_URL
+        # 调用遥测：每次调用的耗时/Token/费用写入本地记录
+        self.telemetry = get_telemetry()
+        # 模型路由：按场景选择模型/最大输出/温度，超出耗时SLO时切换到更快的配置
+        self.router = get_model_router()
+        # 进程级请求合并：多个会话同时分析同一舆情时只调用一次大模型
+        self.single_flight = get_single_flight()
+        # 进程级共享连接池（保活/HTTP2），多个分析器实例复用同一客户端
+        self.client = get_openai_client(self.api_key, self.base_url)
+
+        # 响应缓存：相同模型+提示词+参数的请求直接返回历史结果
+        self.cache = None
+        if LLM_CACHE_ENABLE:
+            self.cache = LLMResponseCache(
+                db_path=LLM_CACHE_DB_PATH,
+                ttl=LLM_CACHE_TTL,
+                max_entries=LLM_CACHE_MAX_ENTRIES,
+                bypass=not use_cache
+            )
+
+        # 相似舆情复用：转载/轻度改写的新闻复用已有分析结果
+        self.near_dup = None
+        if LLM_NEAR_DUP_ENABLE and use_cache:
+            self.near_dup = NearDuplicateStore(
+                db_path=LLM_NEAR_DUP_DB_PATH,
+                max_distance=LLM_NEAR_DUP_MAX_DISTANCE,
+                min_length=LLM_NEAR_DUP_MIN_LENGTH,
+                ttl=LLM_NEAR_DUP_TTL
+            )
+
+        # 分析结果库：行业/公司分析结果写入本地，供历史查询与页面重跑后直接展示
+        self.result_store = None
+        if LLM_RESULT_STORE_ENABLE:
+            self.result_store = AnalysisResultStore(LLM_RESULT_STORE_DB_PATH)
+
+        # 组合信号：分析结果落地时增量更新，投资建议仅在信号实质变化时重新生成
+        self.portfolio = get_portfolio_aggregator(self.result_store)
 
         print("✅ 舆情分析器初始化成功")
         # self.api_key = st.secrets.get("GITEE_AI_API_KEY", "")
@@ -48,109 +159,42 @@ class FinancialSentimentAnalyzer:
         Returns:
             行业景气度分析结果
         """
+        # 相同行业+内容的并发请求共享同一次分析
+        key = make_flight_key("industry", industry_name, news_content)
+        return self.single_flight.do(key, lambda: self._run_industry_analysis(industry_name, news_content))
+
+    def _run_industry_analysis(self, industry_name: str, news_content: str) -> Dict:
+        """执行行业景气度分析（转载/改写的相似舆情直接复用已有结果）"""
+        reused = self._reuse_similar("industry", industry_name, news_content)
+        if reused is not None:
+            result = self._decorate_industry_result(reused, industry_name, news_content)
+        else:
+            prompt = self._build_industry_prompt(industry_name, news_content)
+            response = self._call_llm(prompt, INDUSTRY_SYSTEM_PROMPT, scenario="industry")
+            result = self._build_industry_result(response, industry_name, news_content)
+            result = self._complete_sections(result, "industry", prompt, INDUSTRY_SYSTEM_PROMPT)
+            self._remember_similar("industry", industry_name, news_content, result)
+        self._store_result("industry", industry_name, news_content, result)
+        return result
+
+    def _build_industry_prompt(self, industry_name: str, news_content: str) -> str:
+        """构造行业景气度分析提示词（仅包含可变的舆情内容，分析要求在系统提示词中）"""
         prompt = f"""
-        请严格按照金融投资分析标准，对以下{industry_name}行业舆情进行多维度专业分析，最终输出可直接解析的JSON格式结果（无任何多余文字、注释）：
-
-        **舆情内容：**
-        {news_content}
-
-        # 核心分析要求
-        ## 1. 舆情属性精准识别（正面/负面/中性）
-        - 舆情类型：从「行业政策/技术突破/市场需求/竞争格局/风险事件」中精准匹配（可多选，数组形式）
-        - 舆情倾向：利好/利空/中性（需明确）
-        - 影响强度：高/中/低（结合量化维度：政策落地力度/技术商业化进度/市场需求规模等）
-        - 具体影响：基于舆情类型，量化描述对行业的直接影响（例如「新能源补贴政策落地，预计拉动行业年度销量增长15%-20%」）
-
-        ## 2. 赛道景气度量化评分
-        - 景气度评级：高涨/良好/一般/低迷（需与得分强绑定，判定标准：高涨=80-100分、良好=60-79分、一般=30-59分、低迷=0-29分）
-        - 景气度得分：0-100分（评分逻辑：政策支撑度30% + 技术成熟度25% + 市场需求25% + 产业链配套20%，需量化拆解）
-        - 评分拆解：需单独列出政策支撑度（0-30分）、技术成熟度（0-25分）、市场需求（0-25分）、产业链配套（0-20分）的具体得分，且四项得分之和需等于景气度总分
-        
-
-        ## 3. 资产标的精准匹配与配置建议
-        - 关联资产标的：
-          - 股票：核心标的代码+名称（数组形式，例如["宁德时代 300750", "隆基绿能 601012"]），需标注匹配逻辑（如「新能源政策利好电池环节龙头」）
-          - 债券：核心标的类型+名称（数组形式，例如["新能源产业债AAA级", "光伏企业中期票据"]），需标注匹配逻辑
-        - 配置调整建议：
-          - 行业配置策略：超配/标配/低配/规避（需结合景气度得分）
-          - 标的调整方向：增持/减持/持有/清仓（分股票/债券维度说明）
-          - 调整幅度建议：量化区间（例如「新能源股票超配比例提升5%-8%，新能源债券标配维持不变」）
-          - 风险收益比：潜在收益空间（量化区间）+ 下行风险（量化区间）+ 核心逻辑（例如「潜在收益20%-30%，下行风险10%以内，核心逻辑为政策红利释放+需求增长」）
-
-        ## 4. 多行业联动与产业链影响（适配分散投资策略）
-        - 受益行业：关联受益行业列表（数组形式），标注受益逻辑（例如["储能行业：新能源装机增长带动储能需求"]）
-        - 受损行业：关联受损行业列表（数组形式），标注受损逻辑（例如["传统火电行业：新能源替代加速导致装机量下滑"]）
-        - 产业链分环节影响（需量化、具体）：
-          - 上游：原材料/核心零部件/基础资源的价格变动、供需变化（例如「锂矿：需求增长预计推动价格上涨8%-10%」）
-          - 中游：生产制造/加工组装/设备供应的产能利用率、利润率变化（例如「电池制造：产能利用率提升至90%，利润率提升2-3个百分点」）
-          - 下游：终端应用/分销渠道/消费市场的需求规模、渗透率变化（例如「新能源汽车终端：政策补贴带动需求增长15%-20%，渗透率提升至35%」）
-
-        ## 5. 多行业并行监测适配（动态调整策略支撑）
-        - 跨行业替代/互补关系：列出与{industry_name}行业有替代/互补关系的行业（数组形式），标注对分散投资的影响（例如["光伏行业与风电行业：互补关系，分散配置可降低政策波动风险"]）
-        - 风险提示：分行业/标的维度的核心风险点（数组形式，例如["新能源行业：政策退坡风险；宁德时代：原材料价格上涨风险"]）
-        - 时间窗口：舆情影响的持续时间（量化，例如「6个月内持续影响，3个月为核心窗口期」）
-
-        # 输出格式强制要求
-        1. 仅返回JSON字符串，无任何前置/后置文字、解释、换行；
-        2. 所有列表类字段（受益行业、关联资产标的等）均以数组形式返回；
-        3. 量化维度需标注具体数值/区间，禁止模糊表述；
-        4. 匹配逻辑、调整依据需简洁且符合金融投资逻辑；
-        5. JSON字段命名清晰（如下示例框架），层级结构明确：
-
-        {{
-          "舆情属性": {{
-            "舆情类型": [],
-            "舆情倾向": "",
-            "影响强度": "",
-            "具体影响": ""
-          }},
-          "景气度分析": {{
-            "景气度评级": "",
-            "景气度得分": 0,
-            "评分拆解": {{  
-                "政策支撑度": 0,
-                "技术成熟度": 0,
-                "市场需求": 0,
-                "产业链配套": 0
-    }},
-          }},
-          "资产标的与配置": {{
-            "关联资产标的": {{
-              "股票": [],
-              "债券": []
-            }},
-            "配置调整建议": {{
-              "行业配置策略": "",
-              "标的调整方向": {{
-                "股票": "",
-                "债券": ""
-              }},
-              "调整幅度建议": "",
-              "风险收益比": ""
-            }}
-          }},
-          "产业链与跨行业影响": {{
-            "受益行业": [],
-            "受损行业": [],
-            "产业链影响": {{
-              "上游": "",
-              "中游": "",
-              "下游": ""
-            }},
-            "跨行业关系": []
-          }},
-          "动态调整支撑": {{
-            "风险提示": [],
-            "时间窗口": ""
-          }}
-        }}
-        """
+**目标行业：**{industry_name}
 
-        response = self._call_llm(prompt, "你是资深的金融行业分析师")
+**舆情内容：**
+{news_content}
+"""
+        return prompt
 
+    def _build_industry_result(self, response: str, industry_name: str, news_content: str) -> Dict:
+        """解析行业景气度分析响应并补充基础信息"""
         # 解析结果
         result = self._parse_json_response(response)
+        return self._decorate_industry_result(result, industry_name, news_content)
 
+    def _decorate_industry_result(self, result: Dict, industry_name: str, news_content: str) -> Dict:
+        """补充行业景气度分析结果的基础信息"""
         # 添加基础信息
         result["行业名称"] = industry_name
         result["分析类型"] = "行业景气度分析"
@@ -171,100 +215,61 @@ class FinancialSentimentAnalyzer:
         Returns:
             公司风险分析结果
         """
-        # 准备公司信息文本
-        company_info_text = ""
-        if company_info:
-            company_info_text = f"""
+        # 相同公司+内容的并发请求共享同一次分析
+        key = make_flight_key("company", company_name, news_content, company_info)
+        return self.single_flight.do(
+            key, lambda: self._run_company_analysis(company_name, news_content, company_info)
+        )
+
+    def _run_company_analysis(self, company_name: str, news_content: str,
+                              company_info: Dict = None) -> Dict:
+        """执行公司风险分析（转载/改写的相似舆情直接复用已有结果）"""
+        reused = self._reuse_similar("company", company_name, news_content)
+        if reused is not None:
+            result = self._decorate_company_result(reused, company_name, news_content, company_info)
+        else:
+            prompt = self._build_company_prompt(company_name, news_content, company_info)
+            response = self._call_llm(prompt, COMPANY_SYSTEM_PROMPT, scenario="company")
+            result = self._build_company_result(response, company_name, news_content, company_info)
+            result = self._complete_sections(result, "company", prompt, COMPANY_SYSTEM_PROMPT)
+            self._remember_similar("company", company_name, news_content, result)
+        self._store_result("company", company_name, news_content, result, company_info)
+        return result
+
+    def _build_company_prompt(self, company_name: str, news_content: str,
+                              company_info: Dict = None) -> str:
+        """构造公司风险分析提示词（仅包含可变的舆情内容，分析要求在系统提示词中）"""
+        prompt = f"""
+**目标企业：**{company_name}
+
+**舆情内容：**
+{news_content}
+
+**企业基础信息：**
+{self._format_company_info(company_info)}
+"""
+        return prompt
+
+    def _format_company_info(self, company_info: Dict = None) -> str:
+        """准备公司信息文本"""
+        if not company_info:
+            return ""
+        return f"""
 公司基本信息：
 - 所属行业：{company_info.get('所属行业', '未知')}
 - 风险评分：{company_info.get('风险评分', '未知')}/100
 """
 
-        prompt = f"""
-        # 任务指令：债券发行人/非标融资主体负面舆情风险量化分析
-        请基于金融风控标准，分析以下关于**{company_name}**的舆情信息，重点识别债务违约、评级下调等负面风险，量化严重等级并输出可落地的处置方案。输出结果为**纯净JSON格式**，无任何前置、后置文字或注释。
-
-        ## 基础输入信息
-        **舆情内容：**
-        {news_content}
-
-        **企业基础信息：**
-        {company_info_text}
-
-        ## 核心分析维度（严格按以下结构输出）
-        ### 1. 负面舆情精准识别（强制枚举风险类型）
-        - **风险类型**：从以下枚举值中匹配（可多选，数组格式）：债务逾期、担保违约、高管失联/被查、评级下调/展望负面、债券展期/回售违约、非标融资违约、流动性危机、资产查封冻结、重大诉讼仲裁、供应链风险、经营风险、合规风险；若均不符合，可自行生成。
-        - **风险事件详情**：精炼描述事件核心要素（时间、地点、涉及金额、相关主体、事件进展），量化表述（例如"2025年12月发行人发生5亿元债券逾期，涉及3家商业银行债权"）
-        - **严重等级**：高/中/低（判定标准：高=直接触发违约或丧失偿债能力；中=影响偿债能力但未实质性违约；低=轻微负面，不影响偿债能力）
-        - **风险定性**：实质性违约风险/潜在违约风险/舆情扰动风险，若均不符合可自行生成
-
-        ### 2. 影响范围与传导路径判定
-        - **影响范围**：单一主体/关联企业/全行业（需明确关联企业名单，例如"发行人子公司A、担保人B；行业层面仅影响区域城投平台"）
-        - **直接影响对象**：明确受影响的债券品种/非标产品（数组格式，例如["25XX债01（代码123XXX）", "XX信托非标融资产品"]）,强制生成，不允许返回空值。
-        - **传导路径分析**：
-          - 内部传导：对发行人现金流、融资能力、核心业务的具体影响（量化数据支撑）
-          - 外部传导：对关联企业、担保人、上下游供应链、区域金融生态的连锁反应
-          - 市场传导：对债券二级市场价格、同行业信用利差的影响预判
-
-        ### 3. 风险量化评估（金融风控视角）
-        - **损失预估**：给出潜在损失金额区间和可能的间接损失。不要输出任何占比，百分数信息。
-        - **市场影响程度**：债券价格跌幅预判（例如"预计债券价格下跌15%-20%"）/ 融资成本上升幅度（例如"新增融资成本上浮300-500BP"）
-
-        ### 4. 风险处置建议（可落地、分优先级）
-        - **紧急处置等级**：立即处置/近期关注（7日内）/常规监控（30日内）
-        - **分场景处置措施**：
-          - 持仓机构操作建议：减持比例（例如"减持持仓规模的50%-80%"）/ 止损价位（例如"债券价格跌破80元时全额止损"）/ 持有观望条件
-          - 风险对冲策略：适用场景（如信用违约互换CDS）/ 对冲工具选择 / 对冲比例建议
-          - 投后管理措施：尽调重点（如核查发行人货币资金真实性）/ 沟通对象（如发行人财务总监、担保人）/ 信息披露跟踪要求
-        - **风险缓释手段**：担保人代偿能力核查 / 抵质押物处置可行性 / 政府救助可能性分析（针对城投类主体）
-
-      
-
-        ## 输出格式强制要求
-        1. 必须返回标准JSON，字段命名与上述维度严格对应，无嵌套层级冗余；所有字段必须生成，不允许返回空值；
-        2. 所有量化指标需提供具体数值/区间，禁止模糊表述（如"较大影响"需替换为"影响金额5-8亿元"）；
-        3. 风险类型、监控指标等列表类字段，统一用数组格式输出；
-        4. 分析逻辑需符合债券/非标风控实务，避免理论化表述；
-        5. 禁止输出任何JSON以外的内容（包括"以下是分析结果"等过渡语句）。
-
-        ## JSON输出框架（严格遵循，不得修改字段名称）
-        {{
-          "负面舆情识别": {{
-            "风险类型": [],
-            "风险事件详情": "",
-            "严重等级": "",
-            "风险定性": ""
-          }},
-          "影响范围与传导路径": {{
-            "影响范围": "",
-            "直接影响对象": [],
-            "传导路径分析": {{
-              "内部传导": "",
-              "外部传导": "",
-              "市场传导": ""
-            }}
-          }},
-          "风险量化评估": {{
-            "损失预估": "",
-            "市场影响程度": ""
-          }},
-          "风险处置建议": {{
-            "紧急处置等级": "",
-            "分场景处置措施": {{
-              "持仓机构操作建议": "",
-              "风险对冲策略": "",
-              "投后管理措施": ""
-            }},
-            "风险缓释手段": ""
-          }}
-        }}
-        """
-
-        response = self._call_llm(prompt, "你是经验丰富的金融风控专家")
-
+    def _build_company_result(self, response: str, company_name: str, news_content: str,
+                              company_info: Dict = None) -> Dict:
+        """解析公司风险分析响应并补充基础信息"""
         # 解析结果
         result = self._parse_json_response(response)
+        return self._decorate_company_result(result, company_name, news_content, company_info)
 
+    def _decorate_company_result(self, result: Dict, company_name: str, news_content: str,
+                                 company_info: Dict = None) -> Dict:
+        """补充公司风险分析结果的基础信息"""
         # 添加基础信息
         result["公司名称"] = company_name
         result["分析类型"] = "公司风险分析"
@@ -280,7 +285,121 @@ class FinancialSentimentAnalyzer:
 
         return result
 
-    def batch_analyze_news(self, news_list: List[Dict]) -> List[Dict]:
+    def stream_industry_sentiment(self, industry_name: str, news_content: str):
+        """
+        流式分析行业景气度：顶层JSON板块（舆情属性、景气度分析等）生成完毕即返回
+
+        Args:
+            industry_name: 行业名称
+            news_content: 舆情内容
+
+        Yields:
+            (板块名称, 已完成板块组成的结果)；最后一次板块名称为None，结果为完整分析结果
+        """
+        key = make_flight_key("industry", industry_name, news_content)
+        yield from self._stream_coalesced(key, INDUSTRY_SECTIONS,
+                                          lambda: self._run_industry_stream(industry_name, news_content))
+
+    def _run_industry_stream(self, industry_name: str, news_content: str):
+        """流式执行行业景气度分析，返回完整结果（相似舆情复用已有结果并按板块回放）"""
+        reused = self._reuse_similar("industry", industry_name, news_content)
+        if reused is not None:
+            result = self._decorate_industry_result(reused, industry_name, news_content)
+            yield from self._replay_sections(result, INDUSTRY_SECTIONS)
+        else:
+            prompt = self._build_industry_prompt(industry_name, news_content)
+            response = yield from self._stream_sections(prompt, INDUSTRY_SYSTEM_PROMPT, "industry")
+            result = self._build_industry_result(response, industry_name, news_content)
+            result = self._complete_sections(result, "industry", prompt, INDUSTRY_SYSTEM_PROMPT)
+            self._remember_similar("industry", industry_name, news_content, result)
+        self._store_result("industry", industry_name, news_content, result)
+        return result
+
+    def stream_company_risk(self, company_name: str, news_content: str,
+                            company_info: Dict = None):
+        """
+        流式分析公司风险：顶层JSON板块（负面舆情识别等）生成完毕即返回
+
+        Args:
+            company_name: 公司名称
+            news_content: 舆情内容
+            company_info: 公司基本信息（可选）
+
+        Yields:
+            (板块名称, 已完成板块组成的结果)；最后一次板块名称为None，结果为完整分析结果
+        """
+        key = make_flight_key("company", company_name, news_content, company_info)
+        yield from self._stream_coalesced(
+            key, COMPANY_SECTIONS,
+            lambda: self._run_company_stream(company_name, news_content, company_info)
+        )
+
+    def _run_company_stream(self, company_name: str, news_content: str, company_info: Dict = None):
+        """流式执行公司风险分析，返回完整结果（相似舆情复用已有结果并按板块回放）"""
+        reused = self._reuse_similar("company", company_name, news_content)
+        if reused is not None:
+            result = self._decorate_company_result(reused, company_name, news_content, company_info)
+            yield from self._replay_sections(result, COMPANY_SECTIONS)
+        else:
+            prompt = self._build_company_prompt(company_name, news_content, company_info)
+            response = yield from self._stream_sections(prompt, COMPANY_SYSTEM_PROMPT, "company")
+            result = self._build_company_result(response, company_name, news_content, company_info)
+            result = self._complete_sections(result, "company", prompt, COMPANY_SYSTEM_PROMPT)
+            self._remember_similar("company", company_name, news_content, result)
+        self._store_result("company", company_name, news_content, result, company_info)
+        return result
+
+    def _stream_coalesced(self, key: str, sections: List[str], run):
+        """
+        流式请求合并：首个请求边生成边产出板块，相同的并发请求等待其完整结果后按板块回放
+
+        Args:
+            key: 请求合并键
+            sections: 场景顶层板块（回放顺序）
+            run: 无参函数，返回产出(板块名称, 部分结果)并最终返回完整结果的生成器
+        """
+        call, leader = self.single_flight.join(key)
+        if not leader:
+            result = self.single_flight.wait(call)
+            yield from self._replay_sections(result, sections)
+            yield None, result
+            return
+
+        try:
+            result = yield from run()
+        except BaseException as e:
+            # 页面重跑会中断生成器，此时也要唤醒等待方
+            error = e if isinstance(e, Exception) else RuntimeError("合并的分析请求已中断")
+            self.single_flight.finish(key, call, error=error)
+            raise
+        self.single_flight.finish(key, call, result=copy.deepcopy(result))
+        yield None, result
+
+    @staticmethod
+    def _replay_sections(result: Dict, sections: List[str]):
+        """按板块顺序回放已有的完整结果，产出(板块名称, 部分结果)"""
+        partial = {}
+        for section in sections:
+            if section in result:
+                partial[section] = result[section]
+                yield section, dict(partial)
+
+    def _stream_sections(self, prompt: str, system_prompt: str = None, scenario: str = "general"):
+        """流式调用大模型并按顶层板块产出解析结果，返回完整响应文本"""
+        parser = JSONSectionStream()
+        partial = {}
+        chunks = []
+
+        for delta in self._stream_llm(prompt, system_prompt, scenario=scenario):
+            chunks.append(delta)
+            for section, value in parser.feed(delta):
+                partial[section] = value
+                yield section, dict(partial)
+
+        return "".join(chunks)
+
+    def batch_analyze_news(self, news_list: List[Dict], concurrency: int = None,
+                           triage: bool = False) -> List[Dict]:
         """
         批量分析舆情新闻
 
@@ -292,49 +411,318 @@ class FinancialSentimentAnalyzer:
                 - publish_time: 发布时间
                 - related_industry: 相关行业
                 - related_company: 相关公司
+            concurrency: 并发数（大于1时走异步并发分析，结果顺序与输入一致）
+            triage: 是否先做本地初筛（适合采集批次），仅高信号舆情提交大模型，其余返回本地标签
 
         Returns:
             分析结果列表
         """
+        if triage:
+            return self._triage_and_analyze(news_list, concurrency)
+
+        if concurrency and concurrency > 1:
+            return asyncio.run(self.abatch_analyze_news(news_list, concurrency))
+
         results = []
 
         print(f"开始批量分析 {len(news_list)} 条舆情...")
 
         for i, news in enumerate(news_list):
             print(f"  分析第 {i + 1} 条: {news.get('title', '无标题')[:50]}...")
+            # 批量舆情按严重程度降级为后台优先级，不阻塞页面交互请求
+            with request_priority(priority_for_news(news)):
+                results.append(self.analyze_news(news))
+
+        print("✅ 批量分析完成")
+        return results
 
-            analysis_result = {}
+    def _triage_and_analyze(self, news_list: List[Dict], concurrency: int = None) -> List[Dict]:
+        """本地初筛后仅分析高信号舆情，结果顺序与输入一致"""
+        escalate, local = NewsTriage().split(news_list)
+        print(f"🔎 本地初筛：{len(escalate)}/{len(news_list)} 条提交大模型分析")
+
+        results = [None] * len(news_list)
+        if escalate:
+            analyzed = self.batch_analyze_news([news_list[idx] for idx in escalate], concurrency)
+            for idx, result in zip(escalate, analyzed):
+                results[idx] = result
+        for idx, label in local.items():
+            results[idx] = self._attach_news_meta(label, news_list[idx])
+        return results
 
-            # 根据新闻类型选择分析方式
+    def analyze_news(self, news: Dict) -> Dict:
+        """根据新闻类型选择分析方式，分析单条舆情"""
+        if news.get('related_company'):
+            # 公司风险分析
+            analysis_result = self.analyze_company_risk(
+                company_name=news['related_company'],
+                news_content=news['content'],
+                company_info=news.get('company_info')
+            )
+        elif news.get('related_industry'):
+            # 行业景气度分析
+            analysis_result = self.analyze_industry_sentiment(
+                industry_name=news['related_industry'],
+                news_content=news['content']
+            )
+        else:
+            # 通用分析
+            analysis_result = self._general_analysis(news)
+
+        return self._attach_news_meta(analysis_result, news)
+
+    def batch_analyze_packed(self, news_list: List[Dict], pack_size: int = None) -> List[Dict]:
+        """
+        打包批量分析：同场景的多条舆情合并为一次请求，固定的分析要求只发送一次
+
+        Args:
+            news_list: 舆情新闻列表（字段同batch_analyze_news）
+            pack_size: 每次请求打包的舆情条数，默认读取LLM_PACK_SIZE
+
+        Returns:
+            分析结果列表（顺序与输入一致）；打包成功的结果附带"打包信息"，
+            其中"单条节省输入Token"为相对逐条请求的估算节省量
+        """
+        pack_size = pack_size or LLM_PACK_SIZE
+        results = [None] * len(news_list)
+
+        # 按场景分组，通用舆情无固定分析要求，逐条分析
+        groups = {"company": [], "industry": []}
+        for idx, news in enumerate(news_list):
             if news.get('related_company'):
-                # 公司风险分析
-                analysis_result = self.analyze_company_risk(
-                    company_name=news['related_company'],
-                    news_content=news['content'],
-                    company_info=news.get('company_info')
-                )
+                groups["company"].append(idx)
             elif news.get('related_industry'):
-                # 行业景气度分析
-                analysis_result = self.analyze_industry_sentiment(
-                    industry_name=news['related_industry'],
-                    news_content=news['content']
-                )
+                groups["industry"].append(idx)
             else:
-                # 通用分析
-                analysis_result = self._general_analysis(news)
+                with request_priority(priority_for_news(news)):
+                    results[idx] = self.analyze_news(news)
+
+        print(f"开始打包分析 {len(news_list)} 条舆情（每包 {pack_size} 条）...")
+
+        for scenario, indices in groups.items():
+            for start in range(0, len(indices), pack_size):
+                pack = indices[start:start + pack_size]
+                # 包内任一舆情为高严重程度时整包按高优先级调度
+                priority = min(priority_for_news(news_list[idx]) for idx in pack)
+                with request_priority(priority):
+                    pack_results = self._analyze_pack(scenario, [news_list[idx] for idx in pack])
+                for idx, result in zip(pack, pack_results):
+                    results[idx] = result
+
+        print("✅ 打包分析完成")
+        return results
 
-            # 添加新闻元数据
-            analysis_result["新闻标题"] = news.get('title', '')
-            analysis_result["新闻来源"] = news.get('source', '')
-            analysis_result["发布时间"] = news.get('publish_time', '')
+    def _analyze_pack(self, scenario: str, pack: List[Dict]) -> List[Dict]:
+        """分析一个舆情包：拆分并校验逐条结果，仅对校验失败的条目单独重跑"""
+        if scenario == "company":
+            system_prompt, sections = COMPANY_SYSTEM_PROMPT, COMPANY_SECTIONS
+        else:
+            system_prompt, sections = INDUSTRY_SYSTEM_PROMPT, INDUSTRY_SECTIONS
+
+        prompt = self._build_packed_prompt(scenario, pack)
+        max_tokens = min(LLM_PACK_MAX_TOKENS, self.max_tokens * len(pack))
+        response = self._call_llm(prompt, system_prompt, max_tokens=max_tokens,
+                                  scenario=f"packed_{scenario}")
+        items = self._parse_json_response(response).get("结果")
+        if not isinstance(items, list):
+            items = []
+        items_by_no = {item.get("序号"): item for item in items if isinstance(item, dict)}
+
+        # 估算节省：逐条请求的输入Token之和（含系统提示词） - 打包请求的输入Token，均摊到每条
+        single_tokens = sum(
+            estimate_tokens(system_prompt) + estimate_tokens(self._build_single_prompt(scenario, news))
+            for news in pack
+        )
+        packed_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        saved_per_item = max(0, single_tokens - packed_tokens) // len(pack)
 
-            results.append(analysis_result)
+        results = []
+        retried = 0
+        for no, news in enumerate(pack, start=1):
+            item = items_by_no.get(no)
+            if item is None or not all(isinstance(item.get(sec), dict) for sec in sections):
+                # 该条解析失败：单独重跑
+                retried += 1
+                results.append(self.analyze_news(news))
+                continue
+
+            item.pop("序号", None)
+            if scenario == "company":
+                result = self._decorate_company_result(item, news['related_company'], news['content'],
+                                                       news.get('company_info'))
+                self._store_result("company", news['related_company'], news['content'], result,
+                                   news.get('company_info'))
+            else:
+                result = self._decorate_industry_result(item, news['related_industry'], news['content'])
+                self._store_result("industry", news['related_industry'], news['content'], result)
+            result["打包信息"] = {"打包条数": len(pack), "单条节省输入Token": saved_per_item}
+            results.append(self._attach_news_meta(result, news))
 
-        print("✅ 批量分析完成")
+        print(f"  打包 {len(pack)} 条：单条节省输入Token约 {saved_per_item}，重跑 {retried} 条")
         return results
 
+    def _build_single_prompt(self, scenario: str, news: Dict) -> str:
+        """构造单条分析提示词（用于估算打包节省量）"""
+        if scenario == "company":
+            return self._build_company_prompt(news['related_company'], news['content'],
+                                              news.get('company_info'))
+        return self._build_industry_prompt(news['related_industry'], news['content'])
+
+    def _build_packed_prompt(self, scenario: str, pack: List[Dict]) -> str:
+        """构造打包分析提示词：逐条舆情 + 数组输出要求（分析要求在系统提示词中）"""
+        items_text = ""
+        for no, news in enumerate(pack, start=1):
+            if scenario == "company":
+                items_text += f"""
+## 舆情{no}
+**目标企业：**{news['related_company']}
+**舆情内容：**
+{news['content']}
+**企业基础信息：**
+{self._format_company_info(news.get('company_info'))}
+"""
+            else:
+                items_text += f"""
+## 舆情{no}
+**目标行业：**{news['related_industry']}
+**舆情内容：**
+{news['content']}
+"""
+
+        header = f"请按上述分析要求逐条分析以下{len(pack)}条舆情。"
+        return header + "\n" + items_text + PACKED_OUTPUT_RULES.replace("{count}", str(len(pack)))
+
+    async def abatch_analyze_news(self, news_list: List[Dict], concurrency: int = None) -> List[Dict]:
+        """
+        异步并发批量分析舆情新闻
+
+        Args:
+            news_list: 舆情新闻列表（字段同batch_analyze_news）
+            concurrency: 最大并发请求数，默认读取LLM_BATCH_CONCURRENCY
+
+        Returns:
+            分析结果列表（顺序与输入一致，单条失败不影响其他条目）
+        """
+        concurrency = concurrency or LLM_BATCH_CONCURRENCY
+        semaphore = asyncio.Semaphore(concurrency)
+        client = create_async_openai_client(self.api_key, self.base_url)
+        finished = 0
+
+        print(f"开始并发分析 {len(news_list)} 条舆情（并发数 {concurrency}）...")
+
+        async def run_one(news: Dict) -> Dict:
+            nonlocal finished
+            async with semaphore:
+                try:
+                    # 协程内设置的优先级仅作用于本条舆情
+                    with request_priority(priority_for_news(news)):
+                        result = await self.aanalyze_news(news, client)
+                except Exception as e:
+                    # 单条失败隔离：返回失败标记，不中断整个批次
+                    print(f"⚠️ 分析失败: {news.get('title', '无标题')[:50]} - {e}")
+                    result = self._attach_news_meta(
+                        {"分析类型": "分析失败", "错误信息": str(e), "解析状态": "失败"}, news
+                    )
+            finished += 1
+            print(f"  已完成 {finished}/{len(news_list)}: {news.get('title', '无标题')[:50]}")
+            return result
+
+        try:
+            results = await asyncio.gather(*(run_one(news) for news in news_list))
+        finally:
+            await client.close()
+
+        print("✅ 并发分析完成")
+        return list(results)
+
+    async def aanalyze_news(self, news: Dict, client: AsyncOpenAI) -> Dict:
+        """异步分析单条舆情（分析方式同analyze_news）"""
+        if news.get('related_company'):
+            reused = self._reuse_similar("company", news['related_company'], news['content'])
+            if reused is not None:
+                analysis_result = self._decorate_company_result(reused, news['related_company'],
+                                                                news['content'], news.get('company_info'))
+            else:
+                prompt = self._build_company_prompt(news['related_company'], news['content'],
+                                                    news.get('company_info'))
+                response = await self._acall_llm(client, prompt, COMPANY_SYSTEM_PROMPT,
+                                                 scenario="company")
+                analysis_result = self._build_company_result(response, news['related_company'],
+                                                             news['content'], news.get('company_info'))
+                analysis_result = await self._acomplete_sections(client, analysis_result, "company",
+                                                                 prompt, COMPANY_SYSTEM_PROMPT)
+                self._remember_similar("company", news['related_company'], news['content'], analysis_result)
+            self._store_result("company", news['related_company'], news['content'], analysis_result,
+                               news.get('company_info'))
+        elif news.get('related_industry'):
+            reused = self._reuse_similar("industry", news['related_industry'], news['content'])
+            if reused is not None:
+                analysis_result = self._decorate_industry_result(reused, news['related_industry'],
+                                                                 news['content'])
+            else:
+                prompt = self._build_industry_prompt(news['related_industry'], news['content'])
+                response = await self._acall_llm(client, prompt, INDUSTRY_SYSTEM_PROMPT,
+                                                 scenario="industry")
+                analysis_result = self._build_industry_result(response, news['related_industry'],
+                                                              news['content'])
+                analysis_result = await self._acomplete_sections(client, analysis_result, "industry",
+                                                                 prompt, INDUSTRY_SYSTEM_PROMPT)
+                self._remember_similar("industry", news['related_industry'], news['content'],
+                                       analysis_result)
+            self._store_result("industry", news['related_industry'], news['content'], analysis_result)
+        else:
+            response = await self._acall_llm(client, self._build_general_prompt(news),
+                                             GENERAL_SYSTEM_PROMPT)
+            analysis_result = self._parse_json_response(response)
+
+        return self._attach_news_meta(analysis_result, news)
+
+    def _reuse_similar(self, scenario: str, entity: str, news_content: str):
+        """查找相似舆情的已有分析结果，命中时附带"相似复用"匹配信息；未命中返回None"""
+        if not self.near_dup:
+            return None
+        matched = self.near_dup.lookup(scenario, entity, news_content)
+        if matched is None:
+            return None
+
+        result, match_info = matched
+        result["相似复用"] = match_info
+        print(f"♻️ 复用相似舆情分析结果（相似度 {match_info['相似度']:.2%}）：{entity}")
+        return result
+
+    def _remember_similar(self, scenario: str, entity: str, news_content: str, result: Dict):
+        """保存完整的分析结果，供后续相似舆情复用（不完整或复用所得的结果不保存）"""
+        if not self.near_dup or "相似复用" in result:
+            return
+        if missing_fields(result, SCENARIO_SCHEMAS[scenario]):
+            return
+        self.near_dup.add(scenario, entity, news_content, result)
+
+    def _store_result(self, scenario: str, entity: str, news_content: str, result: Dict,
+                      company_info: Dict = None):
+        """分析结果写入结果库并计入组合信号（解析失败或服务降级的结果不写入）"""
+        if result.get("解析状态") == "失败" or "服务降级" in result:
+            return
+        industry = company_info.get("所属行业") if company_info else None
+        if self.result_store:
+            self.result_store.save(scenario, entity, news_content, result, industry=industry)
+        if self.portfolio:
+            self.portfolio.add(result, news_id=content_id(news_content), industry=industry)
+
+    def _attach_news_meta(self, analysis_result: Dict, news: Dict) -> Dict:
+        """添加新闻元数据"""
+        analysis_result["新闻标题"] = news.get('title', '')
+        analysis_result["新闻来源"] = news.get('source', '')
+        analysis_result["发布时间"] = news.get('publish_time', '')
+        return analysis_result
+
     def _general_analysis(self, news: Dict) -> Dict:
         """通用舆情分析"""
+        response = self._call_llm(self._build_general_prompt(news), GENERAL_SYSTEM_PROMPT)
+        return self._parse_json_response(response)
+
+    def _build_general_prompt(self, news: Dict) -> str:
+        """构造通用舆情分析提示词"""
         prompt = f"""
 请分析以下金融舆情：
 
@@ -350,105 +738,311 @@ class FinancialSentimentAnalyzer:
 
 以JSON格式返回。请用中文生成。
 """
+        return prompt
 
-        response = self._call_llm(prompt, "你是金融舆情分析师")
-        return self._parse_json_response(response)
-
-    def generate_investment_suggestions(self, analysis_results: List[Dict],
-                                        portfolio_info: Dict = None) -> Dict:
+    def generate_investment_suggestions(self, analysis_results: List[Dict] = None,
+                                        portfolio_info: Dict = None, force: bool = False) -> Dict:
         """
-        生成投资建议（基于多个分析结果）
+        生成投资建议（基于组合舆情信号）
 
         Args:
-            analysis_results: 多个分析结果
+            analysis_results: 多个分析结果；为None时使用随分析结果增量更新的进程级组合信号
             portfolio_info: 投资组合信息（可选）
+            force: 组合信号无实质变化时也重新生成
 
         Returns:
-            综合投资建议
+            综合投资建议，附带"生成信息"（组合信号无实质变化时复用上次建议，不调用大模型）
         """
-        # 准备分析摘要
-        analysis_summary = ""
-        for i, result in enumerate(analysis_results[:5]):  # 最多取5条
-            analysis_summary += f"{i + 1}. {result.get('分析类型', '未知')} - "
-            if '行业名称' in result:
-                analysis_summary += f"行业：{result['行业名称']} - "
-            if '公司名称' in result:
-                analysis_summary += f"公司：{result['公司名称']} - "
-            if '景气度评级' in result:
-                analysis_summary += f"景气度：{result['景气度评级']}\n"
-            elif '严重程度' in result:
-                analysis_summary += f"风险：{result['严重程度']}\n"
-            else:
-                analysis_summary += "\n"
+        if analysis_results is None and self.portfolio is not None:
+            aggregator = self.portfolio
+        else:
+            aggregator = PortfolioAggregator()
+            aggregator.add_many(analysis_results or [])
+
+        def generate(signals: Dict) -> Dict:
+            prompt = self._build_suggestions_prompt(signals, portfolio_info)
+            response = self._call_llm(prompt, SUGGESTIONS_SYSTEM_PROMPT, scenario="suggestions")
+            return self._parse_json_response(response)
+
+        return aggregator.suggest(generate, portfolio_info, force=force)
+
+    def _build_suggestions_prompt(self, signals: Dict, portfolio_info: Dict = None) -> str:
+        """构造投资建议提示词（仅包含组合信号与组合信息，生成要求在系统提示词中）"""
+        industry_lines = "\n".join(
+            f"- {row['行业']}：舆情{row['舆情数']}条，景气度得分{row['景气度得分']}，"
+            f"利好占比{row['利好占比']:.0%}，利空占比{row['利空占比']:.0%}，热度{row['热度']}"
+            for row in signals["行业"]
+        ) or "暂无"
+        company_lines = "\n".join(
+            f"- {row['公司']}（{row['所属行业'] or '行业未知'}）：舆情{row['舆情数']}条，"
+            f"高/中/低 {row['高']}/{row['中']}/{row['低']}，风险指数{row['风险指数']}"
+            for row in signals["公司"]
+        ) or "暂无"
 
         prompt = f"""
-基于以下舆情分析结果，生成综合投资建议：
+基于以下组合舆情信号，生成综合投资建议：
 
-**分析结果摘要：**
-{analysis_summary}
+**行业景气度信号：**
+{industry_lines}
+
+**公司风险信号：**
+{company_lines}
 
 **当前投资组合：**
 {json.dumps(portfolio_info, ensure_ascii=False, indent=2) if portfolio_info else "未提供组合信息"}
+"""
+        return prompt
+
+    def _call_llm(self, prompt: str, system_prompt: str = None, use_cache: bool = True,
+                  max_tokens: int = None, scenario: str = "general") -> str:
+        """调用大模型（优先读取响应缓存），scenario用于模型路由与调用遥测分组"""
+        messages = self._build_messages(prompt, system_prompt)
+        route = self._route(scenario)
+        max_tokens = max_tokens or route["max_tokens"]
+        start = time.monotonic()
+
+        cache_key, cached = self._lookup_cache(prompt, system_prompt, use_cache, max_tokens, route)
+        if cached is not None:
+            self._record_call(scenario, start, cache_hit=True, route=route)
+            return cached
+
+        stats = {}
+        try:
+            # 经进程级共享限流器发送请求，429/5xx自动退避重试
+            response = call_with_rate_limit(
+                lambda: self.client.chat.completions.create(
+                    model=route["model"],
+                    messages=messages,
+                    temperature=route["temperature"],
+                    max_tokens=max_tokens
+                ),
+                estimated_tokens=self._estimate_request_tokens(prompt, system_prompt, max_tokens),
+                stats=stats
+            )
+            content = response.choices[0].message.content
+            self._record_call(scenario, start, stats, usage=response.usage, route=route, completion=content)
 
-请提供以下建议，以JSON格式返回：
-
-1. **整体策略**
-   - 市场观点：乐观/谨慎/中性
-   - 风险偏好：建议的风险承受水平
-   - 仓位建议：建议整体仓位（%）
-
-2. **行业配置建议**
-   - 推荐增持的行业及理由
-   - 建议减持的行业及理由
-   - 建议关注的行业
-
-3. **个股操作建议**
-   - 推荐关注的个股（如有）
-   - 建议回避的个股（如有）
-   - 仓位调整建议
+            # 仅缓存可解析的真实响应，备选数据不入缓存
+            self._cache_response(cache_key, content, route)
 
-4. **风险控制**
-   - 主要风险点
-   - 止损建议
-   - 对冲策略
+            return content
+        except Exception as e:
+            print(f"⚠️ API调用失败: {e}")
+            self._record_call(scenario, start, stats, status=self._error_status(e), route=route)
+            # 返回模拟数据避免中断（结果标记为服务降级）
+            return self._get_fallback_response(scenario, e)
+
+    async def _acall_llm(self, client: AsyncOpenAI, prompt: str, system_prompt: str = None,
+                         use_cache: bool = True, scenario: str = "general") -> str:
+        """异步调用大模型（缓存、失败兜底与遥测逻辑同_call_llm）"""
+        messages = self._build_messages(prompt, system_prompt)
+        route = self._route(scenario)
+        start = time.monotonic()
+
+        cache_key, cached = self._lookup_cache(prompt, system_prompt, use_cache, route["max_tokens"], route)
+        if cached is not None:
+            self._record_call(scenario, start, cache_hit=True, route=route)
+            return cached
+
+        stats = {}
+        try:
+            response = await acall_with_rate_limit(
+                lambda: client.chat.completions.create(
+                    model=route["model"],
+                    messages=messages,
+                    temperature=route["temperature"],
+                    max_tokens=route["max_tokens"]
+                ),
+                estimated_tokens=self._estimate_request_tokens(prompt, system_prompt, route["max_tokens"]),
+                stats=stats
+            )
+            content = response.choices[0].message.content
+            self._record_call(scenario, start, stats, usage=response.usage, route=route, completion=content)
 
-5. **监控重点**
-   - 需要重点监控的指标
-   - 关键时间节点
-   - 预警信号
+            self._cache_response(cache_key, content, route)
 
-请确保建议具体、可操作。请用中文生成。
-"""
+            return content
+        except Exception as e:
+            print(f"⚠️ API调用失败: {e}")
+            self._record_call(scenario, start, stats, status=self._error_status(e), route=route)
+            return self._get_fallback_response(scenario, e)
+
+    def _stream_llm(self, prompt: str, system_prompt: str = None, use_cache: bool = True,
+                    scenario: str = "general"):
+        """流式调用大模型，逐段返回文本增量（缓存命中时一次性返回）"""
+        messages = self._build_messages(prompt, system_prompt)
+        route = self._route(scenario)
+        start = time.monotonic()
+
+        cache_key, cached = self._lookup_cache(prompt, system_prompt, use_cache, route["max_tokens"], route)
+        if cached is not None:
+            self._record_call(scenario, start, cache_hit=True, route=route, stream=True)
+            yield cached
+            return
+
+        limiter = get_rate_limiter()
+        breaker = get_circuit_breaker()
+        estimated_tokens = self._estimate_request_tokens(prompt, system_prompt, route["max_tokens"])
+        try:
+            # 熔断期间不排队，直接返回降级结果
+            breaker.check()
+            try:
+                stats = {"queue_wait": get_request_scheduler().acquire(limiter, estimated_tokens), "retries": 0}
+            except Exception:
+                breaker.release_probe()
+                raise
+        except Exception as e:
+            print(f"⚠️ API流式调用失败: {e}")
+            self._record_call(scenario, start, status=self._error_status(e), route=route, stream=True)
+            yield self._get_fallback_response(scenario, e)
+            return
+        started = time.monotonic()
+        released = False
+        chunks = []
+        usage = None
+        ttft = None
 
-        response = self._call_llm(prompt, "你是资深投资顾问")
-        return self._parse_json_response(response)
+        try:
+            stream = self.client.chat.completions.create(
+                model=route["model"],
+                messages=messages,
+                temperature=route["temperature"],
+                max_tokens=route["max_tokens"],
+                stream=True,
+                # 请求在最后一个分片中返回Token用量
+                extra_body={"stream_options": {"include_usage": True}}
+            )
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - start
+                    chunks.append(delta)
+                    yield delta
+            released = True
+            limiter.release(estimated_tokens, getattr(usage, "total_tokens", None))
+        except Exception as e:
+            released = True
+            record_breaker_error(breaker, e)
+            limiter.release_failure(e)
+            print(f"⚠️ API流式调用失败: {e}")
+            self._record_call(scenario, start, stats, ttft=ttft, status="error", route=route, stream=True)
+            # 尚未收到任何内容时返回模拟数据避免中断
+            if not chunks:
+                yield self._get_fallback_response(scenario, e)
+            return
+        finally:
+            # 调用方提前停止迭代时只归还名额，不作为成功反馈给并发窗口
+            if not released:
+                limiter.release_slot()
+                breaker.release_probe()
+
+        breaker.record_success(time.monotonic() - started)
+
+        self._record_call(scenario, start, stats, usage=usage, ttft=ttft, route=route, stream=True,
+                          prompt=prompt, system_prompt=system_prompt, completion="".join(chunks))
+        self._cache_response(cache_key, "".join(chunks), route)
+
+    def _cache_response(self, cache_key: str, content: str, route: Dict):
+        """写入响应缓存：只缓存能解析为JSON对象的响应，截断/格式错误的输出下次重新请求"""
+        if not (cache_key and content):
+            return
+        data, _ = extract_json(content)
+        if isinstance(data, dict):
+            self.cache.set(cache_key, content, model=route["model"])
+
+    def _record_call(self, scenario: str, start: float, stats: Dict = None, usage=None,
+                     ttft: float = None, cache_hit: bool = False, status: str = "ok",
+                     prompt: str = None, system_prompt: str = None, completion: str = None,
+                     route: Dict = None, **extra):
+        """写入调用遥测并反馈给模型路由；接口未返回用量时按文本估算Token数（无法得知前缀缓存命中）"""
+        stats = stats or {}
+        latency = time.monotonic() - start
+        if route and self.router and not cache_hit and status != "circuit_open":
+            # 路由按不含排队的耗时与JSON完整性评估配置
+            data, repaired = extract_json(completion) if status == "ok" else (None, False)
+            self.router.observe(route, latency - stats.get("queue_wait", 0.0),
+                                ok=data is not None and not repaired)
+            extra["route_tier"] = route["tier"]
+        cached_tokens = cached_prompt_tokens(usage)
+        if usage is not None:
+            # 旧版SDK中流式分片的usage为未解析的字典
+            if isinstance(usage, dict):
+                usage = SimpleNamespace(**usage)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        else:
+            prompt_tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt)
+            completion_tokens = estimate_tokens(completion)
+        self.telemetry.record(
+            scenario=scenario,
+            model=route["model"] if route else self.model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            queue_wait=stats.get("queue_wait", 0.0),
+            ttft=ttft,
+            latency=latency,
+            retries=stats.get("retries", 0),
+            cache_hit=cache_hit,
+            status=status,
+            cached_tokens=cached_tokens,
+            priority=current_priority_name(),
+            **extra
+        )
 
-    def _call_llm(self, prompt: str, system_prompt: str = None) -> str:
-        """调用大模型"""
+    def _build_messages(self, prompt: str, system_prompt: str = None) -> List[Dict]:
+        """组装对话消息"""
         messages = []
 
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
 
         messages.append({"role": "user", "content": prompt})
-
-        try:
-            response = self.client.chat.completions.create(
-                # model="deepseek-chat",
-                model=self.model,
-                messages=messages,
-                temperature=0.3,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"⚠️ API调用失败: {e}")
-            # 返回模拟数据避免中断
-            return self._get_fallback_response(prompt)
-
-    def _get_fallback_response(self, prompt: str) -> str:
-        """API失败时的备选响应"""
-        if "行业" in prompt:
+        return messages
+
+    def _estimate_request_tokens(self, prompt: str, system_prompt: str = None,
+                                 max_tokens: int = None) -> int:
+        """预估单次请求Token数（输入估算+最大输出），用于限流"""
+        return estimate_tokens(prompt) + estimate_tokens(system_prompt) + (max_tokens or self.max_tokens)
+
+    def _route(self, scenario: str) -> Dict:
+        """选择本次调用的模型/最大输出/温度；未启用路由时使用实例配置"""
+        if self.router is None:
+            return {"model": self.model, "max_tokens": self.max_tokens,
+                    "temperature": self.temperature, "scenario": scenario, "tier": 0}
+        return self.router.route(scenario)
+
+    def _lookup_cache(self, prompt: str, system_prompt: str = None, use_cache: bool = True,
+                      max_tokens: int = None, route: Dict = None):
+        """查询响应缓存，返回(缓存键, 缓存内容)；未启用缓存时缓存键为None"""
+        if not (self.cache and use_cache):
+            return None, None
+
+        model = route["model"] if route else self.model
+        temperature = route["temperature"] if route else self.temperature
+        cache_key = self.cache.make_key(model, system_prompt, prompt,
+                                        temperature, max_tokens or self.max_tokens)
+        return cache_key, self.cache.get(cache_key)
+
+    @staticmethod
+    def _error_status(error: Exception) -> str:
+        """调用遥测状态：熔断快速失败单独标记"""
+        return "circuit_open" if isinstance(error, CircuitOpenError) else "error"
+
+    def _get_fallback_response(self, scenario: str, error: Exception = None) -> str:
+        """API失败时的备选响应（按调用场景选择行业/公司模板，附带"服务降级"标记，结果不写入结果库与检查点）"""
+        degraded = {
+            "服务降级": {
+                "降级原因": "熔断快速失败" if isinstance(error, CircuitOpenError) else "大模型调用失败",
+                "错误信息": str(error) if error else "",
+                "说明": "大模型服务不可用，以下为备选数据，非实际分析结果"
+            }
+        }
+        # 公司提示词中也含"所属行业"，不能按提示词内容判断场景
+        if not scenario.endswith("company"):
             return json.dumps({
                 "政策影响分析": {
                     "政策性质": "利好",
@@ -464,7 +1058,8 @@ class FinancialSentimentAnalyzer:
                     "行业配置": "建议增加",
                     "配置比例": "15%",
                     "关注板块": ["新能源汽车", "光伏"]
-                }
+                },
+                **degraded
             }, ensure_ascii=False)
         else:
             return json.dumps({
@@ -477,20 +1072,75 @@ class FinancialSentimentAnalyzer:
                     "紧急程度": "近期关注",
                     "具体措施": "加强监控，关注偿债能力变化",
                     "减仓建议": "如有持仓，建议减持5-10%"
-                }
+                },
+                **degraded
             }, ensure_ascii=False)
 
     def _parse_json_response(self, response: str) -> Dict:
-        """解析JSON响应"""
-        try:
-            import re
-            # 提取JSON部分
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                # 尝试直接解析
-                return json.loads(response)
-        except:
+        """解析JSON响应（容忍代码块标记、多余逗号与截断输出）"""
+        result, repaired = extract_json(response)
+        if not isinstance(result, dict):
             # 如果解析失败，返回原始文本
-            return {"原始响应": response, "解析状态": "失败"}
\ No newline at end of file
+            return {"原始响应": response, "解析状态": "失败"}
+        if repaired:
+            result["解析状态"] = "已修复"
+        return result
+
+    def _pending_reask(self, result: Dict, scenario: str):
+        """
+        校验结果是否符合场景JSON框架
+
+        Returns:
+            (缺失字段路径列表, 需要补问的顶层板块列表)；没有任何可用板块（解析失败/备选响应）时不补问
+        """
+        schema = SCENARIO_SCHEMAS[scenario]
+        if not any(isinstance(result.get(section), dict) for section in schema):
+            return [], []
+        missing = missing_fields(result, schema)
+        sections = list(dict.fromkeys(path.split(".")[0] for path in missing))
+        return missing, sections
+
+    def _build_reask_prompt(self, prompt: str, scenario: str, missing: List[str],
+                            sections: List[str]) -> str:
+        """构造缺失板块补问提示词：原始输入 + 仅包含缺失板块的输出框架"""
+        schema = {section: SCENARIO_SCHEMAS[scenario][section] for section in sections}
+        return prompt + REASK_RULES.replace("{missing}", "、".join(missing)).replace(
+            "{schema}", json.dumps(schema, ensure_ascii=False, indent=2))
+
+    def _merge_reask(self, result: Dict, response: str, scenario: str, sections: List[str]) -> Dict:
+        """合并补问结果，仍有缺失时记录缺失字段"""
+        patch, _ = extract_json(response)
+        if isinstance(patch, dict):
+            for section in sections:
+                if isinstance(patch.get(section), dict):
+                    result[section] = patch[section]
+
+        still_missing = missing_fields(result, SCENARIO_SCHEMAS[scenario])
+        if still_missing:
+            result["缺失字段"] = still_missing
+        else:
+            result.pop("缺失字段", None)
+            result["解析状态"] = "已补全"
+        print(f"  补问缺失板块 {sections}：{'仍缺失 ' + str(still_missing) if still_missing else '已补全'}")
+        return result
+
+    def _complete_sections(self, result: Dict, scenario: str, prompt: str,
+                           system_prompt: str = None) -> Dict:
+        """结果缺少板块/字段时，仅针对缺失板块补问一次并合并（不重跑完整分析）"""
+        missing, sections = self._pending_reask(result, scenario)
+        if not sections:
+            return result
+        reask_prompt = self._build_reask_prompt(prompt, scenario, missing, sections)
+        response = self._call_llm(reask_prompt, system_prompt, scenario=f"reask_{scenario}")
+        return self._merge_reask(result, response, scenario, sections)
+
+    async def _acomplete_sections(self, client: AsyncOpenAI, result: Dict, scenario: str,
+                                  prompt: str, system_prompt: str = None) -> Dict:
+        """异步版本的_complete_sections"""
+        missing, sections = self._pending_reask(result, scenario)
+        if not sections:
+            return result
+        reask_prompt = self._build_reask_prompt(prompt, scenario, missing, sections)
+        response = await self._acall_llm(client, reask_prompt, system_prompt,
+                                         scenario=f"reask_{scenario}")
+        return self._merge_reask(result, response, scenario, sections)
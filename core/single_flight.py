@@ -0,0 +1,112 @@
+# single_flight.py
+import copy
+import hashlib
+import threading
+from typing import Any, Callable, Tuple
+
+
+class _Call:
+    """一次进行中的调用：后到的相同请求等待其结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    请求合并（single-flight）
+
+    相同键的并发请求只有第一个（leader）真正执行，其余请求等待并共享同一结果；
+    每个等待方拿到结果的深拷贝，避免后续补充元数据时互相影响。
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        # 统计
+        self.executed_count = 0
+        self.coalesced_count = 0
+
+    def join(self, key: str) -> Tuple[_Call, bool]:
+        """
+        加入对key的调用
+
+        Returns:
+            (调用对象, 是否为leader)；leader执行完毕后必须调用finish
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced_count += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.executed_count += 1
+            return call, True
+
+    def finish(self, key: str, call: _Call, result: Any = None, error: Exception = None):
+        """leader发布结果（或异常）并唤醒所有等待方"""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result = result
+        call.error = error
+        call.done.set()
+
+    @staticmethod
+    def wait(call: _Call) -> Any:
+        """等待leader的结果，leader失败时抛出同一异常"""
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """执行fn，相同key的并发调用共享同一次执行结果"""
+        call, leader = self.join(key)
+        if not leader:
+            return self.wait(call)
+
+        try:
+            result = fn()
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=copy.deepcopy(result))
+        return result
+
+    def stats(self) -> dict:
+        """请求合并统计"""
+        with self._lock:
+            total = self.executed_count + self.coalesced_count
+            return {
+                "实际调用": self.executed_count,
+                "合并请求": self.coalesced_count,
+                "进行中": len(self._calls),
+                "合并率": self.coalesced_count / total if total else 0.0
+            }
+
+
+def make_flight_key(scenario: str, entity: str, content: str, extra: Any = None) -> str:
+    """请求合并键：场景 + 主体 + 内容哈希（extra如企业基础信息一并参与哈希）"""
+    digest = hashlib.sha256(f"{content}\x00{extra!r}".encode("utf-8")).hexdigest()
+    return f"{scenario}:{entity}:{digest}"
+
+
+# ===================== 进程级共享实例 =====================
+_shared_flight = None
+_shared_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """获取进程级共享的请求合并器（多个Streamlit会话共用）"""
+    global _shared_flight
+    with _shared_flight_lock:
+        if _shared_flight is None:
+            _shared_flight = SingleFlight()
+        return _shared_flight
@@ -0,0 +1,145 @@
+# triage.py
+"""
+舆情本地初筛
+纯CPU的关键词词典打分，仅将高信号舆情提交大模型分析，其余舆情给出轻量本地标签
+"""
+import os
+import re
+import sys
+from typing import Dict, List, Tuple
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.llm_config import LLM_TRIAGE_THRESHOLD
+from core.prompt_templates import RISK_TYPES
+
+# 风险类型枚举（提示词中的强制枚举值）拆分后的基础权重
+RISK_TYPE_WEIGHT = 3.0
+
+# 补充风险关键词权重（强信号3分及以上，单独出现不足以触发分析的弱信号1-2分）
+RISK_KEYWORD_WEIGHTS = {
+    "违约": 3.0, "逾期": 3.0, "展期": 3.0, "暴雷": 3.0, "失联": 3.0, "立案调查": 3.0,
+    "破产": 3.0, "重整": 2.5, "被执行": 2.5, "冻结": 2.5, "查封": 2.5, "评级下调": 3.0,
+    "下调评级": 3.0, "负面观察": 2.5, "资金链": 2.5, "流动性": 2.0, "兑付": 2.0,
+    "商票": 2.0, "退市": 2.5, "处罚": 2.0, "诉讼": 2.0, "仲裁": 2.0, "减值": 1.5,
+    "亏损": 1.5, "下滑": 1.0, "监管": 1.0, "问询": 1.0, "停产": 2.0, "裁员": 1.5
+}
+
+# 行业景气度信号关键词权重
+INDUSTRY_KEYWORD_WEIGHTS = {
+    "政策": 1.5, "补贴": 2.0, "规划": 1.5, "实施方案": 2.0, "集采": 2.0, "审批": 1.5,
+    "技术突破": 2.5, "量产": 2.0, "订单": 1.5, "装机": 1.5, "出口": 1.0, "涨价": 1.5,
+    "降价": 1.5, "价格战": 2.0, "产能过剩": 2.0, "需求": 1.0, "销量": 1.0, "渗透率": 1.5,
+    "反倾销": 2.5, "关税": 2.0
+}
+
+# 标题命中的加权系数（标题信息密度更高）
+TITLE_WEIGHT = 1.5
+
+
+def _build_lexicon(*weight_maps: Dict[str, float]) -> Dict[str, float]:
+    """合并词典，同一词取最大权重"""
+    lexicon = {}
+    for weights in weight_maps:
+        for term, weight in weights.items():
+            lexicon[term] = max(weight, lexicon.get(term, 0.0))
+    return lexicon
+
+
+def _compile(lexicon: Dict[str, float]):
+    """编译为单个正则（长词优先，保证"评级下调"先于"下调"匹配）"""
+    terms = sorted(lexicon, key=len, reverse=True)
+    return re.compile("|".join(re.escape(term) for term in terms))
+
+
+# 风险词典：风险类型枚举（"高管失联/被查"拆为两个词）+ 补充关键词
+RISK_LEXICON = _build_lexicon(
+    {term: RISK_TYPE_WEIGHT for risk_type in RISK_TYPES for term in risk_type.split("/")},
+    RISK_KEYWORD_WEIGHTS
+)
+# 行业词典：景气度信号 + 风险词（风险事件同样影响行业景气度）
+INDUSTRY_LEXICON = _build_lexicon(INDUSTRY_KEYWORD_WEIGHTS, RISK_LEXICON)
+
+
+class NewsTriage:
+    """舆情初筛器：词典打分 + 阈值分流"""
+
+    def __init__(self, threshold: float = None):
+        """
+        Args:
+            threshold: 提交大模型的最低得分，默认读取LLM_TRIAGE_THRESHOLD
+        """
+        self.threshold = LLM_TRIAGE_THRESHOLD if threshold is None else threshold
+        self._matchers = {
+            "company": (_compile(RISK_LEXICON), RISK_LEXICON),
+            "industry": (_compile(INDUSTRY_LEXICON), INDUSTRY_LEXICON)
+        }
+
+    @staticmethod
+    def _scenario(news: Dict) -> str:
+        # 与analyze_news的分流规则一致：有公司按公司风险，其次按行业，通用舆情按风险词典
+        if news.get('related_company'):
+            return "company"
+        if news.get('related_industry'):
+            return "industry"
+        return "company"
+
+    def score(self, news: Dict) -> Dict:
+        """
+        单条舆情打分
+
+        Returns:
+            {"初筛得分": 得分, "命中关键词": {关键词: 次数}}
+        """
+        pattern, lexicon = self._matchers[self._scenario(news)]
+        hits = {}
+        score = 0.0
+        for text, factor in ((news.get('title', ''), TITLE_WEIGHT), (news.get('content', ''), 1.0)):
+            for term in pattern.findall(text or ""):
+                # 同一词重复出现边际递减
+                count = hits.get(term, 0)
+                score += lexicon[term] * factor / (1 + count)
+                hits[term] = count + 1
+        return {"初筛得分": round(score, 2), "命中关键词": hits}
+
+    def split(self, news_list: List[Dict]) -> Tuple[List[int], Dict[int, Dict]]:
+        """
+        批量初筛
+
+        Returns:
+            (需提交大模型的下标列表, {未提交的下标: 本地标签结果})
+        """
+        escalate = []
+        local = {}
+        for idx, news in enumerate(news_list):
+            scored = self.score(news)
+            if scored["初筛得分"] >= self.threshold:
+                escalate.append(idx)
+            else:
+                local[idx] = self.local_label(news, scored)
+        return escalate, local
+
+    def local_label(self, news: Dict, scored: Dict = None) -> Dict:
+        """低信号舆情的轻量本地标签"""
+        scored = scored or self.score(news)
+        hits = scored["命中关键词"]
+        risk_types = [risk_type for risk_type in RISK_TYPES
+                      if any(term in hits for term in risk_type.split("/"))]
+        content = news.get('content', '')
+
+        label = {
+            "分析类型": "本地初筛",
+            "初筛得分": scored["初筛得分"],
+            "初筛阈值": self.threshold,
+            "命中关键词": list(hits),
+            "风险类型": risk_types,
+            "初筛结论": "低信号舆情，未提交大模型分析" if hits else "未命中风险/景气度关键词，未提交大模型分析",
+            "舆情摘要": content[:200] + "..." if len(content) > 200 else content
+        }
+        if news.get('related_company'):
+            label["公司名称"] = news['related_company']
+        if news.get('related_industry'):
+            label["行业名称"] = news['related_industry']
+        return label
@@ -0,0 +1,206 @@
+# core/url_store.py
+"""
+采集URL库（SQLite持久化）
+记录已发现的文章链接及其抓取状态（已发现/待抓取/已抓取/失败），替代整体加载、整体重写的pickle集合：
+按URL哈希主键判断是否已发现（单次索引查找，无需载入全部URL），新链接批量追加写入。
+只采集列表页的核心采集函数用observe登记（已发现，不代表详情已抓取）；
+抓取详情页的爬虫用enqueue登记待抓取，并从pending取待抓取与失败重试的链接：
+失败的链接按指数退避重试、达到最多尝试次数后不再返回，且排在待抓取链接之后（旧的失败链接不会挤占新链接）
+"""
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, List
+from urllib.parse import urldefrag
+
+# 配置项目路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config.crawl_config import CRAWL_URL_STORE_DB_PATH, CRAWL_URL_MAX_ATTEMPTS, CRAWL_URL_RETRY_BACKOFF
+
+STATUS_SEEN = "seen"
+STATUS_QUEUED = "queued"
+STATUS_VISITED = "visited"
+STATUS_FAILED = "failed"
+
+
+def normalize_url(url: str) -> str:
+    """去除首尾空白与#锚点（同一文章的不同锚点视为同一链接）"""
+    return urldefrag((url or "").strip())[0]
+
+
+def url_key(url: str) -> bytes:
+    """URL主键：规范化URL的16字节哈希（定长主键，索引紧凑）"""
+    return hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=16).digest()
+
+
+class UrlStore:
+    """已发现链接集合 + 待抓取队列"""
+
+    def __init__(self, db_path: str, max_attempts: int = CRAWL_URL_MAX_ATTEMPTS,
+                 retry_backoff: float = CRAWL_URL_RETRY_BACKOFF):
+        """
+        Args:
+            db_path: SQLite文件路径（":memory:"为内存库）
+            max_attempts: 失败链接最多尝试次数
+            retry_backoff: 失败重试的基础退避时间（秒）
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_urls (
+                url_key BLOB PRIMARY KEY,
+                url TEXT NOT NULL,
+                source TEXT,
+                status TEXT NOT NULL,
+                discovered_at REAL NOT NULL,
+                visited_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_retry_at REAL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_crawl_urls_queue ON crawl_urls(status, discovered_at)"
+        )
+        self._conn.commit()
+
+    def __contains__(self, url: str) -> bool:
+        return self.seen(url)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM crawl_urls").fetchone()[0]
+
+    def seen(self, url: str) -> bool:
+        """链接是否已登记（含已发现、待抓取、已抓取与失败）"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM crawl_urls WHERE url_key = ?", (url_key(url),)
+            ).fetchone() is not None
+
+    def observe(self, urls: Iterable[str], source: str = None) -> List[str]:
+        """
+        登记列表页上看到的链接（不抓取详情；已登记的链接状态不变）
+
+        Args:
+            urls: 链接列表
+            source: 来源标识
+
+        Returns:
+            此前未被任何采集方登记过的链接（按输入顺序，已去重）
+        """
+        return self._insert(urls, source, STATUS_SEEN, upgrade=False)
+
+    def enqueue(self, urls: Iterable[str], source: str = None) -> List[str]:
+        """
+        登记需要抓取详情的链接（仅被列表页登记过的链接转为待抓取；已抓取/失败的链接不变）
+
+        Args:
+            urls: 链接列表
+            source: 来源标识
+
+        Returns:
+            本次新转为待抓取的链接（按输入顺序，已去重）
+        """
+        return self._insert(urls, source, STATUS_QUEUED, upgrade=True)
+
+    def _insert(self, urls: Iterable[str], source: str, status: str, upgrade: bool) -> List[str]:
+        """批量登记链接；upgrade为True时把"已发现"的链接更新为指定状态，返回新登记/更新的链接"""
+        sql = ("INSERT INTO crawl_urls (url_key, url, source, status, discovered_at) VALUES (?, ?, ?, ?, ?) "
+               "ON CONFLICT(url_key) DO ")
+        if upgrade:
+            sql += f"UPDATE SET status = excluded.status WHERE status = '{STATUS_SEEN}'"
+        else:
+            sql += "NOTHING"
+        now = time.time()
+        added = []
+        with self._lock:
+            with self._conn:
+                for url in dict.fromkeys(normalize_url(url) for url in urls if url):
+                    cursor = self._conn.execute(sql, (url_key(url), url, source, status, now))
+                    if cursor.rowcount:
+                        added.append(url)
+        return added
+
+    def mark(self, url: str, status: str = STATUS_VISITED):
+        """
+        更新链接抓取状态（visited/failed）；未登记的链接同时登记
+
+        标记失败时累加尝试次数，并按指数退避设置下次重试时间
+        """
+        url = normalize_url(url)
+        now = time.time()
+        failed = status == STATUS_FAILED
+        with self._lock:
+            with self._conn:
+                # 冲突更新时attempts为更新前的尝试次数：第n次失败退避 基础退避×2^(n-1)
+                self._conn.execute(
+                    "INSERT INTO crawl_urls (url_key, url, status, discovered_at, visited_at, attempts, next_retry_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url_key) DO UPDATE SET status = excluded.status, visited_at = excluded.visited_at, "
+                    "attempts = attempts + excluded.attempts, "
+                    "next_retry_at = CASE WHEN excluded.attempts THEN ? * (1 << attempts) + ? END",
+                    (url_key(url), url, status, now, now, int(failed), now + self.retry_backoff if failed else None,
+                     self.retry_backoff, now)
+                )
+
+    def pending(self, limit: int = 100, source: str = None, include_failed: bool = False) -> List[str]:
+        """
+        按发现顺序返回待抓取的链接（中断后可继续抓取）
+
+        include_failed为True时在待抓取链接之后补充已到重试时间、未达最多尝试次数的失败链接
+        """
+        sql = "SELECT url FROM crawl_urls WHERE (status = ?"
+        params = [STATUS_QUEUED]
+        if include_failed:
+            sql += " OR (status = ? AND attempts < ? AND next_retry_at <= ?)"
+            params += [STATUS_FAILED, self.max_attempts, time.time()]
+        sql += ")"
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY status = ?, discovered_at LIMIT ?"
+        params += [STATUS_FAILED, limit]
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params).fetchall()]
+
+    def stats(self) -> List[Dict]:
+        """按来源统计各状态的链接数"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT COALESCE(source, '未知'), SUM(status = 'seen'), "
+                "SUM(status = 'queued'), SUM(status = 'visited'), SUM(status = 'failed'), COUNT(*) "
+                "FROM crawl_urls GROUP BY source ORDER BY COUNT(*) DESC"
+            ).fetchall()
+        return [{"来源": source, "已发现": seen, "待抓取": queued, "已抓取": visited, "失败": failed, "合计": total}
+                for source, seen, queued, visited, failed, total in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ===================== 进程级共享URL库 =====================
+_shared_url_store = None
+_shared_url_store_lock = threading.Lock()
+
+
+def get_url_store() -> UrlStore:
+    """获取进程级共享URL库（核心采集函数与独立爬虫脚本共用）"""
+    global _shared_url_store
+    with _shared_url_store_lock:
+        if _shared_url_store is None:
+            _shared_url_store = UrlStore(CRAWL_URL_STORE_DB_PATH)
+        return _shared_url_store
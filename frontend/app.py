@@ -29,6 +29,9 @@ import json
 
 from core.sentiment_analyzer import FinancialSentimentAnalyzer
 from core.data_integration import DataIntegrator
+from core.request_scheduler import get_request_scheduler
+from core.circuit_breaker import get_circuit_breaker
+from config.llm_config import LLM_TELEMETRY_SUMMARY_HOURS
 
 # 页面配置
 st.set_page_config(
@@ -194,6 +197,803 @@ def get_risk_tag(text, tag_type):
         return tags if tags else '<span style="color:#6b7280; background:#f3f4f6; padding:0.2rem 0.6rem; border-radius:4px;">未知</span>'
 
 
+def render_industry_metrics(result):
+    """渲染行业景气度核心指标卡片"""
+    col1, col2, col3 = st.columns(3, gap="large")
+
+    with col1:
+        impact = result.get("舆情属性", {}).get("舆情倾向", "未知")
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem; margin-bottom:0.5rem">政策性质</div>
+            <div style="font-size:1.4rem; font-weight:600;">{get_status_tag(impact, "policy")}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        sentiment = result.get("景气度分析", {}).get("景气度评级", "未知")
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem; margin-bottom:0.5rem">景气度评级</div>
+            <div style="font-size:1.4rem; font-weight:600;">{get_status_tag(sentiment, "sentiment")}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        score = result.get("景气度分析", {}).get("景气度得分", 0)
+        # 景气度得分添加颜色渐变
+        score_color = "#2d87bb" if score >= 80 else "#ed8936" if score >= 60 else "#c53030"
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem; margin-bottom:0.5rem">景气度得分</div>
+            <div style="display: flex; align-items: baseline; gap: 0.3rem;">
+<span style="font-size:1.8rem; font-weight:700; color:{score_color};">{score}</span>
+<span style="color:#a0aec0; font-size:0.8rem;">/ 100</span>
+</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def render_industry_attr_tab(result, news_title, news_content):
+    """渲染「舆情属性分析」Tab"""
+    # 提前处理换行符（规避f-string反斜杠报错）
+    processed_content = news_content.replace('\n', '<br>').replace('\r\n',
+                                                                   '<br>') if news_content else "暂无舆情内容"
+    # 标题兜底
+    show_title = news_title if news_title else "暂无标题"
+
+    # 一体化卡片：标题+内容在同一个容器内
+    full_html = f"""
+        <div style="background-color:#f0f8fb; padding:1.5rem; border-radius:8px; margin-bottom:1.5rem;">
+            <!-- 标题行（加粗突出） -->
+            <div style="font-size:1.1rem; font-weight:700; color:#2d3748; margin-bottom:1rem; border-bottom:1px solid #e2e8f0; padding-bottom:0.8rem;">
+                {show_title}
+            </div>
+            <!-- 内容行（紧跟标题下方） -->
+            <div style="font-size:1rem; color:#2d3748; line-height:1.8;">
+                {processed_content}
+            </div>
+        </div>
+        """
+    st.markdown(full_html, unsafe_allow_html=True)
+    # 舆情属性基础信息
+    st.markdown('<div class="sub-header">基础舆情信息</div>', unsafe_allow_html=True)
+    sentiment_attr = result.get("舆情属性", {})
+
+    attr_col1, attr_col2, attr_col3 = st.columns(3)
+    with attr_col1:
+        st.write("**舆情类型:**")
+        sentiment_types = sentiment_attr.get("舆情类型", [])
+        if sentiment_types:
+            type_tags = ""
+            for t in sentiment_types:
+                type_tags += f'<span style="background:#e8f4f8; color:#2d3748; padding:0.2rem 0.5rem; border-radius:4px; margin-right:0.3rem;">{t}</span>'
+            st.markdown(type_tags, unsafe_allow_html=True)
+        else:
+            st.write("未知")
+
+    with attr_col2:
+        st.write("**影响强度:**")
+        impact_level = sentiment_attr.get("影响强度", "未知")
+        level_icon = "🔴" if impact_level == "高" else "🟡" if impact_level == "中" else "🟢"
+        st.write(f"{level_icon} {impact_level}")
+
+    with attr_col3:
+        st.write("**舆情倾向:**")
+        st.write(get_status_tag(sentiment_attr.get("舆情倾向", "未知"), "policy"),
+                 unsafe_allow_html=True)
+
+    # 具体影响
+    st.markdown('<div class="sub-header">具体影响描述</div>', unsafe_allow_html=True)
+    st.markdown(f"""
+    <div style="background-color:#f8fafc; padding:1rem; border-radius:6px; line-height:1.6;">
+        {sentiment_attr.get("具体影响", "暂无详细影响描述")}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_industry_sentiment_tab(result):
+    """渲染「景气度分析」Tab"""
+    sentiment_analysis = result.get("景气度分析", {})
+
+    # 基础景气度信息
+    # st.markdown('<div class="sub-header">景气度核心指标</div>', unsafe_allow_html=True)
+    # sa_col1, sa_col2, sa_col3 = st.columns(3)
+    sa_col1=st.columns(1)[0]
+    # with sa_col1:
+    #     st.write("**景气度得分:**")
+    #     st.write(get_status_tag(sentiment_analysis.get("景气度得分", 50), "sentiment"),
+    #              unsafe_allow_html=True)
+    # with sa_col2:
+    #     st.write("**趋势判断:**")
+    #     trend = sentiment_analysis.get("趋势判断", "未知")
+    #     trend_icon = "📈" if trend == "上升" else "📊" if trend == "持平" else "📉"
+    #     st.write(f"{trend_icon} {trend}")
+    with sa_col1:
+        st.markdown('<div class="sub-header">景气度得分</div>', unsafe_allow_html=True)
+
+        # 获取评分拆解数据，做空值兜底
+        score_detail = sentiment_analysis.get("评分拆解", {})
+        # 兼容不同字段命名（适配"评分逻辑"字段）
+        score_data = score_detail if score_detail else sentiment_analysis.get("评分逻辑", {})
+
+        if not score_data:
+            st.info("暂无评分拆解数据")
+        else:
+            # 定义维度配置（名称+配色，提升视觉区分度）
+            score_dimensions = [
+                {"name": "政策支撑度", "color": "#3b82f6", "max_score": 30},  # 满分30
+                {"name": "技术成熟度", "color": "#10b981", "max_score": 25},  # 满分25
+                {"name": "市场需求", "color": "#f59e0b", "max_score": 25},  # 满分25
+                {"name": "产业链配套", "color": "#8b5cf6", "max_score": 20}  # 满分20
+            ]
+
+            # 拆分成2组，每组2个维度（实现2×2布局）
+            for i in range(0, len(score_dimensions), 2):
+                # 每行创建2列
+                col_a, col_b = st.columns(2, gap="small")
+
+                # 处理第1个维度（左列）
+                dim1 = score_dimensions[i]
+                with col_a:
+                    dim_name1 = dim1["name"]
+                    current_score1 = score_data.get(dim_name1, 0)
+                    max_score1 = dim1["max_score"]
+                    score_color1 = dim1["color"]
+                    score_ratio1 = current_score1 / max_score1 if max_score1 > 0 else 0
+                    # 卡片式展示
+                    st.markdown(f"""
+                    <div style="background-color:#f8fafc; padding:1rem; border-radius:8px; height:130px;">
+                        <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:0.5rem;">
+                            <span style="font-size:0.95rem; font-weight:500; color:#1f2937;">{dim_name1}</span>
+                            <span style="font-size:1rem; font-weight:600; color:{score_color1};">
+                                {current_score1}/{max_score1}
+                            </span>
+                        </div>
+                        <!-- 进度条 -->
+                        <div style="height:8px; background-color:#e5e7eb; border-radius:4px; overflow:hidden;">
+                            <div style="width:{score_ratio1 * 100}%; height:100%; background-color:{score_color1}; border-radius:4px;"></div>
+                        </div>
+                        <div style="font-size:0.8rem; color:#6b7280; margin-top:0.3rem;">
+                            占比：{score_ratio1 * 100:.1f}%
+                        </div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                # 处理第2个维度（右列，避免数组越界）
+                if i + 1 < len(score_dimensions):
+                    dim2 = score_dimensions[i + 1]
+                    with col_b:
+                        dim_name2 = dim2["name"]
+                        current_score2 = score_data.get(dim_name2, 0)
+                        max_score2 = dim2["max_score"]
+                        score_color2 = dim2["color"]
+                        score_ratio2 = current_score2 / max_score2 if max_score2 > 0 else 0
+                        # 卡片式展示
+                        st.markdown(f"""
+                        <div style="background-color:#f8fafc; padding:1rem; border-radius:8px; height:130px;">
+                            <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:0.5rem;">
+                                <span style="font-size:0.95rem; font-weight:500; color:#1f2937;">{dim_name2}</span>
+                                <span style="font-size:1rem; font-weight:600; color:{score_color2};">
+                                    {current_score2}/{max_score2}
+                                </span>
+                            </div>
+                            <!-- 进度条 -->
+                            <div style="height:8px; background-color:#e5e7eb; border-radius:4px; overflow:hidden;">
+                                <div style="width:{score_ratio2 * 100}%; height:100%; background-color:{score_color2}; border-radius:4px;"></div>
+                            </div>
+                            <div style="font-size:0.8rem; color:#6b7280; margin-top:0.3rem;">
+                                占比：{score_ratio2 * 100:.1f}%
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+            total_score = sum(score_data.values())
+            st.markdown(f"""
+                    <div style="margin-top:1rem; padding:1rem; background-color:#eff6ff; border-radius:8px; text-align:center;">
+                        <span style="font-size:0.9rem; color:#4b5563;">景气度总分</span>
+                        <div style="font-size:1.8rem; font-weight:700; color:#2563eb;">
+                            {total_score}/100
+                        </div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+    # 景气度得分可视化
+    # score = sentiment_analysis.get("景气度得分", 50)
+    # fig = go.Figure(go.Indicator(
+    #     mode="gauge+number",
+    #     value=score,
+    #     domain={'x': [0, 1], 'y': [0, 1]},
+    #     title={'text': "景气度指数"},
+    #     gauge={
+    #         'axis': {'range': [0, 100]},
+    #         'bar': {'color': "darkblue"},
+    #         'steps': [
+    #             {'range': [0, 40], 'color': "red"},
+    #             {'range': [40, 70], 'color': "yellow"},
+    #             {'range': [70, 100], 'color': "green"}
+    #         ]
+    #     }
+    # ))
+    # fig.update_layout(height=300)
+    # st.plotly_chart(fig, use_container_width=True)
+
+    # 趋势判断依据
+    # st.markdown('<div class="sub-header">趋势判断依据</div>', unsafe_allow_html=True)
+    # st.markdown(f"""
+    # <div style="background-color:#f8fafc; padding:1rem; border-radius:6px; line-height:1.6;">
+    #     {sentiment_analysis.get("判断依据", "暂无判断依据")}
+    # </div>
+    # """, unsafe_allow_html=True)
+
+
+def render_industry_asset_tab(result):
+    """渲染「资产配置建议」Tab"""
+    asset_config = result.get("资产标的与配置", {})
+
+    # 关联资产标的
+    st.markdown('<div class="sub-header">关联资产标的</div>', unsafe_allow_html=True)
+    related_assets = asset_config.get("关联资产标的", {})
+
+    asset_col1, asset_col2 = st.columns(2)
+    with asset_col1:
+        st.markdown("""
+        <div style="background-color:#f0fff4; border:1px solid #c6f6d5; border-radius:8px; padding:1rem;">
+            <div style="font-weight:600; color:#166534; margin-bottom:0.8rem;">📈 股票标的</div>
+        """, unsafe_allow_html=True)
+
+        stocks = related_assets.get("股票", [])
+        if stocks:
+            stock_html = "<ul style='padding-left:1.2rem; margin:0; line-height:1.8;'>"
+            for stock in stocks:
+                stock_html += f"<li style='margin-bottom:0.4rem;'>{stock}</li>"
+            stock_html += "</ul></div>"
+            st.markdown(stock_html, unsafe_allow_html=True)
+        else:
+            st.markdown('<div style="color:#6b7280;">暂无关联股票标的</div></div>',
+                        unsafe_allow_html=True)
+
+    with asset_col2:
+        st.markdown("""
+        <div style="background-color:#e8f4f8; border:1px solid #90cdf4; border-radius:8px; padding:1rem;">
+            <div style="font-weight:600; color:#2563eb; margin-bottom:0.8rem;">📜 债券标的</div>
+        """, unsafe_allow_html=True)
+
+        bonds = related_assets.get("债券", [])
+        if bonds:
+            bond_html = "<ul style='padding-left:1.2rem; margin:0; line-height:1.8;'>"
+            for bond in bonds:
+                bond_html += f"<li style='margin-bottom:0.4rem;'>{bond}</li>"
+            bond_html += "</ul></div>"
+            st.markdown(bond_html, unsafe_allow_html=True)
+        else:
+            st.markdown('<div style="color:#6b7280;">暂无关联债券标的</div></div>',
+                        unsafe_allow_html=True)
+
+    # 配置调整建议
+    st.markdown('<div class="sub-header">配置调整建议</div>', unsafe_allow_html=True)
+    config_suggest = asset_config.get("配置调整建议", {})
+
+    config_col1, config_col2 = st.columns(2)
+    with config_col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem;">行业配置策略</div>
+            <div style="font-size:1.5rem; font-weight:600; color:#22c55e; margin-top: 0.3rem;">
+                {config_suggest.get('行业配置策略', '未知')}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem;">股票调整方向</div>
+            <div style="font-size:1.2rem; font-weight:600; margin-top: 0.3rem;">
+                {config_suggest.get('标的调整方向', {}).get('股票', '未知')}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with config_col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem;">调整幅度建议</div>
+            <div style="font-size:1rem; font-weight:600; margin-top: 0.3rem; line-height:1.4;">
+                {config_suggest.get('调整幅度建议', '未知')}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#718096; font-size:0.9rem;">债券调整方向</div>
+            <div style="font-size:1.2rem; font-weight:600; margin-top: 0.3rem;">
+                {config_suggest.get('标的调整方向', {}).get('债券', '未知')}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # 风险收益比
+    st.markdown('<div class="sub-header">风险收益比</div>', unsafe_allow_html=True)
+    st.markdown(f"""
+    <div style="background-color:#f8fafc; padding:1rem; border-radius:6px; line-height:1.6;">
+        {config_suggest.get('风险收益比', '暂无风险收益分析')}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_industry_chain_tab(result):
+    """渲染「产业链&跨行业影响」Tab"""
+    chain_impact = result.get("产业链与跨行业影响", {})
+
+    # 关联行业影响
+    st.markdown('<div class="sub-header">关联行业影响</div>', unsafe_allow_html=True)
+    col_benefit, col_harm = st.columns(2, gap="medium")
+
+    with col_benefit:
+        st.markdown("""
+        <div style="background-color: #f0fff4; border: 1px solid #c6f6d5; border-radius: 8px; padding: 1rem; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
+            <div style="display:flex; align-items:center; gap: 0.5rem; margin-bottom: 0.8rem;">
+                <span style="background-color: #22c55e; color: white; padding: 0.2rem 0.6rem; border-radius: 6px; font-weight: 600; font-size: 0.9rem;">✓</span>
+                <h3 style="margin: 0; color: #166534; font-size: 1rem;">受益行业</h3>
+            </div>
+        """, unsafe_allow_html=True)
+
+        benefit_industries = chain_impact.get("受益行业", [])
+        if benefit_industries:
+            benefit_html = "<ul style='padding-left: 1.2rem; margin: 0; line-height: 1.8; color: #1e40af; list-style: disc;'>"
+            for industry in benefit_industries:
+                benefit_html += f"<li style='margin-bottom: 0.4rem;'>{industry}</li>"
+            benefit_html += "</ul></div>"
+            st.markdown(benefit_html, unsafe_allow_html=True)
+        else:
+            st.markdown('<div style="color: #6b7280; padding: 0.5rem 0;">暂无受益行业</div></div>',
+                        unsafe_allow_html=True)
+
+    with col_harm:
+        st.markdown("""
+        <div style="background-color: #fff5f5; border: 1px solid #fecaca; border-radius: 8px; padding: 1rem; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
+            <div style="display:flex; align-items:center; gap: 0.5rem; margin-bottom: 0.8rem;">
+                <span style="background-color: #ef4444; color: white; padding: 0.2rem 0.6rem; border-radius: 6px; font-weight: 600; font-size: 0.9rem;">✕</span>
+                <h3 style="margin: 0; color: #991b1b; font-size: 1rem;">受损行业</h3>
+            </div>
+        """, unsafe_allow_html=True)
+
+        harm_industries = chain_impact.get("受损行业", [])
+        if harm_industries:
+            harm_html = "<ul style='padding-left: 1.2rem; margin: 0; line-height: 1.8; color: #991b1b; list-style: disc;'>"
+            for industry in harm_industries:
+                harm_html += f"<li style='margin-bottom: 0.4rem;'>{industry}</li>"
+            harm_html += "</ul></div>"
+            st.markdown(harm_html, unsafe_allow_html=True)
+        else:
+            st.markdown('<div style="color: #6b7280; padding: 0.5rem 0;">暂无受损行业</div></div>',
+                        unsafe_allow_html=True)
+
+    # 产业链影响
+    st.markdown('<div class="sub-header">产业链影响（上中下游）</div>', unsafe_allow_html=True)
+    chain_detail = chain_impact.get("产业链影响", {})
+    col_up, col_mid, col_down = st.columns(3, gap="medium")
+
+    with col_up:
+        st.markdown("""
+        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
+            <span style="color:#4299e1; font-size:1rem;">⛰️</span>
+            <strong style="color:#2d3748;">上游影响</strong>
+        </div>
+        """, unsafe_allow_html=True)
+        up_impact = chain_detail.get("上游", "暂无")
+        st.markdown(f"""
+            <div class="chain-card" style="background-color:#e8f4f8; color:#2d3748;">
+            {up_impact}
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col_mid:
+        st.markdown("""
+        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
+            <span style="color:#9f7aea; font-size:1rem;">🏭</span>
+            <strong style="color:#2d3748;">中游影响</strong>
+        </div>
+        """, unsafe_allow_html=True)
+        mid_impact = chain_detail.get("中游", "暂无")
+        st.markdown(f"""
+            <div class="chain-card" style="background-color:#fdf2f8; color:#2d3748;">
+            {mid_impact}
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col_down:
+        st.markdown("""
+        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
+            <span style="color:#38b2ac; font-size:1rem;">🛒</span>
+            <strong style="color:#2d3748;">下游影响</strong>
+        </div>
+        """, unsafe_allow_html=True)
+        down_impact = chain_detail.get("下游", "暂无")
+        st.markdown(f"""
+            <div class="chain-card" style="background-color:#f5f5f5; color:#2d3748;">
+            {down_impact}
+            </div>
+            """, unsafe_allow_html=True)
+
+    # 跨行业关系
+    st.markdown('<div class="sub-header">跨行业替代/互补关系</div>', unsafe_allow_html=True)
+    cross_industry = chain_impact.get("跨行业关系", [])
+    if cross_industry:
+        cross_html = "<div style='background-color:#f8fafc; border-radius:8px; padding:1rem;'>"
+        for relation in cross_industry:
+            cross_html += f"<div style='margin-bottom:0.8rem; padding-bottom:0.8rem; border-bottom:1px solid #e2e8f0;'>{relation}</div>"
+        cross_html += "</div>"
+        st.markdown(cross_html, unsafe_allow_html=True)
+    else:
+        st.write("暂无跨行业关系分析")
+
+
+def render_industry_dynamic_tab(result):
+    """渲染「风险提示」Tab"""
+    dynamic_adjust = result.get("动态调整支撑", {})
+
+    # 调整触发条件
+    # st.markdown('<div class="sub-header">动态调整触发条件</div>', unsafe_allow_html=True)
+
+
+    # 风险提示
+    st.markdown('<div class="sub-header">风险提示</div>', unsafe_allow_html=True)
+    risk_tips = dynamic_adjust.get("风险提示", [])
+    if risk_tips:
+        risk_html = "<div style='background-color:#fff5f5; border-radius:8px; padding:1rem;'>"
+        for risk in risk_tips:
+            risk_html += f"<div style='margin-bottom:0.5rem; display:flex; align-items:flex-start; gap:0.5rem;'>"
+            risk_html += f"<span style='color:#ef4444;'>⚠️</span><span>{risk}</span></div>"
+        risk_html += "</div>"
+        st.markdown(risk_html, unsafe_allow_html=True)
+    else:
+        st.write("暂无风险提示")
+
+    # 时间窗口
+    st.markdown('<div class="sub-header">影响时间窗口</div>', unsafe_allow_html=True)
+    time_window = dynamic_adjust.get("时间窗口", "未知")
+    st.markdown(f"""
+    <div class="metric-card">
+        <div style="color:#718096; font-size:0.9rem;">持续影响周期</div>
+        <div style="font-size:1.2rem; font-weight:600; color:#2d3748;">{time_window}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_company_metrics(result):
+    """渲染公司风险核心指标卡片"""
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        risk_type = result.get("负面舆情识别", {}).get("风险类型", [])
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">风险类型</div>
+            <div style="font-size:0.95rem; line-height:1.5;">{get_risk_tag(risk_type, "risk_type")}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        severity = result.get("负面舆情识别", {}).get("严重等级", "未知")
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">严重等级</div>
+            <div style="font-size:1.4rem; font-weight:600;">{get_risk_tag(severity, "severity")}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        urgency = result.get("风险处置建议", {}).get("紧急处置等级", "未知")
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">处置等级</div>
+            <div style="font-size:1.1rem; font-weight:600;">{get_risk_tag(urgency, "urgency")}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        risk_nature = result.get("负面舆情识别", {}).get("风险定性", "未知")
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">风险定性</div>
+            <div style="font-size:1.1rem; font-weight:600; color:#dc2626;">{risk_nature}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def render_company_identify_tab(result, risk_title, risk_content):
+    """渲染「舆情识别」Tab"""
+    # st.markdown("### 负面舆情精准识别")
+    risk_identification = result.get("负面舆情识别", {})
+
+    # 提前处理换行符（规避f-string反斜杠报错）
+    processed_content = risk_content.replace('\n', '<br>').replace('\r\n',
+                                                                   '<br>') if risk_content else "暂无舆情内容"
+    # 标题兜底
+    show_title = risk_title if risk_title else "暂无标题"
+
+    # 一体化卡片：标题+内容在同一个容器内
+    full_html = f"""
+                           <div style="background-color:#f0f8fb; padding:1.5rem; border-radius:8px; margin-bottom:1.5rem;">
+                               <!-- 标题行（加粗突出） -->
+                               <div style="font-size:1.1rem; font-weight:700; color:#2d3748; margin-bottom:1rem; border-bottom:1px solid #e2e8f0; padding-bottom:0.8rem;">
+                                   {show_title}
+                               </div>
+                               <!-- 内容行（紧跟标题下方） -->
+                               <div style="font-size:1rem; color:#2d3748; line-height:1.8;">
+                                   {processed_content}
+                               </div>
+                           </div>
+                           """
+    st.markdown(full_html, unsafe_allow_html=True)
+
+    # 基础风险信息
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write("**风险类型:**")
+        st.markdown(get_risk_tag(risk_identification.get("风险类型", []), "risk_type"), unsafe_allow_html=True)
+    with col2:
+        st.write("**严重等级:**")
+        st.markdown(get_risk_tag(risk_identification.get("严重等级", "未知"), "severity"),
+                    unsafe_allow_html=True)
+    with col3:
+        st.write("**风险定性:**")
+        st.write(
+            f"<span style='color:#dc2626; font-weight:600;'>{risk_identification.get('风险定性', '未知')}</span>",
+            unsafe_allow_html=True)
+
+
+def render_company_impact_tab(result):
+    """渲染「影响传导」Tab"""
+    st.markdown("### 影响范围与传导路径")
+    impact_scope = result.get("影响范围与传导路径", {})
+
+    # 基础影响信息
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**影响范围:**")
+        scope = impact_scope.get("影响范围", "未知")
+        scope_color = "#dc2626" if scope == "全行业" else "#f59e0b" if scope == "关联企业" else "#10b981"
+        st.write(f"<span style='color:{scope_color}; font-weight:600;'>{scope}</span>", unsafe_allow_html=True)
+
+        st.write("**直接影响对象:**")
+        impact_objects = impact_scope.get("直接影响对象", [])
+        if impact_objects:
+            obj_html = "<ul style='padding-left:1.2rem; line-height:1.8;'>"
+            for obj in impact_objects:
+                obj_html += f"<li>{obj}</li>"
+            obj_html += "</ul>"
+            st.markdown(obj_html, unsafe_allow_html=True)
+        else:
+            st.write("未知")
+
+    # with col2:
+    #     # 传导路径分析
+    #     st.write("**传导路径概览:**")
+    #     st.markdown(f"""
+    #     <div style="background-color:#f1f5f9; padding:1rem; border-radius:6px; height:100%;">
+    #         <strong>市场传导:</strong> {impact_scope.get('传导路径分析', {}).get('市场传导', '未知')}
+    #     </div>
+    #     """, unsafe_allow_html=True)
+
+    # 详细传导路径
+    st.markdown('<div class="sub-header">传导路径详细分析</div>', unsafe_allow_html=True)
+    transfer_analysis = impact_scope.get("传导路径分析", {})
+
+    col_up, col_mid, col_down = st.columns(3)
+    with col_up:
+        st.markdown("""
+        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
+            <span style="color:#ef4444; font-size:1rem;">🔴</span>
+            <strong style="color:#1e293b;">内部传导</strong>
+        </div>
+        """, unsafe_allow_html=True)
+        st.markdown(f"""
+            <div style="background-color:#fef2f2; padding:0.8rem; border-radius:6px; height:100%;">
+            {transfer_analysis.get('内部传导', '暂无')}
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col_mid:
+        st.markdown("""
+        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
+            <span style="color:#f59e0b; font-size:1rem;">🟡</span>
+            <strong style="color:#1e293b;">外部传导</strong>
+        </div>
+        """, unsafe_allow_html=True)
+        st.markdown(f"""
+            <div style="background-color:#fffbeb; padding:0.8rem; border-radius:6px; height:100%;">
+            {transfer_analysis.get('外部传导', '暂无')}
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col_down:
+        st.markdown("""
+        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
+            <span style="color:#3b82f6; font-size:1rem;">🔵</span>
+            <strong style="color:#1e293b;">市场传导</strong>
+        </div>
+        """, unsafe_allow_html=True)
+        st.markdown(f"""
+            <div style="background-color:#eff6ff; padding:0.8rem; border-radius:6px; height:100%;">
+            {transfer_analysis.get('市场传导', '暂无')}
+            </div>
+            """, unsafe_allow_html=True)
+
+
+def render_company_quantify_tab(result):
+    """渲染「风险量化」Tab"""
+    st.markdown("### 风险量化评估")
+    risk_quantify = result.get("风险量化评估", {})
+
+    # 核心量化指标
+    col3, col4 = st.columns(2)
+
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#64748b; font-size:0.9rem;">损失预估</div>
+            <div style="font-size:0.95rem; font-weight:600; margin-top:0.5rem;">{risk_quantify.get('损失预估', '未知')}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div style="color:#64748b; font-size:0.9rem;">市场影响程度</div>
+            <div style="font-size:0.95rem; font-weight:600; margin-top:0.5rem;">{risk_quantify.get('市场影响程度', '未知')}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # # 风险矩阵可视化（优化版）
+    # st.markdown('<div class="sub-header">风险矩阵分析</div>', unsafe_allow_html=True)
+    # # 重新定义映射关系（适配新的风险等级）
+    # severity_map = {"高": 90, "中": 60, "低": 30}
+    # # 基于偿债能力影响定义影响分数
+    # impact_map = {"严重削弱": 90, "一定影响": 60, "基本无影响": 30}
+    #
+    # severity_score = severity_map.get(result.get("负面舆情识别", {}).get("严重等级"), 50)
+    # impact_score = impact_map.get(risk_quantify.get("偿债能力影响", "基本无影响"), 50)
+    #
+    # fig = go.Figure()
+    #
+    # # 添加风险区域（红/黄/绿）
+    # fig.add_shape(type="rect", x0=0, y0=0, x1=50, y1=50, fillcolor="green", opacity=0.1, line_width=0,
+    #               name="低风险")
+    # fig.add_shape(type="rect", x0=50, y0=0, x1=100, y1=50, fillcolor="yellow", opacity=0.1,
+    #               line_width=0, name="中风险")
+    # fig.add_shape(type="rect", x0=0, y0=50, x1=50, y1=100, fillcolor="yellow", opacity=0.1,
+    #               line_width=0)
+    # fig.add_shape(type="rect", x0=50, y0=50, x1=100, y1=100, fillcolor="red", opacity=0.2, line_width=0,
+    #               name="高风险")
+    #
+    # # 添加风险点（带企业名称）- 完全符合 Plotly Scatter 规范
+    # fig.add_trace(go.Scatter(
+    #     x=[severity_score],
+    #     y=[impact_score],
+    #     mode='markers+text',
+    #     marker=dict(size=25, color='red', symbol='triangle-up'),
+    #     text=[selected_company],
+    #     textposition="top center",
+    #     # 正确配置：textfont 仅用支持的属性，加粗通过 "Bold" 字体实现
+    #     textfont=dict(
+    #         size=12,  # 字体大小（支持）
+    #         color="black",  # 字体颜色（支持）
+    #         family="Arial Bold, Times New Roman Bold"  # 加粗字体（核心修复点）
+    #     ),
+    #     name="当前风险位置"
+    # ))
+    #
+    # # 布局优化
+    # fig.update_layout(
+    #     title="风险矩阵（严重程度 vs 偿债能力影响）",
+    #     xaxis_title="风险严重程度（高→低）",
+    #     yaxis_title="偿债能力影响（高→低）",
+    #     xaxis_range=[0, 100],
+    #     yaxis_range=[0, 100],
+    #     height=450,
+    #     showlegend=True,
+    #     legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+    # )
+    # st.plotly_chart(fig, use_container_width=True)
+
+
+def render_company_disposal_tab(result):
+    """渲染「处置建议」Tab"""
+    st.markdown("### 风险处置建议")
+    disposal = result.get("风险处置建议", {})
+
+    # 紧急处置等级
+    # st.write("**紧急处置等级:**")
+    # st.markdown(get_risk_tag(disposal.get("紧急处置等级", "未知"), "urgency"), unsafe_allow_html=True)
+
+    # 分场景处置措施
+    # st.markdown('<div class="sub-header">分场景处置措施</div>', unsafe_allow_html=True)
+    measures = disposal.get("分场景处置措施", {})
+
+    # 持仓机构操作建议
+    st.markdown("#### 📈 持仓机构操作建议")
+    st.markdown(f"""
+    <div class="suggestion-card">
+        {measures.get('持仓机构操作建议', '暂无具体建议')}
+    </div>
+    """, unsafe_allow_html=True)
+
+    # 风险对冲策略
+    st.markdown("#### 🛡️ 风险对冲策略")
+    st.markdown(f"""
+    <div class="suggestion-card" style="border-left-color:#8b5cf6;">
+        {measures.get('风险对冲策略', '暂无具体建议')}
+    </div>
+    """, unsafe_allow_html=True)
+
+    # 投后管理措施
+    st.markdown("#### 📊 投后管理措施")
+    st.markdown(f"""
+    <div class="suggestion-card" style="border-left-color:#14b8a6;">
+        {measures.get('投后管理措施', '暂无具体建议')}
+    </div>
+    """, unsafe_allow_html=True)
+
+    # 风险缓释手段
+    st.markdown('<div class="sub-header">风险缓释手段分析</div>', unsafe_allow_html=True)
+    st.markdown(f"""
+    <div style="background-color:#ecfdf5; padding:1rem; border-radius:6px; border-left:4px solid #10b981;">
+        {disposal.get('风险缓释手段', '暂无分析')}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def stream_render_sections(stream, tabs, section_views, metrics_placeholder, render_metrics,
+                           metric_sections):
+    """
+    流式渲染分析结果：某个顶层板块生成完毕即渲染对应Tab
+
+    Args:
+        stream: 分析器流式接口返回的生成器，产出(板块名称, 已完成结果)，板块名称为None时为完整结果
+        tabs: st.tabs返回的Tab列表，顺序与section_views一致
+        section_views: {板块名称: 渲染函数}
+        metrics_placeholder: 核心指标卡片占位容器
+        render_metrics: 核心指标渲染函数
+        metric_sections: 核心指标依赖的板块名称
+
+    Returns:
+        完整分析结果
+    """
+    placeholders = {}
+    for tab, section in zip(tabs, section_views):
+        with tab:
+            placeholders[section] = st.empty()
+            placeholders[section].info("⏳ 该板块生成中...")
+
+    rendered = set()
+    result = {}
+    for section, partial in stream:
+        if section is None:
+            result = partial
+            break
+        if section in placeholders:
+            with placeholders[section].container():
+                section_views[section](partial)
+            rendered.add(section)
+        if section in metric_sections:
+            with metrics_placeholder.container():
+                render_metrics(partial)
+
+    # 流式阶段未渲染的板块（缓存命中、解析兜底等）用完整结果补齐
+    for section, placeholder in placeholders.items():
+        if section not in rendered:
+            with placeholder.container():
+                section_views[section](result)
+    with metrics_placeholder.container():
+        render_metrics(result)
+
+    # 大模型不可用时展示的是备选数据，明确提示
+    if "服务降级" in result:
+        st.warning(f"⚠️ {result['服务降级']['说明']}（{result['服务降级']['降级原因']}）")
+
+    return result
+
 
 # 标题
 st.title("🤖 金融舆情智能分析系统")
@@ -262,6 +1062,46 @@ with st.sidebar:
         st.error("❌ 未配置API密钥")
         st.info("请在.env文件中设置DEEPSEEK_API_KEY")
 
+    # 响应缓存状态
+    status_analyzer = init_analyzer()
+    if status_analyzer and status_analyzer.cache:
+        cache_stats = status_analyzer.cache.stats()
+        st.caption(f"💾 响应缓存：{cache_stats['条目数']}条 | 命中率 {cache_stats['命中率']:.0%}")
+    if status_analyzer and status_analyzer.near_dup:
+        dup_stats = status_analyzer.near_dup.stats()
+        st.caption(f"♻️ 相似复用：{dup_stats['复用次数']}次 | 复用率 {dup_stats['复用率']:.0%}")
+    if status_analyzer:
+        flight_stats = status_analyzer.single_flight.stats()
+        st.caption(f"🔗 请求合并：{flight_stats['合并请求']}次 | 实际调用 {flight_stats['实际调用']}次")
+        if status_analyzer.result_store:
+            store_stats = status_analyzer.result_store.stats()
+            st.caption(f"🗄️ 分析结果库：{store_stats['结果数']}条 | 公司 {store_stats['公司数']}家 | "
+                       f"行业 {store_stats['行业数']}个")
+        breaker_stats = get_circuit_breaker().stats()
+        breaker_text = f"⚡ 熔断器：{breaker_stats['状态']} | 失败率 {breaker_stats['失败率']:.0%} | " \
+                       f"快速失败 {breaker_stats['快速失败次数']}次"
+        if breaker_stats["剩余熔断秒数"]:
+            st.warning(f"{breaker_text} | {breaker_stats['剩余熔断秒数']:.0f}秒后探测恢复")
+        else:
+            st.caption(breaker_text)
+        scheduler_stats = get_request_scheduler().stats()
+        st.caption(f"🚦 请求调度：排队 交互{scheduler_stats['排队中']['interactive']}/"
+                   f"高优{scheduler_stats['排队中']['high']}/常规{scheduler_stats['排队中']['routine']} | "
+                   f"超时 {sum(scheduler_stats['排队超时'].values())}次")
+
+        # 大模型调用统计（按场景的耗时分位数、Token与费用）
+        with st.expander(f"📈 大模型调用统计（近{LLM_TELEMETRY_SUMMARY_HOURS}小时）"):
+            telemetry_rows = status_analyzer.telemetry.summary(since=time.time() - LLM_TELEMETRY_SUMMARY_HOURS * 3600)
+            if telemetry_rows:
+                st.dataframe(pd.DataFrame(telemetry_rows).set_index("场景").T, use_container_width=True)
+            else:
+                st.caption("暂无调用记录")
+
+        # 模型路由（各场景各档配置的实测P95耗时与合格率）
+        if status_analyzer.router:
+            with st.expander("🧭 模型路由"):
+                st.dataframe(pd.DataFrame(status_analyzer.router.stats()), use_container_width=True, hide_index=True)
+
 # 主内容区
 analyzer = init_analyzer()
 
@@ -855,509 +1695,59 @@ if analysis_mode != "数据看板":
         # 分隔线（视觉区分两行）
         st.markdown("---")
 
-        # 分析按钮
-        if st.button("🚀 开始分析", type="primary") and news_content:
+        # 分析按钮；该舆情已分析过时直接展示历史结果
+        analyze_clicked = st.button("🚀 开始分析", type="primary") and news_content
+        stored = None
+        if not analyze_clicked and news_content and analyzer.result_store:
+            stored = analyzer.result_store.find("industry", selected_industry, news_content)
+
+        if analyze_clicked or stored:
             # 记录开始时间
             start_time = datetime.datetime.now()
+            status_text = st.empty()
+            status_text.info("🤖 AI正在深度分析中，各板块生成后将依次展示...")
+
+            st.subheader("📊 核心分析指标", anchor=False)
+            metrics_placeholder = st.empty()
+
+            # ===================== 详细分析Tabs（流式渲染） =====================
+            tabs = st.tabs(
+                ["📋 舆情属性分析", "📈 景气度分析", "💡 资产配置建议", "🔗 产业链&跨行业影响", "⚙️ 风险提示"])
+            section_views = {
+                "舆情属性": lambda r: render_industry_attr_tab(r, news_title, news_content),
+                "景气度分析": render_industry_sentiment_tab,
+                "资产标的与配置": render_industry_asset_tab,
+                "产业链与跨行业影响": render_industry_chain_tab,
+                "动态调整支撑": render_industry_dynamic_tab
+            }
+            if analyze_clicked:
+                stream = analyzer.stream_industry_sentiment(selected_industry, news_content)
+            else:
+                stream = iter([(None, stored["结果"])])
+            result = stream_render_sections(
+                stream, tabs, section_views, metrics_placeholder, render_industry_metrics,
+                metric_sections=("舆情属性", "景气度分析")
+            )
 
-            # 优化的加载提示
-            with st.spinner("""
-                    🤖 AI正在深度分析中...预计需要30-60秒：
-                """):
-                # 模拟进度提示
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                # ["📋 舆情属性分析", "📈 景气度分析", "💡 资产配置建议", "🔗 产业链&跨行业影响", "⚙️ 风险提示"])
-
-                # 模拟分步处理
-                status_text.text("正在分析景气度... (1/4)")
-                progress_bar.progress(25)
-                time.sleep(10)
-
-                status_text.text("正在分析行业关联影响... (2/4)")
-                progress_bar.progress(50)
-                time.sleep(10)
-
-                status_text.text("正在分析产业链跨行业影响... (3/4)")
-                progress_bar.progress(75)
-                time.sleep(10)
-
-                status_text.text("正在生成资产配置建议... (4/4)")
-                progress_bar.progress(100)
-
-                # 进行实际分析
-                result = analyzer.analyze_industry_sentiment(selected_industry, news_content)
-
-                # 记录结束时间
-                end_time = datetime.datetime.now()
-                analysis_duration = (end_time - start_time).total_seconds()
-
-                # 清除进度提示
-                progress_bar.empty()
-                status_text.empty()
-
-                # 显示完成提示
-                st.success(f"✅ 分析完成！本次分析耗时：{analysis_duration:.1f} 秒")
-
-                st.subheader("📊 核心分析指标", anchor=False)
-                col1, col2, col3 = st.columns(3, gap="large")
-
-                with col1:
-                    impact = result.get("舆情属性", {}).get("舆情倾向", "未知")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#718096; font-size:0.9rem; margin-bottom:0.5rem">政策性质</div>
-                        <div style="font-size:1.4rem; font-weight:600;">{get_status_tag(impact, "policy")}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with col2:
-                    sentiment = result.get("景气度分析", {}).get("景气度评级", "未知")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#718096; font-size:0.9rem; margin-bottom:0.5rem">景气度评级</div>
-                        <div style="font-size:1.4rem; font-weight:600;">{get_status_tag(sentiment, "sentiment")}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with col3:
-                    score = result.get("景气度分析", {}).get("景气度得分", 0)
-                    # 景气度得分添加颜色渐变
-                    score_color = "#2d87bb" if score >= 80 else "#ed8936" if score >= 60 else "#c53030"
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#718096; font-size:0.9rem; margin-bottom:0.5rem">景气度得分</div>
-                        <div style="display: flex; align-items: baseline; gap: 0.3rem;">
-        <span style="font-size:1.8rem; font-weight:700; color:{score_color};">{score}</span>
-        <span style="color:#a0aec0; font-size:0.8rem;">/ 100</span>
-    </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                # ===================== 详细分析Tabs（优化后） =====================
-                tabs = st.tabs(
-                    ["📋 舆情属性分析", "📈 景气度分析", "💡 资产配置建议", "🔗 产业链&跨行业影响", "⚙️ 风险提示"])
-
-                with tabs[0]:
-                    # 提前处理换行符（规避f-string反斜杠报错）
-                    processed_content = news_content.replace('\n', '<br>').replace('\r\n',
-                                                                                   '<br>') if news_content else "暂无舆情内容"
-                    # 标题兜底
-                    show_title = news_title if news_title else "暂无标题"
-
-                    # 一体化卡片：标题+内容在同一个容器内
-                    full_html = f"""
-                        <div style="background-color:#f0f8fb; padding:1.5rem; border-radius:8px; margin-bottom:1.5rem;">
-                            <!-- 标题行（加粗突出） -->
-                            <div style="font-size:1.1rem; font-weight:700; color:#2d3748; margin-bottom:1rem; border-bottom:1px solid #e2e8f0; padding-bottom:0.8rem;">
-                                {show_title}
-                            </div>
-                            <!-- 内容行（紧跟标题下方） -->
-                            <div style="font-size:1rem; color:#2d3748; line-height:1.8;">
-                                {processed_content}
-                            </div>
-                        </div>
-                        """
-                    st.markdown(full_html, unsafe_allow_html=True)
-                    # 舆情属性基础信息
-                    st.markdown('<div class="sub-header">基础舆情信息</div>', unsafe_allow_html=True)
-                    sentiment_attr = result.get("舆情属性", {})
-
-                    attr_col1, attr_col2, attr_col3 = st.columns(3)
-                    with attr_col1:
-                        st.write("**舆情类型:**")
-                        sentiment_types = sentiment_attr.get("舆情类型", [])
-                        if sentiment_types:
-                            type_tags = ""
-                            for t in sentiment_types:
-                                type_tags += f'<span style="background:#e8f4f8; color:#2d3748; padding:0.2rem 0.5rem; border-radius:4px; margin-right:0.3rem;">{t}</span>'
-                            st.markdown(type_tags, unsafe_allow_html=True)
-                        else:
-                            st.write("未知")
-
-                    with attr_col2:
-                        st.write("**影响强度:**")
-                        impact_level = sentiment_attr.get("影响强度", "未知")
-                        level_icon = "🔴" if impact_level == "高" else "🟡" if impact_level == "中" else "🟢"
-                        st.write(f"{level_icon} {impact_level}")
-
-                    with attr_col3:
-                        st.write("**舆情倾向:**")
-                        st.write(get_status_tag(sentiment_attr.get("舆情倾向", "未知"), "policy"),
-                                 unsafe_allow_html=True)
-
-                    # 具体影响
-                    st.markdown('<div class="sub-header">具体影响描述</div>', unsafe_allow_html=True)
-                    st.markdown(f"""
-                    <div style="background-color:#f8fafc; padding:1rem; border-radius:6px; line-height:1.6;">
-                        {sentiment_attr.get("具体影响", "暂无详细影响描述")}
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with tabs[1]:
-                    sentiment_analysis = result.get("景气度分析", {})
-
-                    # 基础景气度信息
-                    # st.markdown('<div class="sub-header">景气度核心指标</div>', unsafe_allow_html=True)
-                    # sa_col1, sa_col2, sa_col3 = st.columns(3)
-                    sa_col1=st.columns(1)[0]
-                    # with sa_col1:
-                    #     st.write("**景气度得分:**")
-                    #     st.write(get_status_tag(sentiment_analysis.get("景气度得分", 50), "sentiment"),
-                    #              unsafe_allow_html=True)
-                    # with sa_col2:
-                    #     st.write("**趋势判断:**")
-                    #     trend = sentiment_analysis.get("趋势判断", "未知")
-                    #     trend_icon = "📈" if trend == "上升" else "📊" if trend == "持平" else "📉"
-                    #     st.write(f"{trend_icon} {trend}")
-                    with sa_col1:
-                        st.markdown('<div class="sub-header">景气度得分</div>', unsafe_allow_html=True)
-
-                        # 获取评分拆解数据，做空值兜底
-                        score_detail = sentiment_analysis.get("评分拆解", {})
-                        # 兼容不同字段命名（适配"评分逻辑"字段）
-                        score_data = score_detail if score_detail else sentiment_analysis.get("评分逻辑", {})
-
-                        if not score_data:
-                            st.info("暂无评分拆解数据")
-                        else:
-                            # 定义维度配置（名称+配色，提升视觉区分度）
-                            score_dimensions = [
-                                {"name": "政策支撑度", "color": "#3b82f6", "max_score": 30},  # 满分30
-                                {"name": "技术成熟度", "color": "#10b981", "max_score": 25},  # 满分25
-                                {"name": "市场需求", "color": "#f59e0b", "max_score": 25},  # 满分25
-                                {"name": "产业链配套", "color": "#8b5cf6", "max_score": 20}  # 满分20
-                            ]
-
-                            # 拆分成2组，每组2个维度（实现2×2布局）
-                            for i in range(0, len(score_dimensions), 2):
-                                # 每行创建2列
-                                col_a, col_b = st.columns(2, gap="small")
-
-                                # 处理第1个维度（左列）
-                                dim1 = score_dimensions[i]
-                                with col_a:
-                                    dim_name1 = dim1["name"]
-                                    current_score1 = score_data.get(dim_name1, 0)
-                                    max_score1 = dim1["max_score"]
-                                    score_color1 = dim1["color"]
-                                    score_ratio1 = current_score1 / max_score1 if max_score1 > 0 else 0
-                                    # 卡片式展示
-                                    st.markdown(f"""
-                                    <div style="background-color:#f8fafc; padding:1rem; border-radius:8px; height:130px;">
-                                        <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:0.5rem;">
-                                            <span style="font-size:0.95rem; font-weight:500; color:#1f2937;">{dim_name1}</span>
-                                            <span style="font-size:1rem; font-weight:600; color:{score_color1};">
-                                                {current_score1}/{max_score1}
-                                            </span>
-                                        </div>
-                                        <!-- 进度条 -->
-                                        <div style="height:8px; background-color:#e5e7eb; border-radius:4px; overflow:hidden;">
-                                            <div style="width:{score_ratio1 * 100}%; height:100%; background-color:{score_color1}; border-radius:4px;"></div>
-                                        </div>
-                                        <div style="font-size:0.8rem; color:#6b7280; margin-top:0.3rem;">
-                                            占比：{score_ratio1 * 100:.1f}%
-                                        </div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-
-                                # 处理第2个维度（右列，避免数组越界）
-                                if i + 1 < len(score_dimensions):
-                                    dim2 = score_dimensions[i + 1]
-                                    with col_b:
-                                        dim_name2 = dim2["name"]
-                                        current_score2 = score_data.get(dim_name2, 0)
-                                        max_score2 = dim2["max_score"]
-                                        score_color2 = dim2["color"]
-                                        score_ratio2 = current_score2 / max_score2 if max_score2 > 0 else 0
-                                        # 卡片式展示
-                                        st.markdown(f"""
-                                        <div style="background-color:#f8fafc; padding:1rem; border-radius:8px; height:130px;">
-                                            <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:0.5rem;">
-                                                <span style="font-size:0.95rem; font-weight:500; color:#1f2937;">{dim_name2}</span>
-                                                <span style="font-size:1rem; font-weight:600; color:{score_color2};">
-                                                    {current_score2}/{max_score2}
-                                                </span>
-                                            </div>
-                                            <!-- 进度条 -->
-                                            <div style="height:8px; background-color:#e5e7eb; border-radius:4px; overflow:hidden;">
-                                                <div style="width:{score_ratio2 * 100}%; height:100%; background-color:{score_color2}; border-radius:4px;"></div>
-                                            </div>
-                                            <div style="font-size:0.8rem; color:#6b7280; margin-top:0.3rem;">
-                                                占比：{score_ratio2 * 100:.1f}%
-                                            </div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                            total_score = sum(score_data.values())
-                            st.markdown(f"""
-                                    <div style="margin-top:1rem; padding:1rem; background-color:#eff6ff; border-radius:8px; text-align:center;">
-                                        <span style="font-size:0.9rem; color:#4b5563;">景气度总分</span>
-                                        <div style="font-size:1.8rem; font-weight:700; color:#2563eb;">
-                                            {total_score}/100
-                                        </div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-
-                    # 景气度得分可视化
-                    # score = sentiment_analysis.get("景气度得分", 50)
-                    # fig = go.Figure(go.Indicator(
-                    #     mode="gauge+number",
-                    #     value=score,
-                    #     domain={'x': [0, 1], 'y': [0, 1]},
-                    #     title={'text': "景气度指数"},
-                    #     gauge={
-                    #         'axis': {'range': [0, 100]},
-                    #         'bar': {'color': "darkblue"},
-                    #         'steps': [
-                    #             {'range': [0, 40], 'color': "red"},
-                    #             {'range': [40, 70], 'color': "yellow"},
-                    #             {'range': [70, 100], 'color': "green"}
-                    #         ]
-                    #     }
-                    # ))
-                    # fig.update_layout(height=300)
-                    # st.plotly_chart(fig, use_container_width=True)
-
-                    # 趋势判断依据
-                    # st.markdown('<div class="sub-header">趋势判断依据</div>', unsafe_allow_html=True)
-                    # st.markdown(f"""
-                    # <div style="background-color:#f8fafc; padding:1rem; border-radius:6px; line-height:1.6;">
-                    #     {sentiment_analysis.get("判断依据", "暂无判断依据")}
-                    # </div>
-                    # """, unsafe_allow_html=True)
-
-                with tabs[2]:
-                    asset_config = result.get("资产标的与配置", {})
-
-                    # 关联资产标的
-                    st.markdown('<div class="sub-header">关联资产标的</div>', unsafe_allow_html=True)
-                    related_assets = asset_config.get("关联资产标的", {})
-
-                    asset_col1, asset_col2 = st.columns(2)
-                    with asset_col1:
-                        st.markdown("""
-                        <div style="background-color:#f0fff4; border:1px solid #c6f6d5; border-radius:8px; padding:1rem;">
-                            <div style="font-weight:600; color:#166534; margin-bottom:0.8rem;">📈 股票标的</div>
-                        """, unsafe_allow_html=True)
-
-                        stocks = related_assets.get("股票", [])
-                        if stocks:
-                            stock_html = "<ul style='padding-left:1.2rem; margin:0; line-height:1.8;'>"
-                            for stock in stocks:
-                                stock_html += f"<li style='margin-bottom:0.4rem;'>{stock}</li>"
-                            stock_html += "</ul></div>"
-                            st.markdown(stock_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="color:#6b7280;">暂无关联股票标的</div></div>',
-                                        unsafe_allow_html=True)
-
-                    with asset_col2:
-                        st.markdown("""
-                        <div style="background-color:#e8f4f8; border:1px solid #90cdf4; border-radius:8px; padding:1rem;">
-                            <div style="font-weight:600; color:#2563eb; margin-bottom:0.8rem;">📜 债券标的</div>
-                        """, unsafe_allow_html=True)
-
-                        bonds = related_assets.get("债券", [])
-                        if bonds:
-                            bond_html = "<ul style='padding-left:1.2rem; margin:0; line-height:1.8;'>"
-                            for bond in bonds:
-                                bond_html += f"<li style='margin-bottom:0.4rem;'>{bond}</li>"
-                            bond_html += "</ul></div>"
-                            st.markdown(bond_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="color:#6b7280;">暂无关联债券标的</div></div>',
-                                        unsafe_allow_html=True)
-
-                    # 配置调整建议
-                    st.markdown('<div class="sub-header">配置调整建议</div>', unsafe_allow_html=True)
-                    config_suggest = asset_config.get("配置调整建议", {})
-
-                    config_col1, config_col2 = st.columns(2)
-                    with config_col1:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="color:#718096; font-size:0.9rem;">行业配置策略</div>
-                            <div style="font-size:1.5rem; font-weight:600; color:#22c55e; margin-top: 0.3rem;">
-                                {config_suggest.get('行业配置策略', '未知')}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="color:#718096; font-size:0.9rem;">股票调整方向</div>
-                            <div style="font-size:1.2rem; font-weight:600; margin-top: 0.3rem;">
-                                {config_suggest.get('标的调整方向', {}).get('股票', '未知')}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    with config_col2:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="color:#718096; font-size:0.9rem;">调整幅度建议</div>
-                            <div style="font-size:1rem; font-weight:600; margin-top: 0.3rem; line-height:1.4;">
-                                {config_suggest.get('调整幅度建议', '未知')}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="color:#718096; font-size:0.9rem;">债券调整方向</div>
-                            <div style="font-size:1.2rem; font-weight:600; margin-top: 0.3rem;">
-                                {config_suggest.get('标的调整方向', {}).get('债券', '未知')}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    # 风险收益比
-                    st.markdown('<div class="sub-header">风险收益比</div>', unsafe_allow_html=True)
-                    st.markdown(f"""
-                    <div style="background-color:#f8fafc; padding:1rem; border-radius:6px; line-height:1.6;">
-                        {config_suggest.get('风险收益比', '暂无风险收益分析')}
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with tabs[3]:
-                    chain_impact = result.get("产业链与跨行业影响", {})
-
-                    # 关联行业影响
-                    st.markdown('<div class="sub-header">关联行业影响</div>', unsafe_allow_html=True)
-                    col_benefit, col_harm = st.columns(2, gap="medium")
-
-                    with col_benefit:
-                        st.markdown("""
-                        <div style="background-color: #f0fff4; border: 1px solid #c6f6d5; border-radius: 8px; padding: 1rem; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
-                            <div style="display:flex; align-items:center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                                <span style="background-color: #22c55e; color: white; padding: 0.2rem 0.6rem; border-radius: 6px; font-weight: 600; font-size: 0.9rem;">✓</span>
-                                <h3 style="margin: 0; color: #166534; font-size: 1rem;">受益行业</h3>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-                        benefit_industries = chain_impact.get("受益行业", [])
-                        if benefit_industries:
-                            benefit_html = "<ul style='padding-left: 1.2rem; margin: 0; line-height: 1.8; color: #1e40af; list-style: disc;'>"
-                            for industry in benefit_industries:
-                                benefit_html += f"<li style='margin-bottom: 0.4rem;'>{industry}</li>"
-                            benefit_html += "</ul></div>"
-                            st.markdown(benefit_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="color: #6b7280; padding: 0.5rem 0;">暂无受益行业</div></div>',
-                                        unsafe_allow_html=True)
-
-                    with col_harm:
-                        st.markdown("""
-                        <div style="background-color: #fff5f5; border: 1px solid #fecaca; border-radius: 8px; padding: 1rem; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
-                            <div style="display:flex; align-items:center; gap: 0.5rem; margin-bottom: 0.8rem;">
-                                <span style="background-color: #ef4444; color: white; padding: 0.2rem 0.6rem; border-radius: 6px; font-weight: 600; font-size: 0.9rem;">✕</span>
-                                <h3 style="margin: 0; color: #991b1b; font-size: 1rem;">受损行业</h3>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-                        harm_industries = chain_impact.get("受损行业", [])
-                        if harm_industries:
-                            harm_html = "<ul style='padding-left: 1.2rem; margin: 0; line-height: 1.8; color: #991b1b; list-style: disc;'>"
-                            for industry in harm_industries:
-                                harm_html += f"<li style='margin-bottom: 0.4rem;'>{industry}</li>"
-                            harm_html += "</ul></div>"
-                            st.markdown(harm_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="color: #6b7280; padding: 0.5rem 0;">暂无受损行业</div></div>',
-                                        unsafe_allow_html=True)
-
-                    # 产业链影响
-                    st.markdown('<div class="sub-header">产业链影响（上中下游）</div>', unsafe_allow_html=True)
-                    chain_detail = chain_impact.get("产业链影响", {})
-                    col_up, col_mid, col_down = st.columns(3, gap="medium")
-
-                    with col_up:
-                        st.markdown("""
-                        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
-                            <span style="color:#4299e1; font-size:1rem;">⛰️</span>
-                            <strong style="color:#2d3748;">上游影响</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        up_impact = chain_detail.get("上游", "暂无")
-                        st.markdown(f"""
-                            <div class="chain-card" style="background-color:#e8f4f8; color:#2d3748;">
-                            {up_impact}
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                    with col_mid:
-                        st.markdown("""
-                        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
-                            <span style="color:#9f7aea; font-size:1rem;">🏭</span>
-                            <strong style="color:#2d3748;">中游影响</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        mid_impact = chain_detail.get("中游", "暂无")
-                        st.markdown(f"""
-                            <div class="chain-card" style="background-color:#fdf2f8; color:#2d3748;">
-                            {mid_impact}
-                            </div>
-                            """, unsafe_allow_html=True)
+            # 记录结束时间
+            end_time = datetime.datetime.now()
+            analysis_duration = (end_time - start_time).total_seconds()
 
-                    with col_down:
-                        st.markdown("""
-                        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
-                            <span style="color:#38b2ac; font-size:1rem;">🛒</span>
-                            <strong style="color:#2d3748;">下游影响</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        down_impact = chain_detail.get("下游", "暂无")
-                        st.markdown(f"""
-                            <div class="chain-card" style="background-color:#f5f5f5; color:#2d3748;">
-                            {down_impact}
-                            </div>
-                            """, unsafe_allow_html=True)
+            # 显示完成提示
+            if analyze_clicked:
+                status_text.success(f"✅ 分析完成！本次分析耗时：{analysis_duration:.1f} 秒")
+            else:
+                status_text.info(f"📚 展示 {stored['分析时间']} 的历史分析结果，点击“开始分析”可重新分析")
 
-                    # 跨行业关系
-                    st.markdown('<div class="sub-header">跨行业替代/互补关系</div>', unsafe_allow_html=True)
-                    cross_industry = chain_impact.get("跨行业关系", [])
-                    if cross_industry:
-                        cross_html = "<div style='background-color:#f8fafc; border-radius:8px; padding:1rem;'>"
-                        for relation in cross_industry:
-                            cross_html += f"<div style='margin-bottom:0.8rem; padding-bottom:0.8rem; border-bottom:1px solid #e2e8f0;'>{relation}</div>"
-                        cross_html += "</div>"
-                        st.markdown(cross_html, unsafe_allow_html=True)
-                    else:
-                        st.write("暂无跨行业关系分析")
-
-                with tabs[4]:
-                    dynamic_adjust = result.get("动态调整支撑", {})
-
-                    # 调整触发条件
-                    # st.markdown('<div class="sub-header">动态调整触发条件</div>', unsafe_allow_html=True)
-
-
-                    # 风险提示
-                    st.markdown('<div class="sub-header">风险提示</div>', unsafe_allow_html=True)
-                    risk_tips = dynamic_adjust.get("风险提示", [])
-                    if risk_tips:
-                        risk_html = "<div style='background-color:#fff5f5; border-radius:8px; padding:1rem;'>"
-                        for risk in risk_tips:
-                            risk_html += f"<div style='margin-bottom:0.5rem; display:flex; align-items:flex-start; gap:0.5rem;'>"
-                            risk_html += f"<span style='color:#ef4444;'>⚠️</span><span>{risk}</span></div>"
-                        risk_html += "</div>"
-                        st.markdown(risk_html, unsafe_allow_html=True)
-                    else:
-                        st.write("暂无风险提示")
-
-                    # 时间窗口
-                    st.markdown('<div class="sub-header">影响时间窗口</div>', unsafe_allow_html=True)
-                    time_window = dynamic_adjust.get("时间窗口", "未知")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#718096; font-size:0.9rem;">持续影响周期</div>
-                        <div style="font-size:1.2rem; font-weight:600; color:#2d3748;">{time_window}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # 景气度得分走势（结果库中该行业的历次分析）
+            score_series = analyzer.result_store.score_series(selected_industry) if analyzer.result_store else []
+            if len(score_series) > 1:
+                with st.expander("📈 历次景气度得分走势"):
+                    st.line_chart(pd.DataFrame(score_series).set_index("分析时间")["景气度得分"])
 
-                # 原始数据
-                with st.expander("📋 查看原始分析数据"):
-                    st.json(result)
+            # 原始数据
+            with st.expander("📋 查看原始分析数据"):
+                st.json(result)
 
     elif analysis_mode == "公司风险分析":
         st.header("⚠️ 公司风险分析")
@@ -1818,333 +2208,60 @@ if analysis_mode != "数据看板":
                 risk_title = ""
                 risk_content = ""
 
-        # # 分析按钮
-        if st.button("🔍 分析风险", type="primary") and risk_content:
+        # # 分析按钮；该风险事件已分析过时直接展示历史结果
+        analyze_clicked = st.button("🔍 分析风险", type="primary") and risk_content
+        stored = None
+        if not analyze_clicked and risk_content and analyzer.result_store:
+            stored = analyzer.result_store.find("company", selected_company, risk_content)
+
+        if analyze_clicked or stored:
             # 记录开始时间
             start_time = datetime.datetime.now()
-            # 优化的加载提示
-            with st.spinner("""
-                               🤖 AI正在深度分析中...预计需要30-60秒：
-                           """):
-                # 模拟进度提示
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                # tabs = st.tabs(["📝 舆情识别", "🌐 影响传导", "📊 风险量化", "🛠️ 处置建议"])
-
-                # 模拟分步处理
-                status_text.text("正在进行舆情识别... (1/4)")
-                progress_bar.progress(25)
-                time.sleep(10)
-
-                status_text.text("正在分析关联影响... (2/4)")
-                progress_bar.progress(50)
-                time.sleep(10)
-
-                status_text.text("正在评估风险... (3/4)")
-                progress_bar.progress(75)
-                time.sleep(10)
-
-                status_text.text("正在生成处置建议... (4/4)")
-                progress_bar.progress(100)
-                # 进行分析
-                result = analyzer.analyze_company_risk(
-                    selected_company,
-                    risk_content,
-                    company_info
-                )
-
-                # 记录结束时间
-                end_time = datetime.datetime.now()
-                analysis_duration = (end_time - start_time).total_seconds()
-
-                # 清除进度提示
-                progress_bar.empty()
-                status_text.empty()
-
-                # 显示完成提示
-                st.success(f"✅ 分析完成！本次分析耗时：{analysis_duration:.1f} 秒")
-
-                # 结果展示
-                st.subheader("📊 风险分析结果")
-                col1, col2, col3, col4 = st.columns(4)
-
-                with col1:
-                    risk_type = result.get("负面舆情识别", {}).get("风险类型", [])
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">风险类型</div>
-                        <div style="font-size:0.95rem; line-height:1.5;">{get_risk_tag(risk_type, "risk_type")}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with col2:
-                    severity = result.get("负面舆情识别", {}).get("严重等级", "未知")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">严重等级</div>
-                        <div style="font-size:1.4rem; font-weight:600;">{get_risk_tag(severity, "severity")}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with col3:
-                    urgency = result.get("风险处置建议", {}).get("紧急处置等级", "未知")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">处置等级</div>
-                        <div style="font-size:1.1rem; font-weight:600;">{get_risk_tag(urgency, "urgency")}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with col4:
-                    risk_nature = result.get("负面舆情识别", {}).get("风险定性", "未知")
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div style="color:#64748b; font-size:0.9rem; margin-bottom:0.5rem">风险定性</div>
-                        <div style="font-size:1.1rem; font-weight:600; color:#dc2626;">{risk_nature}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                # ===================== 详细分析Tabs =====================
-                tabs = st.tabs(["📝 舆情识别", "🌐 影响传导", "📊 风险量化", "🛠️ 处置建议"])
-
-                with tabs[0]:
-                    # st.markdown("### 负面舆情精准识别")
-                    risk_identification = result.get("负面舆情识别", {})
-
-                    # 提前处理换行符（规避f-string反斜杠报错）
-                    processed_content = risk_content.replace('\n', '<br>').replace('\r\n',
-                                                                                   '<br>') if risk_content else "暂无舆情内容"
-                    # 标题兜底
-                    show_title = risk_title if risk_title else "暂无标题"
-
-                    # 一体化卡片：标题+内容在同一个容器内
-                    full_html = f"""
-                                           <div style="background-color:#f0f8fb; padding:1.5rem; border-radius:8px; margin-bottom:1.5rem;">
-                                               <!-- 标题行（加粗突出） -->
-                                               <div style="font-size:1.1rem; font-weight:700; color:#2d3748; margin-bottom:1rem; border-bottom:1px solid #e2e8f0; padding-bottom:0.8rem;">
-                                                   {show_title}
-                                               </div>
-                                               <!-- 内容行（紧跟标题下方） -->
-                                               <div style="font-size:1rem; color:#2d3748; line-height:1.8;">
-                                                   {processed_content}
-                                               </div>
-                                           </div>
-                                           """
-                    st.markdown(full_html, unsafe_allow_html=True)
-
-                    # 基础风险信息
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write("**风险类型:**")
-                        st.markdown(get_risk_tag(risk_identification.get("风险类型", []), "risk_type"), unsafe_allow_html=True)
-                    with col2:
-                        st.write("**严重等级:**")
-                        st.markdown(get_risk_tag(risk_identification.get("严重等级", "未知"), "severity"),
-                                    unsafe_allow_html=True)
-                    with col3:
-                        st.write("**风险定性:**")
-                        st.write(
-                            f"<span style='color:#dc2626; font-weight:600;'>{risk_identification.get('风险定性', '未知')}</span>",
-                            unsafe_allow_html=True)
-
-                with tabs[1]:
-                    st.markdown("### 影响范围与传导路径")
-                    impact_scope = result.get("影响范围与传导路径", {})
-
-                    # 基础影响信息
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("**影响范围:**")
-                        scope = impact_scope.get("影响范围", "未知")
-                        scope_color = "#dc2626" if scope == "全行业" else "#f59e0b" if scope == "关联企业" else "#10b981"
-                        st.write(f"<span style='color:{scope_color}; font-weight:600;'>{scope}</span>", unsafe_allow_html=True)
-
-                        st.write("**直接影响对象:**")
-                        impact_objects = impact_scope.get("直接影响对象", [])
-                        if impact_objects:
-                            obj_html = "<ul style='padding-left:1.2rem; line-height:1.8;'>"
-                            for obj in impact_objects:
-                                obj_html += f"<li>{obj}</li>"
-                            obj_html += "</ul>"
-                            st.markdown(obj_html, unsafe_allow_html=True)
-                        else:
-                            st.write("未知")
-
-                    # with col2:
-                    #     # 传导路径分析
-                    #     st.write("**传导路径概览:**")
-                    #     st.markdown(f"""
-                    #     <div style="background-color:#f1f5f9; padding:1rem; border-radius:6px; height:100%;">
-                    #         <strong>市场传导:</strong> {impact_scope.get('传导路径分析', {}).get('市场传导', '未知')}
-                    #     </div>
-                    #     """, unsafe_allow_html=True)
-
-                    # 详细传导路径
-                    st.markdown('<div class="sub-header">传导路径详细分析</div>', unsafe_allow_html=True)
-                    transfer_analysis = impact_scope.get("传导路径分析", {})
-
-                    col_up, col_mid, col_down = st.columns(3)
-                    with col_up:
-                        st.markdown("""
-                        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
-                            <span style="color:#ef4444; font-size:1rem;">🔴</span>
-                            <strong style="color:#1e293b;">内部传导</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.markdown(f"""
-                            <div style="background-color:#fef2f2; padding:0.8rem; border-radius:6px; height:100%;">
-                            {transfer_analysis.get('内部传导', '暂无')}
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                    with col_mid:
-                        st.markdown("""
-                        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
-                            <span style="color:#f59e0b; font-size:1rem;">🟡</span>
-                            <strong style="color:#1e293b;">外部传导</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.markdown(f"""
-                            <div style="background-color:#fffbeb; padding:0.8rem; border-radius:6px; height:100%;">
-                            {transfer_analysis.get('外部传导', '暂无')}
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                    with col_down:
-                        st.markdown("""
-                        <div style="display:flex; align-items:center; gap:0.5rem; margin-bottom:0.5rem;">
-                            <span style="color:#3b82f6; font-size:1rem;">🔵</span>
-                            <strong style="color:#1e293b;">市场传导</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.markdown(f"""
-                            <div style="background-color:#eff6ff; padding:0.8rem; border-radius:6px; height:100%;">
-                            {transfer_analysis.get('市场传导', '暂无')}
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                with tabs[2]:
-                    st.markdown("### 风险量化评估")
-                    risk_quantify = result.get("风险量化评估", {})
-
-                    # 核心量化指标
-                    col3, col4 = st.columns(2)
-
-                    with col3:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="color:#64748b; font-size:0.9rem;">损失预估</div>
-                            <div style="font-size:0.95rem; font-weight:600; margin-top:0.5rem;">{risk_quantify.get('损失预估', '未知')}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col4:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="color:#64748b; font-size:0.9rem;">市场影响程度</div>
-                            <div style="font-size:0.95rem; font-weight:600; margin-top:0.5rem;">{risk_quantify.get('市场影响程度', '未知')}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    # # 风险矩阵可视化（优化版）
-                    # st.markdown('<div class="sub-header">风险矩阵分析</div>', unsafe_allow_html=True)
-                    # # 重新定义映射关系（适配新的风险等级）
-                    # severity_map = {"高": 90, "中": 60, "低": 30}
-                    # # 基于偿债能力影响定义影响分数
-                    # impact_map = {"严重削弱": 90, "一定影响": 60, "基本无影响": 30}
-                    #
-                    # severity_score = severity_map.get(result.get("负面舆情识别", {}).get("严重等级"), 50)
-                    # impact_score = impact_map.get(risk_quantify.get("偿债能力影响", "基本无影响"), 50)
-                    #
-                    # fig = go.Figure()
-                    #
-                    # # 添加风险区域（红/黄/绿）
-                    # fig.add_shape(type="rect", x0=0, y0=0, x1=50, y1=50, fillcolor="green", opacity=0.1, line_width=0,
-                    #               name="低风险")
-                    # fig.add_shape(type="rect", x0=50, y0=0, x1=100, y1=50, fillcolor="yellow", opacity=0.1,
-                    #               line_width=0, name="中风险")
-                    # fig.add_shape(type="rect", x0=0, y0=50, x1=50, y1=100, fillcolor="yellow", opacity=0.1,
-                    #               line_width=0)
-                    # fig.add_shape(type="rect", x0=50, y0=50, x1=100, y1=100, fillcolor="red", opacity=0.2, line_width=0,
-                    #               name="高风险")
-                    #
-                    # # 添加风险点（带企业名称）- 完全符合 Plotly Scatter 规范
-                    # fig.add_trace(go.Scatter(
-                    #     x=[severity_score],
-                    #     y=[impact_score],
-                    #     mode='markers+text',
-                    #     marker=dict(size=25, color='red', symbol='triangle-up'),
-                    #     text=[selected_company],
-                    #     textposition="top center",
-                    #     # 正确配置：textfont 仅用支持的属性，加粗通过 "Bold" 字体实现
-                    #     textfont=dict(
-                    #         size=12,  # 字体大小（支持）
-                    #         color="black",  # 字体颜色（支持）
-                    #         family="Arial Bold, Times New Roman Bold"  # 加粗字体（核心修复点）
-                    #     ),
-                    #     name="当前风险位置"
-                    # ))
-                    #
-                    # # 布局优化
-                    # fig.update_layout(
-                    #     title="风险矩阵（严重程度 vs 偿债能力影响）",
-                    #     xaxis_title="风险严重程度（高→低）",
-                    #     yaxis_title="偿债能力影响（高→低）",
-                    #     xaxis_range=[0, 100],
-                    #     yaxis_range=[0, 100],
-                    #     height=450,
-                    #     showlegend=True,
-                    #     legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-                    # )
-                    # st.plotly_chart(fig, use_container_width=True)
-
-                with tabs[3]:
-                    st.markdown("### 风险处置建议")
-                    disposal = result.get("风险处置建议", {})
-
-                    # 紧急处置等级
-                    # st.write("**紧急处置等级:**")
-                    # st.markdown(get_risk_tag(disposal.get("紧急处置等级", "未知"), "urgency"), unsafe_allow_html=True)
-
-                    # 分场景处置措施
-                    # st.markdown('<div class="sub-header">分场景处置措施</div>', unsafe_allow_html=True)
-                    measures = disposal.get("分场景处置措施", {})
-
-                    # 持仓机构操作建议
-                    st.markdown("#### 📈 持仓机构操作建议")
-                    st.markdown(f"""
-                    <div class="suggestion-card">
-                        {measures.get('持仓机构操作建议', '暂无具体建议')}
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                    # 风险对冲策略
-                    st.markdown("#### 🛡️ 风险对冲策略")
-                    st.markdown(f"""
-                    <div class="suggestion-card" style="border-left-color:#8b5cf6;">
-                        {measures.get('风险对冲策略', '暂无具体建议')}
-                    </div>
-                    """, unsafe_allow_html=True)
+            status_text = st.empty()
+            status_text.info("🤖 AI正在深度分析中，各板块生成后将依次展示...")
+
+            # 结果展示
+            st.subheader("📊 风险分析结果")
+            metrics_placeholder = st.empty()
+
+            # ===================== 详细分析Tabs（流式渲染） =====================
+            tabs = st.tabs(["📝 舆情识别", "🌐 影响传导", "📊 风险量化", "🛠️ 处置建议"])
+            section_views = {
+                "负面舆情识别": lambda r: render_company_identify_tab(r, risk_title, risk_content),
+                "影响范围与传导路径": render_company_impact_tab,
+                "风险量化评估": render_company_quantify_tab,
+                "风险处置建议": render_company_disposal_tab
+            }
+            if analyze_clicked:
+                stream = analyzer.stream_company_risk(selected_company, risk_content, company_info)
+            else:
+                stream = iter([(None, stored["结果"])])
+            result = stream_render_sections(
+                stream, tabs, section_views, metrics_placeholder, render_company_metrics,
+                metric_sections=("负面舆情识别", "风险处置建议")
+            )
 
-                    # 投后管理措施
-                    st.markdown("#### 📊 投后管理措施")
-                    st.markdown(f"""
-                    <div class="suggestion-card" style="border-left-color:#14b8a6;">
-                        {measures.get('投后管理措施', '暂无具体建议')}
-                    </div>
-                    """, unsafe_allow_html=True)
+            # 记录结束时间
+            end_time = datetime.datetime.now()
+            analysis_duration = (end_time - start_time).total_seconds()
 
-                    # 风险缓释手段
-                    st.markdown('<div class="sub-header">风险缓释手段分析</div>', unsafe_allow_html=True)
-                    st.markdown(f"""
-                    <div style="background-color:#ecfdf5; padding:1rem; border-radius:6px; border-left:4px solid #10b981;">
-                        {disposal.get('风险缓释手段', '暂无分析')}
-                    </div>
-                    """, unsafe_allow_html=True)
+            # 显示完成提示
+            if analyze_clicked:
+                status_text.success(f"✅ 分析完成！本次分析耗时：{analysis_duration:.1f} 秒")
+            else:
+                status_text.info(f"📚 展示 {stored['分析时间']} 的历史分析结果，点击“分析风险”可重新分析")
 
+            # 该公司的历次风险分析
+            history = analyzer.result_store.history("company", selected_company, limit=20) \
+                if analyzer.result_store else []
+            if len(history) > 1:
+                with st.expander("🗂️ 历次风险分析"):
+                    st.dataframe(pd.DataFrame(history)[["分析时间", "等级", "舆情ID"]]
+                                 .rename(columns={"等级": "严重等级"}), use_container_width=True)
 
-                # ===================== 原始数据展开栏 =====================
-                with st.expander("📋 查看原始分析数据（JSON）", expanded=False):
-                    st.json(result, expanded=False)
+            # ===================== 原始数据展开栏 =====================
+            with st.expander("📋 查看原始分析数据（JSON）", expanded=False):
+                st.json(result, expanded=False)
 
     elif analysis_mode == "批量舆情分析":
         st.header("📰 批量舆情分析")
@@ -2235,14 +2352,37 @@ if analysis_mode != "数据看板":
     else:  # 投资建议生成
         st.header("💰 投资建议生成")
 
-        # 准备分析结果
-        news_list = integrator.prepare_news_for_analysis(max_news=3)
-        analysis_results = analyzer.batch_analyze_news(news_list)
+        # 组合信号随行业/公司分析结果增量更新，页面重跑不再重复分析
+        signals = analyzer.portfolio.snapshot()
 
-        if not analysis_results:
-            st.warning("请先进行舆情分析")
+        if not signals["结果数"]:
+            st.warning("暂无分析结果，可先分析最新舆情")
+            if st.button("🔍 分析最新舆情"):
+                with st.spinner("批量分析中..."):
+                    analyzer.batch_analyze_news(integrator.prepare_news_for_analysis(max_news=3))
+                st.rerun()
             st.stop()
 
+        # 组合信号
+        st.subheader("组合舆情信号")
+        st.caption(f"基于 {signals['结果数']} 条分析结果（近期结果权重更高）")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.write("**行业景气度信号**")
+            if signals["行业"]:
+                st.dataframe(pd.DataFrame(signals["行业"]), use_container_width=True, hide_index=True)
+            else:
+                st.caption("暂无行业分析结果")
+
+        with col2:
+            st.write("**公司风险信号**")
+            if signals["公司"]:
+                st.dataframe(pd.DataFrame(signals["公司"]), use_container_width=True, hide_index=True)
+            else:
+                st.caption("暂无公司分析结果")
+
         # 投资组合配置
         st.subheader("投资组合配置")
 
@@ -2278,14 +2418,15 @@ if analysis_mode != "数据看板":
                     "当前持仓": current_holdings
                 }
 
-                # 生成投资建议
-                suggestions = analyzer.generate_investment_suggestions(
-                    analysis_results,
-                    portfolio_info
-                )
+                # 生成投资建议（组合信号无实质变化时复用上次建议）
+                suggestions = analyzer.generate_investment_suggestions(portfolio_info=portfolio_info)
 
                 # 显示建议
-                st.success("✅ 投资建议生成完成")
+                generation = suggestions.get("生成信息", {})
+                if generation.get("重新生成"):
+                    st.success(f"✅ 投资建议生成完成（{'；'.join(generation['触发原因'][:5])}）")
+                else:
+                    st.info(f"📚 组合信号无实质变化，展示 {generation.get('上次生成')} 生成的投资建议")
 
                 # 整体策略
                 st.subheader("📋 整体投资策略")
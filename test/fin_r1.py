@@ -1,9 +1,15 @@
 import os
+import sys
 import json
-from openai import OpenAI
 from dotenv import load_dotenv
 import streamlit as st
 
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.llm_client import get_openai_client
+
 # 加载本地.env文件（本地调试用，云端用Streamlit Secrets）
 load_dotenv()
 
@@ -15,10 +21,7 @@ class FinR1SentimentTester:
         if not self.api_key:
             raise ValueError("请配置GITEE_AI_API_KEY（本地.env或云端Secrets）")
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://ai.gitee.com/api/v1"
-        )
+        self.client = get_openai_client(self.api_key, "https://ai.gitee.com/api/v1")
         self.model = "fin-r1"
         print("✅ fin-r1测试客户端初始化完成")
 
@@ -0,0 +1,116 @@
+# test/mock_crawl_server.py
+"""
+本地模拟采集站点（采集传输层/并发引擎/礼貌度/增量采集测试用）
+
+每个请求由respond(request, count)决定响应内容：request为请求处理器（可读取path/headers），
+count为该请求的序号（从1开始）；返回(状态码, 响应体, 额外响应头)。
+服务端记录请求数、客户端连接端口、同时处理的最大请求数与各请求的路径/请求头。
+
+用法：
+    server = MockCrawlServer(lambda request, count: (200, "<h3>新闻</h3>", {})).start()
+    requests.get(server.url("/roll"))
+    server.stop()
+"""
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+
+def echo_path(request, count):
+    """默认响应：返回"页面+请求路径\""""
+    return 200, f"页面{request.path}", {}
+
+
+class MockCrawlServer:
+    """
+    本地模拟采集站点
+
+    Args:
+        respond: 响应函数respond(request, count) -> (status, body, headers)，body为str或bytes
+        delay: 每个请求的处理耗时（秒）
+        host/port: 监听地址，port=0时自动分配
+    """
+
+    def __init__(self, respond=echo_path, delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.respond = respond
+        self.delay = delay
+
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.client_ports = set()
+        # 各请求的(路径, 请求头)
+        self.history = []
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        """站点host:port（与传输层/礼貌度统计中的站点一致）"""
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def base(self) -> str:
+        return f"http://{self.host}"
+
+    def url(self, path: str = "/") -> str:
+        return self.base + path
+
+    def start(self):
+        """后台线程启动"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    count = server.requests
+                    server.client_ports.add(self.client_address[1])
+                    server.history.append((self.path, dict(self.headers)))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    status, body, headers = server.respond(self, count)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+                body = body.encode("utf-8") if isinstance(body, str) else (body or b"")
+                self.send_response(status)
+                headers = {"Content-Type": "text/html; charset=utf-8", **(headers or {})}
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                # 304响应不带响应体
+                if status != 304:
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,475 @@
+# test/mock_llm_server.py
+"""
+本地OpenAI兼容模拟大模型服务（离线压测/延迟测试用）
+
+按提示词类型返回符合JSON框架的结果，支持可配置的延迟分布、输出速率、错误/429注入与流式输出；
+按系统提示词模拟服务端前缀缓存（用量中返回prompt_cache_hit_tokens/prompt_cache_miss_tokens）。
+
+用法：
+    python test/mock_llm_server.py --port 8765 --latency lognormal:1.5 --token-rate 40 --rate-limit-rate 0.05
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8765/v1 streamlit run frontend/app.py
+"""
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.rate_limiter import estimate_tokens
+from core.prompt_templates import RISK_TYPES
+
+
+# ===================== 模拟结果生成 =====================
+def _mock_industry_result(rng: random.Random, industry: str) -> dict:
+    """行业景气度分析结果（评分拆解之和等于总分，评级与得分一致）"""
+    parts = {
+        "政策支撑度": rng.randint(5, 30),
+        "技术成熟度": rng.randint(5, 25),
+        "市场需求": rng.randint(5, 25),
+        "产业链配套": rng.randint(5, 20)
+    }
+    score = sum(parts.values())
+    if score >= 80:
+        level, strategy = "高涨", "超配"
+    elif score >= 60:
+        level, strategy = "良好", "标配"
+    elif score >= 30:
+        level, strategy = "一般", "低配"
+    else:
+        level, strategy = "低迷", "规避"
+    tendency = "利好" if score >= 60 else rng.choice(["中性", "利空"])
+
+    return {
+        "舆情属性": {
+            "舆情类型": rng.sample(["行业政策", "技术突破", "市场需求", "竞争格局", "风险事件"], 2),
+            "舆情倾向": tendency,
+            "影响强度": rng.choice(["高", "中", "低"]),
+            "具体影响": f"预计拉动{industry}行业年度营收增长{rng.randint(5, 15)}%-{rng.randint(16, 25)}%"
+        },
+        "景气度分析": {
+            "景气度评级": level,
+            "景气度得分": score,
+            "评分拆解": parts
+        },
+        "资产标的与配置": {
+            "关联资产标的": {
+                "股票": [f"{industry}龙头A 600{rng.randint(100, 999)}", f"{industry}龙头B 300{rng.randint(100, 999)}"],
+                "债券": [f"{industry}产业债AAA级"]
+            },
+            "配置调整建议": {
+                "行业配置策略": strategy,
+                "标的调整方向": {"股票": "增持" if score >= 60 else "减持", "债券": "持有"},
+                "调整幅度建议": f"股票配置比例调整{rng.randint(2, 5)}%-{rng.randint(6, 10)}%",
+                "风险收益比": f"潜在收益{rng.randint(10, 20)}%-{rng.randint(21, 30)}%，下行风险{rng.randint(5, 15)}%以内"
+            }
+        },
+        "产业链与跨行业影响": {
+            "受益行业": ["储能行业：需求增长带动配套扩张"],
+            "受损行业": ["传统火电行业：替代效应导致装机下滑"],
+            "产业链影响": {
+                "上游": f"原材料价格预计上涨{rng.randint(3, 10)}%",
+                "中游": f"产能利用率提升至{rng.randint(75, 95)}%",
+                "下游": f"终端需求增长{rng.randint(5, 20)}%"
+            },
+            "跨行业关系": ["光伏行业与风电行业：互补关系，分散配置可降低政策波动风险"]
+        },
+        "动态调整支撑": {
+            "风险提示": [f"{industry}行业：政策退坡风险"],
+            "时间窗口": f"{rng.randint(3, 12)}个月"
+        }
+    }
+
+
+def _mock_company_result(rng: random.Random, company: str) -> dict:
+    """公司风险分析结果"""
+    level = rng.choice(["高", "中", "低"])
+    return {
+        "负面舆情识别": {
+            "风险类型": rng.sample(RISK_TYPES, 2),
+            "风险事件详情": f"{company}发生{rng.randint(1, 20)}亿元债务逾期，涉及{rng.randint(2, 6)}家金融机构",
+            "严重等级": level,
+            "风险定性": {"高": "实质性违约风险", "中": "潜在违约风险", "低": "舆情扰动风险"}[level]
+        },
+        "影响范围与传导路径": {
+            "影响范围": rng.choice(["单一主体", "关联企业", "全行业"]),
+            "直接影响对象": [f"25{company[:2]}债01（代码1{rng.randint(10000, 99999)}）"],
+            "传导路径分析": {
+                "内部传导": f"经营现金流预计下降{rng.randint(10, 40)}%",
+                "外部传导": "担保人及上下游供应商回款承压",
+                "市场传导": f"同行业信用利差预计走阔{rng.randint(20, 150)}BP"
+            }
+        },
+        "风险量化评估": {
+            "损失预估": f"直接损失{rng.randint(1, 5)}-{rng.randint(6, 12)}亿元",
+            "市场影响程度": f"预计债券价格下跌{rng.randint(5, 15)}-{rng.randint(16, 30)}元"
+        },
+        "风险处置建议": {
+            "紧急处置等级": {"高": "立即处置", "中": "近期关注（7日内）", "低": "常规监控（30日内）"}[level],
+            "分场景处置措施": {
+                "持仓机构操作建议": f"减持持仓规模的{rng.randint(20, 50)}%",
+                "风险对冲策略": "买入信用违约互换对冲",
+                "投后管理措施": "核查发行人货币资金真实性"
+            },
+            "风险缓释手段": "核查担保人代偿能力"
+        }
+    }
+
+
+def _mock_general_result(rng: random.Random) -> dict:
+    return {
+        "舆情性质": rng.choice(["正面", "负面", "中性"]),
+        "影响范围": rng.choice(["个体", "行业", "系统性"]),
+        "紧急程度": rng.choice(["高", "中", "低"]),
+        "关键要点": ["要点一", "要点二", "要点三"],
+        "建议行动": "持续跟踪后续进展"
+    }
+
+
+def _mock_suggestions(rng: random.Random) -> dict:
+    return {
+        "整体策略": {"市场观点": rng.choice(["乐观", "谨慎", "中性"]), "风险偏好": "稳健", "仓位建议": f"{rng.randint(40, 80)}%"},
+        "行业配置建议": {"推荐增持": ["新能源"], "建议减持": ["房地产"], "建议关注": ["半导体"]},
+        "个股操作建议": {"推荐关注": [], "建议回避": [], "仓位调整建议": "维持现有仓位"},
+        "风险控制": {"主要风险点": ["政策变化"], "止损建议": "单只标的亏损10%止损", "对冲策略": "股指期货对冲"},
+        "监控重点": {"监控指标": ["信用利差"], "关键时间节点": ["季报披露"], "预警信号": ["评级下调"]}
+    }
+
+
+def _mock_generated_data(rng: random.Random, prompt: str, system_prompt: str) -> dict:
+    """数据生成器（行业/公司/政策/风险事件）模拟数据"""
+    count_match = re.search(r"生成(\d+)(?:家|条)", prompt)
+    count = int(count_match.group(1)) if count_match else 1
+
+    if "上市公司" in prompt and "风险事件" not in prompt:
+        items = [{"公司名称": f"模拟科技股份有限公司{i + 1}", "股票代码": f"{rng.randint(600000, 699999)}",
+                  "总市值": round(rng.uniform(50, 2000), 2), "资产负债率": round(rng.uniform(0.2, 0.8), 2),
+                  "风险评分": rng.randint(10, 90)} for i in range(count)]
+        return {"公司列表": items}
+    if "政策新闻" in prompt:
+        items = [{"标题": f"模拟政策新闻{i + 1}", "内容": "相关部门发布支持政策。", "影响类型": rng.choice(["利好", "利空", "中性"]),
+                  "影响程度": round(rng.random(), 2), "发布时间": "2025-01-01 09:00:00"} for i in range(count)]
+        return {"政策列表": items}
+    if "风险事件" in prompt:
+        items = [{"事件标题": f"模拟风险事件{i + 1}", "事件内容": "公司披露债务逾期公告。",
+                  "风险类型": "财务风险", "严重程度": rng.choice(["高", "中", "低"]),
+                  "事件时间": "2025-01-01 09:00:00"} for i in range(count)]
+        return {"事件列表": items}
+
+    industry_match = re.search(r"关于(.+?)行业的详细结构化数据", prompt)
+    industry = industry_match.group(1) if industry_match else "模拟"
+    return {"行业名称": industry, "行业代码": "MK", "产业链位置": "中游", "行业周期": "成长期",
+            "预期增长率": round(rng.uniform(0, 0.3), 2), "ESG评分": round(rng.uniform(40, 90), 1)}
+
+
+def build_mock_content(messages: list, rng: random.Random) -> str:
+    """根据提示词类型生成模拟响应文本（JSON字符串）"""
+    system_prompt = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    prompt = "".join(m.get("content", "") for m in messages if m.get("role") != "system")
+
+    # 单条/打包/补问的分析要求在系统提示词中，用户消息只包含舆情内容
+    if '{"结果": [...]}' in prompt:
+        # 打包分析：按舆情序号逐条返回
+        numbers = [int(n) for n in re.findall(r"## 舆情(\d+)", prompt)]
+        names = re.findall(r"\*\*目标(?:行业|企业)：\*\*(.+)", prompt)
+        is_company = "负面舆情识别" in system_prompt
+        items = []
+        for no, name in zip(numbers, names):
+            item = _mock_company_result(rng, name) if is_company else _mock_industry_result(rng, name)
+            items.append({"序号": no, **item})
+        result = {"结果": items}
+    elif "负面舆情识别" in system_prompt:
+        match = re.search(r"\*\*目标企业：\*\*(.+)", prompt)
+        result = _mock_company_result(rng, match.group(1).strip() if match else "目标企业")
+    elif "景气度分析" in system_prompt + prompt:
+        match = re.search(r"\*\*目标行业：\*\*(.+)", prompt)
+        result = _mock_industry_result(rng, match.group(1).strip() if match else "目标")
+    elif "综合投资建议" in prompt:
+        result = _mock_suggestions(rng)
+    elif "请分析以下金融舆情" in prompt:
+        result = _mock_general_result(rng)
+    else:
+        result = _mock_generated_data(rng, prompt, system_prompt)
+
+    return json.dumps(result, ensure_ascii=False, indent=2)
+
+
+# ===================== 延迟分布 =====================
+def parse_latency(spec: str):
+    """
+    解析延迟分布配置，返回无参采样函数（秒）
+
+    支持：fixed:1.0 / uniform:0.5,2.0 / normal:1.0,0.3 / lognormal:1.0[,0.5]（均值,对数标准差）
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v] or [0.0]
+
+    def sampler(rng: random.Random) -> float:
+        if kind == "fixed":
+            return values[0]
+        if kind == "uniform":
+            return rng.uniform(values[0], values[1])
+        if kind == "normal":
+            return max(0.0, rng.gauss(values[0], values[1]))
+        if kind == "lognormal":
+            if values[0] <= 0:
+                return 0.0
+            sigma = values[1] if len(values) > 1 else 0.5
+            # 使分布均值等于配置的均值
+            return rng.lognormvariate(math.log(values[0]) - sigma ** 2 / 2, sigma)
+        raise ValueError(f"不支持的延迟分布：{spec}")
+
+    return sampler
+
+
+# ===================== HTTP服务 =====================
+class MockLLMServer:
+    """
+    OpenAI兼容模拟服务
+
+    Args:
+        host/port: 监听地址，port为0时自动分配
+        latency: 首Token延迟分布（见parse_latency）
+        token_rate: 输出速率（Token/秒），0表示不限速
+        error_rate: 返回500错误的概率
+        rate_limit_rate: 返回429的概率
+        retry_after: 429响应的Retry-After秒数
+        max_concurrency: 服务端并发上限，超出直接返回429（0表示不限制）
+        seed: 随机种子，保证压测可复现
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, latency: str = "fixed:0",
+                 token_rate: float = 0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0, max_concurrency: int = 0, seed: int = 42):
+        self.latency = parse_latency(latency)
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_concurrency = max_concurrency
+        self.rng = random.Random(seed)
+
+        self.in_flight = 0
+        # 服务端观测到的最大同时在途请求数
+        self.peak_in_flight = 0
+        self.counters = {"请求数": 0, "成功": 0, "429": 0, "500": 0}
+        self._lock = threading.Lock()
+        # 已缓存的系统提示词前缀
+        self._prefixes = set()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """供OpenAI客户端使用的base_url"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """后台线程启动（测试中使用）"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _draw(self):
+        """加锁抽取本次请求的随机参数（共享随机源保证可复现）"""
+        with self._lock:
+            return self.rng.random(), self.latency(self.rng), random.Random(self.rng.random())
+
+    def _prefix_cache_hit(self, messages: list) -> int:
+        """模拟前缀缓存：系统提示词此前出现过即视为命中（按64Token为单位计）"""
+        system_prompt = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        if not system_prompt:
+            return 0
+        with self._lock:
+            if system_prompt not in self._prefixes:
+                self._prefixes.add(system_prompt)
+                return 0
+        return estimate_tokens(system_prompt) // 64 * 64
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [
+                        {"id": "deepseek-chat", "object": "model", "owned_by": "mock"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                with server._lock:
+                    server.counters["请求数"] += 1
+                    overloaded = server.max_concurrency and server.in_flight >= server.max_concurrency
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                try:
+                    self._handle_completion(payload, overloaded)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _handle_completion(self, payload: dict, overloaded: bool):
+                roll, ttft, rng = server._draw()
+
+                if overloaded or roll < server.rate_limit_rate:
+                    with server._lock:
+                        server.counters["429"] += 1
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                    {"Retry-After": str(server.retry_after)})
+                    return
+                if roll < server.rate_limit_rate + server.error_rate:
+                    with server._lock:
+                        server.counters["500"] += 1
+                    time.sleep(ttft)
+                    self._send_json(500, {"error": {"message": "Mock internal error", "type": "server_error"}})
+                    return
+
+                messages = payload.get("messages", [])
+                content = build_mock_content(messages, rng)
+                prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+                completion_tokens = estimate_tokens(content)
+                cache_hit_tokens = server._prefix_cache_hit(messages)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens,
+                         "prompt_cache_hit_tokens": cache_hit_tokens,
+                         "prompt_cache_miss_tokens": prompt_tokens - cache_hit_tokens}
+                model = payload.get("model", "deepseek-chat")
+                completion_id = f"chatcmpl-mock-{rng.randint(0, 10 ** 9)}"
+
+                time.sleep(ttft)
+                if payload.get("stream"):
+                    self._stream(content, model, completion_id, usage)
+                else:
+                    if server.token_rate:
+                        time.sleep(completion_tokens / server.token_rate)
+                    self._send_json(200, {
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": usage
+                    })
+
+                with server._lock:
+                    server.counters["成功"] += 1
+
+            def _stream(self, content: str, model: str, completion_id: str, usage: dict):
+                """SSE流式输出，按token_rate匀速发送"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def send(delta: dict, finish_reason=None, extra: dict = None):
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                    chunk.update(extra or {})
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                step = 8  # 每个分片的字符数
+                for i in range(0, len(content), step):
+                    piece = content[i:i + step]
+                    if server.token_rate:
+                        time.sleep(estimate_tokens(piece) / server.token_rate)
+                    send({"content": piece})
+                send({}, finish_reason="stop", extra={"usage": usage})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+# ===================== 测试辅助 =====================
+def build_analyzer(base_url: str, tmp_path, monkeypatch, use_cache: bool = True):
+    """
+    构造指向模拟服务的舆情分析器（走完整初始化流程）
+
+    缓存/相似复用/结果库写入测试临时目录，遥测、模型路由、请求合并、组合信号等进程级单例
+    在本测试内重新创建，测试之间互不影响
+    """
+    import core.sentiment_analyzer as sentiment_analyzer
+    from core import llm_telemetry, model_router, portfolio_aggregator, single_flight
+
+    monkeypatch.setattr(sentiment_analyzer, "LLM_BASE_URL", base_url)
+    monkeypatch.setattr(sentiment_analyzer, "LLM_CACHE_DB_PATH", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(sentiment_analyzer, "LLM_NEAR_DUP_DB_PATH", str(tmp_path / "near_duplicate.db"))
+    monkeypatch.setattr(sentiment_analyzer, "LLM_RESULT_STORE_DB_PATH", str(tmp_path / "analysis_results.db"))
+    monkeypatch.setattr(llm_telemetry, "LLM_TELEMETRY_PATH", str(tmp_path / "telemetry.jsonl"))
+    monkeypatch.setattr(llm_telemetry, "_shared_telemetry", None)
+    monkeypatch.setattr(model_router, "_shared_router", None)
+    monkeypatch.setattr(portfolio_aggregator, "_shared_aggregator", None)
+    monkeypatch.setattr(single_flight, "_shared_flight", None)
+    return sentiment_analyzer.FinancialSentimentAnalyzer(api_key="mock", use_cache=use_cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI兼容模拟大模型服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:1.0,0.5",
+                        help="首Token延迟分布：fixed:1.0 / uniform:0.5,2.0 / normal:1.0,0.3 / lognormal:1.0,0.5")
+    parser.add_argument("--token-rate", type=float, default=50, help="输出速率（Token/秒），0表示不限速")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500错误注入概率")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429注入概率")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429响应的Retry-After秒数")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="服务端并发上限，超出返回429")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.token_rate, args.error_rate,
+                           args.rate_limit_rate, args.retry_after, args.max_concurrency, args.seed)
+    print(f"✅ 模拟大模型服务已启动：{server.url}")
+    print(f"   设置 DEEPSEEK_BASE_URL={server.url} 即可让舆情分析器/数据生成器使用本服务")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n服务已停止，请求统计：{server.counters}")
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
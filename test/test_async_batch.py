@@ -0,0 +1,50 @@
+# test/test_async_batch.py
+import sys
+import os
+import asyncio
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from mock_llm_server import MockLLMServer, build_analyzer
+
+
+def _news(count: int):
+    industries = ["新能源", "半导体", "医药", "银行", "房地产", "煤炭", "军工", "消费"]
+    return [{"title": f"舆情{i}", "content": f"{industries[i % len(industries)]}行业第{i}条政策消息",
+             "source": "测试", "related_industry": industries[i % len(industries)]} for i in range(count)]
+
+
+def test_results_keep_input_order_and_bounded_concurrency(tmp_path, monkeypatch):
+    """测试并发分析结果顺序与输入一致，服务端同时在途请求数不超过并发上限"""
+    server = MockLLMServer(port=0, latency="uniform:0.05,0.3").start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch, use_cache=False)
+        news_list = _news(8)
+        results = asyncio.run(analyzer.abatch_analyze_news(news_list, concurrency=3))
+    finally:
+        server.stop()
+
+    assert [r["新闻标题"] for r in results] == [n["title"] for n in news_list], "结果顺序应与输入一致"
+    assert [r["行业名称"] for r in results] == [n["related_industry"] for n in news_list]
+    assert server.counters["请求数"] == 8
+    assert 1 < server.peak_in_flight <= 3, f"在途请求数应受并发上限约束：{server.peak_in_flight}"
+
+
+def test_single_failure_isolated(tmp_path, monkeypatch):
+    """测试单条舆情分析失败只标记该条，不影响批次内其他条目"""
+    server = MockLLMServer(port=0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch, use_cache=False)
+        news_list = _news(4)
+        # 缺少舆情内容的条目在构造提示词时失败
+        del news_list[1]["content"]
+        results = analyzer.batch_analyze_news(news_list, concurrency=2)
+    finally:
+        server.stop()
+
+    assert results[1]["分析类型"] == "分析失败" and results[1]["新闻标题"] == "舆情1"
+    assert all(r.get("解析状态") != "失败" and "景气度分析" in r for i, r in enumerate(results) if i != 1), \
+        "其他条目应正常返回分析结果"
+    assert server.counters["请求数"] == 3
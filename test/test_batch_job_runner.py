@@ -0,0 +1,128 @@
+# test/test_batch_job_runner.py
+import sys
+import os
+import json
+import threading
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.batch_job_runner import BatchJobRunner, news_id, write_news_jsonl, read_news_jsonl
+
+
+class FakeAnalyzer:
+    """记录调用次数的假分析器，fail_ids中的舆情抛出异常"""
+
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def analyze_news(self, news):
+        with self._lock:
+            self.calls.append(news["id"])
+        if news["id"] in self.fail_ids:
+            raise RuntimeError("模拟接口失败")
+        return {"分析类型": "公司风险分析", "公司名称": news["related_company"]}
+
+    def _attach_news_meta(self, result, news):
+        return {**result, "新闻标题": news.get("title", "")}
+
+
+def _news(n):
+    return [{"id": f"n{i}", "title": f"标题{i}", "content": f"内容{i}", "related_company": f"公司{i}"}
+            for i in range(n)]
+
+
+def _output_ids(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_news_id_and_jsonl_roundtrip(tmp_path):
+    """测试无id舆情生成稳定ID，JSONL读写保持一致"""
+    news = {"title": "某公司债务逾期", "content": "内容", "related_company": "某公司"}
+    assert news_id(news) == news_id(dict(news)), "相同舆情ID应稳定"
+    assert news_id({**news, "content": "其他内容"}) != news_id(news)
+
+    path = str(tmp_path / "news.jsonl")
+    assert write_news_jsonl([news], path) == 1
+    loaded = read_news_jsonl(path)
+    assert loaded[0]["id"] == news_id(news) and loaded[0]["title"] == news["title"]
+
+
+def test_resume_skips_completed_and_retries_failed(tmp_path):
+    """测试失败项不写检查点，重跑时仅处理未完成项，每个ID只输出一次"""
+    output = str(tmp_path / "results.jsonl")
+    news_list = _news(6)
+
+    first = FakeAnalyzer(fail_ids={"n2", "n4"})
+    report = BatchJobRunner(first, output, workers=3).run(news_list)
+    assert report["本次完成"] == 4 and report["失败"] == 2
+    assert {item["id"] for item in report["失败明细"]} == {"n2", "n4"}
+
+    second = FakeAnalyzer()
+    report = BatchJobRunner(second, output, workers=3).run(news_list + news_list[:2])
+    assert sorted(second.calls) == ["n2", "n4"], "重跑只应分析上次失败的舆情"
+    assert report["已跳过"] == 6 and report["本次完成"] == 2
+
+    ids = _output_ids(output)
+    assert sorted(ids) == [f"n{i}" for i in range(6)], "每个舆情ID应恰好输出一次"
+
+
+def test_truncated_checkpoint_line_is_dropped(tmp_path):
+    """测试中断残留的半行被截断，对应舆情会被重新分析"""
+    output = str(tmp_path / "results.jsonl")
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "n0", "result": {}}, ensure_ascii=False) + "\n")
+        f.write('{"id": "n1", "resu')
+
+    analyzer = FakeAnalyzer()
+    BatchJobRunner(analyzer, output, workers=2).run(_news(2))
+    assert analyzer.calls == ["n1"]
+    assert _output_ids(output) == ["n0", "n1"]
+
+
+def test_triage_writes_local_label(tmp_path):
+    """测试开启初筛时低信号舆情直接输出本地标签"""
+    output = str(tmp_path / "results.jsonl")
+    news_list = [
+        {"id": "a", "title": "某城投公司债务逾期", "content": "评级下调至BB", "related_company": "某城投"},
+        {"id": "b", "title": "某公司召开股东大会", "content": "审议通过年度报告", "related_company": "某公司"},
+    ]
+    analyzer = FakeAnalyzer()
+    BatchJobRunner(analyzer, output, workers=2, triage=True).run(news_list)
+    assert analyzer.calls == ["a"]
+
+    with open(output, "r", encoding="utf-8") as f:
+        results = {entry["id"]: entry["result"] for entry in map(json.loads, f)}
+    assert results["b"]["分析类型"] == "本地初筛" and results["b"]["新闻标题"] == "某公司召开股东大会"
+
+
+def test_degraded_result_not_checkpointed(tmp_path):
+    """测试服务降级的备选结果不写入检查点"""
+    class DegradedAnalyzer(FakeAnalyzer):
+        def analyze_news(self, news):
+            return {"服务降级": {"降级原因": "熔断快速失败"}}
+
+    output = str(tmp_path / "results.jsonl")
+    report = BatchJobRunner(DegradedAnalyzer(), output, workers=2).run(_news(3))
+    assert report["本次完成"] == 0 and report["失败"] == 3
+    assert not os.path.exists(output) or _output_ids(output) == []
+
+
+def test_unparsed_result_not_checkpointed(tmp_path):
+    """测试响应解析失败的结果不写入检查点，重跑时重新分析"""
+    class UnparsedAnalyzer(FakeAnalyzer):
+        def analyze_news(self, news):
+            super().analyze_news(news)
+            return {"原始响应": "无法解析的文本", "解析状态": "失败"}
+
+    output = str(tmp_path / "results.jsonl")
+    report = BatchJobRunner(UnparsedAnalyzer(), output, workers=2).run(_news(2))
+    assert report["本次完成"] == 0 and report["失败"] == 2
+
+    retry = FakeAnalyzer()
+    BatchJobRunner(retry, output, workers=2).run(_news(2))
+    assert sorted(retry.calls) == ["n0", "n1"], "解析失败的舆情应在重跑时重新分析"
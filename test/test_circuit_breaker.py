@@ -0,0 +1,98 @@
+# test/test_circuit_breaker.py
+import sys
+import os
+import time
+import asyncio
+
+import pytest
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from core.rate_limiter import AdaptiveRateLimiter, call_with_rate_limit, acall_with_rate_limit
+from mock_llm_server import MockLLMServer, build_analyzer
+
+
+def test_open_on_failure_rate_and_recover():
+    """测试失败率超过阈值熔断，到期后半开探测成功则恢复"""
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, open_seconds=0.1)
+    for failed in (False, True, False, True):
+        assert breaker.allow()
+        breaker.record_failure() if failed else breaker.record_success(0.1)
+    assert breaker.stats()["状态"] == "熔断"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    time.sleep(0.15)
+    assert breaker.allow(), "到期后应放行探测请求"
+    assert not breaker.allow(), "半开状态只放行一个探测请求"
+    breaker.record_success(0.1)
+    assert breaker.stats()["状态"] == "正常"
+    assert breaker.stats()["快速失败次数"] == 2
+
+
+def test_slow_calls_and_failed_probe():
+    """测试慢调用率超过阈值熔断，探测失败重新熔断"""
+    breaker = CircuitBreaker(min_calls=3, slow_call_seconds=1.0, slow_call_rate=0.6, open_seconds=0.05)
+    for _ in range(3):
+        breaker.record_success(2.0)
+    assert breaker.stats()["状态"] == "熔断"
+
+    time.sleep(0.1)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.stats()["状态"] == "熔断" and breaker.stats()["熔断次数"] == 2
+
+    time.sleep(0.1)
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow(), "归还的探测名额应可再次使用"
+
+
+def test_interrupted_probe_releases_slots():
+    """测试探测调用被中断（KeyboardInterrupt/CancelledError）时归还探测名额与并发名额"""
+    breaker = CircuitBreaker(min_calls=1, failure_rate=0.5, open_seconds=0.05)
+    limiter = AdaptiveRateLimiter(6000, 10 ** 7, max_concurrency=4)
+    breaker.record_failure()
+    time.sleep(0.1)
+    window = limiter.stats()["并发窗口"]
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        call_with_rate_limit(interrupted, 10, limiter=limiter, breaker=breaker)
+    assert limiter.stats()["进行中请求"] == 0, "并发名额应归还"
+
+    async def cancelled():
+        raise asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(acall_with_rate_limit(cancelled, 10, limiter=limiter, breaker=breaker))
+    assert limiter.stats()["进行中请求"] == 0
+    assert limiter.stats()["并发窗口"] == window, "被中断的调用不应视为成功而增大并发窗口"
+    assert call_with_rate_limit(lambda: "ok", 10, limiter=limiter, breaker=breaker) == "ok", "探测名额应可再次使用"
+    assert breaker.stats()["状态"] == "正常"
+
+
+def test_circuit_breaker_fast_fail(tmp_path, monkeypatch):
+    """测试服务持续500时熔断，后续请求不再发出并返回降级结果"""
+    breaker = CircuitBreaker(min_calls=2, failure_rate=0.5, open_seconds=60)
+    monkeypatch.setattr("core.rate_limiter.get_circuit_breaker", lambda: breaker)
+    monkeypatch.setattr("core.rate_limiter.LLM_RETRY_BASE_DELAY", 0.01)
+
+    server = MockLLMServer(port=0, error_rate=1.0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+        first = analyzer.analyze_industry_sentiment("新能源", "补贴政策落地")
+        assert server.counters["500"] == 2, "连续失败达到阈值后应停止重试"
+        assert first["服务降级"]["降级原因"] == "熔断快速失败"
+
+        second = analyzer.analyze_company_risk("某城投公司", "债券展期", {"所属行业": "城投"})
+        assert server.counters["请求数"] == 2, "熔断期间不应再发出请求"
+        assert "服务降级" in second and breaker.stats()["状态"] == "熔断"
+        assert "风险识别" in second and "政策影响分析" not in second, "公司分析应使用公司降级模板"
+    finally:
+        server.stop()
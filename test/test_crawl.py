@@ -9,7 +9,14 @@ import logging
 import nest_asyncio
 from typing import List, Dict, Set
 import json
-import pickle
+import os
+import sys
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.url_store import get_url_store, normalize_url, STATUS_VISITED, STATUS_FAILED
 
 # 应用nest_asyncio以解决异步环境问题
 nest_asyncio.apply()
@@ -57,25 +64,13 @@ class FastNewEnergyCrawler:
             }
         ]
 
-        # 缓存已爬取的URL，避免重复
-        self.visited_urls = set()
-        self.cache_file = 'news_cache.pkl'
-        self.load_cache()
-
-    def load_cache(self):
-        """加载缓存"""
-        try:
-            with open(self.cache_file, 'rb') as f:
-                self.visited_urls = pickle.load(f)
-            logger.info(f"已加载 {len(self.visited_urls)} 个缓存URL")
-        except FileNotFoundError:
-            self.visited_urls = set()
-
-    def save_cache(self):
-        """保存缓存"""
-        with open(self.cache_file, 'wb') as f:
-            pickle.dump(self.visited_urls, f)
-        logger.info(f"已缓存 {len(self.visited_urls)} 个URL")
+        # 已发现的URL（与核心采集函数共用的SQLite URL库：按需查询、增量写入，无需整体加载/保存）
+        self.url_store = get_url_store()
+        logger.info(f"URL库已记录 {len(self.url_store)} 个URL")
+        # 本次搜索到的舆情（规范化链接 → 列表页信息），抓取详情时补全正文
+        self.discovered = {}
+        # 每次运行最多抓取的详情页数
+        self.detail_batch = 200
 
     async def fetch_url(self, session: aiohttp.ClientSession, url: str, timeout: int = 8):
         """异步获取URL内容"""
@@ -125,30 +120,32 @@ class FastNewEnergyCrawler:
             soup = BeautifulSoup(html, 'html.parser')
             news_items = engine['parser'](soup, keyword)
 
-            # 并发获取新闻详情
-            if news_items:
-                # 创建详情获取任务
-                detail_tasks = []
-                for item in news_items:
-                    if item.get('原文链接') and item['原文链接'] not in self.visited_urls:
-                        detail_tasks.append(
-                            self.fetch_news_detail(session, item['原文链接'], item)
-                        )
-                        self.visited_urls.add(item['原文链接'])
-
-                # 并发获取详情
-                if detail_tasks:
-                    detailed_items = await asyncio.gather(*detail_tasks, return_exceptions=True)
-                    # 过滤有效结果
-                    valid_items = [item for item in detailed_items
-                                   if isinstance(item, dict) and item.get('新闻标题')]
-                    return valid_items
-
+            # 登记待抓取详情（核心采集函数只在列表页见过的链接此时转为待抓取），详情统一从待抓取队列获取
+            self.url_store.enqueue(
+                [item['原文链接'] for item in news_items if item.get('原文链接')], source=engine['name']
+            )
+            for item in news_items:
+                if item.get('原文链接'):
+                    self.discovered.setdefault(normalize_url(item['原文链接']), item)
             return news_items
         return []
 
+    async def fetch_pending_details(self) -> List[Dict]:
+        """从URL库取待抓取及失败待重试的链接，并发获取新闻详情"""
+        urls = self.url_store.pending(limit=self.detail_batch, include_failed=True)
+        if not urls:
+            return []
+
+        async with aiohttp.ClientSession() as session:
+            detailed_items = await asyncio.gather(
+                *(self.fetch_news_detail(session, url, self.discovered.get(url, {'原文链接': url})) for url in urls),
+                return_exceptions=True
+            )
+        # 过滤有效结果（抓取失败的链接留待重试；此前中断遗留的链接没有列表页信息，只更新抓取状态）
+        return [item for item in detailed_items if isinstance(item, dict) and item.get('新闻标题')]
+
     async def fetch_news_detail(self, session: aiohttp.ClientSession, url: str, base_item: dict):
-        """异步获取新闻详情"""
+        """异步获取新闻详情；抓取失败时标记为失败并返回None（不把只有列表页信息的条目计入结果）"""
         try:
             html = await self.fetch_url(session, url, timeout=5)
             if html:
@@ -161,11 +158,13 @@ class FastNewEnergyCrawler:
                 base_item['正文/摘要'] = content[:300] if content else base_item.get('正文/摘要', '')
                 base_item['采集时间'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
+                self.url_store.mark(url, STATUS_VISITED)
                 return base_item
         except Exception as e:
             logger.warning(f"获取详情失败 {url}: {str(e)}")
 
-        return base_item
+        self.url_store.mark(url, STATUS_FAILED)
+        return None
 
     def extract_content_fast(self, soup: BeautifulSoup) -> str:
         """快速内容提取策略"""
@@ -316,14 +315,11 @@ class FastNewEnergyCrawler:
                 task = self.search_keyword_concurrently(keyword, engine)
                 all_tasks.append(task)
 
-        # 并发执行所有搜索任务
-        results = await asyncio.gather(*all_tasks, return_exceptions=True)
+        # 并发执行所有搜索任务（搜索结果登记到URL库）
+        await asyncio.gather(*all_tasks, return_exceptions=True)
 
-        # 合并结果
-        all_news = []
-        for result in results:
-            if isinstance(result, list):
-                all_news.extend(result)
+        # 抓取待抓取的详情（含其他采集方已发现的链接与此前抓取失败的链接）
+        all_news = await self.fetch_pending_details()
 
         # 去重
         seen_titles = set()
@@ -404,8 +400,10 @@ async def main():
                 print("\n数据预览:")
                 print(df[['新闻标题', '发布时间', '来源', '搜索关键词']].head(10).to_string())
 
-        # 保存缓存
-        crawler.save_cache()
+        # URL库在采集过程中已增量写入
+        for row in crawler.url_store.stats():
+            print(f"  URL库 {row['来源']}: 已发现{row['已发现']} / 待抓取{row['待抓取']} / 已抓取{row['已抓取']} / "
+                  f"失败{row['失败']}")
 
     except Exception as e:
         logger.error(f"爬取过程出错: {str(e)}")
@@ -0,0 +1,42 @@
+# test/test_crawl_engine.py
+import sys
+import os
+import time
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.crawl_engine import CrawlEngine
+from core.crawl_transport import CrawlTransport
+from mock_crawl_server import MockCrawlServer
+
+
+def test_bounded_concurrency_preserves_order():
+    """测试单站点并发不超过上限，结果顺序与输入一致，总耗时远小于串行"""
+    server = MockCrawlServer(delay=0.2).start()
+    try:
+        engine = CrawlEngine(CrawlTransport(retries=0), concurrency=8, per_host=3)
+        urls = [f"{server.base}/kw{i}" for i in range(9)]
+
+        start = time.monotonic()
+        pages = engine.fetch_all(urls, encoding="utf-8")
+        elapsed = time.monotonic() - start
+
+        assert [page["text"] for page in pages] == [f"页面/kw{i}" for i in range(9)]
+        assert server.max_in_flight == 3, "单站点并发应达到且不超过上限"
+        assert elapsed < 9 * 0.2 * 0.6, "并发采集应明显快于串行"
+    finally:
+        server.stop()
+
+
+def test_failed_page_reported_without_aborting():
+    """测试单个页面失败时返回错误信息，不影响其他页面"""
+    server = MockCrawlServer().start()
+    try:
+        engine = CrawlEngine(CrawlTransport(retries=0, timeout=1))
+        pages = engine.fetch_all([f"{server.base}/ok", "http://127.0.0.1:9/unreachable"])
+        assert pages[0]["status"] == 200 and pages[0]["error"] is None
+        assert pages[1]["status"] is None and pages[1]["error"]
+    finally:
+        server.stop()
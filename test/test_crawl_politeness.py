@@ -0,0 +1,64 @@
+# test/test_crawl_politeness.py
+import sys
+import os
+import time
+from email.utils import formatdate
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.crawl_engine import CrawlEngine
+from core.crawl_politeness import PolitenessScheduler, parse_retry_after
+from core.crawl_transport import CrawlTransport
+from mock_crawl_server import MockCrawlServer
+
+
+def throttling(throttle_times: int = 0, retry_after: str = "1"):
+    """前throttle_times次请求返回429（Retry-After: retry_after），之后返回200"""
+    def respond(request, count):
+        if count <= throttle_times:
+            return 429, "busy", {"Retry-After": retry_after}
+        return 200, f"页面{request.path}", {}
+    return MockCrawlServer(respond).start()
+
+
+def test_hosts_scheduled_independently():
+    """测试同一站点按最小间隔依次排期，不同站点互不等待"""
+    scheduler = PolitenessScheduler(min_interval=0.5, host_intervals={"slow.example": 2})
+    waits = [scheduler.reserve("a.example") for _ in range(3)]
+    assert waits[0] == 0 and abs(waits[1] - 0.5) < 0.05 and abs(waits[2] - 1.0) < 0.05, "同站点应按间隔排期"
+    assert scheduler.reserve("b.example") == 0, "其他站点不应等待"
+    scheduler.reserve("slow.example")
+    assert abs(scheduler.reserve("slow.example") - 2) < 0.05, "按站点覆盖的间隔应生效"
+
+
+def test_parse_retry_after():
+    """测试Retry-After支持秒数与HTTP日期"""
+    assert parse_retry_after("3") == 3
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after("稍后") is None and parse_retry_after(None) is None
+
+
+def test_retry_after_pauses_only_throttled_host():
+    """测试429+Retry-After只暂停对应站点并放大其间隔，其他站点照常采集"""
+    busy, idle = throttling(throttle_times=1, retry_after="1"), throttling()
+    try:
+        transport = CrawlTransport(retries=1, base_delay=0.01, max_delay=0.02)
+        engine = CrawlEngine(transport, concurrency=4, per_host=2)
+        pages = engine.fetch_all([f"{busy.base}/a", f"{idle.base}/b", f"{idle.base}/c"], encoding="utf-8")
+
+        assert [page["status"] for page in pages] == [200, 200, 200], "限流站点重试后应成功"
+        records = {}
+        for entry in transport.records:
+            records.setdefault(entry["host"], []).append(entry)
+        assert records[busy.host][0]["retries"] == 1 and records[busy.host][0]["latency"] >= 0.9, \
+            "应遵守Retry-After后再重试"
+        assert all(entry["latency"] < 0.5 for entry in records[idle.host]), "其他站点不应被限流站点拖慢"
+
+        stats = {row["站点"]: row for row in transport.politeness.stats()}
+        assert stats[busy.host]["限流次数"] == 1 and stats[idle.host]["限流次数"] == 0
+        assert stats[busy.host]["当前间隔(秒)"] > stats[idle.host]["当前间隔(秒)"], "限流站点的请求间隔应放大"
+    finally:
+        busy.stop()
+        idle.stop()
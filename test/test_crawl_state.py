@@ -0,0 +1,99 @@
+# test/test_crawl_state.py
+import sys
+import os
+from datetime import datetime
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.crawl_engine import CrawlEngine
+from core.crawl_state import CrawlStateStore, normalize_time, select_new_items
+from core.crawl_transport import CrawlTransport
+from mock_crawl_server import MockCrawlServer
+
+
+def _items(*pairs):
+    return [{"标题": title, "发布时间": published} for title, published in pairs]
+
+
+def test_normalize_time_formats():
+    """测试常见发布时间格式统一为可比较的字符串"""
+    now = datetime(2025, 12, 8, 15, 0)
+    assert normalize_time("2025-12-07 10:30", now) == "2025-12-07 10:30:00"
+    assert normalize_time("2025年12月07日", now) == "2025-12-07 00:00:00"
+    assert normalize_time("12-07 10:30", now) == "2025-12-07 10:30:00"
+    assert normalize_time("12-30 10:30", now) == "2024-12-30 10:30:00", "晚于当前时间的省略年份日期应视为去年"
+    assert normalize_time("09:15", now) == "2025-12-08 09:15:00"
+    assert normalize_time("23:40", now) == "2025-12-07 23:40:00", "晚于当前时间的时分应视为昨天"
+    assert normalize_time("3小时前", now) == "2025-12-08 12:00:00"
+    assert normalize_time("刚刚", now) is None
+
+
+def test_watermark_early_stop_and_ties():
+    """测试到达水位线即停止，同一时间点的新标题不遗漏"""
+    store = CrawlStateStore(":memory:")
+    store.update("sina_roll", "新能源 补贴", _items(("旧闻B", "2025-12-07 10:00"), ("旧闻A", "2025-12-06 09:00")),
+                 etag='"v1"')
+    mark = store.get("sina_roll", "新能源 补贴")
+    assert mark["watermark"] == "2025-12-07 10:00:00" and mark["boundary"] == ["旧闻B"]
+    assert store.conditional_headers(mark) == {"If-None-Match": '"v1"'}
+
+    page = _items(("新闻D", "2025-12-08 09:00"), ("新闻C", "2025-12-07 10:00"), ("旧闻B", "2025-12-07 10:00"),
+                  ("旧闻A", "2025-12-06 09:00"))
+    items, reached = select_new_items(page, mark)
+    assert [item["标题"] for item in items] == ["新闻D", "新闻C"], "应保留晚于水位线及同一时间点的新标题"
+    assert reached, "遇到已采集的舆情应停止"
+
+    store.update("sina_roll", "新能源 补贴", items)
+    mark = store.get("sina_roll", "新能源 补贴")
+    assert mark["watermark"] == "2025-12-08 09:00:00" and mark["etag"] == '"v1"', "未返回ETag时应保留原值"
+    assert select_new_items(page, mark) == ([], True), "稳定状态下不应有新舆情"
+
+
+def test_unordered_pages_dedupe_by_title():
+    """测试搜索结果页不与水位线比较：早于已采集时间的新标题保留，已采集的标题跳过"""
+    store = CrawlStateStore(":memory:")
+    first = _items(("新闻B", "2025-12-08 09:00"), ("新闻A", "2025-12-06 09:00"))
+    items, reached = select_new_items(first, store.get("10jqka", "新能源 补贴"), ordered=False)
+    assert items == first and not reached
+    store.update("10jqka", "新能源 补贴", items, ordered=False)
+    mark = store.get("10jqka", "新能源 补贴")
+    assert mark["watermark"] is None and mark["recent"] == ["新闻B", "新闻A"], "搜索结果页按标题记录已采集"
+
+    page = _items(("新闻A", "2025-12-06 09:00"), ("新闻C", "2025-12-05 09:00"), ("新闻B", "2025-12-08 09:00"),
+                  ("新闻D", "2025-12-01 09:00"))
+    items, reached = select_new_items(page, mark, time_start="2025-12-02", ordered=False)
+    assert [item["标题"] for item in items] == ["新闻C"] and not reached, "只按标题去重与时间范围过滤，不提前停止"
+
+
+def test_time_range_filter():
+    """测试时间范围：晚于结束日期的跳过，早于起始日期即停止"""
+    page = _items(("未来", "2025-12-09 08:00"), ("范围内", "2025-12-05 08:00"), ("过早", "2025-11-30 08:00"),
+                  ("更早", "2025-11-01 08:00"))
+    items, reached = select_new_items(page, time_start="2025-12-01", time_end="2025-12-08")
+    assert [item["标题"] for item in items] == ["范围内"] and reached
+
+
+def test_conditional_get_not_modified():
+    """测试携带ETag的条件请求返回304，不传输页面"""
+    def respond(request, count):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, b"", {"ETag": '"v1"'}
+        return 200, "<h3>新闻</h3>", {"ETag": '"v1"'}
+
+    server = MockCrawlServer(respond).start()
+    try:
+        url = server.url("/roll")
+        engine = CrawlEngine(CrawlTransport(retries=0))
+        store = CrawlStateStore(":memory:")
+
+        first = engine.fetch_all([url], url_headers=[store.conditional_headers(store.get("zqrb_roll", "万科"))])[0]
+        assert first["status"] == 200 and first["headers"].get("etag") == '"v1"', "响应头应不区分大小写"
+        store.update("zqrb_roll", "万科", [], etag=first["headers"].get("ETag"))
+
+        second = engine.fetch_all([url], url_headers=[store.conditional_headers(store.get("zqrb_roll", "万科"))])[0]
+        assert second["status"] == 304 and second["text"] == "", "页面未修改时应返回304且无正文"
+        assert engine.transport.stats()[0]["未修改(304)"] == 1 and engine.transport.stats()[0]["失败数"] == 0
+    finally:
+        server.stop()
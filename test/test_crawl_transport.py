@@ -0,0 +1,67 @@
+# test/test_crawl_transport.py
+import sys
+import os
+import gzip
+
+import pytest
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.crawl_transport import CrawlTransport
+from mock_crawl_server import MockCrawlServer
+
+PAGE = '<h3 class="news-title"><a href="/n/1">某公司债务逾期</a></h3>' * 20
+
+
+def flaky(fail_times: int = 0):
+    """前fail_times次请求返回503，之后返回gzip压缩页面"""
+    def respond(request, count):
+        if count <= fail_times:
+            return 503, "busy", {}
+        return 200, gzip.compress(PAGE.encode("utf-8")), {"Content-Encoding": "gzip"}
+    return MockCrawlServer(respond).start()
+
+
+@pytest.fixture
+def transport():
+    return CrawlTransport(retries=2, base_delay=0.01, max_delay=0.02)
+
+
+def test_retry_then_gzip_decoded(transport):
+    """测试503后退避重试成功，gzip响应自动解压并记录耗时"""
+    server = flaky(fail_times=2)
+    try:
+        res = transport.get(server.url("/roll/news"))
+        assert res.status_code == 200 and "某公司债务逾期" in res.text
+        assert server.requests == 3, "应重试2次"
+
+        row = transport.stats()[0]
+        assert row["请求数"] == 1 and row["重试次数"] == 2 and row["压缩响应"] == 1
+        assert row["耗时P95(秒)"] >= 0 and row["下载字节"] < len(PAGE.encode("utf-8"))
+    finally:
+        server.stop()
+
+
+def test_retries_exhausted_and_keep_alive(transport):
+    """测试重试耗尽返回最后一次响应，同一站点的后续请求复用保活连接"""
+    server = flaky(fail_times=3)
+    try:
+        assert transport.get(server.url("/roll/news")).status_code == 503
+        assert server.requests == 3, "重试次数不应超过配置"
+
+        for _ in range(5):
+            assert transport.get(server.url("/roll/news")).status_code == 200
+        assert len(server.client_ports) == 1, "同一站点应复用同一连接"
+        assert "br" not in transport.session.headers["Accept-Encoding"] or _has_brotli()
+    finally:
+        server.stop()
+
+
+def _has_brotli():
+    try:
+        import brotli  # noqa: F401
+        return True
+    except ImportError:
+        return False
@@ -0,0 +1,41 @@
+# test/test_credentials.py
+import sys
+import os
+import subprocess
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core import credentials
+from core.credentials import get_credential, register_credential_provider
+
+
+def test_lookup_order(monkeypatch):
+    """测试显式密钥优先，其次按注册顺序查询来源"""
+    monkeypatch.setenv("TEST_LLM_KEY", "from-env")
+    assert get_credential("TEST_LLM_KEY", "explicit") == "explicit"
+    assert get_credential("TEST_LLM_KEY") == "from-env"
+
+    monkeypatch.setattr(credentials, "_providers", list(credentials._providers))
+    register_credential_provider(lambda name: "from-vault" if name == "TEST_LLM_KEY" else None)
+    assert get_credential("TEST_LLM_KEY") == "from-vault", "新注册来源应优先查询"
+    assert get_credential("MISSING_LLM_KEY") is None
+
+
+def test_analyzer_import_without_streamlit():
+    """测试命令行进程导入分析器不会加载Streamlit"""
+    code = "import sys; import core.sentiment_analyzer; print('streamlit' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True,
+                            text=True, check=True).stdout
+    assert output.strip().endswith("False"), "分析器模块不应导入Streamlit"
+
+
+def test_cli_missing_key_fails_cleanly(monkeypatch, capsys):
+    """测试未配置密钥时分析/生成命令均打印提示并返回1（不抛出异常）"""
+    from core import cli
+
+    monkeypatch.setattr(credentials, "_providers", [lambda name: None])
+    for argv in (["analyze", "--input", "missing.jsonl", "--output", "out.json"], ["generate"]):
+        assert cli.main(argv) == 1
+        assert "未找到DEEPSEEK_API_KEY" in capsys.readouterr().out
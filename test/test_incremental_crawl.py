@@ -0,0 +1,111 @@
+# test/test_incremental_crawl.py
+import sys
+import os
+import re
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import pytest
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+import core.incremental_crawl as incremental_crawl
+from core.crawl_engine import CrawlEngine
+from core.crawl_state import CrawlStateStore
+from core.crawl_transport import CrawlTransport
+from core.url_store import UrlStore
+from mock_crawl_server import MockCrawlServer
+
+ITEM_PATTERN = re.compile(r'<li><a href="(.*?)">(.*?)</a><span>(.*?)</span></li>')
+
+
+class RollSite:
+    """按发布时间倒序的滚动新闻站点：{关键词: {页码: [(标题, 发布时间, 链接)]}}，内容版本变化时ETag随之变化"""
+
+    def __init__(self):
+        self.version = 1
+        self.pages = {}
+        self.broken = set()
+
+    def respond(self, request, count):
+        query = parse_qs(urlsplit(request.path).query)
+        keyword, page_no = query["kw"][0], int(query["page"][0])
+        if keyword in self.broken:
+            return 500, "error", {}
+        etag = f'"{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return 304, b"", {"ETag": etag}
+        items = self.pages.get(keyword, {}).get(page_no, [])
+        body = "".join(f'<li><a href="{link}">{title}</a><span>{published}</span></li>'
+                       for title, published, link in items)
+        return 200, f"<ul>{body}</ul>", {"ETag": etag}
+
+
+@pytest.fixture
+def crawl(monkeypatch):
+    """开启增量采集，水位线/URL库/采集引擎使用本测试独立的实例"""
+    state, url_store = CrawlStateStore(":memory:"), UrlStore(":memory:")
+    engine = CrawlEngine(CrawlTransport(retries=0))
+    monkeypatch.setattr(incremental_crawl, "INCREMENTAL_CRAWL", True)
+    monkeypatch.setattr(incremental_crawl, "get_crawl_state", lambda: state)
+    monkeypatch.setattr(incremental_crawl, "get_url_store", lambda: url_store)
+    monkeypatch.setattr(incremental_crawl, "get_crawl_engine", lambda: engine)
+
+    site = RollSite()
+    server = MockCrawlServer(site.respond).start()
+
+    def run(keywords):
+        return incremental_crawl.crawl_keywords(
+            "zqrb_roll",
+            keywords,
+            lambda keyword, page_no: server.url(f"/roll?kw={keyword}&page={page_no}"),
+            lambda html, keyword: [{"标题": title, "发布时间": published, "原文链接": urljoin(server.base, link)}
+                                   for link, title, published in ITEM_PATTERN.findall(html)],
+            max_pages=2,
+            encoding="utf-8"
+        )
+
+    yield run, site, server, state, url_store
+    server.stop()
+
+
+def _titles(result):
+    return [item["标题"] for item in result["items"]]
+
+
+def _page_requests(server, page_no):
+    return sum(f"page={page_no}" in path for path, _ in server.history)
+
+
+def test_incremental_keyword_crawl(crawl):
+    """测试增量采集：304跳过、仅200推进水位线、到达水位线停止翻页、已登记链接过滤"""
+    run, site, server, state, url_store = crawl
+    site.pages["万科"] = {1: [("新闻A", "2025-12-08 10:00", "/a"), ("新闻B", "2025-12-08 09:00", "/b")],
+                        2: [("新闻C", "2025-12-07 08:00", "/c")]}
+    site.broken.add("恒大")
+
+    results = run(["万科", "恒大"])
+    assert _titles(results["万科"]) == ["新闻A", "新闻B", "新闻C"], "首次采集应翻页采集全部舆情"
+    assert results["恒大"]["status"] == 500 and results["恒大"]["items"] == []
+    assert state.get("zqrb_roll", "万科")["watermark"] == "2025-12-08 10:00:00"
+    assert state.get("zqrb_roll", "恒大") is None, "采集失败时不应推进水位线"
+    assert url_store.pending() == [] and server.url("/a") in url_store, "列表页链接只登记为已发现"
+
+    # 页面无变化：条件请求返回304，不解析不翻页，水位线不变
+    results = run(["万科"])
+    assert results["万科"]["not_modified"] and results["万科"]["items"] == []
+    assert server.history[-1][1].get("If-None-Match") == '"1"', "应携带上次的ETag"
+    assert state.get("zqrb_roll", "万科")["watermark"] == "2025-12-08 10:00:00"
+
+    # 页面更新：只保留晚于水位线且链接未登记的舆情，遇到已采集的舆情即停止翻页
+    site.version = 2
+    site.pages["万科"][1] = [("新闻D", "2025-12-08 11:00", "/d"), ("转载E", "2025-12-08 10:30", "/e"),
+                           ("新闻A", "2025-12-08 10:00", "/a"), ("新闻B", "2025-12-08 09:00", "/b")]
+    url_store.enqueue([server.url("/e")], source="sina_roll")
+    page2_before = _page_requests(server, 2)
+
+    results = run(["万科"])
+    assert _titles(results["万科"]) == ["新闻D"], "已登记链接与水位线之前的舆情应被过滤"
+    assert _page_requests(server, 2) == page2_before, "到达水位线后不应再翻页"
+    assert state.get("zqrb_roll", "万科")["watermark"] == "2025-12-08 11:00:00"
@@ -0,0 +1,78 @@
+# test/test_json_stream.py
+import sys
+import os
+import json
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.json_stream import JSONSectionStream, extract_json, missing_fields
+
+
+def test_sections_complete_incrementally():
+    """测试顶层板块逐个闭合即返回"""
+    data = {
+        "舆情属性": {"舆情类型": ["行业政策"], "舆情倾向": "利好"},
+        "景气度分析": {"景气度得分": 75, "评分拆解": {"政策支撑度": 25}},
+        "动态调整支撑": {"风险提示": ["政策退坡风险"], "时间窗口": "6个月"}
+    }
+    text = "```json\n" + json.dumps(data, ensure_ascii=False, indent=2) + "\n```"
+
+    parser = JSONSectionStream()
+    seen = []
+    for i in range(0, len(text), 5):
+        for section, value in parser.feed(text[i:i + 5]):
+            seen.append(section)
+            assert value == data[section], f"板块【{section}】内容解析错误"
+
+    assert seen == list(data.keys()), "板块顺序或数量错误"
+    assert parser.finished, "顶层对象应已闭合"
+
+
+def test_brackets_inside_strings_ignored():
+    """测试字符串中的括号/逗号/转义引号不影响板块切分"""
+    parser = JSONSectionStream()
+    sections = parser.feed('{"a": "x,}{\\"y", "b": [1, {"c": "]"}]}')
+    assert sections == [("a", 'x,}{"y'), ("b", [1, {"c": "]"}])]
+
+
+def test_truncated_section_not_emitted():
+    """测试未闭合的板块不会提前返回"""
+    parser = JSONSectionStream()
+    assert parser.feed('{"舆情属性": {"舆情倾向": "利') == []
+    assert not parser.finished
+
+
+def test_extract_json_code_fence_and_trailing_comma():
+    """测试代码块标记、前后说明文字与多余逗号"""
+    text = '以下是分析结果：\n```json\n{"a": [1, 2,], "b": {"c": "}",},}\n```\n以上。'
+    data, repaired = extract_json(text)
+    assert data == {"a": [1, 2], "b": {"c": "}"}}
+    assert not repaired
+
+
+def test_extract_json_truncated():
+    """测试截断输出回退到最后一个完整元素并补齐括号，截断在标量中间的键值被丢弃"""
+    data, repaired = extract_json('{"舆情属性": {"舆情倾向": "利好"}, "景气度分析": {"景气度得分": 7')
+    assert repaired, "截断输出应标记为已修复"
+    assert data["舆情属性"] == {"舆情倾向": "利好"}
+    assert data["景气度分析"] == {}, "截断的数字可能不完整，不应作为完整值接受"
+    assert missing_fields(data, {"景气度分析": {"景气度得分": 0}}) == ["景气度分析.景气度得分"], "被丢弃的字段应报告缺失以便补问"
+
+    data, _ = extract_json('{"a": {"b": "完整"}, "c": [1, 2')
+    assert data == {"a": {"b": "完整"}, "c": [1]}, "数组末尾截断的数字应丢弃"
+    data, _ = extract_json('{"a": {"b": "完整", "c": true, "d": "已闭合"')
+    assert data == {"a": {"b": "完整", "c": True, "d": "已闭合"}}, "已闭合的字符串值应保留"
+
+    data, _ = extract_json('{"a": {"b": 1}, "c": {"d": "未完')
+    assert data["a"] == {"b": 1}, "截断在字符串中时应保留已完成板块"
+
+    assert extract_json("无JSON内容") == (None, False)
+
+
+def test_missing_fields():
+    """测试按JSON框架返回缺失字段路径"""
+    schema = {"a": {"x": "", "y": {"z": 0}}, "b": {"w": []}}
+    assert missing_fields({"a": {"x": 1, "y": {"z": 2}}, "b": {"w": []}}, schema) == []
+    assert missing_fields({"a": {"x": 1, "y": "文本"}}, schema) == ["a.y", "b"]
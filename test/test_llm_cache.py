@@ -0,0 +1,53 @@
+# test/test_llm_cache.py
+import sys
+import os
+import time
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.llm_cache import LLMResponseCache
+
+
+def test_cache_hit_and_miss():
+    """测试缓存命中/未命中计数"""
+    cache = LLMResponseCache(":memory:")
+    key = cache.make_key("deepseek-chat", "你是金融分析师", "分析新能源政策", 0.3, 2000)
+
+    assert cache.get(key) is None, "空缓存不应命中"
+    cache.set(key, '{"舆情属性": {}}')
+    assert cache.get(key) == '{"舆情属性": {}}', "写入后应命中"
+
+    stats = cache.stats()
+    assert stats["命中次数"] == 1 and stats["未命中次数"] == 1, "命中计数错误"
+
+
+def test_cache_key_depends_on_params():
+    """测试缓存键区分模型/温度/最大Token数"""
+    base = LLMResponseCache.make_key("deepseek-chat", None, "prompt", 0.3, 2000)
+    assert base != LLMResponseCache.make_key("deepseek-reasoner", None, "prompt", 0.3, 2000)
+    assert base != LLMResponseCache.make_key("deepseek-chat", None, "prompt", 0.7, 2000)
+    assert base != LLMResponseCache.make_key("deepseek-chat", None, "prompt", 0.3, 1000)
+    assert base != LLMResponseCache.make_key("deepseek-chat", "system", "prompt", 0.3, 2000)
+
+
+def test_cache_ttl_and_lru():
+    """测试过期淘汰与LRU淘汰"""
+    cache = LLMResponseCache(":memory:", ttl=1, max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")  # a最近被访问，b成为最久未使用
+    cache.set("c", "C")
+    assert cache.get("b") is None, "超量时应淘汰最久未使用的条目"
+    assert cache.get("a") == "A"
+
+    time.sleep(1.1)
+    assert cache.get("c") is None, "过期条目不应命中"
+
+
+def test_cache_bypass():
+    """测试旁路开关"""
+    cache = LLMResponseCache(":memory:", bypass=True)
+    cache.set("k", "v")
+    assert cache.get("k") is None, "旁路模式下不应读写缓存"
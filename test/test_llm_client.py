@@ -0,0 +1,26 @@
+# test/test_llm_client.py
+import sys
+import os
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.llm_client import get_openai_client
+from mock_llm_server import MockLLMServer
+
+
+def test_shared_client_pool():
+    """测试客户端工厂复用同一连接池"""
+    server = MockLLMServer(port=0).start()
+    try:
+        client = get_openai_client("mock", server.url)
+        assert client is get_openai_client("mock", server.url), "相同密钥+地址应复用客户端"
+        assert client._client is get_openai_client("other", server.url)._client, "不同客户端应共用连接池"
+        assert client.max_retries == 0, "重试应只由限流器处理，SDK不应隐式重试"
+
+        response = client.chat.completions.create(model="deepseek-chat",
+                                                  messages=[{"role": "user", "content": "请分析以下金融舆情：测试"}])
+        assert response.usage.total_tokens > 0
+    finally:
+        server.stop()
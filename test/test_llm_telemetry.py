@@ -0,0 +1,65 @@
+# test/test_llm_telemetry.py
+import sys
+import os
+import time
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.llm_telemetry import LLMTelemetry
+from mock_llm_server import MockLLMServer, build_analyzer
+
+
+def test_rotation_bounds_ledger(tmp_path):
+    """测试记录文件超过上限后轮转，统计只读取当前文件且可按时间窗口过滤"""
+    path = str(tmp_path / "telemetry.jsonl")
+    telemetry = LLMTelemetry(path, max_bytes=1000, backups=2)
+    for _ in range(30):
+        telemetry.record("industry", "deepseek-chat", prompt_tokens=100, completion_tokens=50, latency=1.0)
+
+    assert os.path.getsize(path) < 1000 + 400, "当前文件大小应有上限"
+    assert os.path.exists(path + ".2") and not os.path.exists(path + ".3"), "只保留指定数量的轮转文件"
+    current = len(telemetry.load())
+    assert current < len(telemetry.load(include_rotated=True)) <= 30
+
+    assert telemetry.summary()[-1]["调用次数"] == current, "默认只统计当前文件"
+    assert telemetry.summary(since=time.time() + 60) == [], "时间窗口外的记录不统计"
+
+
+def test_call_telemetry(tmp_path, monkeypatch):
+    """测试每次调用写入遥测记录并可按场景聚合"""
+    server = MockLLMServer(port=0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+        analyzer.analyze_industry_sentiment("新能源", "补贴政策落地")
+        list(analyzer.stream_company_risk("某城投公司", "债券展期"))
+    finally:
+        server.stop()
+
+    records = analyzer.telemetry.load()
+    assert analyzer.telemetry.path == str(tmp_path / "telemetry.jsonl"), "遥测应写入测试临时目录"
+    assert [r["scenario"] for r in records] == ["industry", "company"]
+    assert all(r["prompt_tokens"] > 0 and r["completion_tokens"] > 0 for r in records), "应记录Token用量"
+    assert records[1]["stream"] and records[1]["ttft"] is not None, "流式调用应记录首Token耗时"
+
+    summary = {row["场景"]: row for row in analyzer.telemetry.summary()}
+    assert summary["全部"]["调用次数"] == 2 and summary["全部"]["费用(元)"] > 0
+
+
+def test_stable_prompt_prefix_cache(tmp_path, monkeypatch):
+    """测试分析要求放在系统提示词中，不同舆情共享前缀，第二次调用记录前缀缓存命中"""
+    server = MockLLMServer(port=0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+        assert "核心分析要求" not in analyzer._build_industry_prompt("新能源", "补贴政策落地"), "用户消息应只包含舆情内容"
+        analyzer.analyze_industry_sentiment("新能源", "补贴政策落地")
+        analyzer.analyze_industry_sentiment("半导体", "国产替代加速")
+    finally:
+        server.stop()
+
+    first, second = analyzer.telemetry.load()
+    assert first["cached_tokens"] == 0 and second["cached_tokens"] > 0, "相同系统提示词应命中前缀缓存"
+    full_price = analyzer.telemetry.cost(second["prompt_tokens"], second["completion_tokens"])
+    assert second["cost"] < full_price, "命中前缀缓存的输入应按缓存单价计费"
+    assert analyzer.telemetry.summary()[-1]["前缀缓存命中率"] > 0
@@ -0,0 +1,25 @@
+# test/test_mock_llm_server.py
+import sys
+import os
+
+import pytest
+from openai import OpenAI, RateLimitError
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from mock_llm_server import MockLLMServer
+
+
+def test_rate_limit_injection():
+    """测试429注入携带Retry-After"""
+    server = MockLLMServer(port=0, rate_limit_rate=1.0, retry_after=2).start()
+    try:
+        client = OpenAI(api_key="mock", base_url=server.url, max_retries=0)
+        with pytest.raises(RateLimitError) as exc_info:
+            client.chat.completions.create(model="deepseek-chat", messages=[{"role": "user", "content": "hi"}])
+        assert exc_info.value.response.headers.get("retry-after") == "2"
+        assert server.counters["429"] == 1
+    finally:
+        server.stop()
@@ -0,0 +1,59 @@
+# test/test_model_router.py
+import sys
+import os
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.model_router import ModelRouter
+
+DEFAULT = {"model": "deepseek-chat", "max_tokens": 2000, "temperature": 0.3}
+
+
+def _router():
+    return ModelRouter(
+        routes={
+            "industry": [{}, {"max_tokens": 1600, "temperature": 0.2}],
+            "general": [{"max_tokens": 600}]
+        },
+        slo={"industry": 10},
+        default=DEFAULT,
+        min_samples=3
+    )
+
+
+def test_fallback_when_p95_exceeds_slo():
+    """测试首选配置P95超出SLO后切换到更快的档位，样本不足时继续使用首选"""
+    router = _router()
+    first = router.route("industry")
+    assert first["tier"] == 0 and first["max_tokens"] == 2000
+
+    for _ in range(2):
+        router.observe(first, 30, ok=True)
+    assert router.route("industry")["tier"] == 0, "样本不足时不应切换"
+
+    router.observe(first, 30, ok=True)
+    fallback = router.route("industry")
+    assert fallback["tier"] == 1 and fallback["max_tokens"] == 1600 and fallback["model"] == "deepseek-chat"
+
+    # 两档都超时：选P95更低的一档
+    for _ in range(3):
+        router.observe(fallback, 20, ok=True)
+    assert router.route("industry")["tier"] == 1
+
+
+def test_quality_gate_and_defaults():
+    """测试输出不合格的档位被跳过，未配置的场景使用默认配置"""
+    router = _router()
+    fast = router.route("industry")
+    for _ in range(3):
+        router.observe(fast, 1, ok=False)
+    assert router.route("industry")["tier"] == 1, "合格率不达标应切换档位"
+
+    general = router.route("general")
+    assert general["max_tokens"] == 600 and general["temperature"] == 0.3, "缺省字段应由默认配置补齐"
+    assert router.route("packed_industry") == {**DEFAULT, "scenario": "packed_industry", "tier": 0}
+
+    rows = {(row["场景"], row["档位"]): row for row in router.stats()}
+    assert rows[("industry", 0)]["样本数"] == 3 and rows[("industry", 0)]["合格率"] == 0.0
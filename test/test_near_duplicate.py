@@ -0,0 +1,42 @@
+# test/test_near_duplicate.py
+import sys
+import os
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.near_duplicate import NearDuplicateStore, simhash, hamming_distance
+
+ORIGINAL = ("国家发改委、能源局联合发布《关于促进新能源高质量发展的实施方案》，提出到2030年风电、太阳能发电总装机容量"
+            "达到12亿千瓦以上，并明确加快推进大型风电光伏基地建设，完善新能源消纳和调控政策措施，推动储能、特高压等"
+            "配套设施同步建设，业内人士认为该方案将显著提振产业链上下游企业的投资信心。")
+REPRINT = ("【转载】国家发改委和能源局联合发布了《关于促进新能源高质量发展的实施方案》，提出到2030年风电、太阳能发电"
+           "总装机容量达到12亿千瓦以上，并明确加快推进大型风电光伏基地建设，完善新能源消纳与调控政策措施，推动储能、"
+           "特高压等配套设施同步建设。业内人士认为，该方案将显著提振产业链上下游企业投资信心。（来源：财经网）")
+OTHER = ("某光伏企业发布公告称，因原材料价格大幅上涨及下游需求不及预期，公司预计上半年净利润同比下降60%至70%，"
+         "同时拟暂停部分扩产项目，并对部分库存计提减值准备，公司股价盘中一度跌停，多家机构下调其盈利预测与评级。")
+
+
+def test_simhash_distance():
+    """测试转载稿签名接近、无关新闻签名差异大"""
+    assert hamming_distance(simhash(ORIGINAL), simhash(REPRINT)) <= 4
+    assert hamming_distance(simhash(ORIGINAL), simhash(OTHER)) > 16
+
+
+def test_store_reuse_with_match_score():
+    """测试相似舆情命中并返回匹配信息，不同主体/无关内容不命中"""
+    store = NearDuplicateStore(":memory:")
+    store.add("industry", "新能源", ORIGINAL, {"景气度分析": {"景气度得分": 80}})
+
+    matched = store.lookup("industry", "新能源", REPRINT)
+    assert matched is not None, "转载稿应复用已有结果"
+    result, info = matched
+    assert result == {"景气度分析": {"景气度得分": 80}}
+    assert 0.9 < info["相似度"] <= 1 and info["汉明距离"] <= 4
+    assert info["来源舆情摘要"] == ORIGINAL[:100]
+
+    assert store.lookup("industry", "光伏", REPRINT) is None, "不同主体不应复用"
+    assert store.lookup("industry", "新能源", OTHER) is None, "无关内容不应复用"
+    assert store.lookup("industry", "新能源", "短讯") is None, "过短文本不参与比对"
+    assert store.stats()["复用次数"] == 1
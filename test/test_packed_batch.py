@@ -0,0 +1,82 @@
+# test/test_packed_batch.py
+import sys
+import os
+import json
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+import mock_llm_server
+from core.rate_limiter import estimate_tokens
+from core.sentiment_analyzer import INDUSTRY_SYSTEM_PROMPT
+from mock_llm_server import MockLLMServer, build_analyzer
+
+
+def _news():
+    return [
+        {"title": "光伏补贴", "content": "光伏装机补贴政策延续至明年", "related_industry": "新能源"},
+        {"title": "城投展期", "content": "某城投公司公告债券展期", "related_company": "某城投公司"},
+        {"title": "芯片扩产", "content": "国产芯片厂商宣布扩产计划", "related_industry": "半导体"},
+        {"title": "集采降价", "content": "新一轮药品集采平均降价五成", "related_industry": "医药"},
+    ]
+
+
+def test_pack_split_per_item(tmp_path, monkeypatch):
+    """测试同场景舆情合并为一次请求，结果按序号拆分回各条且顺序与输入一致"""
+    server = MockLLMServer(port=0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch, use_cache=False)
+        news_list = _news()
+        results = analyzer.batch_analyze_packed(news_list, pack_size=3)
+    finally:
+        server.stop()
+
+    assert server.counters["请求数"] == 2, "行业、公司各打包一次请求"
+    assert [r["新闻标题"] for r in results] == [n["title"] for n in news_list], "结果顺序应与输入一致"
+    assert [r.get("行业名称") for r in results] == ["新能源", None, "半导体", "医药"]
+    assert results[1]["公司名称"] == "某城投公司" and "负面舆情识别" in results[1]
+    assert [r["打包信息"]["打包条数"] for r in results] == [3, 1, 3, 3]
+
+
+def test_only_failed_items_rerun(tmp_path, monkeypatch):
+    """测试打包结果中缺失的条目单独重跑，其余条目直接使用打包结果"""
+    def drop_second(messages, rng):
+        data = json.loads(build_mock_content(messages, rng))
+        if "结果" in data:
+            data["结果"] = [item for item in data["结果"] if item["序号"] != 2]
+        return json.dumps(data, ensure_ascii=False)
+
+    build_mock_content = mock_llm_server.build_mock_content
+    monkeypatch.setattr(mock_llm_server, "build_mock_content", drop_second)
+
+    server = MockLLMServer(port=0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch, use_cache=False)
+        news_list = [news for news in _news() if news.get("related_industry")]
+        results = analyzer.batch_analyze_packed(news_list, pack_size=3)
+    finally:
+        server.stop()
+
+    assert server.counters["请求数"] == 2, "一次打包请求 + 仅重跑缺失的一条"
+    assert "打包信息" not in results[1] and results[1]["行业名称"] == "半导体", "缺失条目应单独分析"
+    assert "打包信息" in results[0] and "打包信息" in results[2], "解析成功的条目不应重跑"
+    assert all("景气度分析" in r for r in results)
+
+
+def test_saved_input_tokens_per_item(tmp_path, monkeypatch):
+    """测试单条节省输入Token等于逐条请求与打包请求的输入Token差值均摊到每条"""
+    server = MockLLMServer(port=0).start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch, use_cache=False)
+        pack = [news for news in _news() if news.get("related_industry")]
+        results = analyzer._analyze_pack("industry", pack)
+    finally:
+        server.stop()
+
+    system_tokens = estimate_tokens(INDUSTRY_SYSTEM_PROMPT)
+    single = sum(system_tokens + estimate_tokens(analyzer._build_single_prompt("industry", news)) for news in pack)
+    packed = system_tokens + estimate_tokens(analyzer._build_packed_prompt("industry", pack))
+    expected = (single - packed) // len(pack)
+    assert expected > 0, "打包后系统提示词只发送一次，应有节省"
+    assert [r["打包信息"]["单条节省输入Token"] for r in results] == [expected] * len(pack)
@@ -0,0 +1,85 @@
+# test/test_portfolio_aggregator.py
+import sys
+import os
+import time
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.portfolio_aggregator import PortfolioAggregator
+from core.result_store import AnalysisResultStore
+
+DAY = 86400
+
+
+def _industry(name, score, tendency="利好", summary=None):
+    return {"分析类型": "行业景气度分析", "行业名称": name, "舆情摘要": summary or f"{name}{score}",
+            "景气度分析": {"景气度得分": score}, "舆情属性": {"舆情倾向": tendency}}
+
+
+def _company(name, level, industry="城投", summary=None):
+    return {"分析类型": "公司风险分析", "公司名称": name, "舆情摘要": summary or f"{name}{level}",
+            "负面舆情识别": {"严重等级": level}, "公司基本信息": {"所属行业": industry}}
+
+
+def test_recency_weighted_signals():
+    """测试近期结果权重更高，乱序到达结果一致，同一舆情只计一次"""
+    now = time.time()
+    aggregator = PortfolioAggregator(half_life_days=7)
+    assert aggregator.add(_industry("新能源", 80), ts=now)
+    assert aggregator.add(_industry("新能源", 40, "利空"), ts=now - 7 * DAY)
+    assert not aggregator.add(_industry("新能源", 80), ts=now), "重复舆情不应重复计入"
+
+    reordered = PortfolioAggregator(half_life_days=7)
+    reordered.add(_industry("新能源", 40, "利空"), ts=now - 7 * DAY)
+    reordered.add(_industry("新能源", 80), ts=now)
+
+    row = aggregator.snapshot()["行业"][0]
+    assert row["景气度得分"] == round((80 + 40 * 0.5) / 1.5, 1), "一个半衰期前的结果权重应减半"
+    assert row["舆情数"] == 2 and row["利好占比"] == round(1 / 1.5, 2)
+    assert reordered.snapshot()["行业"] == aggregator.snapshot()["行业"], "结果到达顺序不应影响信号"
+
+    aggregator.add(_company("某城投", "高"), ts=now)
+    aggregator.add(_company("某城投", "低"), ts=now)
+    company = aggregator.snapshot()["公司"][0]
+    assert company["风险指数"] == 55.0 and company["高"] == 1 and company["所属行业"] == "城投"
+
+
+def test_suggestions_regenerated_only_on_material_change():
+    """测试组合信号无实质变化时复用建议，提示词只包含前N个信号"""
+    aggregator = PortfolioAggregator(score_change=5, risk_change=15, top_n=3)
+    aggregator.add_many([_industry(f"行业{i}", 30 + i % 50) for i in range(200)]
+                        + [_company(f"公司{i}", "中") for i in range(100)])
+    calls = []
+
+    def generate(signals):
+        calls.append(signals)
+        return {"整体策略": {"市场观点": "中性"}}
+
+    first = aggregator.suggest(generate, {"投资总额": 100})
+    assert first["生成信息"]["重新生成"] and first["生成信息"]["基于结果数"] == 300
+    assert len(calls[0]["行业"]) == 6 and len(calls[0]["公司"]) == 3, "提示词只应包含首尾行业与高风险公司"
+
+    aggregator.add(_industry("行业0", 32, summary="小幅变化"))
+    second = aggregator.suggest(generate, {"投资总额": 100})
+    assert len(calls) == 1 and not second["生成信息"]["重新生成"], "微小变化不应重新调用大模型"
+    assert second["整体策略"] == first["整体策略"]
+
+    aggregator.add(_company("某地产", "高"))
+    third = aggregator.suggest(generate, {"投资总额": 100})
+    assert len(calls) == 2 and "新增风险公司：某地产" in third["生成信息"]["触发原因"]
+
+    aggregator.suggest(generate, {"投资总额": 200})
+    assert len(calls) == 3, "组合信息变化应重新生成"
+
+
+def test_seed_from_store():
+    """测试从结果库载入历史结果"""
+    store = AnalysisResultStore(":memory:")
+    store.save("industry", "医药", "集采扩面", _industry("医药", 50))
+    store.save("company", "某药企", "产品召回", _company("某药企", "中", industry=None), industry="医药")
+
+    aggregator = PortfolioAggregator()
+    assert aggregator.seed_from_store(store) == 2
+    assert aggregator.snapshot()["公司"][0]["所属行业"] == "医药"
@@ -0,0 +1,68 @@
+# test/test_rate_limiter.py
+import sys
+import os
+import time
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.rate_limiter import AdaptiveRateLimiter, TokenBucket, call_with_rate_limit
+
+
+class FakeStatusError(Exception):
+    """模拟带状态码的SDK异常"""
+
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_token_bucket_wait():
+    """测试令牌桶耗尽后需要等待"""
+    bucket = TokenBucket(rate_per_minute=60)  # 每秒1个
+    assert bucket.wait_time(60) == 0
+    bucket.consume(60)
+    assert 0.9 < bucket.wait_time(1) <= 1.0, "令牌耗尽后应等待约1秒"
+
+
+def test_aimd_concurrency_window():
+    """测试成功加性增大、限流乘性减小"""
+    limiter = AdaptiveRateLimiter(6000, 10 ** 7, max_concurrency=8, initial_concurrency=4,
+                                  decrease_cooldown=0)
+    limiter.acquire()
+    limiter.release()
+    assert limiter.concurrency_limit > 4, "成功后并发窗口应增大"
+
+    limiter.acquire()
+    assert limiter.release_failure(FakeStatusError(429)), "429应重试"
+    assert limiter.concurrency_limit < 4, "429后并发窗口应减小"
+
+    limiter.acquire()
+    assert not limiter.release_failure(FakeStatusError(401)), "401不应重试"
+
+
+def test_concurrency_limit_blocks():
+    """测试并发窗口占满时不再放行"""
+    limiter = AdaptiveRateLimiter(6000, 10 ** 7, max_concurrency=1, initial_concurrency=1)
+    limiter.acquire()
+    assert limiter._try_acquire(0) > 0, "窗口占满时应等待"
+    limiter.release()
+    assert limiter._try_acquire(0) == 0
+
+
+def test_call_with_rate_limit_retries(monkeypatch):
+    """测试限流错误自动重试后成功"""
+    limiter = AdaptiveRateLimiter(6000, 10 ** 7, max_concurrency=4, decrease_cooldown=0)
+    calls = []
+
+    def create():
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise FakeStatusError(503)
+        return "ok"
+
+    monkeypatch.setattr("core.rate_limiter.LLM_RETRY_BASE_DELAY", 0.01)
+    assert call_with_rate_limit(create, 100, limiter=limiter, max_retries=3) == "ok"
+    assert len(calls) == 3
+    assert limiter.in_flight == 0, "重试结束后不应残留占用名额"
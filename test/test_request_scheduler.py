@@ -0,0 +1,126 @@
+# test/test_request_scheduler.py
+import sys
+import os
+import time
+import asyncio
+import threading
+
+import pytest
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.rate_limiter import AdaptiveRateLimiter
+from core.data_generator_controller import DataGeneratorController
+from core.llm_telemetry import LLMTelemetry
+from core.request_scheduler import (
+    RequestScheduler,
+    current_priority_name,
+    DeadlineExceeded,
+    request_priority,
+    priority_for_news,
+    current_request,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_HIGH,
+    PRIORITY_ROUTINE
+)
+
+
+def _limiter(concurrency):
+    return AdaptiveRateLimiter(requests_per_minute=6000, tokens_per_minute=10 ** 8,
+                               max_concurrency=concurrency, initial_concurrency=concurrency)
+
+
+def test_priority_context_and_news_priority():
+    """测试默认按交互请求处理，批量舆情按严重程度分级"""
+    assert current_request()[0] == PRIORITY_INTERACTIVE
+    with request_priority(PRIORITY_ROUTINE):
+        assert current_request() == (PRIORITY_ROUTINE, None), "常规任务默认不限排队时间"
+    assert priority_for_news({"severity": "高"}) == PRIORITY_HIGH
+    assert priority_for_news({"严重程度": "中"}) == PRIORITY_ROUTINE
+
+
+def test_reserved_slots_for_interactive():
+    """测试批量任务不能占用为交互请求预留的名额"""
+    limiter = _limiter(3)
+    scheduler = RequestScheduler(reserved_slots=2)
+
+    with request_priority(PRIORITY_ROUTINE):
+        scheduler.acquire(limiter)
+        with pytest.raises(DeadlineExceeded):
+            with request_priority(PRIORITY_ROUTINE, deadline=0.2):
+                scheduler.acquire(limiter)
+
+    scheduler.acquire(limiter)
+    scheduler.acquire(limiter)
+    assert limiter.in_flight == 3, "交互请求应可使用预留名额"
+    assert scheduler.stats()["排队超时"]["routine"] == 1
+
+
+def test_higher_priority_admitted_first():
+    """测试名额释放后按优先级放行，而非按到达顺序"""
+    limiter = _limiter(1)
+    scheduler = RequestScheduler(reserved_slots=0)
+    scheduler.acquire(limiter)
+
+    order = []
+
+    def wait(priority, name):
+        with request_priority(priority):
+            scheduler.acquire(limiter)
+        order.append(name)
+        limiter.release()
+
+    threads = [threading.Thread(target=wait, args=(PRIORITY_ROUTINE, "routine")),
+               threading.Thread(target=wait, args=(PRIORITY_HIGH, "high")),
+               threading.Thread(target=wait, args=(PRIORITY_INTERACTIVE, "interactive"))]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.1)
+
+    limiter.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["interactive", "high", "routine"], f"放行顺序错误：{order}"
+
+
+def test_cancelled_waiter_leaves_queue():
+    """测试排队中的请求被取消后移出队列，不阻塞后续请求"""
+    limiter = _limiter(1)
+    scheduler = RequestScheduler(reserved_slots=0)
+    scheduler.acquire(limiter)
+
+    async def scenario():
+        waiter = asyncio.create_task(scheduler.aacquire(limiter))
+        await asyncio.sleep(0.1)
+        assert sum(scheduler.stats()["排队中"].values()) == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert sum(scheduler.stats()["排队中"].values()) == 0, "被取消的请求应移出队列"
+
+        limiter.release()
+        await asyncio.wait_for(scheduler.aacquire(limiter), timeout=1)
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 1 and scheduler.stats()["已放行"]["interactive"] == 2
+
+
+def test_data_generator_priority(tmp_path, monkeypatch):
+    """测试数据生成默认按交互请求调度，命令行批量造数可指定常规优先级"""
+    seen = []
+
+    def fake_call(create_fn, estimated_tokens, stats=None):
+        seen.append(current_priority_name())
+        raise RuntimeError("不发出请求")
+
+    monkeypatch.setattr("core.data_generator_controller.call_with_rate_limit", fake_call)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("core.data_generator_controller.get_telemetry", lambda: LLMTelemetry("", enabled=False))
+
+    DataGeneratorController("mock").generate_with_llm("生成1家上市公司")
+    DataGeneratorController("mock", priority=PRIORITY_ROUTINE).generate_with_llm("生成1家上市公司")
+    DataGeneratorController("mock", priority=PRIORITY_ROUTINE).generate_with_llm("生成1家上市公司",
+                                                                                 priority=PRIORITY_HIGH)
+    assert seen == ["interactive", "routine", "high"]
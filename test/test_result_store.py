@@ -0,0 +1,61 @@
+# test/test_result_store.py
+import sys
+import os
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.result_store import AnalysisResultStore, content_id
+
+
+def _industry_result(score, rating):
+    return {"景气度分析": {"景气度评级": rating, "景气度得分": score}, "行业名称": "新能源"}
+
+
+def test_find_latest_and_score_series():
+    """测试按舆情查找历史结果、最新分析与景气度得分走势"""
+    store = AnalysisResultStore(":memory:")
+    store.save("industry", "新能源", "补贴政策落地", _industry_result(72, "良好"))
+    store.save("industry", "新能源", "产能过剩加剧", _industry_result(45, "一般"))
+    store.save("industry", "医药", "集采扩面", _industry_result(50, "一般"))
+
+    found = store.find("industry", "新能源", "补贴政策落地")
+    assert found["得分"] == 72 and found["舆情ID"] == content_id("补贴政策落地")
+    assert store.find("industry", "医药", "补贴政策落地") is None, "不同主体不应命中"
+
+    assert store.latest("industry", "新能源")["等级"] == "一般", "应返回最新一次分析"
+    series = store.score_series("新能源")
+    assert [point["景气度得分"] for point in series] == [72, 45], "得分走势应按时间正序"
+
+
+def test_company_history_by_industry():
+    """测试公司结果按所属行业检索，并提取严重等级"""
+    store = AnalysisResultStore(":memory:")
+    store.save("company", "某光伏公司", "债券逾期", {"负面舆情识别": {"严重等级": "高"}}, industry="新能源")
+    store.save("company", "某药企", "产品召回", {"负面舆情识别": {"严重等级": "中"}}, industry="医药")
+
+    rows = store.history(industry="新能源")
+    assert len(rows) == 1 and rows[0]["主体"] == "某光伏公司" and rows[0]["等级"] == "高"
+    assert rows[0]["结果"]["负面舆情识别"]["严重等级"] == "高"
+    assert store.stats() == {"结果数": 2, "公司数": 2, "行业数": 2}
+
+
+def test_repeated_save_upserts(tmp_path):
+    """测试同一舆情重复保存不产生重复记录，结果变化时更新为最新分析"""
+    store = AnalysisResultStore(":memory:")
+    first = store.save("industry", "新能源", "补贴政策落地", _industry_result(72, "良好"))
+    assert store.save("industry", "新能源", "补贴政策落地", _industry_result(72, "良好")) == first
+    assert len(store.score_series("新能源")) == 1, "缓存命中/重复点击不应产生重复走势点"
+
+    store.save("industry", "新能源", "补贴政策落地", _industry_result(80, "良好"))
+    assert [p["景气度得分"] for p in store.score_series("新能源")] == [80], "重新分析应更新为最新结果"
+    store.save("industry", "光伏", "补贴政策落地", _industry_result(60, "一般"))
+    assert store.stats()["结果数"] == 2, "不同主体的同一舆情分别保存"
+
+    # 重新打开文件库后仍按同一场景+主体+舆情更新
+    db_path = str(tmp_path / "results.db")
+    AnalysisResultStore(db_path).save("industry", "新能源", "补贴政策落地", _industry_result(70, "良好"))
+    reopened = AnalysisResultStore(db_path)
+    reopened.save("industry", "新能源", "补贴政策落地", _industry_result(75, "良好"))
+    assert [p["景气度得分"] for p in reopened.score_series("新能源")] == [75]
@@ -0,0 +1,86 @@
+# test/test_sentiment_analyzer.py
+import sys
+import os
+
+import pytest
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.prompt_templates import INDUSTRY_SECTIONS, COMPANY_SECTIONS
+from mock_llm_server import MockLLMServer, build_analyzer
+
+
+@pytest.fixture
+def server():
+    server = MockLLMServer(port=0).start()
+    yield server
+    server.stop()
+
+
+def test_schema_valid_results(server, tmp_path, monkeypatch):
+    """测试行业/公司分析返回完整JSON框架"""
+    analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+
+    industry = analyzer.analyze_industry_sentiment("新能源", "补贴政策落地")
+    assert all(section in industry for section in INDUSTRY_SECTIONS), "行业分析板块缺失"
+    parts = industry["景气度分析"]["评分拆解"]
+    assert sum(parts.values()) == industry["景气度分析"]["景气度得分"], "评分拆解之和应等于总分"
+
+    company = analyzer.analyze_company_risk("某城投公司", "债券展期")
+    assert all(section in company for section in COMPANY_SECTIONS), "公司风险板块缺失"
+
+
+def test_streaming(server, tmp_path, monkeypatch):
+    """测试流式输出可逐板块解析"""
+    analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+    sections = [section for section, _ in analyzer.stream_industry_sentiment("半导体", "国产替代加速")]
+    assert sections[:-1] == INDUSTRY_SECTIONS, "流式板块顺序错误"
+    assert sections[-1] is None, "最后应返回完整结果"
+
+
+def test_reask_missing_sections(server, tmp_path, monkeypatch):
+    """测试截断结果仅补问缺失板块"""
+    analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+    prompt = analyzer._build_industry_prompt("新能源", "补贴政策落地")
+    truncated = '```json\n{"舆情属性": {"舆情类型": [], "舆情倾向": "利好", "影响强度": "高", "具体影响": ""}, "景气度分析": {"景气'
+    result = analyzer._build_industry_result(truncated, "新能源", "补贴政策落地")
+    assert result["解析状态"] == "已修复"
+
+    result = analyzer._complete_sections(result, "industry", prompt)
+    assert result["解析状态"] == "已补全", result.get("缺失字段")
+    assert result["舆情属性"]["舆情倾向"] == "利好", "已解析的板块不应被覆盖"
+    assert server.counters["请求数"] == 1, "应只补问一次"
+
+
+def test_unparseable_response_not_cached(server, tmp_path, monkeypatch):
+    """测试只缓存可解析为JSON对象的响应：格式错误的输出下次重新请求"""
+    import mock_llm_server
+    analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+    prompt = analyzer._build_industry_prompt("新能源", "补贴政策落地")
+
+    build_mock_content = mock_llm_server.build_mock_content
+    monkeypatch.setattr(mock_llm_server, "build_mock_content", lambda messages, rng: "模型输出了无法解析的文本")
+    analyzer._call_llm(prompt, scenario="industry")
+    analyzer._call_llm(prompt, scenario="industry")
+    assert server.counters["请求数"] == 2, "无法解析的响应不应写入缓存"
+
+    monkeypatch.setattr(mock_llm_server, "build_mock_content", build_mock_content)
+    analyzer._call_llm(prompt, scenario="industry")
+    analyzer._call_llm(prompt, scenario="industry")
+    assert server.counters["请求数"] == 3, "可解析的响应应命中缓存"
+
+
+def test_streaming_reuses_similar_news(server, tmp_path, monkeypatch):
+    """测试流式分析同样复用相似舆情结果，并按板块回放"""
+    from test_near_duplicate import ORIGINAL, REPRINT
+    analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+
+    first = list(analyzer.stream_industry_sentiment("新能源", ORIGINAL))
+    assert server.counters["请求数"] == 1
+
+    replayed = list(analyzer.stream_industry_sentiment("新能源", REPRINT))
+    assert server.counters["请求数"] == 1, "转载稿应复用已有结果，不再请求大模型"
+    assert [section for section, _ in replayed] == [section for section, _ in first]
+    assert "相似复用" in replayed[-1][1]
@@ -0,0 +1,29 @@
+# test/test_single_flight.py
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from mock_llm_server import MockLLMServer, build_analyzer
+
+
+def test_concurrent_identical_requests_coalesced(tmp_path, monkeypatch):
+    """测试相同的并发分析只调用一次大模型"""
+    server = MockLLMServer(port=0, latency="fixed:0.5").start()
+    try:
+        analyzer = build_analyzer(server.url, tmp_path, monkeypatch)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(analyzer.analyze_industry_sentiment, "新能源", "补贴政策落地")
+                       for _ in range(3)]
+            futures.append(pool.submit(lambda: list(analyzer.stream_industry_sentiment("新能源", "补贴政策落地"))))
+            results = [f.result() for f in futures]
+
+        assert server.counters["请求数"] == 1, "相同请求应只调用一次"
+        assert results[0] == results[1] and results[0] is not results[1], "等待方应拿到结果副本"
+        assert results[3][-1] == (None, results[0]), "流式等待方应回放完整结果"
+        assert analyzer.single_flight.stats()["合并请求"] == 3
+    finally:
+        server.stop()
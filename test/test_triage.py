@@ -0,0 +1,35 @@
+# test/test_triage.py
+import sys
+import os
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.triage import NewsTriage, RISK_LEXICON
+
+
+def test_lexicon_built_from_risk_types():
+    """测试风险类型枚举拆分后进入词典"""
+    for term in ["债务逾期", "高管失联", "被查", "评级下调", "流动性危机"]:
+        assert term in RISK_LEXICON, f"词典缺少【{term}】"
+
+
+def test_score_and_split():
+    """测试高信号舆情提交大模型，低信号舆情返回本地标签"""
+    news_list = [
+        {"title": "某城投公司债务逾期", "content": "该公司5亿元债券发生逾期，评级下调至BB", "related_company": "某城投"},
+        {"title": "某公司召开年度股东大会", "content": "会议审议通过年度报告", "related_company": "某公司"},
+        {"title": "新能源补贴政策落地", "content": "发改委发布实施方案，明确补贴标准", "related_industry": "新能源"},
+        {"title": "行业展会开幕", "content": "多家企业参展", "related_industry": "新能源"},
+    ]
+    triage = NewsTriage(threshold=3.0)
+    escalate, local = triage.split(news_list)
+
+    assert escalate == [0, 2], "仅高信号舆情应提交大模型"
+    assert set(local) == {1, 3}
+    assert local[1]["分析类型"] == "本地初筛" and local[1]["公司名称"] == "某公司"
+
+    scored = triage.score(news_list[0])
+    assert scored["命中关键词"]["债务逾期"] == 1, "长词应优先匹配"
+    assert "评级下调" in scored["命中关键词"]
@@ -0,0 +1,89 @@
+# test/test_url_store.py
+import sys
+import os
+
+# 配置项目路径（关键：让Python识别utils/core/config模块）
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from core.url_store import UrlStore, STATUS_VISITED, STATUS_FAILED
+
+
+def test_enqueue_returns_only_new_urls():
+    """测试登记链接只返回未发现过的URL（锚点与首尾空白不影响判断）"""
+    store = UrlStore(":memory:")
+    assert store.enqueue(["https://a.cn/1", "https://a.cn/2", "https://a.cn/1"], source="百度新闻") == \
+        ["https://a.cn/1", "https://a.cn/2"], "同批重复链接只登记一次"
+    assert store.enqueue([" https://a.cn/2#comments", "https://a.cn/3", ""], source="搜狗新闻") == \
+        ["https://a.cn/3"], "已发现的链接不应再次返回"
+    assert "https://a.cn/1" in store and "https://a.cn/4" not in store
+    assert len(store) == 3
+
+
+def test_status_and_pending_persist(tmp_path):
+    """测试抓取状态落盘，重新打开后待抓取队列可继续"""
+    db_path = str(tmp_path / "crawl_urls.db")
+    store = UrlStore(db_path)
+    store.enqueue(["https://a.cn/1", "https://a.cn/2", "https://a.cn/3"], source="zqrb_roll")
+    store.mark("https://a.cn/1", STATUS_VISITED)
+    store.mark("https://a.cn/2", STATUS_FAILED)
+    store.close()
+
+    reopened = UrlStore(db_path)
+    assert reopened.pending() == ["https://a.cn/3"], "重新打开后应只剩未抓取的链接"
+    assert reopened.enqueue(["https://a.cn/1"]) == [], "已抓取的链接重新打开后仍视为已发现"
+    assert reopened.stats() == [{"来源": "zqrb_roll", "已发现": 0, "待抓取": 1, "已抓取": 1, "失败": 1, "合计": 3}]
+
+
+def test_list_and_detail_consumers_share_store():
+    """测试列表页采集与详情页爬虫共用URL库：列表页先见过的链接仍会被抓取详情，失败的链接可重试"""
+    store = UrlStore(":memory:", retry_backoff=0)
+    # 核心采集函数（只采集列表页）：登记为已发现，不进入待抓取队列
+    assert store.observe(["https://a.cn/1", "https://a.cn/2"], source="zqrb_roll") == \
+        ["https://a.cn/1", "https://a.cn/2"]
+    assert store.observe(["https://a.cn/2"], source="zqrb_roll") == [], "已发现的链接不应再算作新舆情"
+    assert store.pending() == [], "只在列表页见过的链接不应视为待抓取"
+
+    # 详情页爬虫：列表页已见过的链接也转为待抓取，从待抓取队列取任务
+    assert store.enqueue(["https://a.cn/2", "https://a.cn/3"], source="百度新闻") == \
+        ["https://a.cn/2", "https://a.cn/3"]
+    assert store.pending() == ["https://a.cn/2", "https://a.cn/3"]
+    store.mark("https://a.cn/2", STATUS_VISITED)
+    store.mark("https://a.cn/3", STATUS_FAILED)
+    assert store.pending() == [] and store.pending(include_failed=True) == ["https://a.cn/3"], "失败的链接应可重试"
+
+    assert store.enqueue(["https://a.cn/2"]) == [], "已抓取的链接不应重新排队"
+    assert store.observe(["https://a.cn/3", "https://a.cn/4"]) == ["https://a.cn/4"]
+    assert {row["来源"]: row["已发现"] for row in store.stats()}["zqrb_roll"] == 1
+
+
+def test_failed_urls_do_not_starve_new_ones(monkeypatch):
+    """测试失败链接的重试：排在待抓取链接之后、按指数退避、达到最多尝试次数后不再返回"""
+    now = [1000.0]
+    monkeypatch.setattr("core.url_store.time.time", lambda: now[0])
+    store = UrlStore(":memory:", max_attempts=3, retry_backoff=10)
+    failed = [f"https://a.cn/old{i}" for i in range(5)]
+    for url in failed:
+        now[0] += 1
+        store.enqueue([url])
+        store.mark(url, STATUS_FAILED)
+    now[0] += 10
+    store.enqueue(["https://a.cn/new"])
+    assert store.pending(limit=5, include_failed=True) == ["https://a.cn/new"] + failed[:4], \
+        "新发现的链接应排在更早失败的链接之前"
+
+    # 第二次失败后退避翻倍（10秒→20秒）
+    store.mark("https://a.cn/new", STATUS_VISITED)
+    store.mark(failed[0], STATUS_FAILED)
+    store.enqueue(["https://a.cn/x"])
+    store.mark("https://a.cn/x", STATUS_FAILED)
+    now[0] += 15
+    assert store.pending(limit=10, include_failed=True) == failed[1:] + ["https://a.cn/x"], \
+        "退避时间未到的链接不应重试"
+    now[0] += 10
+    assert store.pending(limit=10, include_failed=True)[0] == failed[0]
+
+    # 达到最多尝试次数后不再返回
+    store.mark(failed[0], STATUS_FAILED)
+    now[0] += 1000
+    assert failed[0] not in store.pending(limit=10, include_failed=True), "达到最多尝试次数的链接不应再重试"